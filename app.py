@@ -10,6 +10,7 @@ import os
 import json
 import logging
 import re
+import time
 import urllib.parse
 import urllib.request
 from datetime import datetime
@@ -540,33 +541,47 @@ def create_app():
         init_scheduler(app)
     except Exception:
         pass
-    
-    # Add request-id + event emission middleware
+
+    # Flush batched analytics writes at request teardown
+    try:
+        from utils.analytics_service import init_activity_buffer
+        init_activity_buffer(app)
+    except Exception:
+        pass
+
+    # Negotiated zstd/br/gzip response compression (streams SSE bodies)
+    try:
+        from extensions.compression import init_compression
+        init_compression(app)
+    except Exception as e:
+        logger.warning(f"Response compression unavailable: {e}")
+
+    # Add request-id + event emission middleware. Events are queued on the
+    # telemetry sink and written in batches by its drainer thread.
     import uuid
+    telemetry = init_runtime(app).get("telemetry")
     
     @app.before_request
     def _nous_before():
         g.request_id = str(uuid.uuid4())
-        try:
-            rt = init_runtime(app)
-            rt["bus"].publish("http.request", {
-                "id": g.request_id,
-                "path": request.path,
-                "method": request.method,
-            })
-        except Exception:
-            pass
+        if telemetry is None or not telemetry.sample(request.path):
+            return
+        g.telemetry_started = time.perf_counter()
+        telemetry.record("http.request", {
+            "id": g.request_id,
+            "path": request.path,
+            "method": request.method,
+        })
     
     @app.after_request
     def _nous_after(resp):
-        try:
-            rt = init_runtime(app)
-            rt["bus"].publish("http.response", {
+        started = g.get("telemetry_started")
+        if started is not None:
+            telemetry.record("http.response", {
                 "id": getattr(g, "request_id", None),
                 "status": getattr(resp, "status_code", None),
+                "ms": round((time.perf_counter() - started) * 1000.0, 3),
             })
-        except Exception:
-            pass
         resp.headers["X-Request-Id"] = getattr(g, "request_id", "")
         return resp
     
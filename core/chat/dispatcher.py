@@ -35,6 +35,9 @@ class ChatDispatcher:
             except Exception as e:
                 print(f"Middleware error: {e}")
         
+        # Pick up codegraph edits without rebuilding the registry per message
+        self.registry.reload_if_changed()
+        
         # Find appropriate handler
         handler_info = self.registry.find_handler(message)
         
@@ -65,7 +68,9 @@ class ChatDispatcher:
                 if asyncio.iscoroutinefunction(handler_func):
                     result = await handler_func(message, context)
                 else:
-                    result = handler_func(message, context)
+                    # Sync handlers run in a worker thread so one slow handler
+                    # does not stall a shared event loop
+                    result = await asyncio.to_thread(handler_func, message, context)
                 
                 return {
                     'success': True,
@@ -112,7 +117,7 @@ class ChatDispatcher:
             if asyncio.iscoroutinefunction(self.fallback_handler):
                 result = await self.fallback_handler(message, context)
             else:
-                result = self.fallback_handler(message, context)
+                result = await asyncio.to_thread(self.fallback_handler, message, context)
             
             return {
                 'success': True,
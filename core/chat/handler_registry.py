@@ -2,24 +2,45 @@
 Handler Registry - Auto-discovery system for chat handlers
 """
 
+import os
 import json
 import inspect
-from typing import Dict, List, Callable, Any, Optional
+from typing import Dict, List, Callable, Any, Optional, Tuple
 from pathlib import Path
 
+from nous_core.patterns import AhoCorasick
+
+CODEGRAPH_PATH = '/tmp/codegraph.json'
+
 class HandlerRegistry:
     """Registry for chat handlers with auto-discovery"""
     
-    def __init__(self):
+    def __init__(self, codegraph_path: str = CODEGRAPH_PATH):
         self.handlers: Dict[str, Dict[str, Any]] = {}
+        self.codegraph_path = codegraph_path
+        self._codegraph_sig: Optional[Tuple[float, int]] = None
+        self._matcher: Optional[Tuple[AhoCorasick, List[Dict[str, Any]], List[List[Tuple[int, int]]], List[Tuple[int, int]]]] = None
         self.load_codegraph()
     
+    def _codegraph_signature(self) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(self.codegraph_path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+    
     def load_codegraph(self) -> None:
         """Load the code graph to find handlers"""
+        self._codegraph_sig = self._codegraph_signature()
         try:
-            with open('/tmp/codegraph.json', 'r') as f:
+            with open(self.codegraph_path, 'r') as f:
                 codegraph = json.load(f)
             
+            # Drop handlers from a previous codegraph load; manual ones stay
+            for name in [n for n, h in self.handlers.items() if h['type'] != 'manual']:
+                del self.handlers[name]
+            self._matcher = None
+            
             # Register handlers from codegraph
             for handler in codegraph.get('chat_handlers', []):
                 self.register_handler_from_codegraph(handler)
@@ -27,6 +48,14 @@ class HandlerRegistry:
         except Exception as e:
             print(f"Warning: Could not load codegraph: {e}")
     
+    def reload_if_changed(self) -> bool:
+        """Reload the codegraph only when its mtime/size changed (one stat call)"""
+        sig = self._codegraph_signature()
+        if sig is None or sig == self._codegraph_sig:
+            return False
+        self.load_codegraph()
+        return True
+    
     def register_handler_from_codegraph(self, handler_info: Dict[str, Any]) -> None:
         """Register a handler from codegraph data"""
         function_name = handler_info['function']
@@ -42,6 +71,7 @@ class HandlerRegistry:
             'type': handler_info.get('type', 'unknown'),
             'callable': None  # Will be set when loaded
         }
+        self._matcher = None
     
     def _extract_intent_patterns(self, function_name: str) -> List[str]:
         """Extract intent patterns from function name"""
@@ -84,22 +114,52 @@ class HandlerRegistry:
             'type': 'manual',
             'callable': handler_func
         }
+        self._matcher = None
+    
+    def _compile_matcher(self) -> Tuple[AhoCorasick, List[Dict[str, Any]], List[List[Tuple[int, int]]], List[Tuple[int, int]]]:
+        """Build one automaton over every lowercased intent pattern of every handler"""
+        order = list(self.handlers.values())
+        owners: Dict[str, Dict[int, int]] = {}
+        empty: Dict[int, int] = {}
+        for idx, handler_info in enumerate(order):
+            for pattern in handler_info['intent_patterns']:
+                pattern_lower = pattern.lower()
+                # Duplicate patterns (e.g. 'x' and 'X') score once each, as before
+                bucket = owners.setdefault(pattern_lower, {}) if pattern_lower else empty
+                bucket[idx] = bucket.get(idx, 0) + 1
+        automaton = AhoCorasick(owners)
+        compiled = (automaton, order, [list(owners[p].items()) for p in automaton.patterns], list(empty.items()))
+        self._matcher = compiled
+        return compiled
     
     def find_handler(self, message: str) -> Optional[Dict[str, Any]]:
-        """Find the best handler for a message"""
+        """Find the best handler for a message (one automaton pass, same scores as
+        _calculate_match_score summed per handler)"""
         message_lower = message.lower().strip()
         
-        best_match = None
-        best_score = 0
+        compiled = self._matcher
+        if compiled is None or len(compiled[1]) != len(self.handlers):
+            compiled = self._compile_matcher()
+        automaton, order, owners, empty = compiled
         
-        for handler_name, handler_info in self.handlers.items():
-            score = self._calculate_match_score(message_lower, handler_info['intent_patterns'])
-            
-            if score > best_score:
-                best_score = score
-                best_match = handler_info
+        scores: Dict[int, int] = {}
+        for pid, start in automaton.matches(message_lower).items():
+            if start == 0:
+                points = 100 if len(automaton.patterns[pid]) == len(message_lower) else 50
+            else:
+                # The old word-boundary branch (75) could never fire: a padded
+                # " p " inside " m " always implies p in m, which scores 25 first.
+                points = 25
+            for idx, count in owners[pid]:
+                scores[idx] = scores.get(idx, 0) + points * count
+        for idx, count in empty:
+            # '' is a prefix of everything
+            scores[idx] = scores.get(idx, 0) + (100 if not message_lower else 50) * count
         
-        return best_match if best_score > 0 else None
+        if not scores:
+            return None
+        best_idx = min(scores, key=lambda idx: (-scores[idx], idx))
+        return order[best_idx] if scores[best_idx] > 0 else None
     
     def _calculate_match_score(self, message: str, patterns: List[str]) -> int:
         """Calculate how well a message matches intent patterns"""
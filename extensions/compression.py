@@ -6,7 +6,9 @@ Dynamic compression for improved performance and reduced bandwidth
 import logging
 import json
 import gzip
-from typing import Any, Dict, Optional, Union
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
 from functools import wraps
 
 logger = logging.getLogger(__name__)
@@ -19,12 +21,50 @@ try:
 except ImportError:
     logger.warning("zstandard not available - using gzip compression fallback")
 
+# Brotli is optional too (either the C binding or the cffi one)
+BROTLI_AVAILABLE = False
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi as brotli
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        brotli = None
+
+# Server preference when the client weighs encodings equally
+ENCODING_PREFERENCE = ('zstd', 'br', 'gzip')
+
+# Content types worth compressing; everything else (images, archives,
+# octet-streams) is usually compressed already
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/xhtml+xml',
+    'application/rss+xml',
+    'application/manifest+json',
+    'image/svg+xml',
+)
+
 def init_compression(app):
     """Initialize compression system
     
+    Creates the per-thread compressor contexts and, unless
+    COMPRESSION_WSGI_MIDDLEWARE is False, wraps app.wsgi_app in
+    CompressionMiddleware so every response is negotiated and compressed.
+    
     Args:
         app: Flask application instance
     """
+    contexts = CompressorContexts(
+        zstd_level=app.config.get('COMPRESSION_ZSTD_LEVEL', 3),
+        brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', 4),
+        gzip_level=app.config.get('COMPRESSION_GZIP_LEVEL', 6),
+    )
+    
     if ZSTD_AVAILABLE:
         try:
             # Create zstandard compressor and decompressor
@@ -48,6 +88,20 @@ def init_compression(app):
             'type': 'gzip'
         }
         logger.info("Compression initialized with gzip fallback")
+    
+    if app.extensions['compression'] is None:
+        return
+    app.extensions['compression']['contexts'] = contexts
+    
+    if app.config.get('COMPRESSION_WSGI_MIDDLEWARE', True):
+        middleware = CompressionMiddleware(
+            app.wsgi_app,
+            compression_threshold=app.config.get('COMPRESSION_MIN_SIZE', 1024),
+            contexts=contexts,
+        )
+        app.wsgi_app = middleware
+        app.extensions['compression']['middleware'] = middleware
+        logger.info(f"Streaming response compression enabled: {', '.join(contexts.available)}")
 
 def get_compression():
     """Get the compression instance from the current Flask app
@@ -265,13 +319,19 @@ def get_compression_stats() -> Dict[str, Any]:
         stats['available_algorithms'].append('zstd')
     stats['available_algorithms'].append('gzip')
     
-    # In a full implementation, these would track actual usage
-    stats.update({
-        'total_compressions': 0,
-        'total_bytes_saved': 0,
-        'average_compression_ratio': 0.0,
-        'compression_errors': 0
-    })
+    if BROTLI_AVAILABLE:
+        stats['available_algorithms'].insert(-1, 'br')
+    
+    middleware = compression.get('middleware')
+    if middleware is not None:
+        stats.update(middleware.stats())
+    else:
+        stats.update({
+            'total_compressions': 0,
+            'total_bytes_saved': 0,
+            'average_compression_ratio': 0.0,
+            'compression_errors': 0
+        })
     
     return stats
 
@@ -346,21 +406,392 @@ def benchmark_compression(test_data: dict) -> Dict[str, Any]:
     
     return results
 
+
+def negotiate_encoding(accept_encoding: str, available: Iterable[str] = ENCODING_PREFERENCE) -> Optional[str]:
+    """Pick the best content-coding from an Accept-Encoding header
+    
+    Honours q-values (q=0 refuses a coding) and '*'; ties go to the server
+    preference order zstd > br > gzip.
+    
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        available: Encodings the server can produce, in preference order
+        
+    Returns:
+        Chosen encoding or None for identity
+    """
+    weights: Dict[str, float] = {}
+    for part in (accept_encoding or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zlib.Z_SYNC_FLUSH) if flush else out
+    
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+    
+    def release(self):
+        pass
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+        self._process = getattr(self._obj, 'process', None) or self._obj.compress
+    
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._process(data)
+        return out + self._obj.flush() if flush else out
+    
+    def finish(self) -> bytes:
+        return self._obj.finish()
+    
+    def release(self):
+        pass
+
+
+class _ZstdStream:
+    def __init__(self, context, release: Callable[[], None]):
+        self._obj = context.compressobj()
+        self._release = release
+    
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zstd.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+    
+    def finish(self) -> bytes:
+        return self._obj.flush(zstd.COMPRESSOBJ_FLUSH_FINISH)
+    
+    def release(self):
+        self._release()
+
+
+class CompressorContexts:
+    """Per-thread compressor state shared by every response on that thread
+    
+    A zstd context (ZstdCompressor) is expensive to create and not
+    thread-safe, so each thread keeps one and reuses it for every
+    response; a second concurrent stream on the same thread gets a
+    throwaway context. gzip and brotli streams are cheap to create.
+    """
+    
+    def __init__(self, zstd_level: int = 3, brotli_quality: int = 4, gzip_level: int = 6):
+        self.zstd_level = zstd_level
+        self.brotli_quality = brotli_quality
+        self.gzip_level = gzip_level
+        self.available: List[str] = [
+            name for name, ok in (('zstd', ZSTD_AVAILABLE), ('br', BROTLI_AVAILABLE), ('gzip', True)) if ok
+        ]
+        self._local = threading.local()
+    
+    def _zstd_context(self):
+        local = self._local
+        if getattr(local, 'zstd_busy', False):
+            return zstd.ZstdCompressor(level=self.zstd_level), lambda: None
+        if getattr(local, 'zstd', None) is None:
+            local.zstd = zstd.ZstdCompressor(level=self.zstd_level)
+        local.zstd_busy = True
+        
+        def release():
+            local.zstd_busy = False
+        return local.zstd, release
+    
+    def stream(self, encoding: str):
+        """Start a streaming compressor for one response body"""
+        if encoding == 'zstd':
+            return _ZstdStream(*self._zstd_context())
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+
+def _content_length(headers: List) -> Optional[int]:
+    for name, value in headers:
+        if name.lower() == 'content-length':
+            return int(value) if value.isdigit() else None
+    return None
+
+
+def _content_type(headers: List) -> str:
+    for name, value in headers:
+        if name.lower() == 'content-type':
+            return value.split(';')[0].strip().lower()
+    return ''
+
+
+class _CompressedBody:
+    """Response iterable for one negotiated request
+    
+    Holds the status and headers from the application's start_response
+    until the first body chunk (or the first legacy write() call) and only
+    then decides whether to compress. close() always closes the wrapped
+    iterable and releases the compressor, even when the server closes the
+    response before iterating it.
+    """
+    
+    def __init__(self, middleware: 'CompressionMiddleware', environ, start_response, encoding: str):
+        self.middleware = middleware
+        self.environ = environ
+        self.encoding = encoding
+        self.app_iter: Iterable[bytes] = ()
+        self._start_response = start_response
+        self._pending = None
+        self._write = None
+        self._stream = None
+        self._flush_each = True
+        self._closed = False
+        self._released = False
+        self._failed = False
+        self._bytes_in = self._bytes_out = 0
+    
+    def start_response(self, status, headers, exc_info=None):
+        if self._write is not None:
+            # Headers already sent: the server re-raises exc_info
+            return self._start_response(status, headers, exc_info)
+        self._pending = (status, list(headers), exc_info)
+        return self._legacy_write
+    
+    def passthrough(self) -> bool:
+        """Headers are known and rule compression out; send them now"""
+        if self._write is not None:
+            return self._stream is None
+        if self._pending is None:
+            return False
+        status, headers, _ = self._pending
+        if self.middleware._should_compress(self.environ, status, headers):
+            return False
+        self._begin(compress=False)
+        return True
+    
+    def _begin(self, compress: bool, complete: bool = False):
+        status, headers, exc_info = self._pending
+        if compress:
+            self._stream = self.middleware.contexts.stream(self.encoding)
+            self._flush_each = not complete and _content_length(headers) is None
+            headers = self.middleware._rewrite_headers(headers, self.encoding)
+        self._pending = None
+        self._write = self._start_response(status, headers, exc_info)
+    
+    def _legacy_write(self, data):
+        # write() callers get chunk-at-a-time behaviour, no size peeking
+        if self._write is None:
+            status, headers, _ = self._pending
+            self._begin(self.middleware._should_compress(self.environ, status, headers))
+        if not data:
+            return
+        if self._stream is None:
+            self._write(data)
+            return
+        self._bytes_in += len(data)
+        out = self._stream.compress(data, flush=True)
+        self._bytes_out += len(out)
+        self._write(out)
+    
+    def _holds_back(self) -> bool:
+        status, headers, _ = self._pending
+        return (_content_length(headers) is None
+                and _content_type(headers) != 'text/event-stream'
+                and self.middleware._should_compress(self.environ, status, headers))
+    
+    def _encode(self, chunk: bytes) -> bytes:
+        if self._stream is None:
+            return chunk
+        self._bytes_in += len(chunk)
+        out = self._stream.compress(chunk, self._flush_each)
+        self._bytes_out += len(out)
+        return out
+    
+    def __iter__(self):
+        try:
+            iterator = iter(self.app_iter)
+            head: List[bytes] = []
+            if self._write is None:
+                size, complete = 0, False
+                threshold = self.middleware.compression_threshold
+                while True:
+                    chunk = next(iterator, None)
+                    if chunk is None:
+                        complete = True
+                        break
+                    if chunk:
+                        head.append(chunk)
+                        size += len(chunk)
+                        if self._pending is None or not self._holds_back() or size >= threshold:
+                            break
+                if self._pending is None:
+                    raise RuntimeError('application returned a body without calling start_response')
+                status, headers, _ = self._pending
+                compress = self.middleware._should_compress(self.environ, status, headers)
+                self._begin(compress and (size >= threshold or not complete), complete)
+            for chunk in head:
+                out = self._encode(chunk)
+                if out:
+                    yield out
+            for chunk in iterator:
+                if chunk:
+                    out = self._encode(chunk)
+                    if out:
+                        yield out
+            if self._stream is not None:
+                tail = self._stream.finish()
+                if tail:
+                    self._bytes_out += len(tail)
+                    yield tail
+        except Exception:
+            self._failed = True
+            raise
+        self._release()
+    
+    def _release(self):
+        if self._stream is None or self._released:
+            return
+        self._released = True
+        self._stream.release()
+        self.middleware._record(self.encoding, self._bytes_in, self._bytes_out, self._failed)
+    
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            close = getattr(self.app_iter, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+
 class CompressionMiddleware:
-    """WSGI middleware for automatic response compression"""
+    """WSGI middleware for automatic response compression
     
-    def __init__(self, app, compression_threshold: int = 1024):
+    Negotiates zstd/br/gzip from Accept-Encoding and compresses the body as
+    the application yields it. The headers are held back until the first
+    body chunk, so applications that call start_response lazily are
+    handled too. Bodies with a Content-Length are compressed in one pass;
+    bodies without one are read up to the size threshold (small ones pass
+    through) and then flushed after every chunk, so streaming clients still
+    see each chunk as soon as it is produced. Event streams are never held
+    back. Non-text, ranged, no-transform or already-encoded responses pass
+    through untouched.
+    """
+    
+    def __init__(self, app, compression_threshold: int = 1024,
+                 contexts: Optional[CompressorContexts] = None):
         """Initialize compression middleware
         
         Args:
             app: WSGI application
             compression_threshold: Minimum response size to compress (bytes)
+            contexts: Shared per-thread compressor contexts
         """
         self.app = app
         self.compression_threshold = compression_threshold
+        self.contexts = contexts or CompressorContexts()
+        self._stats_lock = threading.Lock()
+        self._stats = {'responses': 0, 'bytes_in': 0, 'bytes_out': 0, 'errors': 0}
+        self._by_encoding = {name: 0 for name in self.contexts.available}
+    
+    def _should_compress(self, environ, status: str, headers: List) -> bool:
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return False
+        if status[:3] in ('204', '206', '304') or status[:1] == '1':
+            return False
+        values = {}
+        for name, value in headers:
+            values[name.lower()] = value
+        if 'content-encoding' in values or 'content-range' in values:
+            return False
+        if 'no-transform' in values.get('cache-control', '').lower():
+            return False
+        content_type = values.get('content-type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = _content_length(headers)
+        if length is not None and length < self.compression_threshold:
+            return False
+        return True
+    
+    @staticmethod
+    def _rewrite_headers(headers: List, encoding: str) -> List:
+        out = []
+        vary = None
+        for name, value in headers:
+            lower = name.lower()
+            if lower == 'content-length':
+                continue
+            if lower == 'vary':
+                vary = value
+                continue
+            if lower == 'etag' and not value.startswith('W/'):
+                # The representation changed; a strong validator no longer holds
+                value = 'W/' + value
+            out.append((name, value))
+        if vary is None:
+            vary = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower() and vary.strip() != '*':
+            vary = f"{vary}, Accept-Encoding"
+        out.append(('Vary', vary))
+        out.append(('Content-Encoding', encoding))
+        return out
     
     def __call__(self, environ, start_response):
         """WSGI application interface"""
-        # This would implement automatic response compression
-        # For now, just pass through to the app
-        return self.app(environ, start_response)
\ No newline at end of file
+        encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''), self.contexts.available)
+        if encoding is None:
+            return self.app(environ, start_response)
+        
+        body = _CompressedBody(self, environ, start_response, encoding)
+        app_iter = self.app(environ, body.start_response)
+        if body.passthrough():
+            # Decided up front not to compress: hand the app's iterable
+            # (and any wsgi.file_wrapper) straight to the server
+            return app_iter
+        body.app_iter = app_iter
+        return body
+    
+    def _record(self, encoding: str, bytes_in: int, bytes_out: int, failed: bool):
+        with self._stats_lock:
+            self._stats['responses'] += 1
+            self._stats['bytes_in'] += bytes_in
+            self._stats['bytes_out'] += bytes_out
+            self._stats['errors'] += failed
+            self._by_encoding[encoding] = self._by_encoding.get(encoding, 0) + 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Usage counters in the shape get_compression_stats reports"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            by_encoding = dict(self._by_encoding)
+        ratio = (1 - stats['bytes_out'] / stats['bytes_in']) * 100 if stats['bytes_in'] else 0.0
+        return {
+            'total_compressions': stats['responses'],
+            'total_bytes_saved': stats['bytes_in'] - stats['bytes_out'],
+            'average_compression_ratio': round(ratio, 2),
+            'compression_errors': stats['errors'],
+            'compressions_by_encoding': by_encoding,
+        }
@@ -202,9 +202,10 @@ def get_system_metrics() -> Dict[str, Any]:
     """
     try:
         import psutil
+        from nous_core.monitoring import get_sampler
         
         metrics = {
-            'cpu_percent': psutil.cpu_percent(interval=1),
+            'cpu_percent': get_sampler().latest()['cpu_percent'],
             'memory_percent': psutil.virtual_memory().percent,
             'disk_usage': psutil.disk_usage('/').percent,
             'timestamp': time.time()
@@ -218,7 +219,7 @@ def get_system_metrics() -> Dict[str, Any]:
                 'bytes_recv': net_io.bytes_recv
             }
         except Exception as e:
-    logger.error(f"Unexpected error: {e}")
+            logger.error(f"Unexpected error: {e}")
             
         return metrics
         
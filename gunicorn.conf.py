@@ -42,4 +42,14 @@ max_requests_jitter = 100    # Increased jitter for better worker recycling
 
 # Additional optimization settings
 reuse_port = True           # Enable port reuse for better performance
-preload_app = True         # Preload application for faster worker startup
\ No newline at end of file
+preload_app = True         # Preload application for faster worker startup
+
+def post_fork(server, worker):
+    """Start the job scheduler in each worker; the preloading master never runs it"""
+    from services.scheduler_service import ensure_scheduler_running
+    ensure_scheduler_running()
+
+def worker_exit(server, worker):
+    """Write out request telemetry still queued in this worker"""
+    from nous_core.eventing.telemetry import flush_all
+    flush_all()
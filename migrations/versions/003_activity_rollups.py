@@ -0,0 +1,163 @@
+"""Activity rollups and batched analytics writes
+
+1. Creates user_activity_rollups (per user/day/activity type counters) and
+   backfills it from user_activities, so existing installs get populated
+   dashboards without a manual rebuild_rollups()
+2. Makes user_metrics unique per (user_id, metric_type, metric_date) so the
+   batched analytics writer can UPSERT-increment daily rows; existing
+   duplicates are merged into the lowest id first (counters summed, mood
+   averaged by entry count, feature lists and custom metrics combined)
+
+Revision ID: 003_activity_rollups
+Revises: 002_audit_fixes
+Create Date: 2026-10-16
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# Same precedence as utils.analytics_service.VALUE_KEYS (kept local so the
+# migration does not depend on application code)
+VALUE_KEYS = ('value', 'rating', 'mood', 'score')
+BATCH_SIZE = 1000
+METRIC_COUNTERS = ('tasks_completed', 'tasks_created', 'chat_sessions', 'total_chat_time',
+                   'mood_entries', 'workout_sessions', 'app_sessions', 'total_app_time')
+
+# Revision identifiers
+revision = '003_activity_rollups'
+down_revision = '002_audit_fixes'
+branch_labels = None
+depends_on = None
+
+
+def _activity_value(activity_data):
+    if not isinstance(activity_data, dict):
+        return None
+    for key in VALUE_KEYS:
+        value = activity_data.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return None
+
+
+def _backfill_rollups(rollups):
+    """Fold every user_activities row into per (user, day, type, category) counters"""
+    activities = sa.table(
+        'user_activities',
+        sa.column('user_id', sa.Integer), sa.column('timestamp', sa.DateTime),
+        sa.column('activity_type', sa.String), sa.column('activity_category', sa.String),
+        sa.column('duration_seconds', sa.Integer), sa.column('activity_data', sa.JSON),
+    )
+    query = sa.select(
+        activities.c.user_id, activities.c.timestamp, activities.c.activity_type,
+        activities.c.activity_category, activities.c.duration_seconds, activities.c.activity_data,
+    ).where(activities.c.timestamp.isnot(None))
+
+    totals = {}
+    result = op.get_bind().execution_options(stream_results=True).execute(query)
+    for user_id, ts, activity_type, category, duration, data in result:
+        key = (user_id, ts.date(), activity_type, category or '')
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = {'user_id': user_id, 'day': key[1], 'activity_type': activity_type,
+                                 'activity_category': key[3], 'count': 0, 'duration_seconds': 0,
+                                 'value_sum': 0.0, 'value_count': 0}
+        row['count'] += 1
+        row['duration_seconds'] += duration or 0
+        value = _activity_value(data)
+        if value is not None:
+            row['value_sum'] += value
+            row['value_count'] += 1
+
+    rows = list(totals.values())
+    for i in range(0, len(rows), BATCH_SIZE):
+        op.bulk_insert(rollups, rows[i:i + BATCH_SIZE])
+
+
+def _merge_metrics(rows):
+    """Fold duplicate user_metrics rows (oldest first) into one set of values"""
+    merged = {key: sum(row[key] or 0 for row in rows) for key in METRIC_COUNTERS}
+
+    moods = [(row['mood_average'], row['mood_entries'] or 0) for row in rows if row['mood_average'] is not None]
+    weight = sum(n for _, n in moods)
+    if not moods:
+        merged['mood_average'] = None
+    elif weight:
+        merged['mood_average'] = sum(avg * n for avg, n in moods) / weight
+    else:
+        merged['mood_average'] = sum(avg for avg, _ in moods) / len(moods)
+
+    features = []
+    for row in rows:
+        for feature in row['features_used'] or []:
+            if feature not in features:
+                features.append(feature)
+    merged['features_used'] = features if any(row['features_used'] is not None for row in rows) else None
+
+    custom = None
+    for row in rows:
+        if not isinstance(row['custom_metrics'], dict):
+            continue
+        custom = {} if custom is None else custom
+        for key, value in row['custom_metrics'].items():
+            current = custom.get(key)
+            numeric = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                       and isinstance(current, (int, float)) and not isinstance(current, bool))
+            if numeric:
+                custom[key] = current + value
+            elif current is None:
+                custom[key] = value
+    merged['custom_metrics'] = custom
+    return merged
+
+
+def _dedupe_metrics():
+    """Merge duplicate daily user_metrics rows into the lowest id, then drop the rest"""
+    metrics = sa.table(
+        'user_metrics',
+        sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+        sa.column('metric_type', sa.String), sa.column('metric_date', sa.Date),
+        sa.column('mood_average', sa.Float), sa.column('features_used', sa.JSON),
+        sa.column('custom_metrics', sa.JSON),
+        *(sa.column(key, sa.Integer) for key in METRIC_COUNTERS),
+    )
+    bind = op.get_bind()
+    group = (metrics.c.user_id, metrics.c.metric_type, metrics.c.metric_date)
+    duplicates = bind.execute(sa.select(*group).group_by(*group).having(sa.func.count() > 1)).all()
+    for user_id, metric_type, metric_date in duplicates:
+        rows = bind.execute(
+            sa.select(metrics).where(metrics.c.user_id == user_id, metrics.c.metric_type == metric_type,
+                                     metrics.c.metric_date == metric_date).order_by(metrics.c.id)
+        ).mappings().all()
+        keep = rows[0]['id']
+        bind.execute(metrics.update().where(metrics.c.id == keep).values(**_merge_metrics(rows)))
+        bind.execute(metrics.delete().where(metrics.c.id.in_([row['id'] for row in rows[1:]])))
+
+
+def upgrade():
+    rollups = op.create_table('user_activity_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('activity_type', sa.String(length=50), nullable=False),
+        sa.Column('activity_category', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('duration_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('value_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('value_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', 'activity_type', 'activity_category',
+                            name='uq_activity_rollup_user_day_type')
+    )
+    _backfill_rollups(rollups)
+
+    # Earlier code could create duplicate daily rows; fold them together first
+    _dedupe_metrics()
+    op.create_index('uq_user_metrics_user_type_date', 'user_metrics',
+                    ['user_id', 'metric_type', 'metric_date'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_user_metrics_user_type_date', table_name='user_metrics')
+    op.drop_table('user_activity_rollups')
@@ -0,0 +1,34 @@
+"""Leaderboard indexes
+
+1. point_transactions.created_at, for the per-period score scans
+2. leaderboard_entries (leaderboard_type, category, period_start, rank), so
+   top-N reads walk the index in rank order
+3. leaderboard_entries (leaderboard_type, category, period_start, score), for
+   incremental re-ranking
+
+Revision ID: 004_leaderboard_indexes
+Revises: 003_activity_rollups
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+# Revision identifiers
+revision = '004_leaderboard_indexes'
+down_revision = '003_activity_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_point_transactions_created_at', 'point_transactions', ['created_at'])
+    op.create_index('idx_leaderboard_period_rank', 'leaderboard_entries',
+                    ['leaderboard_type', 'category', 'period_start', 'rank'])
+    op.create_index('idx_leaderboard_period_score', 'leaderboard_entries',
+                    ['leaderboard_type', 'category', 'period_start', 'score'])
+
+
+def downgrade():
+    op.drop_index('idx_leaderboard_period_score', table_name='leaderboard_entries')
+    op.drop_index('idx_leaderboard_period_rank', table_name='leaderboard_entries')
+    op.drop_index('ix_point_transactions_created_at', table_name='point_transactions')
@@ -41,9 +41,44 @@ class UserActivity(db.Model):
             'session_id': self.session_id
         }
 
+class UserActivityRollup(db.Model):
+    """Per user/day/activity type counters, maintained incrementally by AnalyticsService"""
+    __tablename__ = 'user_activity_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'activity_type', 'activity_category',
+                            name='uq_activity_rollup_user_day_type'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    activity_type = db.Column(db.String(50), nullable=False)
+    activity_category = db.Column(db.String(50), nullable=False, default='')  # '' = uncategorised
+    count = db.Column(db.Integer, nullable=False, default=0)
+    duration_seconds = db.Column(db.Integer, nullable=False, default=0)
+    value_sum = db.Column(db.Float, nullable=False, default=0.0)  # numeric payloads, e.g. mood ratings
+    value_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'day': self.day.isoformat() if self.day else None,
+            'activity_type': self.activity_type,
+            'activity_category': self.activity_category or None,
+            'count': self.count,
+            'duration_seconds': self.duration_seconds,
+            'value_sum': self.value_sum,
+            'value_count': self.value_count
+        }
+
 class UserMetrics(db.Model):
     """Aggregate user metrics for analytics"""
     __tablename__ = 'user_metrics'
+    __table_args__ = (
+        # Target of the UPSERT-increments in AnalyticsService's batched writes; a unique
+        # index rather than a constraint, matching migration 003 (SQLite cannot add constraints)
+        db.Index('uq_user_metrics_user_type_date', 'user_id', 'metric_type', 'metric_date', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
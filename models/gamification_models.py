@@ -164,7 +164,7 @@ class PointTransaction(db.Model):
     transaction_type = db.Column(db.String(50))  # earned, spent, bonus
     reason = db.Column(db.String(200))
     category = db.Column(db.String(50))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # leaderboard period scans
     
     # Relationships
     user = db.relationship('User', backref='point_transactions')
@@ -191,6 +191,9 @@ class Leaderboard(db.Model):
     __table_args__ = (
         db.UniqueConstraint('user_id', 'leaderboard_type', 'category', 'period_start', 
                           name='_user_leaderboard_uc'),
+        # Top-N reads walk the first in rank order; incremental re-ranking seeks the second by score
+        db.Index('idx_leaderboard_period_rank', 'leaderboard_type', 'category', 'period_start', 'rank'),
+        db.Index('idx_leaderboard_period_score', 'leaderboard_type', 'category', 'period_start', 'score'),
     )
 
 
@@ -23,7 +23,8 @@ class Language(db.Model):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     # Relationships
-    learning_sessions = relationship("LanguageLearningSession", foreign_keys="[LanguageLearningSession.target_language_id]")
+    learning_sessions = relationship("LanguageLearningSession", foreign_keys="[LanguageLearningSession.target_language_id]",
+                                     back_populates="target_language")
     progress_records = relationship("LanguageProgress", back_populates="language")
 
 
@@ -33,8 +34,8 @@ class LanguageLearningSession(db.Model):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
-    target_language_id = Column(Integer, nullable=False)
-    native_language_id = Column(Integer, nullable=False)
+    target_language_id = Column(Integer, ForeignKey('languages.id'), nullable=False)
+    native_language_id = Column(Integer, ForeignKey('languages.id'), nullable=False)
     session_type = Column(String(50), nullable=False)  # vocabulary, grammar, conversation, reading
     lesson_topic = Column(String(255))
     duration_minutes = Column(Integer, default=0)
@@ -48,7 +49,7 @@ class LanguageLearningSession(db.Model):
     is_completed = Column(Boolean, default=False)
     
     # Relationships
-    target_language = relationship("Language", foreign_keys=[target_language_id])
+    target_language = relationship("Language", foreign_keys=[target_language_id], back_populates="learning_sessions")
     native_language = relationship("Language", foreign_keys=[native_language_id])
     vocabulary_progress = relationship("VocabularyProgress", back_populates="session")
 
@@ -59,7 +60,7 @@ class LanguageProgress(db.Model):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
-    language_id = Column(Integer, nullable=False)
+    language_id = Column(Integer, ForeignKey('languages.id'), nullable=False)
     proficiency_level = Column(String(20), default='beginner')  # beginner, elementary, intermediate, advanced, fluent
     total_xp = Column(Integer, default=0)
     current_streak = Column(Integer, default=0)
@@ -80,7 +81,7 @@ class Vocabulary(db.Model):
     __tablename__ = 'vocabulary'
     
     id = Column(Integer, primary_key=True)
-    language_id = Column(Integer, nullable=False)
+    language_id = Column(Integer, ForeignKey('languages.id'), nullable=False)
     word = Column(String(255), nullable=False)
     translation = Column(String(255), nullable=False)
     pronunciation = Column(String(255))
@@ -94,7 +95,6 @@ class Vocabulary(db.Model):
     
     # Relationships
     language = relationship("Language")
-    progress_records = relationship("VocabularyProgress", back_populates="vocabulary")
 
 
 class VocabularyProgress(db.Model):
@@ -103,8 +103,8 @@ class VocabularyProgress(db.Model):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
-    vocabulary_id = Column(Integer, nullable=False)
-    session_id = Column(Integer)
+    vocabulary_id = Column(Integer, ForeignKey('vocabulary_items.id'), nullable=False)
+    session_id = Column(Integer, ForeignKey('language_learning_sessions.id'))
     mastery_level = Column(Integer, default=0)  # 0-5 scale (0=new, 5=mastered)
     correct_attempts = Column(Integer, default=0)
     total_attempts = Column(Integer, default=0)
@@ -124,7 +124,7 @@ class LanguageGoal(db.Model):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
-    language_id = Column(Integer, nullable=False)
+    language_id = Column(Integer, ForeignKey('languages.id'), nullable=False)
     goal_type = Column(String(50), nullable=False)  # daily_minutes, words_per_week, streak_days
     target_value = Column(Float, nullable=False)
     current_value = Column(Float, default=0.0)
@@ -143,7 +143,7 @@ class LanguageAchievement(db.Model):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, nullable=False)
-    language_id = Column(Integer)
+    language_id = Column(Integer, ForeignKey('languages.id'))
     achievement_type = Column(String(100), nullable=False)  # first_lesson, streak_7_days, 100_words, etc.
     title = Column(String(255), nullable=False)
     description = Column(Text)
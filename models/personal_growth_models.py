@@ -47,7 +47,7 @@ class Goal(db.Model):
     
     # VOCAB: SMART Goal - Specific, Measurable, Achievable, Relevant, Time-bound objective
     # Relationships
-    user = db.relationship('User', backref='goals')
+    user = db.relationship('User', backref='growth_goals')
     sub_goals = db.relationship('Goal', backref=db.backref('parent_goal', remote_side=[id]))
     milestones = db.relationship('GoalMilestone', back_populates='goal', cascade='all, delete-orphan')
     
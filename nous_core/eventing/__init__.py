@@ -1,3 +1,5 @@
-from .event_store import EventStore
 from .bus import EventBus
+from .event_store import EventStore
+from .telemetry import TelemetrySink
 
+__all__ = ["EventStore", "EventBus", "TelemetrySink"]
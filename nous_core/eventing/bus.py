@@ -1,10 +1,16 @@
 from __future__ import annotations
+import os
 import threading
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from .event_store import EventStore
 
 Subscriber = Callable[[str, Dict[str, Any]], None]
 
+OVERFLOW_POLICIES = ("drop", "block")
+
 def _match(pattern: str, topic: str) -> bool:
     pattern = (pattern or "").strip()
     topic = (topic or "").strip()
@@ -15,48 +21,267 @@ def _match(pattern: str, topic: str) -> bool:
         return topic == base or topic.startswith(base + ".")
     return pattern == topic
 
+
+class _Subscription:
+    """One subscribe() call: the callback, its mailbox and its delivery stats."""
+    def __init__(self, pattern: str, fn: Subscriber, queue_size: int):
+        self.pattern = pattern
+        self.fn = fn
+        self.name = getattr(fn, "__name__", "anonymous")
+        self.active = True
+        self.queue: Deque[Tuple[float, str, Dict[str, Any]]] = deque()
+        self.queue_size = queue_size
+        self.scheduled = False
+        self.delivered = 0
+        self.errors = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_total = 0.0
+
+    def record(self, enqueued_at: float, error: Optional[Exception]) -> None:
+        lag = time.monotonic() - enqueued_at
+        self.lag_last = lag
+        self.lag_max = max(self.lag_max, lag)
+        self.lag_total += lag
+        if error is None:
+            self.delivered += 1
+        else:
+            self.errors += 1
+            self.last_error = str(error)
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.delivered + self.errors
+        return {
+            "subscriber": self.name,
+            "pattern": self.pattern,
+            "delivered": self.delivered,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "queued": len(self.queue),
+            "last_error": self.last_error,
+            "lag_ms_last": round(self.lag_last * 1000.0, 3),
+            "lag_ms_max": round(self.lag_max * 1000.0, 3),
+            "lag_ms_avg": round(self.lag_total / done * 1000.0, 3) if done else 0.0,
+        }
+
+
+class _TopicTrie:
+    """
+    Immutable index of subscriptions keyed by dotted topic segments.
+    Exact patterns sit on their node; "base.*" patterns sit on the base node as
+    wildcards; "*" sits on the root. Matching walks the topic once: O(depth).
+    """
+    __slots__ = ("exact", "wild", "children")
+
+    def __init__(self) -> None:
+        self.exact: List[_Subscription] = []
+        self.wild: List[_Subscription] = []
+        self.children: Dict[str, "_TopicTrie"] = {}
+
+    @classmethod
+    def build(cls, subs: List[_Subscription]) -> "_TopicTrie":
+        root = cls()
+        for sub in subs:
+            pattern = (sub.pattern or "").strip()
+            if pattern in ("", "*"):
+                root.wild.append(sub)
+                continue
+            wildcard = pattern.endswith(".*")
+            node = root
+            for seg in (pattern[:-2] if wildcard else pattern).split("."):
+                node = node.children.setdefault(seg, cls())
+            (node.wild if wildcard else node.exact).append(sub)
+        return root
+
+    def match(self, topic: str) -> List[_Subscription]:
+        out = list(self.wild)
+        node: Optional[_TopicTrie] = self
+        for seg in (topic or "").strip().split("."):
+            node = node.children.get(seg)  # type: ignore[union-attr]
+            if node is None:
+                return out
+            out.extend(node.wild)
+        out.extend(node.exact)  # type: ignore[union-attr]
+        return out
+
+
 class EventBus:
-    """Thread-safe in-process pub/sub bus with optional persistence."""
-    def __init__(self, store: Optional[EventStore] = None):
+    """
+    Thread-safe in-process pub/sub bus with optional persistence.
+    - Subscriptions are compiled into a topic trie on (un)subscribe, so
+      publish matches in O(topic depth) without taking the lock.
+    - async_dispatch=True hands events to per-subscriber bounded queues drained
+      by a shared pool of `workers` threads; publish never runs subscriber code.
+      When a queue is full, overflow="drop" discards the event (counted) and
+      overflow="block" waits up to `block_timeout` seconds for room.
+    - metrics() reports delivered/error/drop counts and lag per subscriber.
+    """
+    def __init__(self, store: Optional[EventStore] = None, async_dispatch: bool = False,
+                 workers: int = 4, queue_size: int = 1000, overflow: str = "drop",
+                 block_timeout: float = 1.0):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
         self.store = store
-        self._subs: Dict[str, List[Subscriber]] = {}
+        self.async_dispatch = async_dispatch
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.overflow = overflow
+        self.block_timeout = float(block_timeout)
+        self._subs: Dict[str, List[_Subscription]] = {}
+        self._trie = _TopicTrie()
         self._lock = threading.RLock()
+        self._cond = threading.Condition(threading.Lock())
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_pid = 0
+
+    def _rebuild(self) -> None:
+        self._trie = _TopicTrie.build([s for subs in self._subs.values() for s in subs])
 
     def subscribe(self, pattern: str, fn: Subscriber) -> None:
         with self._lock:
-            self._subs.setdefault(pattern, []).append(fn)
+            self._subs.setdefault(pattern, []).append(_Subscription(pattern, fn, self.queue_size))
+            self._rebuild()
 
     def unsubscribe(self, pattern: str, fn: Subscriber) -> None:
         with self._lock:
-            if pattern in self._subs and fn in self._subs[pattern]:
-                self._subs[pattern].remove(fn)
-                if not self._subs[pattern]:
-                    del self._subs[pattern]
+            subs = self._subs.get(pattern, [])
+            for sub in subs:
+                if sub.fn == fn:
+                    sub.active = False
+                    subs.remove(sub)
+                    break
+            if pattern in self._subs and not subs:
+                del self._subs[pattern]
+            self._rebuild()
 
     def publish(self, topic: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         event_id: Optional[int] = None
         if self.store is not None:
             event_id = self.store.append(topic, payload)
 
-        with self._lock:
-            snapshot: List[Tuple[str, List[Subscriber]]] = [
-                (pat, list(fns)) for pat, fns in self._subs.items()
-            ]
+        matched = self._trie.match(topic)
+        if self.async_dispatch:
+            queued, dropped = self._enqueue(matched, topic, payload)
+            return {"ok": True, "event_id": event_id, "delivered": queued, "dropped": dropped, "errors": []}
+
+        errors: List[Dict[str, Any]] = []
+        delivered = self._deliver(matched, topic, payload, errors)
+        return {"ok": True, "event_id": event_id, "delivered": delivered, "errors": errors}
 
+    @staticmethod
+    def _deliver(matched: List[_Subscription], topic: str, payload: Dict[str, Any],
+                 errors: List[Dict[str, Any]]) -> int:
         delivered = 0
+        for sub in matched:
+            start = time.monotonic()
+            try:
+                sub.fn(topic, payload)
+                delivered += 1
+                sub.record(start, None)
+            except Exception as e:
+                sub.record(start, e)
+                errors.append({
+                    "subscriber": sub.name,
+                    "error": str(e),
+                })
+        return delivered
+
+    def publish_many(self, events: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Persist a batch of events in one store transaction, then dispatch each."""
+        event_ids: List[Optional[int]] = [None] * len(events)
+        if self.store is not None and events:
+            event_ids = list(self.store.append_many(events))
+        delivered = dropped = 0
         errors: List[Dict[str, Any]] = []
-        for pat, fns in snapshot:
-            if not _match(pat, topic):
+        for topic, payload in events:
+            matched = self._trie.match(topic)
+            if self.async_dispatch:
+                queued, lost = self._enqueue(matched, topic, payload)
+                delivered += queued
+                dropped += lost
                 continue
-            for fn in fns:
-                try:
-                    fn(topic, payload)
-                    delivered += 1
-                except Exception as e:
-                    errors.append({
-                        "subscriber": getattr(fn, "__name__", "anonymous"),
-                        "error": str(e),
-                    })
+            delivered += self._deliver(matched, topic, payload, errors)
+        return {"ok": True, "event_ids": event_ids, "delivered": delivered, "dropped": dropped, "errors": errors}
 
-        return {"ok": True, "event_id": event_id, "delivered": delivered, "errors": errors}
+    # --- async dispatch ------------------------------------------------------
 
+    def _executor(self) -> ThreadPoolExecutor:
+        # Worker threads do not survive a fork; recreate per process.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="eventbus")
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _enqueue(self, matched: List[_Subscription], topic: str, payload: Dict[str, Any]) -> Tuple[int, int]:
+        queued = dropped = 0
+        now = time.monotonic()
+        to_schedule: List[_Subscription] = []
+        with self._cond:
+            for sub in matched:
+                if len(sub.queue) >= sub.queue_size and self.overflow == "block":
+                    deadline = now + self.block_timeout
+                    while len(sub.queue) >= sub.queue_size and sub.active:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                if len(sub.queue) >= sub.queue_size:
+                    sub.dropped += 1
+                    dropped += 1
+                    continue
+                sub.queue.append((now, topic, payload))
+                queued += 1
+                if not sub.scheduled:
+                    sub.scheduled = True
+                    to_schedule.append(sub)
+        for sub in to_schedule:
+            self._executor().submit(self._drain, sub)
+        return queued, dropped
+
+    def _drain(self, sub: _Subscription, batch: int = 32) -> None:
+        # At most one drain per subscriber is in flight, which keeps per-subscriber
+        # ordering; yielding after `batch` events keeps slow subscribers from
+        # monopolising a worker.
+        for _ in range(batch):
+            with self._cond:
+                if not sub.active:
+                    sub.queue.clear()
+                if not sub.queue:
+                    sub.scheduled = False
+                    self._cond.notify_all()
+                    return
+                enqueued_at, topic, payload = sub.queue.popleft()
+                self._cond.notify_all()
+            try:
+                sub.fn(topic, payload)
+                sub.record(enqueued_at, None)
+            except Exception as e:
+                sub.record(enqueued_at, e)
+        self._executor().submit(self._drain, sub, batch)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every subscriber queue is drained. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                with self._lock:
+                    subs = [s for group in self._subs.values() for s in group]
+                if not any(s.queue or s.scheduled for s in subs):
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(0.05 if remaining is None else min(remaining, 0.05))
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            subs = [s for group in self._subs.values() for s in group]
+        return [s.stats() for s in subs]
@@ -1,19 +1,46 @@
 from __future__ import annotations
 import json
 import sqlite3
+import threading
 import time
-from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-class EventStore:
-    """SQLite-backed append-only event log."""
-    def __init__(self, db_path: str):
-        self.db_path = str(db_path)
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from nous_core.storage import SQLiteStore
+
+
+class _PendingAppend:
+    __slots__ = ("row", "event_id", "error", "done", "lead")
+
+    def __init__(self, row: Tuple[float, str, str]):
+        self.row = row
+        self.event_id: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()  # set once written, or when promoted to lead
+        self.lead = False
+
+
+class EventStore(SQLiteStore):
+    """
+    SQLite-backed append-only event log on the shared SQLiteStore layer
+    (per-thread WAL connections, re-opened after fork).
+    - group_commit=True lets concurrent appends share one transaction: the
+      first caller commits for everyone queued behind it (leader/follower, no
+      background thread). A leader commits one batch only, then hands the
+      lead to the oldest waiter, so no append waits on more than one round
+      after its own. `commit_window` optionally delays the leader so more
+      appends can join.
+    """
+    def __init__(self, db_path: str, group_commit: bool = False, commit_window: float = 0.0, **store_opts: Any):
+        super().__init__(db_path, **store_opts)
+        self.group_commit = group_commit
+        self.commit_window = float(commit_window)
+        self._pending: List[_PendingAppend] = []
+        self._pending_lock = threading.Lock()
+        self._flushing = False
         self._init_db()
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        def create(conn: sqlite3.Connection) -> None:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -22,32 +49,96 @@ class EventStore:
                     payload TEXT NOT NULL
                 )
             """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_topic ON events(topic)")
+            # (topic, ts) covers topic-prefix range scans ordered by time; it
+            # supersedes the old single-column topic index.
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_topic_ts ON events(topic, ts)")
+            conn.execute("DROP INDEX IF EXISTS idx_events_topic")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)")
-            conn.commit()
+        self.write(create)
+
+    def _insert_rows(self, rows: List[Tuple[float, str, str]]) -> List[int]:
+        def insert(conn: sqlite3.Connection) -> int:
+            conn.executemany("INSERT INTO events(ts, topic, payload) VALUES (?, ?, ?)", rows)
+            # AUTOINCREMENT ids are contiguous inside one write transaction.
+            return int(conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+        last = self.write(insert)
+        return list(range(last - len(rows) + 1, last + 1))
+
+    @staticmethod
+    def _row(topic: str, payload: Dict[str, Any]) -> Tuple[float, str, str]:
+        return (time.time(), topic, json.dumps(payload, ensure_ascii=False))
 
     def append(self, topic: str, payload: Dict[str, Any]) -> int:
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.execute(
-                "INSERT INTO events(ts, topic, payload) VALUES (?, ?, ?)",
-                (time.time(), topic, json.dumps(payload, ensure_ascii=False)),
-            )
-            conn.commit()
-            return int(cur.lastrowid)
+        row = self._row(topic, payload)
+        if not self.group_commit:
+            return self._insert_rows([row])[0]
+
+        item = _PendingAppend(row)
+        with self._pending_lock:
+            self._pending.append(item)
+            item.lead = not self._flushing
+            if item.lead:
+                self._flushing = True
+        if not item.lead:
+            item.done.wait()
+        if item.lead:
+            self._lead_round()
+        if item.error is not None:
+            raise item.error
+        return int(item.event_id)  # type: ignore[arg-type]
+
+    def _lead_round(self) -> None:
+        """Commit the queued batch (which holds the leader's own append), then pass the lead on"""
+        if self.commit_window > 0:
+            time.sleep(self.commit_window)  # let concurrent appends join
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        self._write_batch(batch)
+        # Appends that arrived while the commit was in flight are written by
+        # the oldest of them in the next round.
+        with self._pending_lock:
+            if self._pending:
+                successor = self._pending[0]
+                successor.lead = True
+                successor.done.set()
+            else:
+                self._flushing = False
+
+    def _write_batch(self, batch: List[_PendingAppend]) -> None:
+        try:
+            for pending, event_id in zip(batch, self._insert_rows([p.row for p in batch])):
+                pending.event_id = event_id
+        except Exception as e:
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+    def append_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]) -> List[int]:
+        rows = [self._row(topic, payload) for topic, payload in events]
+        if not rows:
+            return []
+        return self._insert_rows(rows)
 
     def recent(self, limit: int = 100, topic_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
-        q = "SELECT id, ts, topic, payload FROM events"
-        args = []
         if topic_prefix:
-            q += " WHERE topic LIKE ?"
-            args.append(topic_prefix + "%")
-        q += " ORDER BY ts DESC LIMIT ?"
-        args.append(limit)
-        with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute(q, args).fetchall()
+            # Half-open range on topic so idx_events_topic_ts serves the filter;
+            # payloads are only read for the rows that survive the LIMIT.
+            upper = topic_prefix[:-1] + chr(ord(topic_prefix[-1]) + 1)
+            q = """
+                SELECT id, ts, topic, payload FROM events WHERE id IN (
+                    SELECT id FROM events WHERE topic >= ? AND topic < ?
+                    ORDER BY ts DESC LIMIT ?
+                ) ORDER BY ts DESC
+            """
+            args: List[Any] = [topic_prefix, upper, limit]
+        else:
+            q = "SELECT id, ts, topic, payload FROM events ORDER BY ts DESC LIMIT ?"
+            args = [limit]
+        rows = self.read(q, args)
 
         out: List[Dict[str, Any]] = []
         for eid, ts, topic, payload in rows:
             out.append({"id": eid, "ts": ts, "topic": topic, "payload": json.loads(payload)})
         return out
-
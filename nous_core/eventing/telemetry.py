@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Path prefixes matched on whole segments: "/health" covers "/health" and
+# "/health/quick" but not "/healthcare"
+DEFAULT_EXCLUDE = ("/static", "/health", "/healthz", "/ready", "/favicon.ico",
+                   "/api/health", "/api/healthz", "/api/v2/health")
+
+_sinks: "weakref.WeakSet[TelemetrySink]" = weakref.WeakSet()
+
+
+class TelemetrySink:
+    """
+    Off-request-path buffer for high-volume telemetry events (http.request /
+    http.response). record() only appends to a bounded in-memory ring; a
+    daemon thread drains it every `flush_interval` seconds (or once half of
+    it is filled) and hands the batch to `bus.publish_many`, i.e. one
+    event-store transaction per batch.
+    - The ring is a deque: append and popleft are atomic, so producers never
+      take a lock. Once `capacity` events are queued new events are dropped
+      and counted instead of blocking the request (the bound is soft by at
+      most one event per concurrent producer).
+    - sample() applies path exclusion (whole-segment prefix match) and the
+      sample rate.
+    - Each process (gunicorn worker) has its own ring and drainer; both are
+      reset after fork. flush() runs at exit and from gunicorn's worker_exit.
+    """
+    def __init__(self, bus: Any, capacity: int = 8192, flush_interval: float = 1.0,
+                 sample_rate: float = 1.0, exclude: Iterable[str] = DEFAULT_EXCLUDE):
+        self.bus = bus
+        self.capacity = max(2, int(capacity))
+        self.flush_interval = float(flush_interval)
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self.exclude = tuple(p.rstrip("/") for p in exclude if p and p.rstrip("/"))
+        self._exclude_dirs = tuple(p + "/" for p in self.exclude)
+        self._flush_lock = threading.Lock()
+        self._reset()
+        _sinks.add(self)
+
+    def _reset(self) -> None:
+        self._ring: Deque[Tuple[str, Dict[str, Any]]] = deque()
+        self._wake = threading.Event()
+        self._drop_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._stats = {"dropped": 0, "flushed": 0, "batches": 0, "errors": 0, "max_batch": 0,
+                       "last_flush_ms": 0.0}
+
+    # --- producers -------------------------------------------------------------
+
+    def sample(self, path: str) -> bool:
+        """Whether a request to `path` should be recorded at all."""
+        if self.exclude and (path in self.exclude or path.startswith(self._exclude_dirs)):
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, topic: str, payload: Dict[str, Any]) -> bool:
+        """Queue one event; returns False when it was dropped."""
+        pending = len(self._ring)
+        if pending >= self.capacity:
+            with self._drop_lock:
+                self._stats["dropped"] += 1
+            return False
+        self._ring.append((topic, payload))
+        if self._thread is None:
+            self._start()
+        elif pending == self.capacity // 2:
+            self._wake.set()
+        return True
+
+    # --- draining --------------------------------------------------------------
+
+    def _start(self) -> None:
+        with self._flush_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telemetry-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # pragma: no cover - keep the drainer alive
+                logger.warning("telemetry flush failed: %s", e)
+
+    def _take(self) -> List[Tuple[str, Dict[str, Any]]]:
+        ring, popleft = self._ring, self._ring.popleft
+        # Bounded by what is queued now so a busy producer cannot starve the flush
+        return [popleft() for _ in range(len(ring))]
+
+    def flush(self) -> int:
+        """Publish everything queued so far; returns how many events were written."""
+        if self._pid != os.getpid():
+            return 0
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            start = time.perf_counter()
+            try:
+                self.bus.publish_many(batch)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning("telemetry batch of %d events lost: %s", len(batch), e)
+                return 0
+            self._stats["flushed"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+            self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+            return len(batch)
+
+    def _after_fork(self) -> None:
+        # The parent's queued events are its own to flush; the drainer thread did not survive
+        self._flush_lock = threading.Lock()
+        self._reset()
+
+    def stats(self) -> Dict[str, Any]:
+        out = dict(self._stats)
+        out.update({
+            "capacity": self.capacity,
+            "sample_rate": self.sample_rate,
+            "queued": len(self._ring),
+        })
+        return out
+
+
+def flush_all() -> int:
+    """Flush every live sink in this process (exit and worker-shutdown hook)."""
+    total = 0
+    for sink in list(_sinks):
+        try:
+            total += sink.flush()
+        except Exception as e:
+            logger.warning("telemetry flush at shutdown failed: %s", e)
+    return total
+
+
+def _reset_after_fork() -> None:
+    for sink in list(_sinks):
+        sink._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(flush_all)
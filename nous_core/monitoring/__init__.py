@@ -1,2 +1,4 @@
 from .health import snapshot
+from .sampler import MetricsSampler, get_sampler
 
+__all__ = ["snapshot", "MetricsSampler", "get_sampler"]
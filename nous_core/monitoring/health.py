@@ -1,33 +1,17 @@
 from __future__ import annotations
-import time
 from typing import Dict
 
-try:
-    import psutil  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    psutil = None  # type: ignore
+from .sampler import get_sampler
+
 
 def snapshot() -> Dict:
     """
     Capture a lightweight system snapshot.
 
-    If the optional ``psutil`` dependency is unavailable, return
-    a stub snapshot with zeroed metrics so monitoring endpoints
-    remain functional in minimal environments and during tests.
+    Reads the latest reading of the per-process background sampler (see
+    ``MetricsSampler``) instead of sampling CPU on the caller's thread, so
+    this never blocks. If the optional ``psutil`` dependency is unavailable
+    the cpu/memory/disk metrics are zeroed so monitoring endpoints remain
+    functional in minimal environments and during tests.
     """
-    now = time.time()
-
-    if psutil is None:
-        return {
-            "ts": now,
-            "cpu_percent": 0.0,
-            "mem_percent": 0.0,
-            "disk_percent": 0.0,
-        }
-
-    return {
-        "ts": now,
-        "cpu_percent": psutil.cpu_percent(interval=0.1),
-        "mem_percent": psutil.virtual_memory().percent,
-        "disk_percent": psutil.disk_usage("/").percent,
-    }
+    return dict(get_sampler().latest())
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+try:
+    import psutil  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    psutil = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+SMOOTHED = ("cpu_percent", "mem_percent", "load_avg")
+
+
+class MetricsSampler:
+    """
+    Per-process background sampler for CPU, memory, disk and load.
+    - A daemon thread takes a reading every `interval` seconds with
+      psutil.cpu_percent(interval=None), i.e. CPU use since the previous
+      reading, so nothing ever sleeps on a caller's thread.
+    - Each reading is published as a new dict by swapping one reference;
+      latest() is a plain attribute read (no lock) and callers must treat
+      the dict as read-only.
+    - cpu/mem/load also carry exponentially smoothed values (`*_ema`, weight
+      `alpha` on the newest reading), and the last `history` readings are
+      kept in a ring.
+    - The thread starts on first use and is restarted lazily in a forked
+      child (gunicorn workers), since threads do not survive fork.
+    - CPU use needs a baseline, so start() publishes a warm-up reading with
+      cpu_percent/cpu_percent_ema set to None; the first CPU value (and the
+      EMA seed) comes from the thread's first reading one interval later.
+    - Without psutil, cpu/mem/disk read as 0.0 and only load is real.
+    """
+    def __init__(self, interval: float = 1.0, alpha: float = 0.3, history: int = 300, disk_path: str = "/"):
+        self.interval = max(0.05, float(interval))
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+        self.disk_path = disk_path
+        self.history_size = max(1, int(history))
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=self.history_size)
+        self._latest: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pid = os.getpid()
+        self._samples = 0
+
+    # --- sampling ----------------------------------------------------------------
+
+    def _read(self, cpu: bool = True) -> Dict[str, Any]:
+        load = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+        if psutil is None:
+            return {"cpu_percent": 0.0 if cpu else None, "mem_percent": 0.0, "disk_percent": 0.0,
+                    "available_memory": 0, "load_avg": load}
+        memory = psutil.virtual_memory()
+        try:
+            disk = psutil.disk_usage(self.disk_path).percent
+        except OSError:
+            disk = 0.0
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None) if cpu else None,
+            "mem_percent": memory.percent,
+            "disk_percent": disk,
+            "available_memory": memory.available,
+            "load_avg": load,
+        }
+
+    def sample_once(self, cpu: bool = True) -> Dict[str, Any]:
+        """Take and publish one reading now (the background thread calls this).
+
+        With ``cpu=False`` the CPU fields are None; start() uses this for the
+        warm-up reading, when no CPU interval has elapsed yet.
+        """
+        reading = self._read(cpu)
+        now = time.time()
+        previous = self._latest
+        snap: Dict[str, Any] = {"ts": now, **reading}
+        for key in SMOOTHED:
+            value = reading[key]
+            last = previous[f"{key}_ema"] if previous else None
+            if value is None or last is None:
+                snap[f"{key}_ema"] = value
+            else:
+                snap[f"{key}_ema"] = round(last + self.alpha * (value - last), 3)
+        self._samples += 1
+        snap["samples"] = self._samples
+        self._history.append(snap)
+        self._latest = snap
+        return snap
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid and not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:  # pragma: no cover - keep the sampler alive
+                logger.warning("metrics sample failed: %s", e)
+
+    # --- lifecycle -----------------------------------------------------------------
+
+    def start(self) -> "MetricsSampler":
+        if self._pid != os.getpid():
+            self._after_fork()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    if psutil is not None:
+                        psutil.cpu_percent(interval=None)  # prime the cpu delta
+                    self.sample_once(cpu=False)
+                    self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+                    self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.interval + 1.0)
+        self._stop = threading.Event()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    # --- readers -----------------------------------------------------------------
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent reading; starts the sampler on first use."""
+        snap = self._latest
+        if snap is None or self._thread is None or self._pid != os.getpid():
+            self.start()
+            snap = self._latest
+        return snap
+
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Readings oldest first, at most `limit` of the newest."""
+        items = list(self._history)
+        return items[-limit:] if limit else items
+
+
+_sampler: Optional[MetricsSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> MetricsSampler:
+    """The process-wide sampler (METRICS_SAMPLE_INTERVAL / METRICS_SMOOTHING / METRICS_HISTORY)."""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = MetricsSampler(
+                    interval=float(os.environ.get("METRICS_SAMPLE_INTERVAL", 1.0)),
+                    alpha=float(os.environ.get("METRICS_SMOOTHING", 0.3)),
+                    history=int(os.environ.get("METRICS_HISTORY", 300)),
+                )
+    return _sampler
+
+
+def _reset_after_fork() -> None:
+    global _sampler_lock
+    _sampler_lock = threading.Lock()
+    if _sampler is not None:
+        _sampler._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
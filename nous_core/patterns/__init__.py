@@ -0,0 +1,3 @@
+from .aho_corasick import AhoCorasick
+
+__all__ = ["AhoCorasick"]
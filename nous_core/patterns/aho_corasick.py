@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def is_whole_word(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] does not split a word at either end."""
+    return not (
+        (start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]))
+        or (end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]))
+    )
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring automaton (Aho-Corasick).
+    - Built once from a pattern list; scanning is one pass over the text,
+      independent of how many patterns there are.
+    - Patterns are matched verbatim; callers lowercase both sides if needed.
+    - Pattern ids are positions in `self.patterns` (duplicates collapsed).
+    - Failure links are folded into a full transition table at build time,
+      so scanning is one dict lookup per character with no fail-chain walk.
+    """
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = [p for p in dict.fromkeys(patterns) if p]
+        self._ids: Dict[str, int] = {p: i for i, p in enumerate(self.patterns)}
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[int, ...]] = [()]
+        for pid, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            out[node] = out[node] + (pid,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+        # delta[node] = goto[node] over the transitions of its failure state;
+        # BFS order guarantees fail[node] is complete before node.
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            queue.extend(goto[node].values())
+        self._delta = delta
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def pattern_id(self, pattern: str) -> int:
+        return self._ids[pattern]
+
+    def finditer(self, text: str, whole_words: bool = False) -> Iterator[Tuple[int, int]]:
+        """Yield (start, pattern_id) for every occurrence, overlapping included."""
+        delta, out, patterns = self._delta, self._out, self.patterns
+        node = 0
+        for i, ch in enumerate(text):
+            node = delta[node].get(ch, 0)
+            for pid in out[node]:
+                start = i - len(patterns[pid]) + 1
+                if whole_words and not is_whole_word(text, start, i + 1):
+                    continue
+                yield start, pid
+
+    def matches(self, text: str, whole_words: bool = False) -> Dict[int, int]:
+        """Map pattern_id -> first start offset, for every pattern found in text."""
+        found: Dict[int, int] = {}
+        for start, pid in self.finditer(text, whole_words):
+            if pid not in found or start < found[pid]:
+                found[pid] = start
+        return found
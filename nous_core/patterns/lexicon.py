@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+from .aho_corasick import AhoCorasick, is_whole_word
+
+Lexicons = Mapping[str, Mapping[str, Iterable[str]]]
+
+
+class Hit(NamedTuple):
+    lexicon: str
+    label: str
+    keyword: str
+    start: int      # first occurrence in the normalized text
+    bounded: bool   # some occurrence is a whole word
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ScanResult:
+    """
+    Every keyword hit for one normalized message, grouped by lexicon and label.
+    Substring views (the default) are computed once when the scan is built;
+    whole-word views are derived on request. The message text itself is not
+    kept, so cached results never hold user text.
+    """
+    __slots__ = ("hits", "_lexicons", "_found", "_keywords", "_labels")
+
+    def __init__(self, hits: Tuple[Hit, ...], lexicons: Dict[str, Dict[str, List[str]]]):
+        self.hits = hits
+        self._lexicons = lexicons
+        self._found: Dict[str, Dict[str, Hit]] = {}
+        for hit in hits:
+            self._found.setdefault(hit.lexicon, {})[hit.keyword] = hit
+        self._keywords: Dict[Tuple[str, str], List[str]] = {}
+        self._labels: Dict[str, List[str]] = {}
+        for lexicon, found in self._found.items():
+            labels = self._labels[lexicon] = []
+            for label, keywords in lexicons[lexicon].items():
+                present = [k for k in keywords if k in found]
+                if present:
+                    self._keywords[(lexicon, label)] = present
+                    labels.append(label)
+
+    def first(self, lexicon: str, keyword: str, whole_words: bool = False) -> int:
+        """Offset of the first occurrence of `keyword`, -1 if absent (like str.find)."""
+        hit = self._found.get(lexicon, {}).get(keyword)
+        if hit is None or (whole_words and not hit.bounded):
+            return -1
+        return hit.start
+
+    def keywords(self, lexicon: str, label: str, whole_words: bool = False) -> List[str]:
+        """Keywords of `label` that occur, in lexicon order."""
+        present = self._keywords.get((lexicon, label), [])
+        if whole_words:
+            found = self._found[lexicon] if present else {}
+            return [k for k in present if found[k].bounded]
+        return present
+
+    def labels(self, lexicon: str, whole_words: bool = False) -> List[str]:
+        """Labels with at least one keyword hit, in lexicon order."""
+        labels = self._labels.get(lexicon, [])
+        if whole_words:
+            return [label for label in labels if self.keywords(lexicon, label, True)]
+        return labels
+
+    def any(self, lexicon: str, whole_words: bool = False) -> bool:
+        found = self._found.get(lexicon)
+        if not found:
+            return False
+        return not whole_words or any(hit.bounded for hit in found.values())
+
+
+class LexiconScanner:
+    """
+    One Aho-Corasick automaton over every keyword of several named lexicons
+    ({lexicon: {label: [keywords]}}), e.g. intents, crisis phrases, emotions.
+    - scan() lowercases and strips the text once and reports every hit of
+      every lexicon from a single pass, with whole-word information per hit,
+      so callers choose substring or word-boundary semantics afterwards.
+    - Results are cached in an LRU keyed by a digest of the normalized
+      message, so the layers that look at the same message (request checks,
+      NLU, emotion detection) share one scan without the cache holding the
+      text. Messages longer than `max_cached_chars` are scanned uncached.
+    """
+    def __init__(self, lexicons: Lexicons, cache_size: int = 2048, max_cached_chars: int = 4096):
+        self.lexicons: Dict[str, Dict[str, List[str]]] = {
+            name: {label: [k.lower() for k in keywords] for label, keywords in labels.items()}
+            for name, labels in lexicons.items()
+        }
+        owners: Dict[str, List[Tuple[str, str]]] = {}
+        for name, labels in self.lexicons.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    if keyword:
+                        owners.setdefault(keyword, []).append((name, label))
+        self._automaton = AhoCorasick(owners)
+        self._owners = [tuple(dict.fromkeys(owners[p])) for p in self._automaton.patterns]
+        self.cache_size = max(0, int(cache_size))
+        self.max_cached_chars = int(max_cached_chars)
+        self._cache: "OrderedDict[bytes, ScanResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = self._misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return (text or "").lower().strip()
+
+    def scan(self, text: str) -> ScanResult:
+        text = self.normalize(text)
+        if not self.cache_size or len(text) > self.max_cached_chars:
+            return self._scan_uncached(text)
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return result
+            self._misses += 1
+        result = self._scan_uncached(text)
+        with self._cache_lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _scan_uncached(self, text: str) -> ScanResult:
+        first: Dict[int, int] = {}
+        bounded = set()
+        patterns = self._automaton.patterns
+        for start, pid in self._automaton.finditer(text):
+            if pid not in first:
+                first[pid] = start
+            if pid not in bounded and is_whole_word(text, start, start + len(patterns[pid])):
+                bounded.add(pid)
+        hits = tuple(
+            Hit(name, label, patterns[pid], start, pid in bounded)
+            for pid, start in first.items()
+            for name, label in self._owners[pid]
+        )
+        return ScanResult(hits, self.lexicons)
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self.cache_size, len(self._cache))
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
@@ -0,0 +1,4 @@
+from .buffer import NO_TAG, PrioritizedReplay
+from .sum_tree import SumTree
+
+__all__ = ["SumTree", "PrioritizedReplay", "NO_TAG"]
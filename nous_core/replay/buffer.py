@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from .sum_tree import SumTree
+
+T = TypeVar("T")
+
+NO_TAG = -1  # hash() never returns -1 in CPython
+
+_rng = np.random.default_rng()
+
+
+class PrioritizedReplay(Generic[T]):
+    """
+    Bounded ring buffer with proportional prioritized sampling.
+    - Items live in a plain list that grows up to `capacity` and is then
+      overwritten oldest-first; priorities live in a SumTree and an optional
+      int tag per slot (e.g. a user hash) in a numpy array.
+    - sample(k) draws k stratified masses over the total priority (one draw
+      per equal-mass segment, as in prioritized experience replay) and
+      de-duplicates, topping up from the remaining eligible slots if needed.
+      `exclude_tag` skips slots with that tag.
+    - add() and update() are O(log n); sample() is O(k log n).
+    Not thread-safe; callers serialise access.
+    """
+    def __init__(self, capacity: int, rng: Optional[np.random.Generator] = None):
+        self.capacity = max(1, int(capacity))
+        self._items: List[T] = []
+        self._tags = np.full(min(self.capacity, 16), NO_TAG, dtype=np.int64)
+        self._tree = SumTree(self.capacity)
+        self._next = 0
+        self._rng = rng or _rng
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def total(self) -> float:
+        return self._tree.total
+
+    def add(self, item: T, priority: float, tag: int = NO_TAG) -> int:
+        """Store `item`, evicting the oldest one when full; returns its slot."""
+        slot = self._next
+        if slot == len(self._items):
+            self._items.append(item)
+        else:
+            self._items[slot] = item
+        if slot >= len(self._tags):
+            grown = np.full(min(self.capacity, 2 * len(self._tags)), NO_TAG, dtype=np.int64)
+            grown[:len(self._tags)] = self._tags
+            self._tags = grown
+        self._tags[slot] = tag
+        self._tree.update(slot, max(float(priority), 0.0))
+        self._next = (slot + 1) % self.capacity
+        return slot
+
+    def update(self, slot: int, priority: float) -> None:
+        if not 0 <= slot < len(self._items):
+            raise IndexError(f"slot {slot} is empty")
+        self._tree.update(slot, max(float(priority), 0.0))
+
+    def get(self, slot: int) -> T:
+        return self._items[slot]
+
+    def priority(self, slot: int) -> float:
+        return self._tree.get(slot)
+
+    def recent(self, n: int) -> List[Tuple[int, T]]:
+        """The newest `n` (slot, item) pairs, oldest first."""
+        size = len(self._items)
+        n = max(0, min(int(n), size))
+        return [((self._next - n + i) % size, self._items[(self._next - n + i) % size]) for i in range(n)]
+
+    def items(self) -> List[T]:
+        """Every stored item, oldest first."""
+        if len(self._items) < self.capacity:
+            return list(self._items)
+        return self._items[self._next:] + self._items[:self._next]
+
+    def sample(self, k: int, exclude_tag: Optional[int] = None, rounds: int = 3) -> List[T]:
+        return [self._items[s] for s in self.sample_slots(k, exclude_tag, rounds)]
+
+    def sample_slots(self, k: int, exclude_tag: Optional[int] = None, rounds: int = 3) -> List[int]:
+        size = len(self._items)
+        k = min(int(k), size)
+        total = self._tree.total
+        if k <= 0 or total <= 0.0:
+            return []
+        chosen: Dict[int, None] = {}
+        tags = self._tags
+        for _ in range(rounds):
+            need = k - len(chosen)
+            if need <= 0:
+                break
+            masses = (np.arange(need) + self._rng.random(need)) * (total / need)
+            for slot in self._tree.find(masses).tolist():
+                if slot < size and (exclude_tag is None or tags[slot] != exclude_tag):
+                    chosen[slot] = None
+        if len(chosen) < k:
+            self._top_up(chosen, k, exclude_tag)
+        return list(chosen)[:k]
+
+    def _top_up(self, chosen: Dict[int, None], k: int, exclude_tag: Optional[int]) -> None:
+        # Dense fallback when the excluded tag or a few heavy slots dominate the mass
+        size = len(self._items)
+        weights = np.array(self._tree.leaves(size), dtype=np.float64)
+        if exclude_tag is not None:
+            weights[self._tags[:size] == exclude_tag] = 0.0
+        if chosen:
+            weights[list(chosen)] = 0.0
+        eligible = np.flatnonzero(weights > 0.0)
+        take = min(k - len(chosen), len(eligible))
+        if take <= 0:
+            return
+        p = weights[eligible] / weights[eligible].sum()
+        for slot in self._rng.choice(eligible, size=take, replace=False, p=p).tolist():
+            chosen[slot] = None
+
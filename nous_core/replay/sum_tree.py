@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Iterable, Union
+
+import numpy as np
+
+
+class SumTree:
+    """
+    Array-backed sum tree (segment tree over priorities) for proportional
+    sampling.
+    - Leaves hold per-slot priorities; each internal node holds the sum of
+      its children, so the root is the total mass.
+    - update() is O(log n); find() maps a batch of masses in [0, total) to
+      leaf slots with one vectorised descent (O(log n) numpy steps per batch).
+    - The leaf array starts small and doubles up to `capacity` as slots are
+      used, so many small trees (one per user) stay cheap.
+    Not thread-safe; callers serialise access.
+    """
+    def __init__(self, capacity: int, initial: int = 16):
+        self.capacity = max(1, int(capacity))
+        self._leaves = 1
+        while self._leaves < min(self.capacity, max(1, int(initial))):
+            self._leaves *= 2
+        self._tree = np.zeros(2 * self._leaves, dtype=np.float64)
+        self._shifts = np.arange(self._leaves.bit_length(), dtype=np.int64)
+
+    @property
+    def total(self) -> float:
+        return float(self._tree[1])
+
+    def _grow(self, slot: int) -> None:
+        leaves = self._leaves
+        while leaves <= slot:
+            leaves *= 2
+        old = self._tree[self._leaves:2 * self._leaves]
+        self._tree = np.zeros(2 * leaves, dtype=np.float64)
+        self._tree[leaves:leaves + len(old)] = old
+        self._leaves = leaves
+        self._shifts = np.arange(leaves.bit_length(), dtype=np.int64)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        lo = self._leaves
+        while lo > 1:
+            hi, lo = lo, lo // 2
+            self._tree[lo:hi] = self._tree[2 * lo:2 * hi:2] + self._tree[2 * lo + 1:2 * hi:2]
+
+    def update(self, slot: int, priority: float) -> None:
+        if not 0 <= slot < self.capacity:
+            raise IndexError(f"slot {slot} outside capacity {self.capacity}")
+        if slot >= self._leaves:
+            self._grow(slot)
+        # Leaf-to-root path in one fancy-indexed add (indices are distinct)
+        path = (slot + self._leaves) >> self._shifts
+        self._tree[path] += float(priority) - self._tree[path[0]]
+
+    def get(self, slot: int) -> float:
+        return float(self._tree[slot + self._leaves]) if slot < self._leaves else 0.0
+
+    def leaves(self, n: int) -> np.ndarray:
+        """Priorities of slots [0, n)."""
+        return self._tree[self._leaves:self._leaves + min(n, self._leaves)]
+
+    def find(self, masses: Union[Iterable[float], np.ndarray]) -> np.ndarray:
+        """Leaf slot whose cumulative range contains each mass."""
+        mass = np.array(masses, dtype=np.float64)
+        idx = np.ones(len(mass), dtype=np.int64)
+        tree = self._tree
+        for _ in range(self._leaves.bit_length() - 1):
+            left = 2 * idx
+            left_mass = tree[left]
+            right = (mass >= left_mass) & (tree[left + 1] > 0.0)
+            mass -= np.where(right, left_mass, 0.0)
+            idx = left + right
+        return idx - self._leaves
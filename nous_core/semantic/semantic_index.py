@@ -1,32 +1,118 @@
 from __future__ import annotations
 import json
+import logging
+import queue
+import re
 import sqlite3
-from pathlib import Path
+import threading
+import time
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from nous_core.storage import SQLiteStore
+
 try:
-    from sentence_transformers import SentenceTransformer
     import numpy as np
-    _HAS_EMBED = True
+    from .vector_index import DenseVectorIndex, IVFVectorIndex
 except Exception:
-    SentenceTransformer = None  # type: ignore
     np = None  # type: ignore
+    DenseVectorIndex = IVFVectorIndex = None  # type: ignore
+
+try:
+    from sentence_transformers import SentenceTransformer
+    _HAS_EMBED = np is not None
+except Exception:
+    SentenceTransformer = None  # type: ignore
     _HAS_EMBED = False
 
-class SemanticIndex:
+logger = logging.getLogger(__name__)
+
+INDEX_MODES = ("matrix", "ivf", "scan")
+
+# Schema versions (PRAGMA user_version):
+#   0 - docs table only
+#   1 - docs_fts external-content FTS5 index kept in sync by triggers
+SCHEMA_VERSION = 1
+
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+        text, content='docs', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS docs_fts_ai AFTER INSERT ON docs BEGIN
+        INSERT INTO docs_fts(rowid, text) VALUES (new.rowid, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS docs_fts_ad AFTER DELETE ON docs BEGIN
+        INSERT INTO docs_fts(docs_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS docs_fts_au AFTER UPDATE OF text ON docs BEGIN
+        INSERT INTO docs_fts(docs_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+        INSERT INTO docs_fts(rowid, text) VALUES (new.rowid, new.text);
+    END
+    """,
+]
+
+_TOKEN_PAT = re.compile(r"\w+", re.UNICODE)
+
+class SemanticIndex(SQLiteStore):
     """
-    SQLite semantic index.
+    SQLite semantic index on the shared SQLiteStore layer.
     - Always works in keyword mode.
     - If sentence-transformers is installed, uses embeddings too.
+    - Keyword mode is served by an FTS5 index ranked with bm25 (falls back to a
+      substring scan if this SQLite build lacks FTS5).
+    - index_mode="matrix" keeps all embeddings in one in-memory float32 matrix
+      (exact), "ivf" adds an approximate inverted-file index for large corpora,
+      "scan" is the original per-row SQLite scan.
+    - vector_sidecar=True persists the matrix next to the db and memory-maps it
+      on startup instead of re-reading every embedding from SQLite.
+    - Texts are embedded in batches of `embed_batch_size`. With async_embed=True
+      writes land immediately with emb=NULL and a background thread back-fills
+      the vectors in batches; flush_embeddings() drains the queue. A batch
+      that fails is logged and requeued with backoff up to `embed_retries`
+      times, then dropped (the docs stay keyword-searchable).
     """
-    def __init__(self, db_path: str, model_name: str = "all-MiniLM-L6-v2"):
-        self.db_path = str(db_path)
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+    def __init__(self, db_path: str, model_name: str = "all-MiniLM-L6-v2",
+                 index_mode: str = "matrix", vector_sidecar: bool = False,
+                 model: Any = None, embed_batch_size: int = 64,
+                 async_embed: bool = False, embed_interval: float = 0.05, embed_retries: int = 3,
+                 **store_opts: Any):
+        if index_mode not in INDEX_MODES:
+            raise ValueError(f"index_mode must be one of {INDEX_MODES}, got {index_mode!r}")
+        super().__init__(db_path, **store_opts)
         self._init_db()
-        self.model = SentenceTransformer(model_name) if _HAS_EMBED else None
+        if model is not None:
+            self.model = model
+        else:
+            self.model = SentenceTransformer(model_name) if _HAS_EMBED else None
+        self.index_mode = index_mode if np is not None else "scan"
+        self.vector_sidecar = vector_sidecar
+        self._vectors: Optional[DenseVectorIndex] = None
+        self._vec_rowid = 0
+        self._vec_lock = threading.Lock()
+        self.embed_batch_size = max(1, int(embed_batch_size))
+        self.async_embed = bool(async_embed) and self.model is not None
+        self.embed_interval = float(embed_interval)
+        self._embed_queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self._embed_worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self.embed_retries = max(0, int(embed_retries))
+        self._embed_attempts: Dict[Tuple[str, str], int] = {}
+        self.embed_dropped = 0
+
+    def _configure(self, conn: sqlite3.Connection) -> None:
+        # INSERT OR REPLACE only fires the FTS delete trigger with this enabled.
+        conn.execute("PRAGMA recursive_triggers=ON")
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        self.has_fts = False
+        with self._conn() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS docs (
                     doc_id TEXT PRIMARY KEY,
@@ -35,46 +121,284 @@ class SemanticIndex:
                     emb    BLOB
                 )
             """)
+            version = int(conn.execute("PRAGMA user_version").fetchone()[0])
+            try:
+                for ddl in _FTS_DDL:
+                    conn.execute(ddl)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                conn.rollback()
+            if self.has_fts and version < 1:
+                # Migrate pre-FTS databases: index every existing row once.
+                conn.execute("INSERT INTO docs_fts(docs_fts) VALUES ('rebuild')")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             conn.commit()
 
+    def rebuild_keyword_index(self) -> None:
+        """Re-index every row in docs_fts (e.g. after writes that bypassed triggers)."""
+        if not self.has_fts:
+            return
+        self.execute("INSERT INTO docs_fts(docs_fts) VALUES ('rebuild')")
+
+    @property
+    def sidecar_path(self) -> str:
+        return self.db_path + ".vec"
+
     def _embed(self, text: str) -> Optional[bytes]:
-        if not _HAS_EMBED or self.model is None:
-            return None
-        v = self.model.encode([text], normalize_embeddings=True)[0].astype("float32")
-        return v.tobytes()
+        return self._embed_many([text])[0]
 
-    def upsert(self, doc_id: str, text: str, meta: Dict[str, Any]) -> None:
-        emb = self._embed(text)
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO docs(doc_id,text,meta,emb) VALUES(?,?,?,?)",
-                (doc_id, text, json.dumps(meta, ensure_ascii=False), emb),
+    def _embed_many(self, texts: List[str]) -> List[Optional[bytes]]:
+        if self.model is None:
+            return [None] * len(texts)
+        out: List[Optional[bytes]] = []
+        for start in range(0, len(texts), self.embed_batch_size):
+            chunk = texts[start:start + self.embed_batch_size]
+            vecs = self.model.encode(chunk, batch_size=len(chunk), normalize_embeddings=True)
+            out.extend(v.astype("float32").tobytes() for v in vecs)
+        return out
+
+    # --- in-memory vector index ----------------------------------------------
+
+    def _new_vector_index(self, dim: int) -> DenseVectorIndex:
+        if self.index_mode == "ivf":
+            return IVFVectorIndex(dim)
+        return DenseVectorIndex(dim)
+
+    def _track_written(self, written: List[Tuple[int, str, Optional[bytes]]]) -> None:
+        """Mirror rows this process just wrote into the vector index."""
+        if self._vectors is None or not written:
+            return
+        with self._vec_lock:
+            if self._vectors is None:
+                return
+            for rowid, doc_id, emb in written:
+                if emb is not None:
+                    self._vectors.upsert(doc_id, np.frombuffer(emb, dtype="float32"))
+                if rowid == self._vec_rowid + 1:
+                    self._vec_rowid = rowid
+
+    def _sync_vectors(self) -> Optional[DenseVectorIndex]:
+        """
+        Load (or catch up) the vector index. Rows written by other processes are
+        picked up incrementally via the monotonically increasing rowid.
+        """
+        with self._vec_lock:
+            if self._vectors is None and self.vector_sidecar:
+                loaded = (IVFVectorIndex if self.index_mode == "ivf" else DenseVectorIndex).load(self.sidecar_path)
+                if loaded is not None:
+                    self._vectors, meta = loaded
+                    self._vec_rowid = int(meta.get("rowid", 0))
+                    if isinstance(self._vectors, IVFVectorIndex):
+                        self._vectors.maybe_train()
+            cold = self._vectors is None
+            rows = self.read(
+                "SELECT rowid, doc_id, emb FROM docs WHERE rowid > ? ORDER BY rowid",
+                (self._vec_rowid,),
             )
-            conn.commit()
+            if not rows:
+                return self._vectors
+            ids = [doc_id for _rid, doc_id, emb in rows if emb is not None]
+            if ids:
+                vecs = np.vstack([np.frombuffer(emb, dtype="float32") for _rid, _d, emb in rows if emb is not None])
+                if self._vectors is None:
+                    self._vectors = self._new_vector_index(vecs.shape[1])
+                self._vectors.upsert_many(ids, vecs)
+            self._vec_rowid = int(rows[-1][0])
+            if cold and self.vector_sidecar and self._vectors is not None:
+                self.save_vectors()
+            return self._vectors
+
+    def save_vectors(self) -> None:
+        """Write the in-memory matrix to the sidecar file next to the db."""
+        if self._vectors is not None:
+            self._vectors.save(self.sidecar_path, meta={"rowid": self._vec_rowid})
+
+    # --- writes --------------------------------------------------------------
+
+    def upsert(self, doc_id: str, text: str, meta: Dict[str, Any]) -> None:
+        self.bulk_upsert([(doc_id, text, meta)])
 
     def bulk_upsert(self, items: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
-        n = 0
-        with sqlite3.connect(self.db_path) as conn:
-            for doc_id, text, meta in items:
-                emb = self._embed(text)
-                conn.execute(
+        items = list(items)
+        if not items:
+            return 0
+        texts = [text for _doc_id, text, _meta in items]
+        embs = [None] * len(items) if self.async_embed else self._embed_many(texts)
+
+        def insert(conn: sqlite3.Connection) -> List[Tuple[int, str, Optional[bytes]]]:
+            written = []
+            for (doc_id, text, meta), emb in zip(items, embs):
+                cur = conn.execute(
                     "INSERT OR REPLACE INTO docs(doc_id,text,meta,emb) VALUES(?,?,?,?)",
                     (doc_id, text, json.dumps(meta, ensure_ascii=False), emb),
                 )
-                n += 1
-            conn.commit()
-        return n
+                written.append((int(cur.lastrowid), doc_id, emb))
+            return written
 
-    def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute("SELECT doc_id,text,meta,emb FROM docs").fetchall()
+        self._track_written(self.write(insert))
+        if self.async_embed:
+            self._enqueue_embeddings([(doc_id, text) for doc_id, text, _meta in items])
+        return len(items)
+
+    # --- background embedding --------------------------------------------------
+
+    def _enqueue_embeddings(self, pending: List[Tuple[str, str]]) -> None:
+        for item in pending:
+            self._embed_queue.put(item)
+        with self._worker_lock:
+            # Threads do not survive a fork, so (re)start lazily in each process.
+            if self._embed_worker is None or not self._embed_worker.is_alive():
+                self._embed_worker = threading.Thread(
+                    target=self._embed_loop, name="semantic-embedder", daemon=True
+                )
+                self._embed_worker.start()
+
+    def _embed_loop(self) -> None:
+        while True:
+            batch = [self._embed_queue.get()]
+            deadline = time.monotonic() + self.embed_interval
+            while len(batch) < self.embed_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._embed_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._backfill(batch)
+                for item in batch:
+                    self._embed_attempts.pop(item, None)
+            except Exception as e:
+                self._retry_batch(batch, e)
+            finally:
+                for _ in batch:
+                    self._embed_queue.task_done()
+
+    def _retry_batch(self, batch: List[Tuple[str, str]], error: Exception) -> None:
+        # Requeue before task_done() so flush_embeddings() keeps waiting for the retry
+        attempt = max(self._embed_attempts.get(item, 0) for item in batch) + 1
+        if attempt > self.embed_retries:
+            for item in batch:
+                self._embed_attempts.pop(item, None)
+            self.embed_dropped += len(batch)
+            logger.error("embedding back-fill of %d docs failed %d times, dropping: %s",
+                         len(batch), attempt, error)
+            return
+        logger.warning("embedding back-fill of %d docs failed (attempt %d/%d), retrying: %s",
+                       len(batch), attempt, self.embed_retries, error)
+        time.sleep(min(self.embed_interval * (2 ** attempt), 5.0))
+        for item in batch:
+            self._embed_attempts[item] = attempt
+            self._embed_queue.put(item)
+
+    def _backfill(self, batch: List[Tuple[str, str]]) -> None:
+        latest = dict(batch)  # later writes of the same doc win
+        doc_ids = list(latest)
+        embs = self._embed_many([latest[d] for d in doc_ids])
+
+        def reinsert(conn: sqlite3.Connection) -> List[Tuple[int, str, Optional[bytes]]]:
+            written = []
+            for doc_id, emb in zip(doc_ids, embs):
+                # Re-insert (new rowid) so other workers' vector indexes catch up;
+                # skipped if the text changed since it was queued.
+                cur = conn.execute(
+                    """
+                    INSERT OR REPLACE INTO docs(doc_id,text,meta,emb)
+                    SELECT doc_id, text, meta, ? FROM docs WHERE doc_id=? AND text=?
+                    """,
+                    (emb, doc_id, latest[doc_id]),
+                )
+                if cur.rowcount > 0:
+                    written.append((int(cur.lastrowid), doc_id, emb))
+            return written
+
+        self._track_written(self.write(reinsert))
+
+    def pending_embeddings(self) -> int:
+        return self._embed_queue.unfinished_tasks
+
+    def flush_embeddings(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued embeddings are written. Returns False on timeout."""
+        if timeout is None:
+            self._embed_queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while self._embed_queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    # --- reads ---------------------------------------------------------------
+
+    def _fetch_docs(self, scored: List[Tuple[float, str]]) -> List[Dict[str, Any]]:
+        if not scored:
+            return []
+        ids = [doc_id for _score, doc_id in scored]
+        by_id = self.get_many("docs", "doc_id", ids, ("text", "meta"))
+        res = []
+        for score, doc_id in scored:
+            if doc_id in by_id:
+                text, meta = by_id[doc_id]
+                res.append({"doc_id": doc_id, "score": score, "text": text, "meta": json.loads(meta)})
+        return res
+
+    def _scan_search(self, qv: Any, top_k: int) -> List[Dict[str, Any]]:
+        rows = self.read("SELECT doc_id,text,meta,emb FROM docs")
+        out2 = []
+        for doc_id, text, meta, emb in rows:
+            if emb is None:
+                continue
+            dv = np.frombuffer(emb, dtype="float32")
+            score = float(np.dot(qv, dv))
+            out2.append((score, doc_id, text, meta))
+        out2.sort(reverse=True)
+        res = []
+        for score, doc_id, text, meta in out2[:top_k]:
+            res.append({"doc_id": doc_id, "score": score, "text": text, "meta": json.loads(meta)})
+        return res
+
+    def _keyword_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        # Each token becomes a quoted prefix term; OR lets bm25 rank partial matches.
+        tokens = _TOKEN_PAT.findall(query.lower())
+        if not tokens:
+            return []
+        match = " OR ".join('"{}"*'.format(t.replace('"', '""')) for t in dict.fromkeys(tokens))
+        rows = self.read(
+            """
+            SELECT d.doc_id, d.text, d.meta, bm25(docs_fts) AS rank
+            FROM docs_fts JOIN docs d ON d.rowid = docs_fts.rowid
+            WHERE docs_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (match, int(top_k)),
+        )
+        return [
+            {"doc_id": doc_id, "score": -float(rank), "text": text, "meta": json.loads(meta)}
+            for doc_id, text, meta, rank in rows
+        ]
+
+    def search_vector(self, qv: Any, top_k: int = 10) -> List[Dict[str, Any]]:
+        """Nearest documents to an already-normalised query embedding."""
+        if self.index_mode == "scan":
+            return self._scan_search(qv, top_k)
+        vectors = self._sync_vectors()
+        if vectors is None:
+            return []
+        return self._fetch_docs(vectors.search(qv, top_k))
 
+    def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
         q = (query or "").strip()
         if not q:
             return []
 
         # Keyword fallback
-        if not _HAS_EMBED or self.model is None:
+        if self.model is None:
+            if self.has_fts:
+                return self._keyword_search(q, top_k)
+            rows = self.read("SELECT doc_id,text,meta,emb FROM docs")
             ql = q.lower()
             scored = []
             for doc_id, text, meta, _emb in rows:
@@ -89,16 +413,4 @@ class SemanticIndex:
 
         # Embedding similarity
         qv = self.model.encode([q], normalize_embeddings=True)[0].astype("float32")
-        out2 = []
-        for doc_id, text, meta, emb in rows:
-            if emb is None:
-                continue
-            dv = np.frombuffer(emb, dtype="float32")
-            score = float(np.dot(qv, dv))
-            out2.append((score, doc_id, text, meta))
-        out2.sort(reverse=True)
-        res = []
-        for score, doc_id, text, meta in out2[:top_k]:
-            res.append({"doc_id": doc_id, "score": score, "text": text, "meta": json.loads(meta)})
-        return res
-
+        return self.search_vector(qv, top_k)
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class DenseVectorIndex:
+    """
+    Exact in-memory vector index.
+    - All embeddings live in one contiguous float32 matrix (amortised doubling).
+    - Search is a single matrix-vector product plus argpartition top-k.
+    - Can be saved to / memory-mapped from a sidecar .npy file.
+    """
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = int(dim)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._mat = np.zeros((max(1, int(capacity)), self.dim), dtype="float32")
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def _reserve(self, n: int) -> None:
+        cap = self._mat.shape[0]
+        if n <= cap and self._mat.flags.writeable:
+            return
+        new_cap = cap
+        while new_cap < n:
+            new_cap *= 2
+        grown = np.zeros((new_cap, self.dim), dtype="float32")
+        grown[: len(self._ids)] = self._mat[: len(self._ids)]
+        self._mat = grown
+
+    def _put(self, doc_id: str, vec: np.ndarray) -> int:
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = len(self._ids)
+            self._reserve(row + 1)
+            self._ids.append(doc_id)
+            self._rows[doc_id] = row
+        else:
+            self._reserve(len(self._ids))
+        self._mat[row] = vec
+        return row
+
+    def upsert(self, doc_id: str, vec: np.ndarray) -> None:
+        with self._lock:
+            self._put(doc_id, np.asarray(vec, dtype="float32").reshape(self.dim))
+
+    def upsert_many(self, doc_ids: Sequence[str], vecs: np.ndarray) -> None:
+        vecs = np.asarray(vecs, dtype="float32").reshape(len(doc_ids), self.dim)
+        with self._lock:
+            self._reserve(len(self._ids) + len(doc_ids))
+            for doc_id, vec in zip(doc_ids, vecs):
+                self._put(doc_id, vec)
+
+    def _snapshot(self) -> Tuple[np.ndarray, List[str]]:
+        """The first n matrix rows and the shared id list, which may grow past n.
+
+        _ids is append-only and a row never changes id, so the first n entries
+        stay valid without copying the list on every search.
+        """
+        with self._lock:
+            n = len(self._ids)
+            return self._mat[:n], self._ids
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        if k >= scores.shape[0]:
+            return np.argsort(-scores, kind="stable")
+        part = np.argpartition(-scores, k - 1)[:k]
+        return part[np.argsort(-scores[part], kind="stable")]
+
+    def search(self, qv: np.ndarray, top_k: int = 10) -> List[Tuple[float, str]]:
+        mat, ids = self._snapshot()
+        if top_k <= 0 or mat.shape[0] == 0:
+            return []
+        scores = mat @ np.asarray(qv, dtype="float32").reshape(self.dim)
+        return [(float(scores[i]), ids[i]) for i in self._top_k(scores, top_k)]
+
+    # --- sidecar persistence -------------------------------------------------
+
+    @staticmethod
+    def _sidecar_paths(path: str) -> Tuple[Path, Path]:
+        p = Path(path)
+        return p.with_name(p.name + ".npy"), p.with_name(p.name + ".ids.json")
+
+    def save(self, path: str, meta: Optional[Dict[str, object]] = None) -> None:
+        mat, ids = self._snapshot()
+        ids = ids[: mat.shape[0]]
+        vec_path, ids_path = self._sidecar_paths(path)
+        tmp = vec_path.with_name(vec_path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(mat))
+        tmp.replace(vec_path)
+        ids_path.write_text(json.dumps({"ids": ids, "meta": meta or {}}), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> Optional[Tuple["DenseVectorIndex", Dict[str, object]]]:
+        """Load a sidecar; with mmap the matrix stays read-only until first write."""
+        vec_path, ids_path = cls._sidecar_paths(path)
+        if not vec_path.exists() or not ids_path.exists():
+            return None
+        try:
+            mat = np.load(vec_path, mmap_mode="r" if mmap else None)
+            doc = json.loads(ids_path.read_text(encoding="utf-8"))
+            ids, meta = doc["ids"], doc.get("meta") or {}
+        except Exception:
+            return None
+        if mat.ndim != 2 or mat.shape[0] != len(ids):
+            return None
+        idx = cls(mat.shape[1], capacity=1)
+        idx._mat = mat if mmap else np.ascontiguousarray(mat, dtype="float32")
+        idx._ids = list(ids)
+        idx._rows = {doc_id: i for i, doc_id in enumerate(idx._ids)}
+        return idx, meta
+
+
+class IVFVectorIndex(DenseVectorIndex):
+    """
+    Approximate index for large corpora (inverted file over k-means cells).
+    - Below `min_train` vectors it behaves exactly like DenseVectorIndex.
+    - New vectors are assigned to their nearest cell incrementally; the
+      quantizer is retrained once the corpus doubles since the last training.
+    - Search scores only the rows in the `nprobe` closest cells.
+    """
+    def __init__(self, dim: int, capacity: int = 1024, nlist: Optional[int] = None,
+                 nprobe: int = 16, min_train: int = 20000, seed: int = 0):
+        super().__init__(dim, capacity)
+        self.nlist = nlist
+        self.nprobe = int(nprobe)
+        self.min_train = int(min_train)
+        self._seed = seed
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._assign: Dict[int, int] = {}
+        self._trained_at = 0
+
+    def _put(self, doc_id: str, vec: np.ndarray) -> int:
+        row = super()._put(doc_id, vec)
+        if self._centroids is not None:
+            self._assign_row(row, vec)
+        return row
+
+    def _assign_row(self, row: int, vec: np.ndarray) -> None:
+        cell = int(np.argmax(self._centroids @ vec))
+        prev = self._assign.get(row)
+        if prev == cell:
+            return
+        if prev is not None:
+            self._lists[prev].remove(row)
+            self._list_arrays.pop(prev, None)
+        self._lists[cell].append(row)
+        self._list_arrays.pop(cell, None)
+        self._assign[row] = cell
+
+    def upsert(self, doc_id: str, vec: np.ndarray) -> None:
+        super().upsert(doc_id, vec)
+        self.maybe_train()
+
+    def upsert_many(self, doc_ids: Sequence[str], vecs: np.ndarray) -> None:
+        super().upsert_many(doc_ids, vecs)
+        self.maybe_train()
+
+    def maybe_train(self) -> None:
+        n = len(self._ids)
+        if n >= self.min_train and n >= 2 * self._trained_at:
+            self.train()
+
+    def train(self, iters: int = 10, sample: int = 65536) -> None:
+        """Fit spherical k-means on a sample and rebuild the inverted lists."""
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return
+            mat = self._mat[:n]
+            nlist = self.nlist or max(1, int(np.sqrt(n)))
+            nlist = min(nlist, n)
+            rng = np.random.default_rng(self._seed)
+            pick = rng.choice(n, size=min(n, max(sample, nlist)), replace=False)
+            train = mat[pick]
+            cents = train[rng.choice(train.shape[0], size=nlist, replace=False)].copy()
+            for _ in range(iters):
+                assign = np.argmax(train @ cents.T, axis=1)
+                sums = np.zeros_like(cents)
+                np.add.at(sums, assign, train)
+                norms = np.linalg.norm(sums, axis=1)
+                live = norms > 0
+                cents[live] = sums[live] / norms[live, None]
+            self._centroids = cents
+            self._lists = [[] for _ in range(nlist)]
+            self._list_arrays = {}
+            self._assign = {}
+            chunk = 65536
+            for start in range(0, n, chunk):
+                cells = np.argmax(mat[start:start + chunk] @ cents.T, axis=1)
+                for offset, cell in enumerate(cells.tolist()):
+                    self._lists[cell].append(start + offset)
+                    self._assign[start + offset] = cell
+            self._trained_at = n
+
+    def _cell_rows(self, cell: int) -> np.ndarray:
+        arr = self._list_arrays.get(cell)
+        if arr is None:
+            arr = np.fromiter(self._lists[cell], dtype=np.int64, count=len(self._lists[cell]))
+            self._list_arrays[cell] = arr
+        return arr
+
+    def search(self, qv: np.ndarray, top_k: int = 10) -> List[Tuple[float, str]]:
+        if self._centroids is None:
+            return super().search(qv, top_k)
+        qv = np.asarray(qv, dtype="float32").reshape(self.dim)
+        with self._lock:
+            probe = self._top_k(self._centroids @ qv, min(self.nprobe, len(self._lists)))
+            rows = np.concatenate([self._cell_rows(int(c)) for c in probe])
+            mat, ids = self._mat, self._ids  # shared, not copied: see _snapshot
+        if top_k <= 0 or rows.size == 0:
+            return []
+        scores = mat[rows] @ qv
+        return [(float(scores[i]), ids[int(rows[i])]) for i in self._top_k(scores, top_k)]
@@ -0,0 +1,3 @@
+from .sqlite_store import SQLiteStore, is_busy_error
+
+__all__ = ["SQLiteStore", "is_busy_error"]
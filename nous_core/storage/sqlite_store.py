@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+DEFAULT_CACHE_KIB = 8 * 1024
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+MAX_PARAMS = 500
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    msg = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in msg or "busy" in msg)
+
+
+class SQLiteStore:
+    """
+    Shared base for the embedded SQLite stores (events, semantic index,
+    memory graph, Spotify caches).
+    - One long-lived connection per thread, re-opened after fork, so the
+      sqlite3 prepared-statement cache (`cached_statements`) is actually reused.
+    - Every connection runs WAL, synchronous=NORMAL, a memory-mapped read
+      window (`mmap_size`), a larger page cache and a busy timeout.
+    - write(fn) runs fn(conn) as one transaction and retries the whole
+      transaction with jittered backoff when SQLite still reports the
+      database busy/locked after the busy timeout.
+    - get_many/put_many batch keyed reads (chunked IN lists) and writes
+      (executemany) into single statements/transactions.
+    Subclasses add their own schema in _init_db() and per-connection
+    settings in _configure().
+    """
+    def __init__(self, db_path: str, *, busy_timeout: float = 30.0,
+                 mmap_size: int = DEFAULT_MMAP_SIZE, cache_kib: int = DEFAULT_CACHE_KIB,
+                 retries: int = 5, retry_backoff: float = 0.05, cached_statements: int = 256):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.busy_timeout = float(busy_timeout)
+        self.mmap_size = int(mmap_size)
+        self.cache_kib = int(cache_kib)
+        self.retries = max(0, int(retries))
+        self.retry_backoff = float(retry_backoff)
+        self.cached_statements = int(cached_statements)
+        self._local = threading.local()
+
+    # --- connections -----------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                   cached_statements=self.cached_statements)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+            conn.execute(f"PRAGMA cache_size=-{self.cache_kib}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._configure(conn)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _configure(self, conn: sqlite3.Connection) -> None:
+        """Hook for subclass per-connection pragmas."""
+
+    def close(self) -> None:
+        """Close this thread's connection (others close when their thread exits)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            if self._local.pid == os.getpid():
+                conn.close()
+            self._local.conn = None
+
+    # --- retrying helpers --------------------------------------------------------
+
+    def _retry(self, fn: Callable[[], T]) -> T:
+        for attempt in range(self.retries + 1):
+            try:
+                return fn()
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt >= self.retries:
+                    raise
+                time.sleep(self.retry_backoff * (2 ** attempt) * (0.5 + random.random()))
+        raise AssertionError("unreachable")
+
+    def write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run fn(conn) in one transaction, retrying it as a whole on busy/locked."""
+        def attempt() -> T:
+            with self._conn() as conn:  # commits, or rolls back on any error
+                return fn(conn)
+        return self._retry(attempt)
+
+    def read(self, sql: str, args: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        return self._retry(lambda: self._conn().execute(sql, args).fetchall())
+
+    def read_one(self, sql: str, args: Sequence[Any] = ()) -> Optional[Tuple[Any, ...]]:
+        return self._retry(lambda: self._conn().execute(sql, args).fetchone())
+
+    def execute(self, sql: str, args: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return self.write(lambda conn: conn.execute(sql, args))
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> int:
+        rows = list(rows)
+        if rows:
+            self.write(lambda conn: conn.executemany(sql, rows))
+        return len(rows)
+
+    # --- bulk helpers -----------------------------------------------------------
+
+    @staticmethod
+    def chunks(keys: Sequence[Any], size: int = MAX_PARAMS) -> Iterable[Sequence[Any]]:
+        for i in range(0, len(keys), size):
+            yield keys[i : i + size]
+
+    def get_many(self, table: str, key: str, keys: Iterable[Any], columns: Sequence[str],
+                 where: str = "", args: Sequence[Any] = ()) -> Dict[Any, Tuple[Any, ...]]:
+        """
+        Rows of `table` whose `key` is in `keys`, as {key: (columns...)}.
+        `where`/`args` add an extra AND-ed filter.
+        """
+        keys = list(dict.fromkeys(keys))
+        cols = ", ".join(columns)
+        extra = f" AND ({where})" if where else ""
+        out: Dict[Any, Tuple[Any, ...]] = {}
+        for chunk in self.chunks(keys):
+            sql = f"SELECT {key}, {cols} FROM {table} WHERE {key} IN ({','.join('?' * len(chunk))}){extra}"
+            for row in self.read(sql, [*chunk, *args]):
+                out[row[0]] = tuple(row[1:])
+        return out
+
+    def put_many(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+                 conflict: str = "REPLACE") -> int:
+        """INSERT OR <conflict> all rows in one transaction."""
+        sql = (f"INSERT OR {conflict} INTO {table}({','.join(columns)}) "
+               f"VALUES({','.join('?' * len(columns))})")
+        return self.executemany(sql, rows)
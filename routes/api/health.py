@@ -48,6 +48,8 @@ import logging
 from datetime import datetime
 from flask import Blueprint, jsonify, request
 
+from nous_core.monitoring import get_sampler
+
 # Import our standardized API route helpers
 from utils.api_route_helper import create_api_blueprint, api_route, register_api_error_handlers
 
@@ -103,7 +105,7 @@ def system_health():
     try:
         # Get system information with error handling
         memory_info = psutil.virtual_memory()
-        cpu_percent = psutil.cpu_percent(interval=0.1)  # Quick sampling
+        cpu_percent = get_sampler().latest()['cpu_percent']  # Background sample, no blocking
         disk_info = psutil.disk_usage('/')
 
         # Return comprehensive system health information
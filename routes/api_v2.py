@@ -1,14 +1,22 @@
 from __future__ import annotations
+import json
 import os
 import time
 from functools import wraps
 from typing import Any, Dict, List
 
 import requests
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, session, stream_with_context
+
+from utils.rate_limiter import rate_limit
 
 api_v2_bp = Blueprint("api_v2", __name__)
 
+# Server-side caps for the streaming chat route
+STREAM_MAX_TOKENS = int(os.environ.get("AI_STREAM_MAX_TOKENS", "1000"))
+STREAM_MAX_MESSAGES = 50
+STREAM_ROLES = ("user", "assistant")
+
 def _auth_optional(fn):
     @wraps(fn)
     def w(*args, **kwargs):
@@ -108,6 +116,67 @@ def policy_evaluate():
     policy = _rt()["policy"]
     return jsonify({"ok": True, "result": policy.evaluate(d)})
 
+# ── AI Streaming (SSE) ───────────────────────────────────────────────
+def _stream_messages(d: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Client messages reduced to user/assistant turns with string content (system prompts are server-only)"""
+    raw = d.get("messages")
+    if not isinstance(raw, list):
+        raw = [{"role": "user", "content": d["message"]}] if d.get("message") else []
+    messages = [
+        {"role": m["role"], "content": m["content"]}
+        for m in raw
+        if isinstance(m, dict) and m.get("role") in STREAM_ROLES and isinstance(m.get("content"), str)
+        and m["content"].strip()
+    ]
+    return messages[-STREAM_MAX_MESSAGES:]
+
+@api_v2_bp.post("/ai/chat/stream")
+@_auth_optional
+@rate_limit(limit=20, window=60)
+def ai_chat_stream():
+    from utils.unified_ai_service import get_unified_ai_service
+    d = request.get_json(force=True, silent=False) or {}
+    messages = _stream_messages(d)
+    if not messages or messages[-1]["role"] != "user":
+        return jsonify({"ok": False, "error": "message or messages (ending with a user turn) required"}), 400
+    try:
+        max_tokens = min(max(int(d.get("max_tokens", STREAM_MAX_TOKENS)), 1), STREAM_MAX_TOKENS)
+        temperature = min(max(float(d.get("temperature", 0.7)), 0.0), 2.0)
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "error": "max_tokens must be an integer and temperature a number"}), 400
+
+    # Same safety/crisis handling as the non-streaming chat: mental-health
+    # responses are sent as one event instead of calling the provider
+    from utils.mental_health_chat_handler import get_mental_health_handler
+    handler = get_mental_health_handler()
+    user_id = session.get("user_id", session.get("google_id", "guest"))
+    support = handler.process_message(user_id, messages[-1]["content"], {"request_type": "chat_stream"})
+    if support:
+        body = {"delta": handler.format_chat_response(support), "type": "mental_health_support",
+                "crisis_detected": support.get("severity", 0) >= 8,
+                "requires_immediate_display": support.get("requires_immediate_display", False)}
+        return Response(f"data: {json.dumps(body)}\n\ndata: [DONE]\n\n", mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache"})
+
+    service = get_unified_ai_service()
+    tokens = service.stream_chat_completion(
+        messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        complexity=service.detect_complexity(messages),
+    )
+
+    def events():
+        try:
+            for delta in tokens:
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # ── FREE API INTEGRATION #1: Open-Meteo ───────────────────────────────
 @api_v2_bp.get("/weather/current")
 @_auth_optional
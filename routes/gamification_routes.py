@@ -189,10 +189,10 @@ def leaderboard_page():
     
     leaderboard = gamification_service.get_leaderboard(period, category, limit=50)
     
-    # Get user's rank
+    # Get user's rank (also when outside the top 50)
     user_id = get_current_user_id()
-    user_rank = next((i + 1 for i, entry in enumerate(leaderboard) 
-                     if entry['user_id'] == user_id), None)
+    my_rank = gamification_service.get_user_rank(user_id, period, category) if user_id else None
+    user_rank = my_rank['rank'] if my_rank else None
     
     return render_template('gamification/leaderboard.html',
                          leaderboard=leaderboard,
@@ -216,6 +216,20 @@ def api_get_leaderboard():
         'category': category
     })
 
+@gamification_bp.route('/api/gamification/leaderboard/me')
+@demo_allowed
+def api_get_my_rank():
+    """API endpoint to get the current user's leaderboard rank"""
+    period = request.args.get('period', 'weekly')
+    category = request.args.get('category', 'overall')
+    user_id = get_current_user_id()
+
+    return jsonify({
+        'rank': gamification_service.get_user_rank(user_id, period, category) if user_id else None,
+        'period': period,
+        'category': category
+    })
+
 # === Challenge Routes ===
 
 @gamification_bp.route('/challenges')
@@ -38,14 +38,36 @@ def nexus_ingest():
         pass
     return jsonify({"ok": True, "graph": out})
 
+def _int_arg(name: str, default: int, lo: int, hi: int) -> int:
+    """Integer query arg clamped to [lo, hi]; ValueError when it is not an integer."""
+    return max(lo, min(int(request.args.get(name, default)), hi))
+
 @nexus_bp.get("/nexus/graph")
 @require_auth(allow_demo=True)
 def nexus_graph():
     node = (request.args.get("node") or "").strip()
     if not node:
         return jsonify({"ok": False, "error": "node required"}), 400
+    try:
+        hops = _int_arg("hops", 1, 1, 4)
+        limit = _int_arg("limit", 50, 1, 500)
+    except ValueError:
+        return jsonify({"ok": False, "error": "hops and limit must be integers"}), 400
+    rt = init_runtime(current_app)
+    return jsonify({"ok": True, "data": rt["graph"].neighborhood(node, limit=limit, hops=hops)})
+
+@nexus_bp.get("/nexus/graph/related")
+@require_auth(allow_demo=True)
+def nexus_graph_related():
+    nodes = [n.strip() for n in request.args.getlist("node") if n.strip()]
+    if not nodes:
+        return jsonify({"ok": False, "error": "node required"}), 400
+    try:
+        top_k = _int_arg("k", 10, 1, 100)
+    except ValueError:
+        return jsonify({"ok": False, "error": "k must be an integer"}), 400
     rt = init_runtime(current_app)
-    return jsonify({"ok": True, "data": rt["graph"].neighborhood(node, limit=int(request.args.get("limit", "50")))})
+    return jsonify({"ok": True, "related": rt["graph"].related(nodes, top_k=top_k)})
 
 # ── Free Integration #1: Crossref ─────────────────────────────────────
 @nexus_bp.get("/research/crossref")
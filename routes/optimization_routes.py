@@ -244,7 +244,8 @@ def system_health():
         health_metrics = manager._get_system_health()
         
         # Add health status based on metrics
-        cpu_status = 'good' if health_metrics.get('cpu_percent', 0) < 70 else 'warning' if health_metrics.get('cpu_percent', 0) < 90 else 'critical'
+        cpu_percent = health_metrics.get('cpu_percent')
+        cpu_status = 'warming_up' if cpu_percent is None else 'good' if cpu_percent < 70 else 'warning' if cpu_percent < 90 else 'critical'
         memory_status = 'good' if health_metrics.get('memory_percent', 0) < 80 else 'warning' if health_metrics.get('memory_percent', 0) < 95 else 'critical'
         
         health_data = {
@@ -252,7 +253,7 @@ def system_health():
             'status': {
                 'cpu': cpu_status,
                 'memory': memory_status,
-                'overall': 'good' if cpu_status == 'good' and memory_status == 'good' else 'warning'
+                'overall': 'good' if cpu_status in ('good', 'warming_up') and memory_status == 'good' else 'warning'
             }
         }
         
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark experience replay in utils.adaptive_ai_system.
+
+    python scripts/bench_adaptive_replay.py --experiences 1000000 --users 5000
+
+Streams experiences into the replay (default capacity 10k) and reports store
+rate, sample_experiences() calls/sec (global and per-user) and resident
+memory once everything is stored. "legacy" is the previous deque + sort
+implementation, kept here only for comparison. Run one mode per process
+(--mode) for clean RSS numbers; without --mode both run in subprocesses.
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict, deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.adaptive_ai_system import Experience, ExperienceReplaySystem  # noqa: E402
+
+
+class LegacyReplay:
+    def __init__(self, capacity=10000):
+        self.experiences = deque(maxlen=capacity)
+        self.user_experiences = defaultdict(lambda: deque(maxlen=1000))
+
+    def store_experience(self, experience):
+        self.experiences.append(experience)
+        if experience.user_context.get('user_id'):
+            self.user_experiences[experience.user_context['user_id']].append(experience)
+
+    def sample_experiences(self, batch_size=32, user_id=None):
+        if user_id and user_id in self.user_experiences:
+            user_size = int(batch_size * 0.7)
+            user = list(self.user_experiences[user_id])
+            others = [e for e in self.experiences if e.user_context.get('user_id') != user_id]
+            return self._sample(user, user_size) + self._sample(others, batch_size - user_size)
+        return self._sample(list(self.experiences), batch_size)
+
+    @staticmethod
+    def _sample(experiences, size):
+        if not experiences or size <= 0:
+            return []
+        size = min(size, len(experiences))
+        ranked = sorted(experiences, key=lambda x: x.reward, reverse=True)
+        top = max(1, size // 2)
+        result = ranked[:top]
+        if size - top > 0 and len(ranked) > top:
+            result.extend(random.sample(ranked[top:], min(size - top, len(ranked) - top)))
+        return result
+
+
+def _rss_mb():
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _rate(fn, seconds=2.0):
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run(mode, n, users, batch):
+    rng = random.Random(5)
+    replay = LegacyReplay() if mode == "legacy" else ExperienceReplaySystem()
+    base = _rss_mb()
+    start = time.perf_counter()
+    for i in range(n):
+        uid = f"user{rng.randrange(users)}"
+        replay.store_experience(Experience(
+            timestamp=float(i), user_context={'user_id': uid, 'session_id': f"s{i % 97}"},
+            action_taken=i % 5, reward=rng.uniform(-1.0, 2.0),
+            outcome_state={'action_type': 'TASK_CREATION', 'success': True}, task_type='standard'))
+    store_rate = n / (time.perf_counter() - start)
+    rss = _rss_mb() - base
+    global_rate = _rate(lambda: replay.sample_experiences(batch))
+    user_rate = _rate(lambda: replay.sample_experiences(batch, user_id=f"user{rng.randrange(users)}"))
+    print(f"{mode:>8} {store_rate:>12,.0f} {global_rate:>12,.0f} {user_rate:>12,.0f} {rss:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--experiences", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--mode", choices=("legacy", "sumtree"))
+    args = parser.parse_args()
+    if args.mode:
+        run(args.mode, args.experiences, args.users, args.batch)
+        return
+    print(f"{args.experiences:,} experiences, {args.users:,} users, batch {args.batch}")
+    print(f"{'mode':>8} {'store/s':>12} {'global/s':>12} {'per-user/s':>12} {'RSS MB':>10}")
+    sys.stdout.flush()
+    for mode in ("legacy", "sumtree"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--experiences", str(args.experiences),
+                        "--users", str(args.users), "--batch", str(args.batch)], check=True)
+
+
+if __name__ == "__main__":
+    main()
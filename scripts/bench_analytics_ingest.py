@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark AnalyticsService.track_activity ingestion: one transaction per
+event vs the write-behind ActivityBuffer.
+
+    python scripts/bench_analytics_ingest.py --events 5000 --users 50
+    python scripts/bench_analytics_ingest.py --url postgresql://localhost/nous_bench
+
+Reports events/sec as seen by the caller, time until everything is
+committed, and the buffer's batch and flush-lag metrics.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from models.database import db  # noqa: E402
+from utils.analytics_service import ActivityBuffer, AnalyticsService  # noqa: E402
+
+TYPES = ["chat", "chat", "chat", "login", "task_completed", "mood", "workout"]
+
+
+def _app(url, users):
+    from models import analytics_models as am
+    from models.user import User
+
+    app = Flask("bench_analytics")
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    db.init_app(app)
+    with app.app_context():
+        tables = [User.__table__] + [model.__table__ for model in (
+            am.UserActivity, am.UserActivityRollup, am.UserMetrics, am.UserInsight, am.UserGoals)]
+        db.metadata.drop_all(db.engine, tables=tables)
+        db.metadata.create_all(db.engine, tables=tables)
+        db.session.add_all([User(id=i, username=f"u{i}", email=f"u{i}@example.com") for i in range(1, users + 1)])
+        db.session.commit()
+    return app
+
+
+def _run(url, write_behind, events, users, batch):
+    app = _app(url, users)
+    buffer = ActivityBuffer(max_events=batch, flush_interval=0.5)
+    rng = random.Random(7)
+    with app.app_context():
+        service = AnalyticsService(db, write_behind=write_behind, buffer=buffer)
+        t0 = time.perf_counter()
+        for _ in range(events):
+            kind = rng.choice(TYPES)
+            service.track_activity(rng.randint(1, users), kind, "bench",
+                                   {"rating": rng.randint(1, 10)} if kind == "mood" else None,
+                                   duration_seconds=rng.randint(0, 120))
+        enqueued = time.perf_counter() - t0
+        buffer.flush()
+        committed = time.perf_counter() - t0
+        db.session.remove()
+    return events / enqueued, committed, buffer.stats()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=5000)
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--batch", type=int, default=500)
+    ap.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        print(f"{'mode':>12} {'events/s':>10} {'commit_s':>9} {'batches':>8} {'avg_batch':>10} {'max_lag_ms':>11}")
+        for mode, write_behind in (("per-event", False), ("write-behind", True)):
+            rate, committed, stats = _run(url, write_behind, args.events, args.users, args.batch)
+            print(f"{mode:>12} {rate:>10.0f} {committed:>9.2f} {stats['flushes']:>8} "
+                  f"{stats['avg_batch_size']:>10.1f} {stats['max_flush_lag_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression: the after_request gzip in
+utils.performance_middleware vs the streaming CompressionMiddleware
+installed by extensions.compression.init_compression.
+
+    python scripts/bench_compression.py --requests 500 --sizes 2,32,256
+
+Reports requests/sec, CPU ms per request and bytes on the wire for JSON
+bodies of each size (KB), plus time-to-first-byte for a streamed response
+whose generator takes --event-ms per event.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, jsonify  # noqa: E402
+
+from extensions.compression import init_compression  # noqa: E402
+from utils.performance_middleware import setup_performance_middleware  # noqa: E402
+
+
+def _payload(kb):
+    row = {"id": 0, "user": "someone@example.com", "mood": "calm", "note": "walked the dog, slept ok"}
+    rows = max(1, kb * 1024 // len(str(row)))
+    return {"entries": [dict(row, id=i) for i in range(rows)]}
+
+
+def _app(kind, sizes, events, event_ms):
+    app = Flask(f"bench_{kind}")
+    payloads = {kb: _payload(kb) for kb in sizes}
+
+    @app.route("/json/<int:kb>")
+    def json_body(kb):
+        return jsonify(payloads[kb])
+
+    @app.route("/stream")
+    def stream():
+        def generate():
+            for i in range(events):
+                time.sleep(event_ms / 1000.0)
+                yield f"data: {{\"n\": {i}, \"text\": \"{'token ' * 40}\"}}\n\n"
+        # text/plain so the after_request hook (which skips event-stream) compresses it too
+        return Response(generate(), mimetype="text/plain")
+
+    if kind == "after_request":
+        setup_performance_middleware(app)
+    else:
+        init_compression(app)
+    return app
+
+
+def _bench_json(client, kb, requests):
+    headers = {"Accept-Encoding": "zstd, br, gzip"}
+    wall, cpu = time.perf_counter(), time.process_time()
+    size = 0
+    for _ in range(requests):
+        size = len(client.get(f"/json/{kb}", headers=headers).data)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return requests / wall, cpu / requests * 1000, size
+
+
+def _ttfb(client):
+    t0 = time.perf_counter()
+    r = client.get("/stream", headers={"Accept-Encoding": "gzip"}, buffered=False)
+    chunks = iter(r.response)
+    size = len(next(chunks))
+    first = time.perf_counter() - t0
+    size += sum(len(chunk) for chunk in chunks)
+    r.close()
+    return first * 1000, (time.perf_counter() - t0) * 1000, size
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=500)
+    ap.add_argument("--sizes", default="2,32,256")
+    ap.add_argument("--events", type=int, default=20)
+    ap.add_argument("--event-ms", type=float, default=5.0)
+    args = ap.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    clients = {kind: _app(kind, sizes, args.events, args.event_ms).test_client()
+               for kind in ("after_request", "middleware")}
+    print(f"{'variant':>13} {'KB':>5} {'req/s':>8} {'cpu_ms':>7} {'wire_bytes':>11}")
+    for kb in sizes:
+        for kind, client in clients.items():
+            rate, cpu_ms, size = _bench_json(client, kb, args.requests)
+            print(f"{kind:>13} {kb:>5} {rate:>8.0f} {cpu_ms:>7.3f} {size:>11}")
+
+    print(f"\nstream of {args.events} events, {args.event_ms}ms apart")
+    print(f"{'variant':>13} {'ttfb_ms':>8} {'total_ms':>9} {'wire_bytes':>11}")
+    for kind, client in clients.items():
+        first, total, size = _ttfb(client)
+        print(f"{kind:>13} {first:>8.1f} {total:>9.1f} {size:>11}")
+
+
+if __name__ == "__main__":
+    main()
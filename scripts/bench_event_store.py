@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark EventStore append throughput under concurrent threads, the way
+gunicorn gthread workers share one store.
+
+    python scripts/bench_event_store.py --threads 1,4,8 --events 2000
+
+"legacy" re-creates the original behaviour (new connection + rollback-journal
+commit per append) for the before/after comparison.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nous_core.eventing import EventStore  # noqa: E402
+
+
+class LegacyEventStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "ts REAL NOT NULL, topic TEXT NOT NULL, payload TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_topic ON events(topic)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)")
+
+    def append(self, topic, payload):
+        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            cur = conn.execute("INSERT INTO events(ts, topic, payload) VALUES (?, ?, ?)",
+                               (time.time(), topic, json.dumps(payload)))
+            conn.commit()
+            return int(cur.lastrowid)
+
+
+def _run(store, threads, per_thread):
+    def worker(n):
+        for i in range(per_thread):
+            store.append("spotify.track.played", {"worker": n, "i": i})
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return threads * per_thread / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", default="1,4,8,16")
+    ap.add_argument("--events", type=int, default=2000, help="events per run (split across threads)")
+    args = ap.parse_args()
+
+    variants = {
+        "legacy": LegacyEventStore,
+        "wal": lambda p: EventStore(p),
+        "group": lambda p: EventStore(p, group_commit=True),
+    }
+    print(f"{'threads':>7} " + " ".join(f"{name:>10}" for name in variants) + "   (events/sec)")
+    for threads in [int(t) for t in args.threads.split(",") if t]:
+        row = []
+        for name, factory in variants.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                store = factory(os.path.join(tmp, "nous_events.db"))
+                row.append(_run(store, threads, max(1, args.events // threads)))
+        print(f"{threads:>7} " + " ".join(f"{v:>10.0f}" for v in row))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EventStore(os.path.join(tmp, "nous_events.db"))
+        t0 = time.perf_counter()
+        store.append_many(("spotify.track.played", {"i": i}) for i in range(args.events))
+        print(f"append_many: {args.events / (time.perf_counter() - t0):.0f} events/sec")
+
+
+if __name__ == "__main__":
+    main()
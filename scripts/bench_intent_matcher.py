@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for HandlerRegistry.find_handler: the compiled Aho-Corasick
+matcher vs the original per-handler _calculate_match_score loop.
+
+    python scripts/bench_intent_matcher.py --handlers 100,1000,5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.chat.handler_registry import HandlerRegistry  # noqa: E402
+
+WORDS = ["play", "music", "mood", "log", "weather", "spotify", "journal", "help", "sleep", "dbt",
+         "reminder", "task", "habit", "breathe", "focus", "playlist", "calendar", "email", "note", "goal"]
+
+
+def _legacy_find(reg, message):
+    message_lower = message.lower().strip()
+    best, best_score = None, 0
+    for handler_info in reg.handlers.values():
+        score = reg._calculate_match_score(message_lower, handler_info['intent_patterns'])
+        if score > best_score:
+            best, best_score = handler_info, score
+    return best
+
+
+def _registry(n, rng):
+    reg = HandlerRegistry(codegraph_path=os.devnull)
+    for i in range(n):
+        name = rng.choice(["cmd_", "handle_"]) + "_".join(rng.sample(WORDS, 2)) + f"_{i}"
+        reg.register_handler_from_codegraph({"function": name, "type": "command"})
+    return reg
+
+
+def _bench(fn, messages):
+    t0 = time.perf_counter()
+    for m in messages:
+        fn(m)
+    return (time.perf_counter() - t0) / len(messages) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--handlers", default="100,1000,5000")
+    ap.add_argument("--messages", type=int, default=200)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    messages = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) for _ in range(args.messages)]
+    print(f"{'handlers':>9} {'legacy_us':>10} {'indexed_us':>11} {'speedup':>8}")
+    for n in [int(h) for h in args.handlers.split(",") if h]:
+        reg = _registry(n, rng)
+        reg.find_handler("warm up")  # compile outside the timed loop
+        legacy = _bench(lambda m: _legacy_find(reg, m), messages)
+        indexed = _bench(reg.find_handler, messages)
+        print(f"{n:>9} {legacy:>10.1f} {indexed:>11.1f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
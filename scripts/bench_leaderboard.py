@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark GamificationService leaderboards: full INSERT ... SELECT rebuild,
+incremental re-scoring of a few changed users, top-N reads and the
+per-user rank lookup.
+
+    python scripts/bench_leaderboard.py --users 100000 --changed 100
+    python scripts/bench_leaderboard.py --url postgresql://localhost/nous_bench
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+import services.gamification_service as gs  # noqa: E402
+from models.database import db  # noqa: E402
+
+
+def _timed(fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat * 1000, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=100000)
+    ap.add_argument("--changed", type=int, default=100)
+    ap.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    args = ap.parse_args()
+
+    from models.gamification_models import Leaderboard, PointTransaction
+    from models.user import User
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = Flask("bench_leaderboard")
+        app.config["SQLALCHEMY_DATABASE_URI"] = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        db.init_app(app)
+        with app.app_context():
+            tables = [User.__table__, PointTransaction.__table__, Leaderboard.__table__]
+            db.metadata.drop_all(db.engine, tables=tables)
+            db.metadata.create_all(db.engine, tables=tables)
+            rng = random.Random(3)
+            now = datetime.utcnow()
+            db.session.execute(User.__table__.insert(), [
+                {"id": i, "username": f"user{i}", "email": f"u{i}@example.com"} for i in range(1, args.users + 1)])
+            db.session.execute(PointTransaction.__table__.insert(), [
+                {"user_id": i, "points": int(rng.paretovariate(1.2) * 10), "transaction_type": "earned",
+                 "created_at": now - timedelta(hours=rng.randint(1, 100))}
+                for i in range(1, args.users + 1) for _ in range(2)])
+            db.session.commit()
+            service = gs.GamificationService()
+
+            full_ms, _ = _timed(lambda: service.update_leaderboards(incremental=False))
+            db.session.execute(PointTransaction.__table__.insert(), [
+                {"user_id": rng.randint(1, args.users), "points": rng.randint(1, 20),
+                 "transaction_type": "earned", "created_at": datetime.utcnow()} for _ in range(args.changed)])
+            db.session.commit()
+            gs.LEADERBOARD_WATERMARK_SLACK = timedelta(0)
+            incremental_ms, _ = _timed(service.update_leaderboards)
+            cold_ms, _ = _timed(lambda: service.get_leaderboard("weekly", limit=50))
+            warm_ms, _ = _timed(lambda: service.get_leaderboard("weekly", limit=50), repeat=1000)
+            rank_ms, _ = _timed(lambda: service.get_user_rank(rng.randint(1, args.users)), repeat=1000)
+
+    print(f"{args.users} users, {args.changed} changed")
+    print(f"{'full rebuild (2 boards)':>28} {full_ms:>10.1f} ms")
+    print(f"{'incremental (2 boards)':>28} {incremental_ms:>10.1f} ms")
+    print(f"{'top-50 cold':>28} {cold_ms:>10.3f} ms")
+    print(f"{'top-50 cached':>28} {warm_ms:>10.3f} ms")
+    print(f"{'my rank':>28} {rank_ms:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark system-metrics reads and executor re-configuration.
+
+    python scripts/bench_metrics_sampler.py --reads 100000
+
+Compares the old blocking read (psutil.cpu_percent(interval=0.1) plus
+memory/disk) with the background sampler's snapshot, and recreating the
+thread/process pools with resizing ResizableExecutor in place.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil  # noqa: E402
+
+from nous_core.monitoring import get_sampler, snapshot  # noqa: E402
+from utils.adaptive_ai_system import ResizableExecutor  # noqa: E402
+
+
+def _legacy_read():
+    return (psutil.cpu_percent(interval=0.1), psutil.virtual_memory().percent, psutil.disk_usage("/").percent)
+
+
+def _timed(fn, reps):
+    out = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1e6)
+    out.sort()
+    return statistics.median(out), out[int(len(out) * 0.99) - 1]
+
+
+def _recreate():
+    threads, procs = ThreadPoolExecutor(max_workers=8), ProcessPoolExecutor(max_workers=2)
+    threads.submit(int).result()
+    procs.submit(int).result()
+    threads.shutdown(wait=True)
+    procs.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reads", type=int, default=100000)
+    parser.add_argument("--legacy-reads", type=int, default=20)
+    parser.add_argument("--resizes", type=int, default=20)
+    args = parser.parse_args()
+
+    get_sampler().start()
+    threads = ResizableExecutor(ThreadPoolExecutor, 16, 8)
+    procs = ResizableExecutor(ProcessPoolExecutor, 4, 2)
+    threads.submit(int).result()
+    procs.submit(int).result()
+
+    def resize():
+        threads.resize(4)
+        procs.resize(1)
+        threads.resize(8)
+        procs.resize(2)
+        threads.submit(int).result()
+        procs.submit(int).result()
+
+    rows = [
+        ("legacy blocking read", _timed(_legacy_read, args.legacy_reads)),
+        ("sampler latest()", _timed(lambda: get_sampler().latest(), args.reads)),
+        ("health snapshot()", _timed(snapshot, args.reads)),
+        ("recreate executors", _timed(_recreate, args.resizes)),
+        ("resize in place", _timed(resize, args.resizes)),
+    ]
+    print(f"{'path':>22} {'p50 us':>12} {'p99 us':>12}")
+    for name, (p50, p99) in rows:
+        print(f"{name:>22} {p50:>12,.2f} {p99:>12,.2f}")
+    threads.shutdown()
+    procs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
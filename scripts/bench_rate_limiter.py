@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Multi-process benchmark for utils.rate_limiter: throughput of the shared
+GCRA table and how many requests a hot key really gets through when N
+gunicorn-style worker processes enforce a limit.
+
+    python scripts/bench_rate_limiter.py --procs 1,2,4,8 --checks 20000
+
+"legacy" re-creates the original per-process deque limiter, where every
+worker keeps its own counts and the effective limit is limit * workers.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict, deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rate_limiter import RateLimiter  # noqa: E402
+
+LIMIT, WINDOW = 100, 60
+
+
+class LegacyRateLimiter:
+    def __init__(self):
+        self.requests = defaultdict(deque)
+
+    def is_allowed(self, key, limit, window):
+        now = time.time()
+        while self.requests[key] and self.requests[key][0] <= now - window:
+            self.requests[key].popleft()
+        if len(self.requests[key]) >= limit:
+            return False
+        self.requests[key].append(now)
+        return True
+
+
+def _worker(kind, path, checks, keys, seed, start, out):
+    limiter = LegacyRateLimiter() if kind == "legacy" else RateLimiter(path=path)
+    rng = random.Random(seed)
+    names = [f"10.0.{i // 256}.{i % 256}" for i in range(keys)]
+    start.wait()
+    t0 = time.perf_counter()
+    for _ in range(checks):
+        limiter.is_allowed(rng.choice(names), LIMIT, WINDOW)
+    elapsed = time.perf_counter() - t0
+    hot = sum(limiter.is_allowed("hot-key", LIMIT, WINDOW) for _ in range(LIMIT * 2))
+    out.put((elapsed, hot))
+
+
+def _run(kind, procs, checks, keys):
+    ctx = multiprocessing.get_context("fork")
+    out, start = ctx.Queue(), ctx.Event()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rate_limit.tbl")
+        RateLimiter(path=path)  # create the table before the workers race for it
+        workers = [ctx.Process(target=_worker, args=(kind, path, checks // procs, keys, n, start, out))
+                   for n in range(procs)]
+        for w in workers:
+            w.start()
+        start.set()
+        results = [out.get() for _ in workers]
+        for w in workers:
+            w.join()
+    rate = checks / max(elapsed for elapsed, _ in results)
+    return rate, sum(hot for _, hot in results)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", default="1,2,4,8")
+    ap.add_argument("--checks", type=int, default=20000, help="checks per run (split across processes)")
+    ap.add_argument("--keys", type=int, default=5000)
+    args = ap.parse_args()
+
+    print(f"limit {LIMIT}/{WINDOW}s; 'hot' = requests admitted for one key across all processes")
+    print(f"{'procs':>5} {'legacy/s':>10} {'shm/s':>10} {'legacy hot':>11} {'shm hot':>8}")
+    for procs in [int(p) for p in args.procs.split(",") if p]:
+        legacy_rate, legacy_hot = _run("legacy", procs, args.checks, args.keys)
+        shm_rate, shm_hot = _run("shm", procs, args.checks, args.keys)
+        print(f"{procs:>5} {legacy_rate:>10.0f} {shm_rate:>10.0f} {legacy_hot:>11} {shm_hot:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request http.request/http.response events: synchronous
+bus.publish (one event-store commit per event) vs the TelemetrySink ring.
+
+    python scripts/bench_request_telemetry.py --requests 5000 --threads 4
+
+Serves a trivial route through the Flask test client and reports
+requests/sec with the hooks disabled, publishing inline, and queued on the
+sink (including the time to drain it afterwards).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, g, request  # noqa: E402
+
+from nous_core.eventing import EventBus, EventStore, TelemetrySink  # noqa: E402
+
+
+def _app(mode, bus, sink):
+    app = Flask(f"bench_{mode}")
+
+    @app.route("/ping")
+    def ping():
+        return "ok"
+
+    if mode == "inline":
+        @app.before_request
+        def before():
+            g.request_id = str(uuid.uuid4())
+            bus.publish("http.request", {"id": g.request_id, "path": request.path, "method": request.method})
+
+        @app.after_request
+        def after(resp):
+            bus.publish("http.response", {"id": g.request_id, "status": resp.status_code})
+            return resp
+    elif mode == "sink":
+        @app.before_request
+        def before():
+            g.request_id = str(uuid.uuid4())
+            if sink.sample(request.path):
+                g.telemetry_started = time.perf_counter()
+                sink.record("http.request", {"id": g.request_id, "path": request.path, "method": request.method})
+
+        @app.after_request
+        def after(resp):
+            started = g.get("telemetry_started")
+            if started is not None:
+                sink.record("http.response", {"id": g.request_id, "status": resp.status_code,
+                                              "ms": round((time.perf_counter() - started) * 1000.0, 3)})
+            return resp
+    return app
+
+
+def _run(mode, tmp, requests, threads):
+    store = EventStore(os.path.join(tmp, f"{mode}.db"), group_commit=True)
+    bus = EventBus(store=store, async_dispatch=True)
+    sink = TelemetrySink(bus, capacity=65536, flush_interval=0.25)
+    app = _app(mode, bus, sink)
+    per_thread = requests // threads
+
+    def worker():
+        client = app.test_client()
+        for _ in range(per_thread):
+            client.get("/ping")
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    served = time.perf_counter() - t0
+    sink.flush()
+    drained = time.perf_counter() - t0
+    stored = store.read_one("SELECT COUNT(*) FROM events")[0]
+    return per_thread * threads / served, drained, stored, sink.stats()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--threads", type=int, default=4)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'hooks':>9} {'req/s':>9} {'drained_s':>10} {'events':>7} {'batches':>8} {'dropped':>8}")
+        for mode in ("disabled", "inline", "sink"):
+            rate, drained, stored, stats = _run(mode, tmp, args.requests, args.threads)
+            batches = stats["batches"] if mode == "sink" else "-"
+            dropped = stats["dropped"] if mode == "sink" else "-"
+            print(f"{mode:>9} {rate:>9.0f} {drained:>10.2f} {stored:>7} {batches:>8} {dropped:>8}")
+
+
+if __name__ == "__main__":
+    main()
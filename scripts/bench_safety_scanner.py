@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared safety scanner against the per-lexicon substring loops it
+replaced, over every layer that looks at a chat message (crisis_check on the
+request body, NLU intents + crisis, emotion detection).
+
+    python scripts/bench_safety_scanner.py --messages 5000 --words 40
+
+Reports MB/s of message text for the legacy loops, the scanner on unseen
+messages (cold cache) and on repeated messages (warm cache).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.safety_scanner import (  # noqa: E402
+    CRISIS_KEYWORDS,
+    EMOTION_KEYWORDS,
+    INTENSITY_MODIFIERS,
+    INTENT_KEYWORDS,
+    REQUEST_CRISIS_KEYWORDS,
+    safety_scanner,
+    scan_message,
+)
+
+FILLER = ("i the and to feel today about my work so it was a bit long day with friends "
+          "family sleep food morning evening think maybe just want need really").split()
+KEYWORDS = sorted({k for kws in INTENT_KEYWORDS.values() for k in kws} | set(CRISIS_KEYWORDS)
+                  | {k for kws in EMOTION_KEYWORDS.values() for k in kws})
+
+
+def _messages(n, words, rng):
+    return [" ".join(rng.choice(KEYWORDS) if rng.random() < 0.08 else rng.choice(FILLER)
+                     for _ in range(words)).capitalize() for _ in range(n)]
+
+
+def legacy(message):
+    body = str({"message": message}).lower()
+    any(k in body for k in REQUEST_CRISIS_KEYWORDS)
+    lowered = message.lower().strip()
+    [i for i, kws in INTENT_KEYWORDS.items() if any(k in lowered for k in kws)]
+    any(k in lowered for k in CRISIS_KEYWORDS)
+    text_lower = lowered.lower()
+    for kws in EMOTION_KEYWORDS.values():
+        for k in kws:
+            if k in text_lower:
+                for m in INTENSITY_MODIFIERS:
+                    if m in text_lower and text_lower.find(m) < text_lower.find(k):
+                        break
+
+
+def scanner(message):
+    scan_message(message).any("request_crisis")
+    scan = scan_message(message.lower().strip())
+    scan.labels("intent")
+    scan.any("crisis")
+    modifiers = [scan.first("intensity", m) for m in INTENSITY_MODIFIERS if scan.first("intensity", m) != -1]
+    for emotion in EMOTION_KEYWORDS:
+        for k in scan.keywords("emotion", emotion):
+            at = scan.first("emotion", k)
+            for modifier_at in modifiers:
+                if modifier_at < at:
+                    break
+
+
+def _rate(fn, messages):
+    t0 = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return sum(map(len, messages)) / (time.perf_counter() - t0) / 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=5000)
+    ap.add_argument("--words", type=int, default=40)
+    args = ap.parse_args()
+
+    rng = random.Random(5)
+    messages = _messages(args.messages, args.words, rng)
+    print(f"{len(messages)} messages, avg {sum(map(len, messages)) / len(messages):.0f} chars, "
+          f"{len(safety_scanner._automaton)} keywords in one automaton")
+    print(f"{'path':>16} {'MB/s':>8}")
+    print(f"{'legacy loops':>16} {_rate(legacy, messages):>8.2f}")
+    safety_scanner.clear_cache()
+    print(f"{'scanner cold':>16} {_rate(scanner, messages):>8.2f}")
+    warm = messages[-min(len(messages), safety_scanner.cache_info().maxsize // 2):]
+    print(f"{'scanner warm':>16} {_rate(scanner, warm):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark SemanticIndex vector search: legacy per-row SQLite scan vs the
+in-memory matrix index vs the approximate IVF index.
+
+    python scripts/bench_semantic_index.py --sizes 10000,100000,1000000
+
+Clustered random unit vectors stand in for sentence-transformers embeddings,
+so the benchmark runs without the model installed. The scan mode is skipped above
+--scan-max docs because it takes minutes per query at 1M.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nous_core.semantic import SemanticIndex  # noqa: E402
+
+
+def _sample(rng, centers, m):
+    vecs = centers[rng.integers(0, len(centers), m)] + 0.08 * rng.standard_normal((m, centers.shape[1]))
+    vecs = vecs.astype("float32")
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _populate(db_path, n, centers, rng):
+    SemanticIndex(db_path, index_mode="scan")  # creates the schema
+    with sqlite3.connect(db_path) as conn:
+        chunk = 50000
+        for start in range(0, n, chunk):
+            m = min(chunk, n - start)
+            vecs = _sample(rng, centers, m)
+            conn.executemany(
+                "INSERT INTO docs(doc_id,text,meta,emb) VALUES(?,?,?,?)",
+                ((f"doc:{start + i}", f"text {start + i}", "{}", vecs[i].tobytes()) for i in range(m)),
+            )
+        conn.commit()
+
+
+def _time_queries(idx, queries, top_k):
+    t0 = time.perf_counter()
+    results = [idx.search_vector(q, top_k) for q in queries]
+    return (time.perf_counter() - t0) / len(queries) * 1000.0, results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="10000,100000,1000000")
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--top-k", type=int, default=10)
+    ap.add_argument("--scan-max", type=int, default=100000)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((2000, args.dim)) / np.sqrt(args.dim)
+    print(f"{'docs':>9} {'mode':>7} {'build_s':>8} {'ms/query':>9} {'recall@k':>9}")
+    for n in [int(s) for s in args.sizes.split(",") if s]:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = os.path.join(tmp, "nous_semantic.db")
+            _populate(db, n, centers, rng)
+            queries = _sample(rng, centers, args.queries)
+
+            truth = None
+            for mode in ("matrix", "ivf", "scan"):
+                if mode == "scan" and n > args.scan_max:
+                    print(f"{n:>9} {mode:>7} {'-':>8} {'skipped':>9} {'-':>9}")
+                    continue
+                idx = SemanticIndex(db, index_mode=mode)
+                t0 = time.perf_counter()
+                if mode != "scan":
+                    idx._sync_vectors()
+                build = time.perf_counter() - t0
+                ms, results = _time_queries(idx, queries, args.top_k)
+                ids = [{r["doc_id"] for r in res} for res in results]
+                if truth is None:
+                    truth = ids
+                recall = float(np.mean([len(a & b) / args.top_k for a, b in zip(ids, truth)]))
+                print(f"{n:>9} {mode:>7} {build:>8.2f} {ms:>9.2f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
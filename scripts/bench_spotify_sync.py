@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark sync_recently_played against a local stub Spotify + lyrics API:
+the old per-track path vs the batched ingest, cold and warm.
+
+    python scripts/bench_spotify_sync.py --tracks 50 --lyrics-ms 40
+
+Counts HTTP round-trips served by the stub and SQLite round-trips (one
+query or one write transaction each) across the Spotify, event, semantic
+and graph stores.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nous_core.eventing import EventBus, EventStore  # noqa: E402
+from nous_core.semantic import SemanticIndex  # noqa: E402
+from nous_core.storage import SQLiteStore  # noqa: E402
+from services.nexus.memory_graph import MemoryGraph  # noqa: E402
+from services.spotify import spotify_api, spotify_ingest  # noqa: E402
+from services.spotify.lyrics import LyricsProvider, analyze_lyrics  # noqa: E402
+from services.spotify.spotify_api import SpotifyAPI, SpotifyConfig  # noqa: E402
+from services.spotify.spotify_store import SpotifyStore  # noqa: E402
+from utils.http import HTTPError, http_get_json  # noqa: E402
+
+COUNTS = {"http": 0, "sql": 0}
+_retry = SQLiteStore._retry
+
+
+def _counting_retry(self, fn):
+    COUNTS["sql"] += 1
+    return _retry(self, fn)
+
+
+def _stub_server(tracks, lyrics_delay):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            COUNTS["http"] += 1
+            url = urlparse(self.path)
+            qs = parse_qs(url.query)
+            if url.path == "/v1/me/player/recently-played":
+                n = int(qs.get("limit", ["50"])[0])
+                body = {"items": [{
+                    "played_at": f"2026-10-16T10:{i // 60:02d}:{i % 60:02d}.000Z",
+                    "track": {"id": f"t{i}", "name": f"Song {i}", "artists": [{"name": f"Artist {i % 7}"}]},
+                } for i in reversed(range(min(n, tracks)))]}
+            elif url.path == "/v1/audio-features":
+                body = {"audio_features": [{"id": t, "energy": 0.5} for t in qs["ids"][0].split(",")]}
+            elif url.path.startswith("/lyrics/"):
+                time.sleep(lyrics_delay)
+                body = {"lyrics": "" if url.path.endswith("0") else "hold on, we rise into the light"}
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubLyricsProvider(LyricsProvider):
+    name = "stub"
+
+    def __init__(self, base):
+        self.base = base
+
+    def fetch(self, *, artist, title):
+        try:
+            data = http_get_json(f"{self.base}/lyrics/{artist}/{title}")
+        except HTTPError:
+            return None
+        return {"provider": self.name, "lyrics": data["lyrics"]} if data.get("lyrics") else None
+
+
+class HashEncoder:
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        import numpy as np
+        out = np.zeros((len(texts), 32), dtype="float32")
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                out[i, hash(word) % 32] += 1.0
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
+
+
+def _per_track_sync(spotify, store, runtime, provider, user_id="bench"):
+    """The pre-batching flow: one write (and connection) per track per store."""
+    tracks = [it["track"] for it in spotify.recently_played("x", limit=50)]
+    ids = [t["id"] for t in tracks]
+    for t in tracks:
+        store.put_track(t["id"], t)
+    for f in spotify.audio_features("x", ids):
+        store.put_enrichment(f["id"], "audio_features", f)
+    for tid in ids:
+        if store.get_lyrics_analysis(tid):
+            continue
+        tr = store.get_track(tid) or {}
+        artist, title = spotify_ingest._artist_title(tr)
+        res = provider.fetch(artist=artist, title=title)
+        if res:
+            store.put_lyrics_analysis(tid, {"analysis": analyze_lyrics(res["lyrics"])})
+    for t in tracks:
+        artist, title = spotify_ingest._artist_title(t)
+        meta = {"track_id": t["id"], "artist": artist, "title": title}
+        runtime["semantic"].upsert(f"spotify:track:{t['id']}", f"{title} {artist}", meta)
+        runtime["graph"].upsert_node(f"spotify:track:{t['id']}", kind="spotify_track", meta=meta)
+        runtime["graph"].upsert_node(f"artist:{artist}", kind="artist", meta={"name": artist})
+        runtime["graph"].add_edge(f"spotify:track:{t['id']}", f"artist:{artist}", rel="by")
+        runtime["bus"].publish("spotify.track.played", {"track_id": t["id"], "user_id": user_id})
+
+
+def _runtime(tmp, tag):
+    return {
+        "bus": EventBus(store=EventStore(os.path.join(tmp, f"{tag}-events.db"))),
+        "semantic": SemanticIndex(os.path.join(tmp, f"{tag}-sem.db"), model=HashEncoder()),
+        "graph": MemoryGraph(os.path.join(tmp, f"{tag}-graph.db")),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tracks", type=int, default=50)
+    ap.add_argument("--lyrics-ms", type=float, default=40.0, help="stub lyrics latency")
+    args = ap.parse_args()
+
+    server = _stub_server(args.tracks, args.lyrics_ms / 1000.0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    spotify_api.SPOTIFY_API = f"{base}/v1"
+    provider = StubLyricsProvider(base)
+    spotify_ingest.default_providers = lambda: [provider]
+    spotify = SpotifyAPI(SpotifyConfig("id", "secret", "http://localhost/cb"))
+    SQLiteStore._retry = _counting_retry
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = []
+        legacy_store = SpotifyStore(os.path.join(tmp, "legacy.db"))
+        legacy_rt = _runtime(tmp, "legacy")
+        batched_store = SpotifyStore(os.path.join(tmp, "batched.db"))
+        batched_rt = _runtime(tmp, "batched")
+        runs = [
+            ("per-track", lambda: _per_track_sync(spotify, legacy_store, legacy_rt, provider)),
+            ("batched cold", lambda: spotify_ingest.sync_recently_played(
+                spotify=spotify, store=batched_store, access_token="x", runtime=batched_rt, user_id="bench")),
+            ("batched warm", lambda: spotify_ingest.sync_recently_played(
+                spotify=spotify, store=batched_store, access_token="x", runtime=batched_rt, user_id="bench")),
+        ]
+        for label, fn in runs:
+            COUNTS.update(http=0, sql=0)
+            t0 = time.perf_counter()
+            fn()
+            rows.append((label, (time.perf_counter() - t0) * 1000.0, COUNTS["http"], COUNTS["sql"]))
+    server.shutdown()
+
+    print(f"{'mode':>14} {'ms':>9} {'http':>6} {'sqlite_trips':>13}")
+    for label, ms, http, stmts in rows:
+        print(f"{label:>14} {ms:>9.1f} {http:>6} {stmts:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark mixed read/write throughput of the embedded stores (SpotifyStore,
+MemoryGraph, SemanticIndex, EventStore) under concurrent threads.
+
+    python scripts/bench_sqlite_stores.py --threads 8 --ops 2000 --write-ratio 0.2
+
+"legacy" re-creates the old behaviour for the before/after comparison: a
+fresh sqlite3.connect per call with default pragmas (rollback journal,
+synchronous=FULL, no mmap).
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nous_core.eventing import EventStore  # noqa: E402
+from nous_core.semantic import SemanticIndex  # noqa: E402
+from nous_core.storage import SQLiteStore  # noqa: E402
+from services.nexus.memory_graph import MemoryGraph  # noqa: E402
+from services.spotify.spotify_store import SpotifyStore  # noqa: E402
+
+_tuned_conn = SQLiteStore._conn
+
+
+def _legacy_conn(self):
+    conn = sqlite3.connect(self.db_path, timeout=30.0)
+    self._configure(conn)
+    return conn
+
+
+def _workloads(tmp, tag):
+    spotify = SpotifyStore(os.path.join(tmp, f"{tag}-spotify.db"))
+    graph = MemoryGraph(os.path.join(tmp, f"{tag}-graph.db"))
+    semantic = SemanticIndex(os.path.join(tmp, f"{tag}-sem.db"), model=None)
+    events = EventStore(os.path.join(tmp, f"{tag}-events.db"))
+    words = ["calm", "run", "sleep", "journal", "focus", "breath", "walk", "music"]
+
+    return {
+        "spotify": (
+            lambda r: spotify.put_track(f"t{r.randrange(500)}", {"name": "song", "n": r.random()}),
+            lambda r: spotify.get_track(f"t{r.randrange(500)}"),
+        ),
+        "graph": (
+            lambda r: graph.add_edge(f"n{r.randrange(200)}", f"n{r.randrange(200)}", rel="mentions"),
+            lambda r: graph.neighborhood(f"n{r.randrange(200)}", limit=20),
+        ),
+        "semantic": (
+            lambda r: semantic.upsert(f"d{r.randrange(500)}", " ".join(r.choices(words, k=6)), {}),
+            lambda r: semantic.search(r.choice(words), top_k=5),
+        ),
+        "events": (
+            lambda r: events.append("bench.event", {"n": r.random()}),
+            lambda r: events.recent(limit=20, topic_prefix="bench."),
+        ),
+    }
+
+
+def _run(write, read, threads, ops, write_ratio):
+    def worker(seed):
+        r = random.Random(seed)
+        for _ in range(ops):
+            (write if r.random() < write_ratio else read)(r)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return threads * ops / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=8)
+    ap.add_argument("--ops", type=int, default=2000, help="operations per thread")
+    ap.add_argument("--write-ratio", type=float, default=0.2)
+    args = ap.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("legacy", "shared"):
+            SQLiteStore._conn = _legacy_conn if mode == "legacy" else _tuned_conn
+            for name, (write, read) in _workloads(tmp, mode).items():
+                for _ in range(200):  # warm the tables
+                    write(random.Random(0))
+                results[(mode, name)] = _run(write, read, args.threads, args.ops, args.write_ratio)
+        SQLiteStore._conn = _tuned_conn
+
+    print(f"{'store':>10} {'legacy ops/s':>13} {'shared ops/s':>13} {'speedup':>8}")
+    for name in ("spotify", "graph", "semantic", "events"):
+        before, after = results[("legacy", name)], results[("shared", name)]
+        print(f"{name:>10} {before:>13.0f} {after:>13.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
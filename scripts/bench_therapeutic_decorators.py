@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Report the latency each therapeutic decorator adds, production vs mindful mode,
+using the framework's built-in DecoratorProfiler.
+
+    python scripts/bench_therapeutic_decorators.py --calls 100000
+
+Mindful mode sleeps for real, so it is measured over --mindful-calls calls.
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import therapeutic_code_framework as tcf  # noqa: E402
+
+DECORATORS = {
+    "stop_skill": lambda mode: tcf.stop_skill("serving", mode=mode),
+    "with_mindful_breathing": lambda mode: tcf.with_mindful_breathing(breath_count=1, mode=mode),
+    "cognitive_reframe": lambda mode: tcf.cognitive_reframe("slow", "fast", mode=mode),
+    "with_therapy_session": lambda mode: tcf.with_therapy_session("request", mode=mode),
+    "distress_tolerance": lambda mode: tcf.distress_tolerance("TIPP", mode=mode),
+    "growth_mindset_loop": lambda mode: tcf.growth_mindset_loop(3, mode=mode),
+}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=100000)
+    ap.add_argument("--mindful-calls", type=int, default=2)
+    args = ap.parse_args()
+
+    logging.getLogger(tcf.__name__).setLevel(logging.WARNING)  # measure the wrappers, not the handler
+    tcf.decorator_profiler.enable()
+    for mode, calls in (("production", args.calls), ("mindful", args.mindful_calls)):
+        for name, make in DECORATORS.items():
+            handler = make(mode)(lambda: None)
+            for _ in range(calls):
+                handler()
+
+    print(f"{'decorator':>24} {'mode':>11} {'calls':>8} {'avg_us':>12} {'max_us':>12}")
+    for row in sorted(tcf.decorator_profiler.report(), key=lambda r: (r["decorator"], r["mode"])):
+        print(f"{row['decorator']:>24} {row['mode']:>11} {row['calls']:>8} "
+              f"{row['avg_overhead_us']:>12.3f} {row['max_overhead_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
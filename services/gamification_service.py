@@ -11,17 +11,25 @@ points, streaks, challenges, and leaderboards.
 import logging
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Any, Tuple
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, insert, update, literal, null
 from models.database import db
 from models.gamification_models import (
     Achievement, UserAchievement, WellnessStreak, UserPoints,
     PointTransaction, Leaderboard, Challenge, ChallengeParticipation
 )
 from models.user import User
+from utils.api_cache import MemoryCache
 from utils.notification_service import NotificationService
 
 logger = logging.getLogger(__name__)
 
+# Leaderboard reads are cached per process; rebuilds clear the cache
+LEADERBOARD_CACHE_TTL = 60
+# Incremental rebuilds re-score users with transactions this long before the last run
+LEADERBOARD_WATERMARK_SLACK = timedelta(minutes=5)
+
+_leaderboard_cache = MemoryCache(max_entries=256)
+
 
 class GamificationService:
     """Service for managing gamification and engagement features"""
@@ -280,97 +288,232 @@ class GamificationService:
     
     # === Leaderboard Methods ===
     
-    def update_leaderboards(self) -> None:
-        """Update all leaderboards (should be run periodically)"""
+    def update_leaderboards(self, incremental: bool = True) -> None:
+        """
+        Update all leaderboards (should be run periodically)
+        
+        Incremental runs only re-score users with point transactions since the
+        period's last run; a new period (or a moved end date) is rebuilt in full.
+        """
         try:
+            today = datetime.utcnow().date()
+            
             # Update weekly leaderboard
-            self._update_leaderboard_period('weekly', 
-                                          datetime.utcnow().date() - timedelta(days=7),
-                                          datetime.utcnow().date())
+            self._update_leaderboard_period('weekly', today - timedelta(days=7), today, incremental)
             
             # Update monthly leaderboard
-            first_day = datetime.utcnow().date().replace(day=1)
-            self._update_leaderboard_period('monthly', first_day, datetime.utcnow().date())
+            self._update_leaderboard_period('monthly', today.replace(day=1), today, incremental)
             
             logger.info("Leaderboards updated successfully")
             
         except Exception as e:
             logger.error(f"Error updating leaderboards: {e}")
+            db.session.rollback()
+        finally:
+            _leaderboard_cache.clear()
     
-    def _update_leaderboard_period(self, period_type: str, start_date: date, end_date: date):
-        """Update leaderboard for a specific period"""
-        # Get all users with points in this period
-        user_scores = db.session.query(
+    def _update_leaderboard_period(self, period_type: str, start_date: date, end_date: date,
+                                   incremental: bool = False):
+        """Update leaderboard for a specific period with INSERT ... SELECT, ranked in SQL"""
+        table = Leaderboard.__table__
+        range_start = datetime.combine(start_date, datetime.min.time())
+        range_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+        in_period = and_(
+            table.c.leaderboard_type == period_type,
+            table.c.category == 'overall',
+            table.c.period_start == start_date
+        )
+        
+        # Total earned points per user in [start_date, end_date]
+        scores = select(
             PointTransaction.user_id,
-            func.sum(PointTransaction.points).label('total_points')
-        ).filter(
-            PointTransaction.created_at >= start_date,
-            PointTransaction.created_at <= end_date,
+            func.sum(PointTransaction.points).label('score')
+        ).where(
+            PointTransaction.created_at >= range_start,
+            PointTransaction.created_at < range_end,
             PointTransaction.transaction_type == 'earned'
-        ).group_by(PointTransaction.user_id).all()
+        ).group_by(PointTransaction.user_id)
         
-        # Clear existing entries for this period
-        Leaderboard.query.filter_by(
-            leaderboard_type=period_type,
-            period_start=start_date,
-            period_end=end_date
-        ).delete()
+        last_run = None
+        if incremental:
+            last_run = db.session.query(func.max(Leaderboard.created_at)).filter(
+                Leaderboard.leaderboard_type == period_type,
+                Leaderboard.category == 'overall',
+                Leaderboard.period_start == start_date,
+                Leaderboard.period_end == end_date
+            ).scalar()
         
-        # Create new entries
-        for rank, (user_id, score) in enumerate(sorted(user_scores, 
-                                                      key=lambda x: x[1], 
-                                                      reverse=True), 1):
-            entry = Leaderboard(
-                user_id=user_id,
-                leaderboard_type=period_type,
-                category='overall',
-                score=score,
-                rank=rank,
-                period_start=start_date,
-                period_end=end_date
-            )
-            db.session.add(entry)
+        def insert_scores(scores, rank):
+            columns = ['user_id', 'leaderboard_type', 'category', 'score', 'rank',
+                       'period_start', 'period_end', 'created_at']
+            db.session.execute(insert(table).from_select(columns, select(
+                scores.c.user_id,
+                literal(period_type),
+                literal('overall'),
+                scores.c.score,
+                rank,
+                literal(start_date, db.Date),
+                literal(end_date, db.Date),
+                literal(datetime.utcnow(), db.DateTime)
+            ).select_from(scores)))
+        
+        if last_run is None:
+            db.session.execute(table.delete().where(in_period))
+            scores = scores.subquery()
+            insert_scores(scores, func.row_number().over(order_by=(scores.c.score.desc(), scores.c.user_id)))
+        else:
+            changed = [row[0] for row in db.session.execute(select(PointTransaction.user_id).where(
+                PointTransaction.created_at >= max(range_start, last_run - LEADERBOARD_WATERMARK_SLACK),
+                PointTransaction.created_at < range_end,
+                PointTransaction.transaction_type == 'earned'
+            ).distinct())]
+            if changed:
+                self._rescore_leaderboard_users(table, in_period, scores, changed, insert_scores)
         
         db.session.commit()
     
+    def _rescore_leaderboard_users(self, table, in_period, scores, user_ids: List[int], insert_scores):
+        """
+        Replace the entries of users whose points changed and fix up ranks
+        
+        A changed user only reorders entries scored between its old and new
+        score, so ranks are recomputed inside those (merged) score bands; the
+        entries between bands just move by the number of users that joined
+        or left the board above them.
+        """
+        old = dict(db.session.execute(
+            select(table.c.user_id, table.c.score).where(in_period, table.c.user_id.in_(user_ids))
+        ).all())
+        db.session.execute(table.delete().where(in_period, table.c.user_id.in_(user_ids)))
+        insert_scores(scores.where(PointTransaction.user_id.in_(user_ids)).subquery(), null())
+        new = dict(db.session.execute(
+            select(table.c.user_id, table.c.score).where(in_period, table.c.user_id.in_(user_ids))
+        ).all())
+        
+        # Score bands touched by each user (old..new), merged, highest first
+        bands = []
+        for user_id in set(old) | set(new):
+            band_scores = [score for score in (old.get(user_id), new.get(user_id)) if score is not None]
+            joined = int(user_id not in old) - int(user_id not in new)
+            bands.append([min(band_scores), max(band_scores), joined])
+        bands.sort(key=lambda band: band[1], reverse=True)
+        merged = []
+        for low, high, joined in bands:
+            if merged and high >= merged[-1][0]:
+                merged[-1][0] = min(merged[-1][0], low)
+                merged[-1][2] += joined
+            else:
+                merged.append([low, high, joined])
+        
+        shift = 0  # users that joined (minus left) above the current position
+        previous_low = None
+        for low, high, joined in merged:
+            if shift:
+                gap = [table.c.score > high]
+                if previous_low is not None:
+                    gap.append(table.c.score < previous_low)
+                db.session.execute(update(table).where(in_period, *gap).values(rank=table.c.rank + shift))
+            
+            # The lowest entry above the band already has its final rank
+            above = db.session.execute(
+                select(table.c.rank).where(in_period, table.c.score > high)
+                .order_by(table.c.score, table.c.user_id.desc()).limit(1)
+            ).scalar() or 0
+            ranked = select(
+                table.c.id,
+                (above + func.row_number().over(order_by=(table.c.score.desc(), table.c.user_id))).label('new_rank')
+            ).where(in_period, table.c.score >= low, table.c.score <= high).subquery()
+            db.session.execute(
+                update(table)
+                .where(table.c.id == ranked.c.id,
+                       or_(table.c.rank.is_(None), table.c.rank != ranked.c.new_rank))
+                .values(rank=ranked.c.new_rank)
+            )
+            shift += joined
+            previous_low = low
+        
+        if shift and previous_low is not None:
+            db.session.execute(
+                update(table).where(in_period, table.c.score < previous_low).values(rank=table.c.rank + shift)
+            )
+    
+    def _latest_leaderboard_period(self, period_type: str, category: str) -> Optional[Tuple[date, date]]:
+        key = ('period', period_type, category)
+        period = _leaderboard_cache.get(key)
+        if period is None:
+            period = db.session.query(Leaderboard.period_start, Leaderboard.period_end).filter(
+                Leaderboard.leaderboard_type == period_type,
+                Leaderboard.category == category
+            ).order_by(Leaderboard.period_start.desc()).first()  # one period_end per start
+            if period is None:
+                return None
+            period = tuple(period)
+            _leaderboard_cache.set(key, period, ttl=LEADERBOARD_CACHE_TTL)
+        return period
+    
     def get_leaderboard(self, period_type: str = 'weekly', 
                        category: str = 'overall', limit: int = 10) -> List[Dict[str, Any]]:
         """Get leaderboard entries"""
         try:
-            # Get most recent period
-            latest_entry = Leaderboard.query.filter_by(
-                leaderboard_type=period_type,
-                category=category
-            ).order_by(Leaderboard.period_end.desc()).first()
-            
-            if not latest_entry:
-                return []
+            key = ('top', period_type, category, limit)
+            leaderboard = _leaderboard_cache.get(key)
+            if leaderboard is None:
+                # Get most recent period
+                period = self._latest_leaderboard_period(period_type, category)
+                if not period:
+                    return []
+                
+                entries = db.session.query(
+                    Leaderboard.rank, Leaderboard.user_id, User.username, Leaderboard.score
+                ).join(User, User.id == Leaderboard.user_id).filter(
+                    Leaderboard.leaderboard_type == period_type,
+                    Leaderboard.category == category,
+                    Leaderboard.period_start == period[0],
+                    Leaderboard.period_end == period[1]
+                ).order_by(Leaderboard.rank).limit(limit).all()
+                
+                leaderboard = [{
+                    'rank': rank,
+                    'user_id': user_id,
+                    'username': username,
+                    'score': score,
+                    'period': f"{period[0]} to {period[1]}"
+                } for rank, user_id, username, score in entries]
+                _leaderboard_cache.set(key, leaderboard, ttl=LEADERBOARD_CACHE_TTL)
             
-            entries = Leaderboard.query.filter_by(
-                leaderboard_type=period_type,
-                category=category,
-                period_start=latest_entry.period_start,
-                period_end=latest_entry.period_end
-            ).order_by(Leaderboard.rank).limit(limit).all()
-            
-            leaderboard = []
-            for entry in entries:
-                user = User.query.get(entry.user_id)
-                if user:
-                    leaderboard.append({
-                        'rank': entry.rank,
-                        'user_id': entry.user_id,
-                        'username': user.username,
-                        'score': entry.score,
-                        'period': f"{entry.period_start} to {entry.period_end}"
-                    })
-            
-            return leaderboard
+            return [dict(entry) for entry in leaderboard]
             
         except Exception as e:
             logger.error(f"Error getting leaderboard: {e}")
             return []
     
+    def get_user_rank(self, user_id: str, period_type: str = 'weekly',
+                      category: str = 'overall') -> Optional[Dict[str, Any]]:
+        """Get a user's rank and score on the latest leaderboard (one unique-index lookup)"""
+        try:
+            period = self._latest_leaderboard_period(period_type, category)
+            if not period:
+                return None
+            
+            entry = db.session.query(Leaderboard.rank, Leaderboard.score).filter(
+                Leaderboard.user_id == user_id,
+                Leaderboard.leaderboard_type == period_type,
+                Leaderboard.category == category,
+                Leaderboard.period_start == period[0]
+            ).first()
+            if entry is None:
+                return None
+            
+            return {
+                'rank': entry.rank,
+                'score': entry.score,
+                'period': f"{period[0]} to {period[1]}"
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting user rank: {e}")
+            return None
+    
     # === Challenge Methods ===
     
     def create_challenge(self, name: str, description: str, challenge_type: str,
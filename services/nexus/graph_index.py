@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DIRECTIONS = ("out", "in", "both")
+
+# (edge id, src, dst, rel, weight)
+EdgeRow = Tuple[int, str, str, str, float]
+
+
+class CSRAdjacency:
+    """
+    In-memory weighted adjacency over MemoryGraph edges for traversal queries.
+    - Node and rel names are interned to ints. Edges loaded at the last
+      compaction live in CSR arrays, both outgoing (by src) and incoming
+      (by dst), so a node's neighbours are one array slice.
+    - apply() folds in rows changed since the last sync. A new weight for a
+      known edge is written in place through the edge id -> position maps;
+      new edges go to a small delta list that is merged into the CSR arrays
+      once it outgrows `compact_ratio` of the base (at least `min_compact`).
+    - Weighted degrees are kept per node for PageRank normalisation.
+    Not thread-safe; MemoryGraph serialises access.
+    """
+    def __init__(self, compact_ratio: float = 0.25, min_compact: int = 4096):
+        self.compact_ratio = float(compact_ratio)
+        self.min_compact = int(min_compact)
+        self.version = 0
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.rels: List[str] = []
+        self._rel_index: Dict[str, int] = {}
+        self._deg_out = np.zeros(0, dtype=np.float64)
+        self._deg_in = np.zeros(0, dtype=np.float64)
+        self._delta: List[Tuple[int, int, int, float, int]] = []  # (src, dst, rel, weight, eid)
+        self._delta_pos: Dict[int, int] = {}
+        self._delta_out: Dict[int, List[int]] = {}
+        self._delta_in: Dict[int, List[int]] = {}
+        self._build(*(np.zeros(0, dtype=t) for t in (np.int64, np.int64, np.int32, np.float64, np.int64)))
+
+    # --- building ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.out_dst) + len(self._delta)
+
+    def _intern(self, name: str) -> int:
+        idx = self.index.get(name)
+        if idx is None:
+            idx = self.index[name] = len(self.ids)
+            self.ids.append(name)
+        return idx
+
+    def _intern_rel(self, rel: str) -> int:
+        idx = self._rel_index.get(rel)
+        if idx is None:
+            idx = self._rel_index[rel] = len(self.rels)
+            self.rels.append(rel)
+        return idx
+
+    def _grow(self) -> None:
+        n = len(self.ids)
+        if n > len(self._deg_out):
+            cap = max(n, 2 * len(self._deg_out), 1024)
+            self._deg_out = np.concatenate([self._deg_out, np.zeros(cap - len(self._deg_out))])
+            self._deg_in = np.concatenate([self._deg_in, np.zeros(cap - len(self._deg_in))])
+
+    def _build(self, src: np.ndarray, dst: np.ndarray, rel: np.ndarray, w: np.ndarray, eid: np.ndarray) -> None:
+        n = len(self.ids)
+        self.n_base = n
+        order = np.argsort(src, kind="stable")
+        self.out_ptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))]).astype(np.int64)
+        self.out_dst, self.out_rel, self.out_w, self.out_eid = dst[order], rel[order], w[order], eid[order]
+        order_in = np.argsort(dst, kind="stable")
+        self.in_ptr = np.concatenate([[0], np.cumsum(np.bincount(dst, minlength=n))]).astype(np.int64)
+        self.in_src, self.in_rel, self.in_w, self.in_eid = src[order_in], rel[order_in], w[order_in], eid[order_in]
+
+        size = int(eid.max()) + 1 if len(eid) else 0
+        self._pos_out = np.full(size, -1, dtype=np.int64)
+        self._pos_out[self.out_eid] = np.arange(len(self.out_eid))
+        self._pos_in = np.full(size, -1, dtype=np.int64)
+        self._pos_in[self.in_eid] = np.arange(len(self.in_eid))
+
+        self._grow()
+        self._deg_out[:] = 0.0
+        self._deg_in[:] = 0.0
+        self._deg_out[:n] = np.bincount(src, weights=w, minlength=n)
+        self._deg_in[:n] = np.bincount(dst, weights=w, minlength=n)
+        self._delta, self._delta_pos, self._delta_out, self._delta_in = [], {}, {}, {}
+
+    def load(self, rows: Iterable[EdgeRow], version: int) -> None:
+        """Replace everything with `rows` (a full edge scan)."""
+        src, dst, rel, w, eid = [], [], [], [], []
+        for edge_id, s, d, r, weight in rows:
+            eid.append(edge_id)
+            src.append(self._intern(s))
+            dst.append(self._intern(d))
+            rel.append(self._intern_rel(r))
+            w.append(weight)
+        self._build(np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64),
+                    np.asarray(rel, dtype=np.int32), np.asarray(w, dtype=np.float64),
+                    np.asarray(eid, dtype=np.int64))
+        self.version = int(version)
+
+    def apply(self, rows: Iterable[EdgeRow], version: int) -> int:
+        """Fold changed edge rows in; returns how many were applied."""
+        count = 0
+        for edge_id, s, d, r, weight in rows:
+            count += 1
+            if edge_id < len(self._pos_out) and self._pos_out[edge_id] >= 0:
+                p = self._pos_out[edge_id]
+                diff = weight - self.out_w[p]
+                self.out_w[p] = weight
+                self.in_w[self._pos_in[edge_id]] = weight
+                self._deg_out[self._src_of(p)] += diff
+                self._deg_in[self.out_dst[p]] += diff
+                continue
+            i = self._delta_pos.get(edge_id)
+            if i is not None:
+                si, di, ri, old, _ = self._delta[i]
+                self._delta[i] = (si, di, ri, weight, edge_id)
+                self._deg_out[si] += weight - old
+                self._deg_in[di] += weight - old
+                continue
+            si, di = self._intern(s), self._intern(d)
+            self._grow()
+            self._delta_pos[edge_id] = len(self._delta)
+            self._delta_out.setdefault(si, []).append(len(self._delta))
+            self._delta_in.setdefault(di, []).append(len(self._delta))
+            self._delta.append((si, di, self._intern_rel(r), float(weight), edge_id))
+            self._deg_out[si] += weight
+            self._deg_in[di] += weight
+        self.version = max(self.version, int(version))
+        if len(self._delta) > max(self.min_compact, self.compact_ratio * len(self.out_dst)):
+            self.compact()
+        return count
+
+    def _src_of(self, pos: int) -> int:
+        return int(np.searchsorted(self.out_ptr, pos, side="right")) - 1
+
+    def compact(self) -> None:
+        """Merge the delta list into the CSR arrays."""
+        if not self._delta:
+            return
+        base_src = np.repeat(np.arange(self.n_base, dtype=np.int64), np.diff(self.out_ptr))
+        d_src, d_dst, d_rel, d_w, d_eid = (np.asarray(c) for c in zip(*self._delta))
+        self._build(np.concatenate([base_src, d_src.astype(np.int64)]),
+                    np.concatenate([self.out_dst, d_dst.astype(np.int64)]),
+                    np.concatenate([self.out_rel, d_rel.astype(np.int32)]),
+                    np.concatenate([self.out_w, d_w.astype(np.float64)]),
+                    np.concatenate([self.out_eid, d_eid.astype(np.int64)]))
+
+    # --- access ----------------------------------------------------------------
+
+    def node(self, name: str) -> Optional[int]:
+        return self.index.get(name)
+
+    def neighbors(self, u: int, direction: str = "both") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(neighbour ids, weights, rel ids) of node `u`."""
+        nbrs, ws, rels = [], [], []
+        if direction in ("out", "both"):
+            if u < self.n_base:
+                a, b = self.out_ptr[u], self.out_ptr[u + 1]
+                nbrs.append(self.out_dst[a:b]), ws.append(self.out_w[a:b]), rels.append(self.out_rel[a:b])
+            extra = self._delta_out.get(u)
+            if extra:
+                nbrs.append(np.array([self._delta[i][1] for i in extra], dtype=np.int64))
+                rels.append(np.array([self._delta[i][2] for i in extra], dtype=np.int32))
+                ws.append(np.array([self._delta[i][3] for i in extra], dtype=np.float64))
+        if direction in ("in", "both"):
+            if u < self.n_base:
+                a, b = self.in_ptr[u], self.in_ptr[u + 1]
+                nbrs.append(self.in_src[a:b]), ws.append(self.in_w[a:b]), rels.append(self.in_rel[a:b])
+            extra = self._delta_in.get(u)
+            if extra:
+                nbrs.append(np.array([self._delta[i][0] for i in extra], dtype=np.int64))
+                rels.append(np.array([self._delta[i][2] for i in extra], dtype=np.int32))
+                ws.append(np.array([self._delta[i][3] for i in extra], dtype=np.float64))
+        if not nbrs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0, dtype=np.int32)
+        if len(nbrs) == 1:
+            return nbrs[0], ws[0], rels[0]
+        return np.concatenate(nbrs), np.concatenate(ws), np.concatenate(rels)
+
+    def degrees(self, direction: str = "both") -> np.ndarray:
+        n = len(self.ids)
+        if direction == "out":
+            return self._deg_out[:n]
+        if direction == "in":
+            return self._deg_in[:n]
+        return self._deg_out[:n] + self._deg_in[:n]
+
+    # --- queries -----------------------------------------------------------------
+
+    def k_hop(self, seeds: Sequence[int], k: int = 2, direction: str = "both",
+              max_nodes: int = 1000) -> Tuple[Dict[int, int], List[Tuple[int, int, int, float]]]:
+        """
+        Breadth-first expansion up to `k` hops from `seeds`, stopping once
+        `max_nodes` are reached. Returns ({node: hops}, [(u, v, rel, weight)])
+        with the edges that reached each node, oriented as traversed.
+        """
+        hops = {s: 0 for s in seeds}
+        edges: List[Tuple[int, int, int, float]] = []
+        frontier = list(hops)
+        for depth in range(1, k + 1):
+            nxt = []
+            for u in frontier:
+                nbrs, ws, rels = self.neighbors(u, direction)
+                for v, w, r in zip(nbrs.tolist(), ws.tolist(), rels.tolist()):
+                    if v not in hops:
+                        if len(hops) >= max_nodes:
+                            return hops, edges
+                        hops[v] = depth
+                        nxt.append(v)
+                    if hops[v] == depth:
+                        edges.append((u, v, r, w))
+            if not nxt:
+                break
+            frontier = nxt
+        return hops, edges
+
+    def personalized_pagerank(self, seeds: Dict[int, float], alpha: float = 0.15, eps: float = 1e-4,
+                              direction: str = "both", max_pushes: int = 200000) -> Dict[int, float]:
+        """
+        Approximate personalized PageRank by forward push (Andersen, Chung
+        and Lang): residual mass is pushed to weighted neighbours until every
+        node's residual is below eps * its weighted degree. Work depends on
+        eps and alpha, not on the graph size, so recall stays local.
+        `alpha` is the teleport (restart) probability.
+        """
+        total = sum(seeds.values())
+        if not seeds or total <= 0:
+            return {}
+        deg = self.degrees(direction)
+        residual: Dict[int, float] = {u: m / total for u, m in seeds.items()}
+        rank: Dict[int, float] = {}
+        queue = deque(residual)
+        queued = set(residual)
+        pushes = 0
+        while queue and pushes < max_pushes:
+            u = queue.popleft()
+            queued.discard(u)
+            ru = residual.pop(u, 0.0)
+            if ru <= 0.0:
+                continue
+            pushes += 1
+            du = float(deg[u])
+            if du <= 0.0:
+                rank[u] = rank.get(u, 0.0) + ru  # dangling: keep the mass here
+                continue
+            rank[u] = rank.get(u, 0.0) + alpha * ru
+            nbrs, ws, _ = self.neighbors(u, direction)
+            share = (1.0 - alpha) * ru / du
+            for v, w in zip(nbrs.tolist(), ws.tolist()):
+                rv = residual.get(v, 0.0) + share * w
+                residual[v] = rv
+                if v not in queued and rv >= eps * float(deg[v]):
+                    queue.append(v)
+                    queued.add(v)
+        return rank
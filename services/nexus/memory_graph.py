@@ -1,11 +1,15 @@
 from __future__ import annotations
+import heapq
 import json
 import re
 import sqlite3
+import threading
 import time
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from nous_core.storage import SQLiteStore
+from services.nexus.graph_index import DIRECTIONS, CSRAdjacency
 
 ENTITY_PAT = re.compile(r"\b([A-Z][a-z]{2,}(?:\s+[A-Z][a-z]{2,}){0,2})\b")
 
@@ -17,14 +21,40 @@ class Edge:
     weight: float = 1.0
 
 
-class MemoryGraph:
-    def __init__(self, db_path: str):
-        self.db_path = str(db_path)
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+# Schema versions (PRAGMA user_version):
+#   0 - edges appended on every add_edge, duplicates allowed
+#   1 - edges unique on (src, dst, rel) with accumulated weight; a `version`
+#       stamp per write transaction drives incremental adjacency refresh
+SCHEMA_VERSION = 1
+
+_EDGE_UPSERT = """
+    INSERT INTO edges(src,dst,rel,weight,created_ts,version) VALUES(?,?,?,?,?,?)
+    ON CONFLICT(src,dst,rel) DO UPDATE SET weight = weight + excluded.weight, version = excluded.version
+"""
+
+
+class MemoryGraph(SQLiteStore):
+    """
+    Entity/document graph on the shared SQLiteStore layer.
+    - Edges are unique per (src, dst, rel); adding one again accumulates
+      its weight. ingest()/ingest_text() write a whole batch of nodes and
+      edges in one transaction.
+    - k_hop() and related() (personalized PageRank) run on an in-memory
+      CSRAdjacency that is loaded once per process and then refreshed from
+      the edges stamped with a newer write version, so writes from other
+      workers show up without a reload.
+    """
+    def __init__(self, db_path: str, compact_ratio: float = 0.25, min_compact: int = 4096, **store_opts: Any):
+        super().__init__(db_path, **store_opts)
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self._adj: Optional[CSRAdjacency] = None
+        self._adj_lock = threading.RLock()
         self._init_db()
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        def create(conn: sqlite3.Connection) -> None:
+            conn.execute("BEGIN IMMEDIATE")  # one process migrates, the rest wait and see v1
             conn.execute("""
               CREATE TABLE IF NOT EXISTS nodes (
                 id TEXT PRIMARY KEY,
@@ -40,31 +70,85 @@ class MemoryGraph:
                 dst TEXT NOT NULL,
                 rel TEXT NOT NULL,
                 weight REAL NOT NULL,
-                created_ts REAL NOT NULL
+                created_ts REAL NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
               )
             """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_src ON edges(src)")
+            conn.execute("CREATE TABLE IF NOT EXISTS graph_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO graph_meta(key, value) VALUES ('edges_version', 0)")
+            if int(conn.execute("PRAGMA user_version").fetchone()[0]) < 1:
+                cols = {row[1] for row in conn.execute("PRAGMA table_info(edges)")}
+                if "version" not in cols:
+                    conn.execute("ALTER TABLE edges ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+                # Collapse repeated edges into the oldest row, summing weights
+                conn.execute("""
+                  UPDATE edges SET weight = (
+                    SELECT SUM(e.weight) FROM edges e
+                    WHERE e.src = edges.src AND e.dst = edges.dst AND e.rel = edges.rel
+                  ) WHERE id IN (SELECT MIN(id) FROM edges GROUP BY src, dst, rel HAVING COUNT(*) > 1)
+                """)
+                conn.execute("DELETE FROM edges WHERE id NOT IN (SELECT MIN(id) FROM edges GROUP BY src, dst, rel)")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            # The unique index also serves src lookups
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_edges_src_dst_rel ON edges(src, dst, rel)")
+            conn.execute("DROP INDEX IF EXISTS idx_edges_src")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_dst ON edges(dst)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_rel ON edges(rel)")
-            conn.commit()
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_version ON edges(version)")
+        self.write(create)
+
+    # --- writes ------------------------------------------------------------------
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection) -> int:
+        return int(conn.execute(
+            "UPDATE graph_meta SET value = value + 1 WHERE key = 'edges_version' RETURNING value"
+        ).fetchall()[0][0])
+
+    @staticmethod
+    def _node_rows(nodes: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]], now: float) -> List[Tuple[Any, ...]]:
+        return [(nid, kind, json.dumps(meta or {}, ensure_ascii=False), now) for nid, kind, meta in nodes]
+
+    def ingest(self, nodes: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]] = (),
+               edges: Iterable[Edge] = ()) -> Dict[str, int]:
+        """Upsert nodes and accumulate edges in one transaction."""
+        now = time.time()
+        node_rows = self._node_rows(nodes, now)
+        merged: Dict[Tuple[str, str, str], float] = {}
+        for e in edges:
+            key = (e.src, e.dst, e.rel)
+            merged[key] = merged.get(key, 0.0) + float(e.weight)
+
+        def write(conn: sqlite3.Connection) -> None:
+            if node_rows:
+                conn.executemany("""
+                  INSERT INTO nodes(id,kind,meta,created_ts) VALUES(?,?,?,?)
+                  ON CONFLICT(id) DO UPDATE SET kind = excluded.kind, meta = excluded.meta
+                """, node_rows)
+            if merged:
+                version = self._bump_version(conn)
+                conn.executemany(_EDGE_UPSERT, [(s, d, r, w, now, version) for (s, d, r), w in merged.items()])
+
+        if node_rows or merged:
+            self.write(write)
+        return {"nodes": len(node_rows), "edges": len(merged)}
 
     def upsert_node(self, node_id: str, kind: str = "entity", meta: Optional[Dict[str, Any]] = None) -> None:
-        meta = meta or {}
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO nodes(id,kind,meta,created_ts) VALUES(?,?,?,?)",
-                (node_id, kind, json.dumps(meta, ensure_ascii=False), time.time()),
-            )
-            conn.commit()
+        self.ingest(nodes=[(node_id, kind, meta)])
+
+    def upsert_nodes(self, nodes: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+        return self.ingest(nodes=nodes)["nodes"]
 
     def add_edge(self, src: str, dst: str, rel: str = "mentions", weight: float = 1.0) -> int:
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.execute(
-                "INSERT INTO edges(src,dst,rel,weight,created_ts) VALUES(?,?,?,?,?)",
-                (src, dst, rel, float(weight), time.time()),
-            )
-            conn.commit()
-            return int(cur.lastrowid)
+        """Add (or strengthen) one edge; returns its id."""
+        def write(conn: sqlite3.Connection) -> int:
+            version = self._bump_version(conn)
+            return int(conn.execute(_EDGE_UPSERT + " RETURNING id",
+                                    (src, dst, rel, float(weight), time.time(), version)).fetchall()[0][0])
+        return self.write(write)
+
+    def add_edges(self, edges: List[Edge]) -> int:
+        return self.ingest(edges=edges)["edges"]
 
     def extract_entities(self, text: str) -> List[str]:
         # naive but deterministic; next-gen can swap this to better NER later
@@ -82,26 +166,81 @@ class MemoryGraph:
         return out[:25]
 
     def ingest_text(self, doc_id: str, text: str, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        meta = meta or {}
-        self.upsert_node(doc_id, kind="doc", meta=meta)
         ents = self.extract_entities(text)
-        for e in ents:
-            self.upsert_node(e, kind="entity", meta={})
-            self.add_edge(doc_id, e, rel="mentions", weight=1.0)
+        self.ingest(
+            nodes=[(doc_id, "doc", meta or {})] + [(e, "entity", {}) for e in ents],
+            edges=[Edge(doc_id, e, "mentions", 1.0) for e in ents],
+        )
         return {"doc_id": doc_id, "entities": ents, "count": len(ents)}
 
-    def neighborhood(self, node_id: str, limit: int = 50) -> Dict[str, Any]:
-        with sqlite3.connect(self.db_path) as conn:
-            edges = conn.execute(
-                "SELECT src,dst,rel,weight,created_ts FROM edges WHERE src=? OR dst=? ORDER BY created_ts DESC LIMIT ?",
-                (node_id, node_id, int(limit)),
-            ).fetchall()
-            nodes = conn.execute(
-                "SELECT id,kind,meta,created_ts FROM nodes WHERE id=?",
-                (node_id,),
-            ).fetchall()
+    def neighborhood(self, node_id: str, limit: int = 50, hops: int = 1) -> Dict[str, Any]:
+        if hops > 1:
+            return self.k_hop(node_id, k=hops, limit=limit)
+        edges = self.read(
+            "SELECT src,dst,rel,weight,created_ts FROM edges WHERE src=? OR dst=? ORDER BY created_ts DESC LIMIT ?",
+            (node_id, node_id, int(limit)),
+        )
+        nodes = self.read("SELECT id,kind,meta,created_ts FROM nodes WHERE id=?", (node_id,))
         return {
             "node": node_id,
             "nodes": [{"id": i, "kind": k, "meta": json.loads(m), "created_ts": ts} for i,k,m,ts in nodes],
             "edges": [{"src": s, "dst": d, "rel": r, "weight": w, "created_ts": ts} for s,d,r,w,ts in edges],
         }
+
+    # --- traversal -------------------------------------------------------------
+
+    def adjacency(self) -> CSRAdjacency:
+        """The in-memory adjacency, caught up with every committed edge write."""
+        with self._adj_lock:
+            row = self.read_one("SELECT value FROM graph_meta WHERE key = 'edges_version'")
+            version = int(row[0]) if row else 0
+            if self._adj is None:
+                adj = CSRAdjacency(self.compact_ratio, self.min_compact)
+                # Read the version first: rows committed meanwhile are re-applied next time
+                adj.load(self.read("SELECT id, src, dst, rel, weight FROM edges"), version)
+                self._adj = adj
+            elif version > self._adj.version:
+                rows = self.read(
+                    "SELECT id, src, dst, rel, weight FROM edges WHERE version > ? ORDER BY version",
+                    (self._adj.version,),
+                )
+                self._adj.apply(rows, version)
+            return self._adj
+
+    def _node_docs(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        rows = self.get_many("nodes", "id", ids, ("kind", "meta", "created_ts"))
+        return {i: {"id": i, "kind": k, "meta": json.loads(m), "created_ts": ts} for i, (k, m, ts) in rows.items()}
+
+    def k_hop(self, node_id: str, k: int = 2, limit: int = 200, direction: str = "both") -> Dict[str, Any]:
+        """Nodes within `k` hops of `node_id` (at most `limit`), with hop counts and the edges reaching them."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+        with self._adj_lock:
+            adj = self.adjacency()
+            start = adj.node(node_id)
+            if start is None:
+                return {"node": node_id, "nodes": [], "edges": []}
+            hops, edges = adj.k_hop([start], k=k, direction=direction, max_nodes=int(limit))
+            names = {u: adj.ids[u] for u in hops}
+            edge_out = [{"src": names[u], "dst": names[v], "rel": adj.rels[r], "weight": w} for u, v, r, w in edges]
+        docs = self._node_docs(list(names.values()))
+        nodes = [{**docs.get(names[u], {"id": names[u]}), "hops": h} for u, h in hops.items()]
+        return {"node": node_id, "nodes": nodes, "edges": edge_out}
+
+    def related(self, seeds: Iterable[str], top_k: int = 10, alpha: float = 0.15, eps: float = 1e-4,
+                direction: str = "both", include_seeds: bool = False) -> List[Dict[str, Any]]:
+        """
+        Nodes most related to `seeds` by weighted personalized PageRank.
+        Unknown seeds are ignored; returns [{"id", "score"}] best first.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+        with self._adj_lock:
+            adj = self.adjacency()
+            start = {u: 1.0 for u in (adj.node(s) for s in seeds) if u is not None}
+            rank = adj.personalized_pagerank(start, alpha=alpha, eps=eps, direction=direction)
+            if not include_seeds:
+                for u in start:
+                    rank.pop(u, None)
+            best = heapq.nlargest(int(top_k), rank.items(), key=lambda kv: kv[1])
+            return [{"id": adj.ids[u], "score": score} for u, score in best]
@@ -1,26 +1,18 @@
 from __future__ import annotations
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from flask import current_app
 
-# Core runtime
+# Core runtime (owns the long-lived ChatDispatcher, PluginRegistry and event loop)
 from services.runtime_service import init_runtime
 
-# Existing systems (already in repo)
-try:
-    from core.chat.dispatcher import ChatDispatcher
-except Exception:
-    ChatDispatcher = None  # type: ignore
-
-try:
-    from utils.plugin_registry import PluginRegistry
-except Exception:
-    PluginRegistry = None  # type: ignore
-
 from nous_core.quality import score as quality_score
 
+DISPATCH_TIMEOUT_S = 30.0
+RECALL_TOP_K = 5
+
 
 @dataclass
 class NexusResult:
@@ -45,19 +37,41 @@ def _policy_check(rt: Dict[str, Any], payload: Dict[str, Any]) -> Tuple[bool, Di
 
 
 def _store_memory(rt: Dict[str, Any], kind: str, text: str, meta: Dict[str, Any]) -> None:
-    ts = time.time()
-    rt["store"].append(f"nexus.{kind}", {"text": text, "meta": meta, "ts": ts})
-    # Semantic upsert for retrieval
+    _store_memories(rt, [(kind, text, meta)])
+
+
+def _store_memories(rt: Dict[str, Any], turns: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+    events, docs = [], []
+    for kind, text, meta in turns:
+        ts = time.time()
+        events.append((f"nexus.{kind}", {"text": text, "meta": meta, "ts": ts}))
+        docs.append((f"nexus:{kind}:{ts}", text, {"kind": kind, **meta}))
+    rt["store"].append_many(events)
+    # Semantic upsert for retrieval: one batch, embedded off the request thread
+    # when the runtime index runs with async_embed.
     try:
-        rt["semantic"].upsert(f"nexus:{kind}:{ts}", text, {"kind": kind, **meta})
+        rt["semantic"].bulk_upsert(docs)
     except Exception:
         pass
 
 
+def _recall(rt: Dict[str, Any], message: str) -> List[Dict[str, Any]]:
+    # Graph memories related to the entities mentioned, served from the
+    # in-memory adjacency (personalized PageRank, milliseconds).
+    graph = rt.get("graph")
+    if graph is None:
+        return []
+    try:
+        ents = graph.extract_entities(message)
+        return graph.related(ents, top_k=RECALL_TOP_K) if ents else []
+    except Exception:
+        return []
+
+
 def run_nexus(message: str, context: Optional[Dict[str, Any]] = None) -> NexusResult:
     """
     The unified execution pipeline:
-    message -> policy -> router -> response -> quality gate -> memory
+    message -> policy -> recall -> router -> response -> quality gate -> memory
     """
     context = context or {}
     rt = init_runtime(current_app)
@@ -67,27 +81,29 @@ def run_nexus(message: str, context: Optional[Dict[str, Any]] = None) -> NexusRe
     if not allowed:
         return NexusResult(ok=False, response="Denied by policy.", meta={"policy": pol})
 
-    # 2) Route using existing ChatDispatcher if available
+    # 2) Recall related graph memory
+    recall = _recall(rt, message)
+
+    # 3) Route using the runtime's ChatDispatcher if available
     routed = None
-    if ChatDispatcher is not None:
+    disp = rt.get("dispatcher")
+    if disp is not None:
         try:
-            # ChatDispatcher is async; run in a tiny event loop if needed.
-            import asyncio
-            disp = ChatDispatcher()
-            routed = asyncio.run(disp.dispatch(message, context))
+            # ChatDispatcher is async; run it on the runtime's persistent loop.
+            routed = rt["loop"].run(disp.dispatch(message, context), timeout=DISPATCH_TIMEOUT_S)
         except Exception as e:
             routed = {"success": False, "error": _safe_str(e), "type": "dispatcher_error"}
 
-    # 3) Tool/plugin assist (optional)
+    # 4) Tool/plugin assist (optional)
     plugins = None
-    if PluginRegistry is not None:
+    reg = rt.get("plugins")
+    if reg is not None:
         try:
-            reg = PluginRegistry()
             plugins = {k: v.status.value for k, v in reg.plugins.items()}  # type: ignore[attr-defined]
         except Exception:
             plugins = None
 
-    # 4) Compose response deterministically if routed isn't usable
+    # 5) Compose response deterministically if routed isn't usable
     if isinstance(routed, dict) and routed.get("success") and routed.get("response"):
         resp_text = _safe_str(routed["response"])
         handler = routed.get("handler", "unknown")
@@ -95,12 +111,14 @@ def run_nexus(message: str, context: Optional[Dict[str, Any]] = None) -> NexusRe
         handler = "fallback"
         resp_text = f"✅ NOUS NEXUS heard you: {_safe_str(message).strip()}"
 
-    # 5) Quality gate (score + issues)
+    # 6) Quality gate (score + issues)
     q = quality_score(resp_text)
 
-    # 6) Store memory
-    _store_memory(rt, "user", message, {"source": "nexus"})
-    _store_memory(rt, "assistant", resp_text, {"source": "nexus", "handler": handler, "quality": q})
+    # 7) Store memory
+    _store_memories(rt, [
+        ("user", message, {"source": "nexus"}),
+        ("assistant", resp_text, {"source": "nexus", "handler": handler, "quality": q}),
+    ])
 
     return NexusResult(
         ok=True,
@@ -110,6 +128,7 @@ def run_nexus(message: str, context: Optional[Dict[str, Any]] = None) -> NexusRe
             "quality": q,
             "policy": pol,
             "plugins": plugins,
+            "recall": recall,
             "routed": routed if isinstance(routed, dict) else None,
         },
     )
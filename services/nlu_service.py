@@ -8,6 +8,8 @@ import re
 from dataclasses import dataclass, field, asdict
 from typing import Any, Dict, List, Optional, Tuple
 
+from utils.safety_scanner import CRISIS_KEYWORDS, INTENT_KEYWORDS, scan_message
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -41,25 +43,17 @@ class NLUService:
     """Simple, fast NLU layer with rule-based fallbacks."""
 
     def __init__(self):
-        self.intent_keywords: Dict[str, List[str]] = {
-            "crisis": ["suicide", "kill myself", "self harm", "overdose", "cant go on", "abuso", "violencia", "911", "988", "741741"],
-            "cbt": ["thought", "distortion", "cbt", "challenge", "reframe"],
-            "dbt": ["dbt", "tipp", "wise mind", "stop skill", "opposite action"],
-            "act": ["defusion", "values", "aceptacion", "aceptar", "mindfulness"],
-            "grounding": ["ground", "anclaje", "panic", "panico", "ansiedad", "anxiety", "present moment"],
-            "behavioral_activation": ["activate", "activation", "motivation", "tarea", "task", "walk", "exercise"],
-            "motivational_interviewing": ["motivation", "ambivalence", "confidence", "importancia", "confianza", "cambio"],
-            "productivity": ["calendar", "schedule", "reminder", "task", "organize", "agenda"],
-            "gratitude": ["gratitude", "gracias", "agradecido"],
-        }
+        # Lexicons live in utils.safety_scanner, compiled into one shared automaton
+        self.intent_keywords: Dict[str, List[str]] = INTENT_KEYWORDS
         self.spanish_markers = {"que", "como", "estoy", "gracias", "necesito", "quiero", "hola", "usted", "tengo", "siento"}
-        self.crisis_keywords = ["suicide", "kill myself", "self harm", "harm myself", "end it", "cant go on", "overdose", "abuse", "assault", "rape", "violence", "hurt myself", "last goodbye"]
+        self.crisis_keywords = CRISIS_KEYWORDS
 
     def analyze(self, text: str, user_id: Optional[str] = None, context: Optional[Dict[str, Any]] = None) -> NLUResult:
         """Run intent, language, emotion, and crisis checks."""
         context = context or {}
         lowered = text.lower().strip()
 
+        # Intent, crisis and emotion checks share one cached scan of `lowered`
         language = self._detect_language(lowered)
         intents = self._detect_intents(lowered)
         crisis = self._detect_crisis(lowered)
@@ -91,14 +85,10 @@ class NLUService:
         return "es" if spanish_hits >= 2 else "en"
 
     def _detect_intents(self, lowered: str) -> List[str]:
-        intents: List[str] = []
-        for intent, keywords in self.intent_keywords.items():
-            if any(keyword in lowered for keyword in keywords):
-                intents.append(intent)
-        return intents
+        return scan_message(lowered).labels("intent")
 
     def _detect_crisis(self, lowered: str) -> Optional[Dict[str, Any]]:
-        if any(keyword in lowered for keyword in self.crisis_keywords):
+        if scan_message(lowered).any("crisis"):
             return {"detected": True, "reason": "keyword_match"}
         return None
 
@@ -110,17 +100,10 @@ class NLUService:
             except Exception as exc:
                 logger.error(f"Emotion detection failed, using fallback: {exc}")
 
-        # Fallback heuristic
-        emotion_map = {
-            "anxious": ["anxious", "nervous", "worried", "panico", "ansioso"],
-            "sad": ["sad", "down", "depressed", "triste"],
-            "angry": ["angry", "furious", "mad", "enojo"],
-            "overwhelmed": ["overwhelmed", "too much", "agotado"],
-            "distressed": ["hopeless", "cant go on", "sufrir"],
-        }
-        for emotion, keywords in emotion_map.items():
-            if any(keyword in lowered for keyword in keywords):
-                return emotion, 0.6
+        # Fallback heuristic (FALLBACK_EMOTION_KEYWORDS)
+        matched = scan_message(lowered).labels("emotion_fallback")
+        if matched:
+            return matched[0], 0.6
         return "neutral", 0.5
 
 
@@ -1,12 +1,82 @@
 from __future__ import annotations
+import asyncio
+import os
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Awaitable, Optional
 from flask import Flask
-from nous_core.eventing import EventStore, EventBus
+from nous_core.eventing import EventStore, EventBus, TelemetrySink
+from nous_core.eventing.telemetry import DEFAULT_EXCLUDE as DEFAULT_TELEMETRY_EXCLUDE
 from nous_core.semantic import SemanticIndex
 from nous_core.policy import PolicyEngine
 from services.nexus.memory_graph import MemoryGraph
 
+
+class BackgroundLoop:
+    """
+    One asyncio event loop running forever on a daemon thread, so sync request
+    handlers can run coroutines without paying for asyncio.run() each time.
+    Restarted lazily after fork (gunicorn preload) since threads do not survive it.
+    """
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid = 0
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="nous-runtime-loop", daemon=True).start()
+                self._loop = loop
+                self._pid = os.getpid()
+            return self._loop
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure()).result(timeout)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+def _build_dispatcher() -> Any:
+    try:
+        from core.chat.dispatcher import ChatDispatcher
+        return ChatDispatcher()
+    except Exception:
+        return None
+
+
+def _build_plugins() -> Any:
+    try:
+        from utils.plugin_registry import PluginRegistry
+        return PluginRegistry()
+    except Exception:
+        return None
+
+
+def _build_telemetry(app: Flask, bus: EventBus) -> Optional[TelemetrySink]:
+    """Request telemetry sink, configured from app.config or the environment."""
+    def setting(name: str, default: Any) -> Any:
+        return app.config.get(name, os.environ.get(name, default))
+
+    if str(setting("TELEMETRY_ENABLED", "true")).lower() in ("0", "false", "no"):
+        return None
+    exclude = setting("TELEMETRY_EXCLUDE_PATHS", None)
+    if isinstance(exclude, str):
+        exclude = [p.strip() for p in exclude.split(",")]
+    return TelemetrySink(
+        bus,
+        capacity=int(setting("TELEMETRY_BUFFER_SIZE", 8192)),
+        flush_interval=float(setting("TELEMETRY_FLUSH_INTERVAL", 1.0)),
+        sample_rate=float(setting("TELEMETRY_SAMPLE_RATE", 1.0)),
+        exclude=DEFAULT_TELEMETRY_EXCLUDE if exclude is None else exclude,
+    )
+
+
 def init_runtime(app: Flask) -> Dict[str, Any]:
     """
     Initialize NOUS core runtime and attach to app.extensions["nous_runtime"].
@@ -21,12 +91,20 @@ def init_runtime(app: Flask) -> Dict[str, Any]:
     semantic_db = str(Path(app.instance_path) / "nous_semantic.db")
     graph_db = str(Path(app.instance_path) / "nous_graph.db")
 
-    store = EventStore(events_db)
-    bus = EventBus(store=store)
-    sem = SemanticIndex(semantic_db)
+    store = EventStore(events_db, group_commit=True)
+    bus = EventBus(store=store, async_dispatch=True)
+    sem = SemanticIndex(semantic_db, async_embed=True)
     policy = PolicyEngine()
     graph = MemoryGraph(graph_db)
 
-    rt = {"store": store, "bus": bus, "semantic": sem, "policy": policy, "graph": graph}
+    rt = {
+        "store": store, "bus": bus, "semantic": sem, "policy": policy, "graph": graph,
+        # Long-lived chat routing state shared by every nexus message
+        "dispatcher": _build_dispatcher(),
+        "plugins": _build_plugins(),
+        "loop": BackgroundLoop(),
+        # http.request/http.response events, batched off the request path
+        "telemetry": _build_telemetry(app, bus),
+    }
     app.extensions["nous_runtime"] = rt
     return rt
@@ -1,27 +1,466 @@
+"""
+Scheduler Service
+
+One periodic-job runner shared by every subsystem in the process. Under
+gunicorn (preload_app, many workers) each worker runs a scheduler thread,
+but jobs registered as leader-only run in exactly one process: the holder
+of a lease row in a small SQLite state file. create_app only arms the
+scheduler (start(lazy=True)); the thread starts in each worker from the
+post_fork hook or on its first request, never in the preloading master. The same file persists each
+job's next run time, enabled flag and run metrics, so a new leader picks up
+the schedule where the last one stopped.
+
+- Missed runs (no leader, process restarts) are coalesced into one catch-up
+  run, or skipped with catch_up=False; the schedule keeps its phase.
+- Each run is offset by a random jitter so jobs do not fire in lockstep.
+- A job still running when it comes due again is skipped, not stacked.
+- Per-process jobs (leader_only=False) share the same thread, e.g. memory
+  checks that must look at their own process.
+"""
 from __future__ import annotations
+
+import atexit
 import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STATE_PATH = os.path.join("instance", "scheduler.db")
+LEASE_SECONDS = 30.0
+MAX_SLEEP_SECONDS = 60.0
+
+
+class _Job:
+    __slots__ = ("job_id", "func", "interval", "jitter", "catch_up", "leader_only", "enabled",
+                 "scheduled_at", "next_run", "running", "runs", "failures", "overruns", "skipped",
+                 "missed", "last_duration", "max_duration", "total_duration", "last_run", "last_error")
+
+    def __init__(self, job_id, func, interval, jitter, catch_up, leader_only, enabled):
+        self.job_id = job_id
+        self.func = func
+        self.interval = float(interval)
+        self.jitter = float(jitter)
+        self.catch_up = catch_up
+        self.leader_only = leader_only
+        self.enabled = enabled
+        self.scheduled_at = time.time() + self.interval  # phase-aligned slot, without jitter
+        self.next_run = self.scheduled_at + random.uniform(0, self.jitter)
+        self.running = False
+        self.runs = self.failures = self.overruns = self.skipped = self.missed = 0
+        self.last_duration = self.max_duration = self.total_duration = 0.0
+        self.last_run = None
+        self.last_error = None
+
+    def advance(self, now: float) -> int:
+        """Move to the first slot after now; returns how many slots were missed"""
+        missed = max(0, int((now - self.scheduled_at) // self.interval))
+        self.scheduled_at += (missed + 1) * self.interval
+        self.next_run = self.scheduled_at + random.uniform(0, self.jitter)
+        return missed
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "leader_only": self.leader_only,
+            "enabled": self.enabled,
+            "running": self.running,
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "runs": self.runs,
+            "failures": self.failures,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "missed": self.missed,
+            "last_duration_ms": round(self.last_duration * 1000, 2),
+            "avg_duration_ms": round(self.total_duration / self.runs * 1000, 2) if self.runs else 0.0,
+            "max_duration_ms": round(self.max_duration * 1000, 2),
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """Periodic jobs with SQLite-lease leader election and persisted schedules"""
+
+    _STATE_COLUMNS = ("scheduled_at", "next_run", "enabled", "runs", "failures", "overruns",
+                      "skipped", "missed", "last_duration", "max_duration", "total_duration",
+                      "last_run", "last_error")
+
+    def __init__(self, state_path: Optional[str] = None, lease_seconds: float = LEASE_SECONDS,
+                 max_workers: int = 4):
+        self.state_path = state_path or os.environ.get("SCHEDULER_STATE_PATH", DEFAULT_STATE_PATH)
+        self.lease_seconds = lease_seconds
+        # 0 runs jobs inline on the scheduler thread (or the run_pending caller)
+        self.max_workers = max_workers
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._started = False
+        self._reset_process_state()
+        ref = weakref.ref(self)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=lambda: ref() is not None and ref()._after_fork())
+        atexit.register(lambda: ref() is not None and ref().stop())
+
+    def _reset_process_state(self):
+        self._pid = os.getpid()
+        self.owner = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._lease_checked = 0.0
+        self._state_loaded = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def _after_fork(self):
+        # Threads, connections and the lease do not survive fork. The child
+        # gets its own identity but only runs once ensure_running() is
+        # called, so helper processes forked from a worker stay out of the
+        # leader election
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._reset_process_state()
+        for job in self._jobs.values():
+            job.running = False
+
+    # === Registration ===
+
+    def add_job(self, job_id: str, func: Callable[[], Any], interval: float, jitter: float = 0.0,
+                catch_up: bool = True, leader_only: bool = True, enabled: bool = True) -> None:
+        """Register (or replace) a job running every `interval` seconds"""
+        with self._lock:
+            self._jobs[job_id] = _Job(job_id, func, interval, jitter, catch_up, leader_only, enabled)
+            self._state_loaded = False
+        self._wake.set()
+
+    def has_job(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._jobs
+
+    def remove_job(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def set_enabled(self, job_id: str, enabled: bool) -> None:
+        """Enable or pause a job; for leader-only jobs this applies to every process"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.enabled = enabled
+            if job is None or job.leader_only:
+                conn = self._db()
+                with conn:
+                    conn.execute("INSERT INTO scheduler_jobs (job_id, enabled) VALUES (?, ?) "
+                                 "ON CONFLICT(job_id) DO UPDATE SET enabled = excluded.enabled",
+                                 (job_id, int(enabled)))
+        self._wake.set()
+
+    def is_enabled(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.leader_only:
+                return job.enabled
+            row = self._db().execute("SELECT enabled FROM scheduler_jobs WHERE job_id = ?",
+                                     (job_id,)).fetchone()
+            if row is not None and row[0] is not None:
+                return bool(row[0])
+            return job.enabled if job is not None else False
+
+    # === Lifecycle ===
+
+    def start(self, lazy: bool = False) -> "JobScheduler":
+        """Start the scheduler thread; lazy=True only arms it for ensure_running()"""
+        with self._lock:
+            self._started = True
+            if lazy:
+                return self
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+                self._thread.start()
+        return self
+
+    def ensure_running(self) -> "JobScheduler":
+        """Start the thread in this process if the scheduler was armed here or before fork"""
+        if self._started and self._thread is None:
+            self.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopping = True
+            self._started = False
+            if self.is_leader and self._conn is not None and self._pid == os.getpid():
+                try:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM scheduler_lease WHERE name = 'leader' AND owner = ?",
+                                           (self.owner,))
+                except sqlite3.Error:
+                    pass
+            self.is_leader = False
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopping and self._pid == os.getpid():
+            try:
+                delay = self.run_pending()
+            except Exception as e:
+                logger.exception("scheduler tick failed: %s", e)
+                delay = 5.0
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    # === State ===
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.state_path, timeout=10, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS scheduler_lease ("
+                         "name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS scheduler_jobs ("
+                         "job_id TEXT PRIMARY KEY, scheduled_at REAL, next_run REAL, enabled INTEGER, "
+                         "runs INTEGER DEFAULT 0, failures INTEGER DEFAULT 0, overruns INTEGER DEFAULT 0, "
+                         "skipped INTEGER DEFAULT 0, missed INTEGER DEFAULT 0, last_duration REAL DEFAULT 0, "
+                         "max_duration REAL DEFAULT 0, total_duration REAL DEFAULT 0, last_run REAL, "
+                         "last_error TEXT, owner TEXT)")
+            self._conn = conn
+        return self._conn
+
+    def _renew_lease(self, now: float) -> bool:
+        """Take or extend the leader lease; returns whether this process holds it"""
+        conn = self._db()
+        with conn:
+            conn.execute(
+                "INSERT INTO scheduler_lease (name, owner, expires_at) VALUES ('leader', ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE scheduler_lease.owner = excluded.owner OR scheduler_lease.expires_at < ?",
+                (self.owner, now + self.lease_seconds, now))
+            row = conn.execute("SELECT owner FROM scheduler_lease WHERE name = 'leader'").fetchone()
+        leader = row is not None and row[0] == self.owner
+        if leader and not self.is_leader:
+            logger.info("scheduler leadership acquired by %s", self.owner)
+            self._state_loaded = False
+        self.is_leader = leader
+        return leader
+
+    def _load_state(self):
+        """Adopt persisted schedules, enabled flags and counters for leader-only jobs"""
+        self._state_loaded = True
+        rows = self._db().execute(
+            f"SELECT job_id, {', '.join(self._STATE_COLUMNS)} FROM scheduler_jobs").fetchall()
+        for row in rows:
+            job = self._jobs.get(row[0])
+            if job is None or not job.leader_only:
+                continue
+            state = dict(zip(self._STATE_COLUMNS, row[1:]))
+            if state["enabled"] is not None:
+                job.enabled = bool(state["enabled"])
+            if state["scheduled_at"] is not None:
+                job.scheduled_at, job.next_run = state["scheduled_at"], state["next_run"]
+            for name in ("runs", "failures", "overruns", "skipped", "missed", "last_duration",
+                         "max_duration", "total_duration", "last_run", "last_error"):
+                if state[name] is not None:
+                    setattr(job, name, state[name])
+
+    def _save_state(self, job: _Job):
+        conn = self._db()
+        values = [getattr(job, name) for name in self._STATE_COLUMNS if name != "enabled"]
+        columns = [name for name in self._STATE_COLUMNS if name != "enabled"]
+        with conn:
+            conn.execute(
+                f"INSERT INTO scheduler_jobs (job_id, owner, {', '.join(columns)}) "
+                f"VALUES (?, ?, {', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT(job_id) DO UPDATE SET owner = excluded.owner, "
+                + ", ".join(f"{name} = excluded.{name}" for name in columns),
+                [job.job_id, self.owner] + values)
+
+    def _persisted_enabled(self) -> Dict[str, bool]:
+        rows = self._db().execute("SELECT job_id, enabled FROM scheduler_jobs WHERE enabled IS NOT NULL")
+        return {job_id: bool(enabled) for job_id, enabled in rows}
+
+    # === Running ===
+
+    def run_pending(self, now: Optional[float] = None) -> float:
+        """Start every due job this process owns; returns seconds until the next check"""
+        now = time.time() if now is None else now
+        with self._lock:
+            jobs = list(self._jobs.values())
+            wants_lease = any(job.leader_only for job in jobs)
+            next_check = now + MAX_SLEEP_SECONDS
+            if wants_lease:
+                if now - self._lease_checked >= self.lease_seconds / 3:
+                    self._lease_checked = now
+                    self._renew_lease(now)
+                    if self.is_leader and self._state_loaded:
+                        # Pick up set_enabled() calls made in other processes
+                        for job_id, enabled in self._persisted_enabled().items():
+                            if job_id in self._jobs and self._jobs[job_id].leader_only:
+                                self._jobs[job_id].enabled = enabled
+                if self.is_leader and not self._state_loaded:
+                    self._load_state()
+                next_check = min(next_check, self._lease_checked + self.lease_seconds / 3)
+
+            due = []
+            for job in jobs:
+                if not job.enabled or (job.leader_only and not self.is_leader):
+                    continue
+                if now < job.next_run:
+                    next_check = min(next_check, job.next_run)
+                    continue
+                if job.running:
+                    job.skipped += 1
+                    job.advance(now)
+                elif job.catch_up or now - job.scheduled_at < job.interval:
+                    job.missed += job.advance(now)
+                    due.append(job)
+                else:
+                    # Missed slots are dropped without a catch-up run
+                    job.missed += job.advance(now) + 1
+                if job.leader_only:
+                    # Persist the new slot before running so a successor does not repeat it
+                    self._save_state(job)
+                next_check = min(next_check, job.next_run)
+
+            for job in due:
+                job.running = True
+                if self.max_workers:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                            thread_name_prefix="scheduled-job")
+                    self._executor.submit(self._execute, job)
+        if not self.max_workers:
+            for job in due:
+                self._execute(job)
+        return max(0.05, next_check - time.time())
+
+    def _execute(self, job: _Job):
+        started = time.perf_counter()
+        error = None
+        try:
+            job.func()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("scheduled job %s failed", job.job_id)
+        duration = time.perf_counter() - started
+        with self._lock:
+            job.running = False
+            job.runs += 1
+            job.last_run = time.time()
+            job.last_duration = duration
+            job.total_duration += duration
+            job.max_duration = max(job.max_duration, duration)
+            if duration > job.interval:
+                job.overruns += 1
+            if error:
+                job.failures += 1
+                job.last_error = error
+            if job.leader_only and self._pid == os.getpid():
+                try:
+                    self._save_state(job)
+                except sqlite3.Error as e:
+                    logger.warning("could not persist scheduler state for %s: %s", job.job_id, e)
+
+    # === Introspection ===
+
+    def stats(self) -> Dict[str, Any]:
+        """Leadership and per-job duration, overrun and miss metrics"""
+        with self._lock:
+            jobs = {job_id: job.metrics() for job_id, job in self._jobs.items()}
+            if not self.is_leader and any(job.leader_only for job in self._jobs.values()):
+                # Another process runs these; report what it persisted
+                columns = self._STATE_COLUMNS + ("owner",)
+                rows = self._db().execute(
+                    f"SELECT job_id, {', '.join(columns)} FROM scheduler_jobs").fetchall()
+                for row in rows:
+                    if row[0] in jobs and self._jobs[row[0]].leader_only:
+                        state = dict(zip(columns, row[1:]))
+                        runs = state["runs"] or 0
+                        jobs[row[0]].update({
+                            "enabled": bool(state["enabled"]) if state["enabled"] is not None
+                            else jobs[row[0]]["enabled"],
+                            "next_run": state["next_run"],
+                            "last_run": state["last_run"],
+                            "runs": runs,
+                            "failures": state["failures"] or 0,
+                            "overruns": state["overruns"] or 0,
+                            "skipped": state["skipped"] or 0,
+                            "missed": state["missed"] or 0,
+                            "last_duration_ms": round((state["last_duration"] or 0) * 1000, 2),
+                            "avg_duration_ms": round((state["total_duration"] or 0) / runs * 1000, 2) if runs else 0.0,
+                            "max_duration_ms": round((state["max_duration"] or 0) * 1000, 2),
+                            "last_error": state["last_error"],
+                            "owner": state["owner"],
+                        })
+            return {
+                "pid": self._pid,
+                "owner": self.owner,
+                "leader": self.is_leader,
+                "running": self._thread is not None and self._thread.is_alive(),
+                "jobs": jobs,
+            }
+
+
+_scheduler: Optional[JobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """The process-wide scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
+
+
+def ensure_scheduler_running() -> None:
+    """Start the process-wide scheduler in this process if init_scheduler armed it"""
+    if _scheduler is not None:
+        _scheduler.ensure_running()
+
+
 def init_scheduler(app):
-    try:
-        from apscheduler.schedulers.background import BackgroundScheduler
-    except Exception:
-        logger.warning("APScheduler not installed; scheduler disabled.")
+    if str(app.config.get("SCHEDULER_ENABLED", os.environ.get("SCHEDULER_ENABLED", "true"))).lower() in ("0", "false", "no"):
+        logger.info("Scheduler disabled by configuration")
         return None
 
-    sched = BackgroundScheduler(daemon=True)
+    sched = get_scheduler()
 
-    # Example job: run daily workflow every 24h (dev-safe)
+    # Daily workflow, once a day across all workers
     def _job():
-        try:
-            with app.app_context():
-                from services.workflows.daily import run_daily_workflow
-                run_daily_workflow()
-        except Exception as e:
-            logger.exception("scheduler job failed: %s", e)
+        with app.app_context():
+            from services.workflows.daily import run_daily_workflow
+            run_daily_workflow()
+
+    sched.add_job("daily_reset", _job, interval=24 * 3600, jitter=300)
+
+    try:
+        from services.seed_drone_swarm import register_swarm_jobs
+        register_swarm_jobs(sched)
+    except Exception as e:
+        logger.warning("Drone swarm jobs not registered: %s", e)
+
+    # Armed only: with preload_app this runs in the gunicorn master, which
+    # must not hold the lease or run jobs on the DB pool its workers inherit
+    sched.start(lazy=True)
+
+    @app.before_request
+    def _ensure_scheduler():
+        sched.ensure_running()
 
-    sched.add_job(_job, "interval", hours=24, id="daily_reset", replace_existing=True)
-    sched.start()
     app.extensions["scheduler"] = sched
     return sched
@@ -14,7 +14,6 @@ import asyncio
 import logging
 import json
 import sqlite3
-import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -1129,7 +1128,7 @@ class SeedDroneSwarm:
         self.completed_tasks: List[DroneResult] = []
         self.executor = ThreadPoolExecutor(max_workers=10)
         self.running = False
-        self.swarm_thread = None
+        self.task_lease = timedelta(hours=1)  # assigned tasks older than this are requeued
         
         # Drone type configurations
         self.drone_configs = {
@@ -1185,9 +1184,13 @@ class SeedDroneSwarm:
                     created_at TIMESTAMP NOT NULL,
                     assigned_drone TEXT,
                     status TEXT DEFAULT 'pending',
-                    completed_at TIMESTAMP
+                    completed_at TIMESTAMP,
+                    claimed_at TIMESTAMP
                 )
             ''')
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(tasks)')}
+            if 'claimed_at' not in columns:
+                cursor.execute('ALTER TABLE tasks ADD COLUMN claimed_at TIMESTAMP')
             
             # Results storage
             cursor.execute('''
@@ -1204,43 +1207,49 @@ class SeedDroneSwarm:
             conn.commit()
     
     def start_swarm(self):
-        """Start the drone swarm orchestrator"""
-        if self.running:
-            return
+        """Start the drone swarm orchestrator (its jobs run in the scheduler's leader process)"""
+        from services.scheduler_service import get_scheduler
         
+        scheduler = get_scheduler()
+        register_swarm_jobs(scheduler)
+        for job_id in SWARM_JOBS:
+            scheduler.set_enabled(job_id, True)
+        scheduler.start()
         self.running = True
-        self.swarm_thread = threading.Thread(target=self._swarm_loop, daemon=True)
-        self.swarm_thread.start()
         logger.info("SEED Drone Swarm started")
     
     def stop_swarm(self):
         """Stop the drone swarm"""
+        from services.scheduler_service import get_scheduler
+        
+        scheduler = get_scheduler()
+        for job_id in SWARM_JOBS:
+            scheduler.set_enabled(job_id, False)
         self.running = False
-        if self.swarm_thread:
-            self.swarm_thread.join(timeout=5)
         logger.info("SEED Drone Swarm stopped")
     
-    def _swarm_loop(self):
-        """Main swarm orchestration loop"""
-        while self.running:
-            try:
-                # Spawn drones as needed
-                self._spawn_drones()
-                
-                # Assign tasks to available drones
-                self._assign_tasks()
-                
-                # Clean up completed/failed drones
-                self._cleanup_drones()
-                
-                # Schedule periodic verification tasks
-                self._schedule_periodic_tasks()
-                
-                time.sleep(30)  # Check every 30 seconds
-                
-            except Exception as e:
-                logger.error(f"Swarm loop error: {e}")
-                time.sleep(60)  # Wait longer on error
+    def run_tick(self):
+        """One orchestration pass: spawn, assign and clean up drones
+        
+        Runs only in the scheduler's leader process, so the queue is the
+        shared tasks table (any worker's add_task lands there) and the
+        drones table is rewritten from this process's drones for the
+        status views in the other workers.
+        """
+        # Take back work stranded by a previous leader, then pick up tasks queued by every worker
+        self._requeue_stale_tasks()
+        self.task_queue = self._load_pending_tasks()
+        
+        # Spawn drones as needed
+        self._spawn_drones()
+        
+        # Assign tasks to available drones
+        self._assign_tasks()
+        
+        # Clean up completed/failed drones
+        self._cleanup_drones()
+        
+        self._sync_drones()
     
     def _spawn_drones(self):
         """Spawn drones based on configuration and workload"""
@@ -1277,8 +1286,10 @@ class SeedDroneSwarm:
             
             if suitable_drones:
                 drone = suitable_drones[0]
-                available_drones.remove(drone)
                 self.task_queue.remove(task)
+                if not self._claim_task(task, drone):
+                    continue
+                available_drones.remove(drone)
                 
                 # Execute task in thread pool
                 future = self.executor.submit(self._execute_task_sync, drone, task)
@@ -1301,6 +1312,7 @@ class SeedDroneSwarm:
             # Store result
             self.completed_tasks.append(result)
             self._store_result(result)
+            self._finish_task(task, 'completed' if result.success else 'failed')
             
             # Update drone status
             drone.status = DroneStatus.IDLE
@@ -1308,6 +1320,7 @@ class SeedDroneSwarm:
             
         except Exception as e:
             logger.error(f"Task execution failed: {e}")
+            self._finish_task(task, 'failed')
             drone.status = DroneStatus.FAILED
             drone.tasks_failed += 1
     
@@ -1331,33 +1344,29 @@ class SeedDroneSwarm:
             del self.active_drones[drone_id]
             logger.info(f"Removed drone: {drone_id}")
     
-    def _schedule_periodic_tasks(self):
-        """Schedule regular maintenance tasks"""
+    def schedule_verification(self):
+        """Queue the periodic full-system verification"""
         current_time = datetime.now()
-        
-        # Schedule verification task every 10 minutes
-        last_verification = self._get_last_task_time('system_verification')
-        if not last_verification or (current_time - last_verification).seconds > 600:
-            self.add_task(
-                DroneType.VERIFICATION_DRONE,
-                priority=5,
-                payload={'verification_type': 'full_system'},
-                task_id=f"verification_{int(current_time.timestamp())}"
-            )
-        
-        # Schedule optimization task every 30 minutes
-        last_optimization = self._get_last_task_time('system_optimization')
-        if not last_optimization or (current_time - last_optimization).seconds > 1800:
-            self.add_task(
-                DroneType.OPTIMIZATION_DRONE,
-                priority=3,
-                payload={'optimization_type': 'general'},
-                task_id=f"optimization_{int(current_time.timestamp())}"
-            )
+        self.add_task(
+            DroneType.VERIFICATION_DRONE,
+            priority=5,
+            payload={'verification_type': 'full_system'},
+            task_id=f"verification_{int(current_time.timestamp())}"
+        )
+    
+    def schedule_optimization(self):
+        """Queue the periodic general optimization"""
+        current_time = datetime.now()
+        self.add_task(
+            DroneType.OPTIMIZATION_DRONE,
+            priority=3,
+            payload={'optimization_type': 'general'},
+            task_id=f"optimization_{int(current_time.timestamp())}"
+        )
     
     def add_task(self, drone_type: DroneType, priority: int, payload: Dict[str, Any], 
                  task_id: Optional[str] = None, deadline: Optional[datetime] = None):
-        """Add a task to the drone swarm queue"""
+        """Add a task to the shared queue; the leader's next tick assigns it"""
         if not task_id:
             task_id = f"task_{uuid.uuid4().hex[:8]}"
         
@@ -1370,37 +1379,171 @@ class SeedDroneSwarm:
             deadline=deadline
         )
         
-        self.task_queue.append(task)
         self._store_task(task)
         logger.info(f"Added task {task_id} to queue")
         
         return task_id
     
+    def is_running(self) -> bool:
+        """Whether the swarm jobs are enabled (in any worker)"""
+        try:
+            from services.scheduler_service import get_scheduler
+            return get_scheduler().is_enabled('drone_swarm.tick')
+        except Exception:
+            return self.running
+    
     def get_swarm_status(self) -> Dict[str, Any]:
-        """Get comprehensive swarm status"""
+        """Get comprehensive swarm status (from the shared tables, so any worker can answer)"""
+        with sqlite3.connect(self.db_path) as conn:
+            drones = conn.execute('''
+                SELECT drone_id, drone_type, status, created_at, last_activity, tasks_completed, tasks_failed
+                FROM drones WHERE status != ?
+            ''', (DroneStatus.TERMINATED.value,)).fetchall()
+            avg_times = dict(conn.execute(
+                'SELECT drone_id, AVG(execution_time) FROM results WHERE success GROUP BY drone_id'
+            ).fetchall())
+            pending = conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending'").fetchone()[0]
+            completed = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        
         active_drones_by_type = {}
-        for drone in self.active_drones.values():
-            drone_type = drone.drone_type.value
-            if drone_type not in active_drones_by_type:
-                active_drones_by_type[drone_type] = 0
-            active_drones_by_type[drone_type] += 1
+        performance = []
+        now = datetime.now()
+        for drone_id, drone_type, status, created_at, last_activity, done, failed in drones:
+            active_drones_by_type[drone_type] = active_drones_by_type.get(drone_type, 0) + 1
+            local = self.active_drones.get(drone_id)
+            if local is not None:
+                performance.append(local.get_performance_metrics())
+                continue
+            total = (done or 0) + (failed or 0)
+            performance.append({
+                'drone_id': drone_id,
+                'type': drone_type,
+                'status': status,
+                'uptime': (now - _parse_time(created_at)).total_seconds(),
+                'tasks_completed': done or 0,
+                'tasks_failed': failed or 0,
+                'success_rate': (done or 0) / total if total else 0,
+                'avg_execution_time': avg_times.get(drone_id) or 0,
+                'last_activity': _parse_time(last_activity).isoformat()
+            })
         
         return {
-            'swarm_running': self.running,
-            'total_active_drones': len(self.active_drones),
+            'swarm_running': self.is_running(),
+            'total_active_drones': len(drones),
             'active_drones_by_type': active_drones_by_type,
-            'pending_tasks': len(self.task_queue),
-            'completed_tasks': len(self.completed_tasks),
-            'drone_performance': [drone.get_performance_metrics() 
-                                for drone in self.active_drones.values()]
+            'pending_tasks': pending,
+            'completed_tasks': completed,
+            'drone_performance': performance
         }
     
     def get_recent_results(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent task results"""
-        recent_results = sorted(self.completed_tasks, 
-                              key=lambda r: r.completed_at, reverse=True)[:limit]
+        """Get recent task results (from the shared results table)"""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('''
+                SELECT task_id, drone_id, success, result_data, execution_time, completed_at
+                FROM results ORDER BY completed_at DESC LIMIT ?
+            ''', (limit,)).fetchall()
+        
+        local = {result.task_id: result for result in self.completed_tasks}
+        results = []
+        for task_id, drone_id, success, result_data, execution_time, completed_at in rows:
+            if task_id in local:
+                results.append(asdict(local[task_id]))
+                continue
+            results.append(asdict(DroneResult(
+                task_id=task_id,
+                drone_id=drone_id,
+                success=bool(success),
+                result_data=json.loads(result_data),
+                execution_time=execution_time,
+                completed_at=_parse_time(completed_at)
+            )))
+        return results
+    
+    def _load_pending_tasks(self) -> List[DroneTask]:
+        """Pending tasks from the shared table, highest priority first"""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('''
+                SELECT task_id, drone_type, priority, payload, created_at
+                FROM tasks WHERE status = 'pending'
+                ORDER BY priority DESC, created_at
+            ''').fetchall()
         
-        return [asdict(result) for result in recent_results]
+        tasks = []
+        for task_id, drone_type, priority, payload, created_at in rows:
+            try:
+                tasks.append(DroneTask(
+                    task_id=task_id,
+                    drone_type=DroneType(drone_type),
+                    priority=priority,
+                    payload=json.loads(payload),
+                    created_at=_parse_time(created_at)
+                ))
+            except ValueError as e:
+                logger.error(f"Dropping unreadable task {task_id}: {e}")
+                self._finish_task_id(task_id, 'failed')
+        return tasks
+    
+    def _claim_task(self, task: DroneTask, drone: BaseDrone) -> bool:
+        """Mark a pending task assigned; False if another process already took it"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'assigned', assigned_drone = ?, claimed_at = ? "
+                "WHERE task_id = ? AND status = 'pending'",
+                (drone.drone_id, datetime.now(), task.task_id)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+    
+    def _requeue_stale_tasks(self) -> int:
+        """Return assigned tasks to pending when their drone is gone or their lease ran out
+        
+        A leader that dies or loses leadership mid-task leaves its rows
+        'assigned' under drones no other process has, so the new leader
+        takes them back; the lease also catches tasks whose drone hung.
+        """
+        drone_ids = list(self.active_drones)
+        marks = ','.join('?' * len(drone_ids))
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                f"UPDATE tasks SET status = 'pending', assigned_drone = NULL, claimed_at = NULL "
+                f"WHERE status = 'assigned' AND (assigned_drone NOT IN ({marks}) "
+                f"OR claimed_at IS NULL OR claimed_at < ?)",
+                (*drone_ids, datetime.now() - self.task_lease)
+            )
+            conn.commit()
+        if cursor.rowcount:
+            logger.warning(f"Requeued {cursor.rowcount} stranded drone tasks")
+        return cursor.rowcount
+    
+    def _finish_task(self, task: DroneTask, status: str):
+        self._finish_task_id(task.task_id, status)
+    
+    def _finish_task_id(self, task_id: str, status: str):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('UPDATE tasks SET status = ?, completed_at = ? WHERE task_id = ?',
+                         (status, datetime.now(), task_id))
+            conn.commit()
+    
+    def _sync_drones(self):
+        """Write this process's drones to the registry and retire every other row"""
+        drones = list(self.active_drones.values())
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO drones
+                (drone_id, drone_type, status, created_at, last_activity, tasks_completed, tasks_failed)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(drone_id) DO UPDATE SET status = excluded.status,
+                    last_activity = excluded.last_activity, tasks_completed = excluded.tasks_completed,
+                    tasks_failed = excluded.tasks_failed
+            ''', [(d.drone_id, d.drone_type.value, d.status.value, d.created_at, d.last_activity,
+                   d.tasks_completed, d.tasks_failed) for d in drones])
+            marks = ','.join('?' * len(drones))
+            conn.execute(
+                f"UPDATE drones SET status = ? WHERE status != ? AND drone_id NOT IN ({marks})",
+                (DroneStatus.TERMINATED.value, DroneStatus.TERMINATED.value, *(d.drone_id for d in drones))
+            )
+            conn.commit()
     
     def _register_drone(self, drone: BaseDrone):
         """Register drone in database"""
@@ -1453,18 +1596,10 @@ class SeedDroneSwarm:
                 result.completed_at
             ))
             conn.commit()
-    
-    def _get_last_task_time(self, task_prefix: str) -> Optional[datetime]:
-        """Get the timestamp of the last task with given prefix"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT MAX(created_at) FROM tasks 
-                WHERE task_id LIKE ?
-            ''', (f"{task_prefix}%",))
-            result = cursor.fetchone()[0]
-            
-        return datetime.fromisoformat(result) if result else None
+
+def _parse_time(value) -> datetime:
+    """Timestamps come back from sqlite3 as ISO strings"""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
 
 # Global swarm instance
 _drone_swarm_instance = None
@@ -1485,4 +1620,19 @@ def start_drone_swarm():
 def stop_drone_swarm():
     """Stop the global drone swarm"""
     swarm = get_drone_swarm() 
-    swarm.stop_swarm()
\ No newline at end of file
+    swarm.stop_swarm()
+
+# Scheduler jobs: id -> (interval seconds, jitter seconds, SeedDroneSwarm method)
+SWARM_JOBS = {
+    'drone_swarm.tick': (30, 5, 'run_tick'),
+    'drone_swarm.verification': (600, 30, 'schedule_verification'),
+    'drone_swarm.optimization': (1800, 60, 'schedule_optimization')
+}
+
+def register_swarm_jobs(scheduler):
+    """Register the swarm's periodic jobs; they stay paused until start_swarm()"""
+    for job_id, (interval, jitter, method) in SWARM_JOBS.items():
+        if scheduler.has_job(job_id):
+            continue
+        scheduler.add_job(job_id, lambda method=method: getattr(get_drone_swarm(), method)(),
+                          interval=interval, jitter=jitter, enabled=False)
@@ -1,2 +1,17 @@
-from services.spotify.lyrics.providers import LyricsProvider, LyricsOvhProvider, UserProvidedLyricsProvider
 from services.spotify.lyrics.analyzer import analyze_lyrics
+from services.spotify.lyrics.providers import (
+    LyricsOvhProvider,
+    LyricsProvider,
+    LyricsUnavailable,
+    UserProvidedLyricsProvider,
+    default_providers,
+)
+
+__all__ = [
+    "LyricsProvider",
+    "LyricsOvhProvider",
+    "LyricsUnavailable",
+    "UserProvidedLyricsProvider",
+    "default_providers",
+    "analyze_lyrics",
+]
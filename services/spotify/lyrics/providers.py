@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from utils.http import http_get_json, HTTPError
 
 logger = logging.getLogger(__name__)
 
 
+class LyricsUnavailable(RuntimeError):
+    """Provider could not answer right now (timeout, connection error, 5xx); unlike None, not a miss."""
+
+
 class LyricsProvider:
     name = "base"
 
@@ -32,8 +36,10 @@ class LyricsOvhProvider(LyricsProvider):
         try:
             data = http_get_json(url, headers={"User-Agent": "NOUSIntelligence/1.0 (lyrics)"})
         except HTTPError as e:
-            logger.info(f"Lyrics.ovh miss for {artist} - {title}: {e}")
-            return None
+            if e.status_code == 404:
+                logger.info(f"Lyrics.ovh miss for {artist} - {title}: {e}")
+                return None
+            raise LyricsUnavailable(f"lyrics.ovh unavailable: {e}") from e
         lyrics = (data.get("lyrics") or "").strip()
         if not lyrics:
             return None
@@ -53,3 +59,7 @@ class UserProvidedLyricsProvider(LyricsProvider):
         if not lyrics:
             return None
         return {"provider": self.name, "artist": (artist or "").strip(), "title": (title or "").strip(), "lyrics": lyrics}
+
+
+def default_providers() -> List[LyricsProvider]:
+    return [LyricsOvhProvider()]
@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+from services.nexus.memory_graph import Edge
+from services.spotify.lyrics import (
+    LyricsProvider,
+    LyricsUnavailable,
+    analyze_lyrics,
+    default_providers,
+)
 from services.spotify.spotify_api import SpotifyAPI
 from services.spotify.spotify_store import SpotifyStore
-from services.spotify.lyrics import default_providers, analyze_lyrics
+
+logger = logging.getLogger(__name__)
+
+LYRICS_WORKERS = 8
+PLAYED_CURSOR = "recently_played"
+# Enrichment markers written once a track reached the runtime's semantic
+# index / memory graph; tracks without one are indexed on the next sync
+SEMANTIC_MARKER = "semantic_indexed"
+GRAPH_MARKER = "graph_indexed"
 
 
 def _track_id(track_obj: Dict[str, Any]) -> Optional[str]:
@@ -33,6 +50,66 @@ def _now_iso() -> str:
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
 
+def _fetch_lyrics(providers: List[LyricsProvider], artist: str, title: str) -> Optional[Tuple[str, str]]:
+    """(lyrics, provider) from the first provider that has them, or None when every one reported a miss.
+
+    Raises LyricsUnavailable when nobody had lyrics but some provider failed,
+    so an outage is retried on the next sync instead of negatively cached.
+    """
+    failure: Optional[Exception] = None
+    for prov in providers:
+        try:
+            res = prov.fetch(artist=artist, title=title)
+        except Exception as e:
+            failure = e
+            continue
+        if res and res.get("lyrics"):
+            return res["lyrics"], str(res.get("provider") or prov.name)
+    if failure is not None:
+        raise LyricsUnavailable(f"no lyrics for {artist} - {title}: {failure}") from failure
+    return None
+
+
+def _analyze_lyrics_batch(
+    store: SpotifyStore,
+    candidates: List[Tuple[str, str, str]],
+    workers: int,
+) -> int:
+    """Fetch lyrics for (track_id, artist, title) concurrently and write hits and misses in one go.
+
+    Only real misses are negatively cached; tracks whose lookup failed are
+    left out so the next sync tries them again.
+    """
+    if not candidates:
+        return 0
+    providers = default_providers()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(candidates))), thread_name_prefix="lyrics") as pool:
+        futures = [pool.submit(_fetch_lyrics, providers, artist, title) for _, artist, title in candidates]
+
+    analyses: List[Tuple[str, Dict[str, Any]]] = []
+    misses: List[str] = []
+    for (tid, artist, title), future in zip(candidates, futures):
+        error = future.exception()
+        if error is not None:
+            logger.info(f"Lyrics lookup failed, retrying next sync: {error}")
+            continue
+        hit = future.result()
+        if not hit:
+            misses.append(tid)
+            continue
+        lyr_text, used = hit
+        analyses.append((tid, {
+            "track_id": tid,
+            "artist": artist,
+            "title": title,
+            "provider": used,
+            "analysis": analyze_lyrics(lyr_text),
+            "stored_raw_lyrics": False,
+            "created_at": _now_iso(),
+        }))
+    return store.put_lyrics_results(analyses, misses)
+
+
 def sync_recently_played(
     *,
     spotify: SpotifyAPI,
@@ -43,65 +120,55 @@ def sync_recently_played(
     limit: int = 50,
     enrich: bool = True,
     lyrics: bool = True,
+    lyrics_workers: int = LYRICS_WORKERS,
 ) -> Dict[str, Any]:
+    """
+    Pull recently played tracks and fan them out to the caches and runtime.
+
+    Everything is batched: one lookup per cache to find what is new, one
+    transaction per store for the writes, concurrent lyrics lookups with a
+    negative cache, one bulk semantic upsert and one event-store transaction.
+    Tracks already cached are not re-written or re-enriched. Indexing is
+    tracked separately: a track is sent to the semantic index and the graph
+    until an upsert succeeds (a marker is stored after it), so a failed
+    upsert or a sync without a runtime is retried later. Only plays newer
+    than the user's last sync are published.
+    """
     items = spotify.recently_played(access_token, limit=limit)
-    tracks: List[Dict[str, Any]] = []
+    plays: List[Tuple[str, Dict[str, Any], str]] = []
+    tracks: Dict[str, Dict[str, Any]] = {}
     for it in items:
         tr = it.get("track") if isinstance(it, dict) else None
-        if isinstance(tr, dict):
-            tracks.append(tr)
-
-    cached = 0
-    track_ids: List[str] = []
-    for tr in tracks:
-        tid = _track_id(tr)
+        tid = _track_id(tr) if isinstance(tr, dict) else None
         if not tid:
             continue
-        track_ids.append(tid)
-        store.put_track(tid, tr)
-        cached += 1
+        plays.append((tid, tr, str(it.get("played_at") or "")))
+        tracks.setdefault(tid, tr)
 
-    if enrich and track_ids:
+    known = store.get_tracks(tracks)
+    new_ids = [tid for tid in tracks if tid not in known]
+    cached = store.put_tracks([(tid, tracks[tid]) for tid in new_ids])
+
+    features = 0
+    if enrich and tracks:
+        have = store.enriched_ids(tracks, "audio_features")
+        todo = [tid for tid in tracks if tid not in have]
         feats = []
-        for i in range(0, len(track_ids), 100):
-            feats.extend(spotify.audio_features(access_token, track_ids[i : i + 100]))
-        for f in feats:
-            tid = str(f.get("id") or "")
-            if tid:
-                store.put_enrichment(tid, "audio_features", f)
+        for i in range(0, len(todo), 100):
+            feats.extend(spotify.audio_features(access_token, todo[i : i + 100]))
+        features = store.put_enrichments(
+            "audio_features", [(str(f["id"]), f) for f in feats if f.get("id")]
+        )
 
     lyr_analyzed = 0
-    if lyrics:
-        providers = default_providers()
-        for tid in track_ids[: min(len(track_ids), 50)]:
-            if store.get_lyrics_analysis(tid):
-                continue
-            tr = store.get_track(tid) or {}
+    if lyrics and tracks:
+        done = store.lyrics_done_ids(tracks)
+        candidates = []
+        for tid, tr in tracks.items():
             artist, title = _artist_title(tr)
-            if not artist or not title:
-                continue
-            lyr_text = None
-            used = None
-            for prov in providers:
-                res = prov.fetch(artist, title)
-                if res and res.lyrics:
-                    lyr_text = res.lyrics
-                    used = res.provider
-                    break
-            if not lyr_text:
-                continue
-            analysis = analyze_lyrics(lyr_text)
-            payload = {
-                "track_id": tid,
-                "artist": artist,
-                "title": title,
-                "provider": used,
-                "analysis": analysis,
-                "stored_raw_lyrics": False,
-                "created_at": _now_iso(),
-            }
-            store.put_lyrics_analysis(tid, payload)
-            lyr_analyzed += 1
+            if tid not in done and artist and title:
+                candidates.append((tid, artist, title))
+        lyr_analyzed = _analyze_lyrics_batch(store, candidates, lyrics_workers)
 
     events = 0
     sem = 0
@@ -110,12 +177,25 @@ def sync_recently_played(
         bus = runtime.get("bus")
         semantic = runtime.get("semantic")
         graph = runtime.get("graph")
+        now = _now_iso()
 
-        for tr in tracks:
-            tid = _track_id(tr)
-            if not tid:
+        to_index: List[str] = []
+        to_graph: List[str] = []
+        if semantic and tracks:
+            indexed = store.enriched_ids(tracks, SEMANTIC_MARKER)
+            to_index = [tid for tid in tracks if tid not in indexed]
+        if graph and tracks:
+            graphed = store.enriched_ids(tracks, GRAPH_MARKER)
+            to_graph = [tid for tid in tracks if tid not in graphed]
+        pending = set(to_index) | set(to_graph)
+
+        docs = []
+        nodes = []
+        edges: List[Edge] = []
+        for tid in tracks:
+            if tid not in pending:
                 continue
-            artist, title = _artist_title(tr)
+            artist, title = _artist_title(tracks[tid])
             meta = {
                 "source": "spotify",
                 "kind": "track",
@@ -123,38 +203,56 @@ def sync_recently_played(
                 "artist": artist,
                 "title": title,
                 "user_id": user_id,
-                "ts": _now_iso(),
+                "ts": now,
             }
-            text = f"Spotify track played: {title} — {artist}"
-            if semantic:
-                try:
-                    semantic.upsert(f"spotify:track:{tid}", text, meta)
-                    sem += 1
-                except Exception:
-                    pass
-            if graph:
-                try:
-                    graph.upsert_node(f"spotify:track:{tid}", kind="spotify_track", meta=meta)
-                    if artist:
-                        graph.upsert_node(f"artist:{artist}", kind="artist", meta={"name": artist})
-                        graph_edges += graph.add_edge(f"spotify:track:{tid}", f"artist:{artist}", rel="by")
-                except Exception:
-                    pass
-            if bus:
-                try:
-                    bus.publish(
-                        "spotify.track.played",
-                        {"track_id": tid, "artist": artist, "title": title, "user_id": user_id, "ts": meta["ts"]},
-                    )
-                    events += 1
-                except Exception:
-                    pass
+            if tid in to_index:
+                docs.append((f"spotify:track:{tid}", f"Spotify track played: {title} — {artist}", meta))
+            if tid in to_graph:
+                nodes.append((f"spotify:track:{tid}", "spotify_track", meta))
+                if artist:
+                    nodes.append((f"artist:{artist}", "artist", {"name": artist}))
+                    edges.append(Edge(f"spotify:track:{tid}", f"artist:{artist}", "by"))
+
+        if docs:
+            try:
+                sem = semantic.bulk_upsert(docs)
+                store.put_enrichments(SEMANTIC_MARKER, [(tid, {"indexed_at": now}) for tid in to_index])
+            except Exception as e:
+                logger.warning("Spotify semantic upsert failed: %s", e)
+        if nodes:
+            try:
+                graph.upsert_nodes(nodes)
+                graph_edges = graph.add_edges(edges)
+                store.put_enrichments(GRAPH_MARKER, [(tid, {"indexed_at": now}) for tid in to_graph])
+            except Exception as e:
+                logger.warning("Spotify graph ingest failed: %s", e)
+        if bus:
+            cursor = store.get_cursor(user_id, PLAYED_CURSOR) or ""
+            fresh = [(tid, tr, played_at) for tid, tr, played_at in plays if not played_at or played_at > cursor]
+            batch = []
+            for tid, tr, played_at in reversed(fresh):  # oldest first
+                artist, title = _artist_title(tr)
+                payload = {"track_id": tid, "artist": artist, "title": title, "user_id": user_id, "ts": now}
+                if played_at:
+                    payload["played_at"] = played_at
+                batch.append(("spotify.track.played", payload))
+            try:
+                if batch:
+                    bus.publish_many(batch)
+                    events = len(batch)
+                latest = max((played_at for _, _, played_at in plays), default="")
+                if latest > cursor:
+                    store.set_cursor(user_id, PLAYED_CURSOR, latest)
+            except Exception as e:
+                logger.warning("Spotify play events not published: %s", e)
 
     return {
         "ok": True,
-        "tracks_seen": len(tracks),
+        "tracks_seen": len(plays),
         "tracks_cached": cached,
+        "tracks_already_cached": len(known),
         "audio_features_cached": bool(enrich),
+        "audio_features_fetched": features,
         "lyrics_analyzed": lyr_analyzed,
         "semantic_upserts": sem,
         "events_published": events,
@@ -3,11 +3,14 @@ from __future__ import annotations
 import json
 import sqlite3
 import time
-from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
+from nous_core.storage import SQLiteStore
 
-class SpotifyStore:
+LYRICS_MISS_TTL = 7 * 24 * 3600.0
+
+
+class SpotifyStore(SQLiteStore):
     """SQLite store for Spotify auth + caches.
 
     Tables:
@@ -15,17 +18,20 @@ class SpotifyStore:
       - track_cache: raw Spotify track objects
       - enrichment_cache: (track_id, source) -> payload
       - lyrics_cache: lyrics analysis (optionally full lyrics if you insist)
+      - lyrics_misses: negative cache of tracks no provider had lyrics for
+      - sync_cursors: per-user sync positions (e.g. last recently-played timestamp)
+
+    The *_many methods read or write a whole batch in one transaction.
 
     Designed to work on Render/Fly/local with zero external services.
     """
 
-    def __init__(self, db_path: str) -> None:
-        self.db_path = str(db_path)
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+    def __init__(self, db_path: str, **store_opts: Any) -> None:
+        super().__init__(db_path, **store_opts)
         self._init_db()
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self.db_path) as conn:
+        def create(conn: sqlite3.Connection) -> None:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tokens (
@@ -69,16 +75,53 @@ class SpotifyStore:
                 )
                 """
             )
-            conn.commit()
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS lyrics_misses (
+                    track_id TEXT PRIMARY KEY,
+                    updated_ts REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_cursors (
+                    user_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    updated_ts REAL NOT NULL,
+                    PRIMARY KEY (user_id, name)
+                )
+                """
+            )
+        self.write(create)
+
+    @staticmethod
+    def _loads(payload: Optional[str]) -> Optional[Dict[str, Any]]:
+        if payload is None:
+            return None
+        try:
+            return json.loads(payload)
+        except Exception:
+            return None
+
+    def _get_payloads(self, table: str, track_ids: Iterable[str], where: str = "",
+                      args: Tuple[Any, ...] = ()) -> Dict[str, Dict[str, Any]]:
+        rows = self.get_many(table, "track_id", track_ids, ("payload",), where, args)
+        out: Dict[str, Dict[str, Any]] = {}
+        for tid, (payload,) in rows.items():
+            obj = self._loads(payload)
+            if obj is not None:
+                out[tid] = obj
+        return out
 
     # ── Tokens ─────────────────────────────────────────────────────────
 
     def get_tokens(self, user_id: str) -> Optional[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute(
-                "SELECT access_token, refresh_token, expires_at, scope, token_type FROM tokens WHERE user_id=?",
-                (user_id,),
-            ).fetchone()
+        row = self.read_one(
+            "SELECT access_token, refresh_token, expires_at, scope, token_type FROM tokens WHERE user_id=?",
+            (user_id,),
+        )
         if not row:
             return None
         access_token, refresh_token, expires_at, scope, token_type = row
@@ -100,80 +143,91 @@ class SpotifyStore:
         scope = token.get("scope")
         token_type = token.get("token_type") or "Bearer"
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO tokens(user_id,access_token,refresh_token,expires_at,scope,token_type,created_ts,updated_ts)
-                VALUES(?,?,?,?,?,?, COALESCE((SELECT created_ts FROM tokens WHERE user_id=?), ?), ?)
-                """,
-                (user_id, access_token, refresh_token, expires_at, scope, token_type, user_id, now, now),
-            )
-            conn.commit()
+        self.execute(
+            """
+            INSERT OR REPLACE INTO tokens(user_id,access_token,refresh_token,expires_at,scope,token_type,created_ts,updated_ts)
+            VALUES(?,?,?,?,?,?, COALESCE((SELECT created_ts FROM tokens WHERE user_id=?), ?), ?)
+            """,
+            (user_id, access_token, refresh_token, expires_at, scope, token_type, user_id, now, now),
+        )
 
     def delete_tokens(self, user_id: str) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM tokens WHERE user_id=?", (user_id,))
-            conn.commit()
+        self.execute("DELETE FROM tokens WHERE user_id=?", (user_id,))
 
     # ── Track cache ────────────────────────────────────────────────────
 
     def get_track(self, track_id: str) -> Optional[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute("SELECT payload FROM track_cache WHERE track_id=?", (track_id,)).fetchone()
-        if not row:
-            return None
-        try:
-            return json.loads(row[0])
-        except Exception:
-            return None
+        return self.get_tracks([track_id]).get(track_id)
 
     def put_track(self, track_id: str, payload: Dict[str, Any]) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO track_cache(track_id,payload,updated_ts) VALUES(?,?,?)",
-                (track_id, json.dumps(payload, ensure_ascii=False), time.time()),
-            )
-            conn.commit()
+        self.put_tracks([(track_id, payload)])
+
+    def get_tracks(self, track_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return self._get_payloads("track_cache", track_ids)
+
+    def put_tracks(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        now = time.time()
+        return self.put_many(
+            "track_cache", ("track_id", "payload", "updated_ts"),
+            [(tid, json.dumps(payload, ensure_ascii=False), now) for tid, payload in items],
+        )
 
     # ── Enrichment cache ───────────────────────────────────────────────
 
     def get_enrichment(self, track_id: str, source: str) -> Optional[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute(
-                "SELECT payload FROM enrichment_cache WHERE track_id=? AND source=?",
-                (track_id, source),
-            ).fetchone()
-        if not row:
-            return None
-        try:
-            return json.loads(row[0])
-        except Exception:
-            return None
+        return self._get_payloads("enrichment_cache", [track_id], "source=?", (source,)).get(track_id)
 
     def put_enrichment(self, track_id: str, source: str, payload: Dict[str, Any]) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO enrichment_cache(track_id,source,payload,updated_ts) VALUES(?,?,?,?)",
-                (track_id, source, json.dumps(payload, ensure_ascii=False), time.time()),
-            )
-            conn.commit()
+        self.put_enrichments(source, [(track_id, payload)])
+
+    def enriched_ids(self, track_ids: Iterable[str], source: str) -> set:
+        return set(self.get_many("enrichment_cache", "track_id", track_ids, ("source",), "source=?", (source,)))
+
+    def put_enrichments(self, source: str, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        now = time.time()
+        return self.put_many(
+            "enrichment_cache", ("track_id", "source", "payload", "updated_ts"),
+            [(tid, source, json.dumps(payload, ensure_ascii=False), now) for tid, payload in items],
+        )
 
     # ── Lyrics cache ───────────────────────────────────────────────────
 
     def get_lyrics_analysis(self, track_id: str) -> Optional[Dict[str, Any]]:
-        with sqlite3.connect(self.db_path) as conn:
-            row = conn.execute("SELECT payload FROM lyrics_cache WHERE track_id=?", (track_id,)).fetchone()
-        if not row:
-            return None
-        try:
-            return json.loads(row[0])
-        except Exception:
-            return None
+        return self._get_payloads("lyrics_cache", [track_id]).get(track_id)
 
     def put_lyrics_analysis(self, track_id: str, payload: Dict[str, Any]) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO lyrics_cache(track_id,payload,updated_ts) VALUES(?,?,?)",
-                (track_id, json.dumps(payload, ensure_ascii=False), time.time()),
-            )
-            conn.commit()
+        self.put_lyrics_results([(track_id, payload)])
+
+    def lyrics_done_ids(self, track_ids: Iterable[str], miss_ttl: float = LYRICS_MISS_TTL) -> set:
+        """Track ids that already have an analysis or a recent negative-cache entry."""
+        ids = list(dict.fromkeys(track_ids))
+        done = set(self.get_many("lyrics_cache", "track_id", ids, ("updated_ts",)))
+        done.update(self.get_many("lyrics_misses", "track_id", ids, ("updated_ts",),
+                                  "updated_ts >= ?", (time.time() - miss_ttl,)))
+        return done
+
+    def put_lyrics_results(self, analyses: Iterable[Tuple[str, Dict[str, Any]]], misses: Iterable[str] = ()) -> int:
+        now = time.time()
+        rows = [(tid, json.dumps(payload, ensure_ascii=False), now) for tid, payload in analyses]
+        miss_rows = [(tid, now) for tid in misses]
+
+        def write(conn: sqlite3.Connection) -> None:
+            conn.executemany("INSERT OR REPLACE INTO lyrics_cache(track_id,payload,updated_ts) VALUES(?,?,?)", rows)
+            conn.executemany("DELETE FROM lyrics_misses WHERE track_id=?", [(r[0],) for r in rows])
+            conn.executemany("INSERT OR REPLACE INTO lyrics_misses(track_id,updated_ts) VALUES(?,?)", miss_rows)
+
+        if rows or miss_rows:
+            self.write(write)
+        return len(rows)
+
+    # ── Sync cursors ───────────────────────────────────────────────────
+
+    def get_cursor(self, user_id: str, name: str) -> Optional[str]:
+        row = self.read_one("SELECT value FROM sync_cursors WHERE user_id=? AND name=?", (user_id, name))
+        return row[0] if row else None
+
+    def set_cursor(self, user_id: str, name: str, value: str) -> None:
+        self.execute(
+            "INSERT OR REPLACE INTO sync_cursors(user_id,name,value,updated_ts) VALUES(?,?,?,?)",
+            (user_id, name, value, time.time()),
+        )
@@ -1,6 +1,6 @@
 """
 NOUS Workflows - Automation Engine
 """
-from .engine import run_workflow, Workflow, StepFn
+from .engine import run_workflow, Workflow, Step, StepFn, WorkflowError
 
-__all__ = ["run_workflow", "Workflow", "StepFn"]
+__all__ = ["run_workflow", "Workflow", "Step", "StepFn", "WorkflowError"]
@@ -1,24 +1,42 @@
 from __future__ import annotations
 import time
 from typing import Any, Dict
+
 from flask import current_app
 from services.runtime_service import init_runtime
-from services.workflows.engine import run_workflow
+from services.workflows.engine import Step, run_workflow
+
 
 def _snapshot(state: Dict[str, Any]) -> Dict[str, Any]:
-    rt = init_runtime(current_app)
     try:
         from nous_core.monitoring import snapshot
         snap = snapshot()
     except Exception:
         snap = {"ts": time.time()}
-    rt["store"].append("system.snapshot", snap)
     return {"snapshot": snap}
 
+
 def _rollup(state: Dict[str, Any]) -> Dict[str, Any]:
     rt = init_runtime(current_app)
     recent = rt["store"].recent(limit=200)
     return {"events_last_200": len(recent)}
 
+
+def _record(state: Dict[str, Any]) -> Dict[str, Any]:
+    rt = init_runtime(current_app)
+    event_id = rt["store"].append("system.snapshot", state["snapshot"])
+    return {"snapshot_event_id": event_id}
+
+
+# snapshot (psutil sampling) and rollup (event store read) are independent
+DAILY_STEPS = [
+    Step("snapshot", _snapshot, timeout=30, retries=1),
+    Step("rollup", _rollup, timeout=30, retries=1),
+    Step("record", _record, deps=("snapshot",), timeout=30, retries=2, retry_delay=0.5),
+]
+
+
 def run_daily_workflow() -> Dict[str, Any]:
-    return run_workflow("daily_reset", steps=[_snapshot, _rollup], payload={"ts": time.time()})
+    # A run interrupted within the last hour (deploy, worker restart) is
+    # resumed from its checkpoints instead of starting over.
+    return run_workflow("daily_reset", DAILY_STEPS, payload={"ts": time.time()}, resume=True)
@@ -1,31 +1,322 @@
 from __future__ import annotations
+import asyncio
+import inspect
+import logging
 import time
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from flask import current_app
-from services.runtime_service import init_runtime
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
 
 StepFn = Callable[[Dict[str, Any]], Dict[str, Any]]
 
+DONE_KINDS = ("done",)
+
+
+@dataclass
+class Step:
+    """
+    One node of a workflow DAG.
+    - `deps` name the steps whose outputs this step reads; steps without a
+      path between them run concurrently.
+    - `timeout` bounds each attempt in seconds. Coroutine steps are cancelled;
+      a timed-out thread is abandoned (Python cannot kill it) and its result ignored.
+    - `retries` extra attempts are made after a failure or timeout, waiting
+      `retry_delay * 2**n` seconds before attempt n+1.
+    """
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    retries: int = 0
+    retry_delay: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.deps = tuple(self.deps)
+
+
 @dataclass
 class Workflow:
     name: str
-    steps: List[StepFn]
+    steps: List[Union[Step, StepFn]] = field(default_factory=list)
 
-def _emit(topic: str, payload: Dict[str, Any]) -> None:
-    rt = init_runtime(current_app)
-    rt["bus"].publish(topic, payload)
+    def run(self, payload: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        return run_workflow(self.name, self.steps, payload, **kwargs)
 
-def run_workflow(name: str, steps: List[StepFn], payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    payload = payload or {}
-    _emit("workflow.start", {"name": name, "payload": payload, "ts": time.time()})
-    state = dict(payload)
+
+class WorkflowError(RuntimeError):
+    """A step failed after its retries. Completed steps stay checkpointed, so
+    calling run_workflow again with the same run_id resumes after them."""
+    def __init__(self, name: str, run_id: str, step: str, error: BaseException,
+                 state: Dict[str, Any]):
+        super().__init__(f"workflow {name!r} (run {run_id}) failed at step {step!r}: {error}")
+        self.name = name
+        self.run_id = run_id
+        self.step = step
+        self.error = error
+        self.state = state
+
+
+def _normalize(steps: Sequence[Union[Step, StepFn]]) -> List[Step]:
+    # Bare callables keep the old contract: each one runs after the previous.
+    out: List[Step] = []
+    names = set()
+    prev: Optional[str] = None
     for idx, step in enumerate(steps):
-        out = step(state)
-        if not isinstance(out, dict):
-            out = {"result": out}
-        state.update(out)
-        _emit("workflow.step", {"name": name, "idx": idx, "state": out, "ts": time.time()})
-    _emit("workflow.done", {"name": name, "state": state, "ts": time.time()})
+        if not isinstance(step, Step):
+            name = getattr(step, "__name__", "step")
+            if name in names or name == "<lambda>":
+                name = f"{name}_{idx}"
+            step = Step(name, step, deps=(prev,) if prev else ())
+        if step.name in names:
+            raise ValueError(f"duplicate workflow step {step.name!r}")
+        names.add(step.name)
+        out.append(step)
+        prev = step.name
+    return out
+
+
+def _toposort(steps: List[Step]) -> List[Step]:
+    # Kahn's algorithm, stable in declaration order so merges are deterministic.
+    by_name = {s.name: s for s in steps}
+    for s in steps:
+        for dep in s.deps:
+            if dep not in by_name:
+                raise ValueError(f"step {s.name!r} depends on unknown step {dep!r}")
+    indegree = {s.name: len(set(s.deps)) for s in steps}
+    order: List[Step] = []
+    ready = [s for s in steps if indegree[s.name] == 0]
+    while ready:
+        step = ready.pop(0)
+        order.append(step)
+        for s in steps:
+            if step.name in s.deps:
+                indegree[s.name] -= 1
+                if indegree[s.name] == 0:
+                    ready.append(s)
+    if len(order) != len(steps):
+        cyclic = sorted(n for n, d in indegree.items() if d > 0)
+        raise ValueError(f"workflow steps form a cycle: {cyclic}")
+    return order
+
+
+def _ancestors(order: List[Step]) -> Dict[str, List[str]]:
+    # Every step sees the payload plus its ancestors' outputs, merged in
+    # topological order, whatever order they happened to finish in.
+    anc: Dict[str, set] = {}
+    for s in order:
+        anc[s.name] = set(s.deps).union(*(anc[d] for d in s.deps)) if s.deps else set()
+    return {s.name: [o.name for o in order if o.name in anc[s.name]] for s in order}
+
+
+def _call(fn: Callable[[Dict[str, Any]], Any], state: Dict[str, Any],
+          timeout: Optional[float], app: Any) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    if app is not None:
+        with app.app_context():
+            out = _invoke(fn, state, timeout)
+    else:
+        out = _invoke(fn, state, timeout)
+    return out, time.perf_counter() - start
+
+
+def _invoke(fn: Callable[[Dict[str, Any]], Any], state: Dict[str, Any], timeout: Optional[float]) -> Any:
+    if inspect.iscoroutinefunction(fn):
+        return asyncio.run(asyncio.wait_for(fn(state), timeout))
+    return fn(state)
+
+
+def _resolve_bus(bus: Any) -> Any:
+    if bus is not None:
+        return bus
+    if has_app_context():
+        from services.runtime_service import init_runtime
+        return init_runtime(current_app)["bus"]
+    return None
+
+
+def _topic(name: str, run_id: str, kind: str) -> str:
+    return f"workflow.{name}.{run_id}.{kind}"
+
+
+def _emit(bus: Any, topic: str, payload: Dict[str, Any]) -> None:
+    if bus is None:
+        return
+    try:
+        bus.publish(topic, payload)
+    except Exception as e:
+        logger.warning("Workflow checkpoint %s not written: %s", topic, e)
+
+
+def _load_checkpoint(store: Any, name: str, run_id: str) -> Optional[Dict[str, Any]]:
+    events = store.recent(limit=100000, topic_prefix=f"workflow.{name}.{run_id}.")
+    if not events:
+        return None
+    ckpt: Dict[str, Any] = {"payload": None, "outputs": {}, "step_ms": {}, "done": False}
+    for event in reversed(events):
+        kind = event["topic"].rsplit(".", 1)[-1]
+        data = event["payload"]
+        if kind == "start":
+            ckpt["payload"] = data.get("payload") or {}
+        elif kind == "step":
+            ckpt["outputs"][data["step"]] = data.get("delta") or {}
+            ckpt["step_ms"][data["step"]] = data.get("ms", 0.0)
+        elif kind in DONE_KINDS:
+            ckpt["done"] = True
+    return ckpt
+
+
+def find_incomplete_run(store: Any, name: str, within: float = 3600.0) -> Optional[str]:
+    """run_id of the newest run of `name` that never finished, if it was active in the last `within` seconds."""
+    latest = store.recent(limit=1, topic_prefix=f"workflow.{name}.")
+    if not latest or latest[0]["ts"] < time.time() - within:
+        return None
+    run_id, kind = latest[0]["topic"][len(name) + 10:].rsplit(".", 1)
+    return None if kind in DONE_KINDS else run_id
+
+
+def run_workflow(name: str, steps: Sequence[Union[Step, StepFn]],
+                 payload: Optional[Dict[str, Any]] = None, *,
+                 run_id: Optional[str] = None, resume: bool = False,
+                 resume_within: float = 3600.0, max_workers: int = 4,
+                 bus: Any = None) -> Dict[str, Any]:
+    """
+    Run `steps` as a DAG on a thread pool and return the merged state.
+
+    Progress is checkpointed through the runtime EventBus (and so the
+    EventStore) as one compact event per step carrying only that step's
+    output. Passing the `run_id` of an interrupted run - or resume=True to
+    pick the newest unfinished run of `name` - restores the completed steps
+    from those checkpoints and only runs the rest.
+
+    The returned state carries `_workflow` with the run_id, total and
+    per-step wall-clock milliseconds, and which steps were restored.
+    """
+    order = _toposort(_normalize(steps))
+    ancestors = _ancestors(order)
+    bus = _resolve_bus(bus)
+    store = getattr(bus, "store", None)
+    app = current_app._get_current_object() if has_app_context() else None  # type: ignore[attr-defined]
+
+    if run_id is None and resume and store is not None:
+        run_id = find_incomplete_run(store, name, resume_within)
+    ckpt = _load_checkpoint(store, name, run_id) if run_id and store is not None else None
+    run_id = run_id or uuid.uuid4().hex[:12]
+
+    outputs: Dict[str, Dict[str, Any]] = {}
+    step_ms: Dict[str, float] = {}
+    if ckpt is not None:
+        payload = ckpt["payload"] if ckpt["payload"] is not None else (payload or {})
+        known = {s.name for s in order}
+        outputs = {k: v for k, v in ckpt["outputs"].items() if k in known}
+        step_ms = {k: v for k, v in ckpt["step_ms"].items() if k in known}
+    payload = dict(payload or {})
+    restored = list(outputs)
+
+    started = time.perf_counter()
+    if ckpt is None or ckpt["payload"] is None:
+        _emit(bus, _topic(name, run_id, "start"), {"run_id": run_id, "payload": payload})
+
+    failure: Optional[Tuple[str, BaseException]] = None
+    pending = [s for s in order if s.name not in outputs]
+    if pending and not (ckpt and ckpt["done"]):
+        failure = _execute(name, run_id, pending, ancestors, payload, outputs, step_ms,
+                           max_workers, app, bus)
+
+    state = dict(payload)
+    for s in order:
+        state.update(outputs.get(s.name, {}))
+    state["_workflow"] = {
+        "run_id": run_id,
+        "ms": round((time.perf_counter() - started) * 1000.0, 3),
+        "step_ms": {s.name: step_ms[s.name] for s in order if s.name in step_ms},
+        "restored": restored,
+    }
+
+    if failure is not None:
+        step, error = failure
+        _emit(bus, _topic(name, run_id, "failed"), {"run_id": run_id, "step": step, "error": str(error)})
+        raise WorkflowError(name, run_id, step, error, state)
+    if not (ckpt and ckpt["done"]):
+        _emit(bus, _topic(name, run_id, "done"),
+              {"run_id": run_id, "ms": state["_workflow"]["ms"], "step_ms": state["_workflow"]["step_ms"]})
     return state
+
+
+def _execute(name: str, run_id: str, pending: List[Step], ancestors: Dict[str, List[str]],
+             payload: Dict[str, Any], outputs: Dict[str, Dict[str, Any]], step_ms: Dict[str, float],
+             max_workers: int, app: Any, bus: Any) -> Optional[Tuple[str, BaseException]]:
+    attempts: Dict[str, int] = {}
+    ready_at: Dict[str, float] = {}
+    running: Dict[Future, Tuple[Step, float]] = {}
+    failure: Optional[Tuple[str, BaseException]] = None
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=f"workflow-{name}")
+
+    def _fail(step: Step, error: BaseException, now: float) -> Optional[Tuple[str, BaseException]]:
+        attempts[step.name] = attempts.get(step.name, 0) + 1
+        logger.warning("Workflow %s step %s attempt %d failed: %s", name, step.name, attempts[step.name], error)
+        if attempts[step.name] <= step.retries:
+            ready_at[step.name] = now + step.retry_delay * (2 ** (attempts[step.name] - 1))
+            pending.append(step)
+            return None
+        return (step.name, error)
+
+    try:
+        while pending or running:
+            now = time.monotonic()
+            if failure is None:
+                for step in list(pending):
+                    if ready_at.get(step.name, 0.0) <= now and all(d in outputs for d in step.deps):
+                        pending.remove(step)
+                        state = dict(payload)
+                        for anc in ancestors[step.name]:
+                            state.update(outputs[anc])
+                        fut = pool.submit(_call, step.fn, state, step.timeout, app)
+                        deadline = now + step.timeout if step.timeout else float("inf")
+                        running[fut] = (step, deadline)
+            elif not running:
+                break
+
+            if not running:
+                if not pending:
+                    break
+                time.sleep(max(0.0, min(ready_at.get(s.name, now) for s in pending) - now))
+                continue
+
+            # Once a step has failed nothing else is started, so queued retries
+            # must not wake the loop or it spins until the running steps finish
+            retry_wakes = [] if failure is not None else [ready_at[s.name] for s in pending if s.name in ready_at]
+            wake = min([d for _, d in running.values()] + retry_wakes)
+            done, _ = wait(list(running), timeout=None if wake == float("inf") else max(0.0, wake - now),
+                           return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for fut in done:
+                step, _deadline = running.pop(fut)
+                try:
+                    out, elapsed = fut.result()
+                except BaseException as e:  # noqa: B902 - step errors are data here
+                    if isinstance(e, asyncio.TimeoutError):
+                        e = TimeoutError(f"step {step.name!r} timed out after {step.timeout}s")
+                    failure = failure or _fail(step, e, now)
+                    continue
+                if not isinstance(out, dict):
+                    out = {"result": out}
+                outputs[step.name] = out
+                step_ms[step.name] = round(elapsed * 1000.0, 3)
+                _emit(bus, _topic(name, run_id, "step"), {
+                    "run_id": run_id, "step": step.name, "delta": out,
+                    "ms": step_ms[step.name], "attempts": attempts.get(step.name, 0) + 1,
+                })
+            for fut, (step, deadline) in list(running.items()):
+                if deadline <= now:
+                    running.pop(fut)
+                    fut.cancel()
+                    failure = failure or _fail(
+                        step, TimeoutError(f"step {step.name!r} timed out after {step.timeout}s"), now)
+    finally:
+        pool.shutdown(wait=False)
+    return failure
@@ -1,6 +1,4 @@
 import gc
-import threading
-import time
 import logging
 import psutil
 import os
@@ -93,39 +91,47 @@ class MemoryManager:
     
     def periodic_cleanup(self):
         """Run periodic cleanup tasks"""
-        while self.running:
-            try:
-                time.sleep(self.cleanup_interval)
-                
-                if not self.running:
-                    break
-                
-                logger.info("Running periodic cleanup")
-                
-                # Check memory pressure
-                self.check_memory_pressure()
-                
-                # Regular cleanup
-                self.cleanup_old_sessions()
-                
-                # Log memory stats
-                memory = self.get_memory_usage()
-                logger.info(f"Memory usage: {memory['rss_mb']:.1f}MB ({memory['percent']:.1f}%)")
-                
-            except Exception as e:
-                logger.error(f"Periodic cleanup error: {e}")
+        try:
+            logger.info("Running periodic cleanup")
+            
+            # Check memory pressure
+            self.check_memory_pressure()
+            
+            # Regular cleanup
+            self.cleanup_old_sessions()
+            
+            # Log memory stats
+            memory = self.get_memory_usage()
+            logger.info(f"Memory usage: {memory['rss_mb']:.1f}MB ({memory['percent']:.1f}%)")
+            
+        except Exception as e:
+            logger.error(f"Periodic cleanup error: {e}")
     
     def start_cleanup_thread(self):
-        """Start the cleanup background thread"""
+        """Schedule periodic cleanup on the shared scheduler thread
+        
+        Memory is per process, so this job runs in every worker (jittered)
+        rather than only in the scheduler's leader.
+        """
         if not self.running:
+            from services.scheduler_service import get_scheduler
+            
             self.running = True
-            thread = threading.Thread(target=self.periodic_cleanup, daemon=True)
-            thread.start()
+            scheduler = get_scheduler()
+            scheduler.add_job('memory_manager.cleanup', self.periodic_cleanup,
+                              interval=self.cleanup_interval, jitter=self.cleanup_interval * 0.1,
+                              leader_only=False)
+            # Runs once a worker starts the scheduler (see ensure_running), not
+            # in a preloading master that imported this module
+            scheduler.start(lazy=True)
             logger.info("Memory manager started")
     
     def stop_cleanup_thread(self):
-        """Stop the cleanup thread"""
+        """Stop the cleanup job"""
+        from services.scheduler_service import get_scheduler
+        
         self.running = False
+        get_scheduler().remove_job('memory_manager.cleanup')
         logger.info("Memory manager stopped")
 
 # Global memory manager instance
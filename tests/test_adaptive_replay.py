@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from nous_core.replay import PrioritizedReplay, SumTree
+from utils.adaptive_ai_system import (
+    Experience,
+    ExperienceReplaySystem,
+    UserProfile,
+    UserProfileCache,
+)
+
+
+def _experience(user_id, reward, i=0):
+    return Experience(timestamp=float(i), user_context={"user_id": user_id} if user_id else {},
+                      action_taken=i % 5, reward=reward, outcome_state={"i": i})
+
+
+def test_sum_tree_totals_and_proportional_find():
+    rng = np.random.default_rng(7)
+    tree = SumTree(300, initial=4)
+    priorities = rng.random(300) + 0.01
+    for slot, p in enumerate(priorities):
+        tree.update(slot, p)
+    tree.update(5, 3.0)
+    priorities[5] = 3.0
+    assert tree.total == pytest.approx(priorities.sum())
+
+    slots = tree.find(rng.random(200000) * tree.total)
+    freq = np.bincount(slots, minlength=300) / len(slots)
+    assert np.abs(freq - priorities / priorities.sum()).max() < 0.003
+    with pytest.raises(IndexError):
+        tree.update(300, 1.0)
+
+
+def test_ring_evicts_oldest_and_samples_without_duplicates():
+    buf = PrioritizedReplay(8, rng=np.random.default_rng(1))
+    for i in range(20):
+        buf.add(i, 1.0 + i, tag=i % 2)
+    assert len(buf) == 8
+    assert buf.items() == list(range(12, 20))
+    assert [item for _, item in buf.recent(3)] == [17, 18, 19]
+    assert sorted(buf.sample(8)) == list(range(12, 20))
+    assert sorted(buf.sample(10, exclude_tag=1)) == [12, 14, 16, 18]
+    assert buf.total == pytest.approx(sum(1.0 + i for i in range(12, 20)))
+
+
+def test_replay_prefers_high_reward_and_splits_user_and_global():
+    replay = ExperienceReplaySystem(capacity=500, user_capacity=50)
+    for i in range(400):
+        replay.store_experience(_experience(f"u{i % 4}", 2.0 if i % 10 == 0 else -1.0, i))
+    batch = replay.sample_experiences(20)
+    assert len(batch) == 20 and len({id(e) for e in batch}) == 20
+    assert sum(e.reward == 2.0 for e in batch) > 5  # 10% of the buffer, most of the mass
+
+    mixed = replay.sample_experiences(10, user_id="u1")
+    own = [e for e in mixed if e.user_context["user_id"] == "u1"]
+    assert len(own) == 7 and len(mixed) == 10
+    assert len(replay.user_experiences["u1"]) == 50
+    assert len(replay) == 400 and replay.experiences[0].timestamp == 0.0
+
+
+def test_user_buffers_are_lru_capped_and_feedback_reprioritizes():
+    replay = ExperienceReplaySystem(capacity=100, max_users=3)
+    for i in range(10):
+        replay.store_experience(_experience(f"u{i}", 0.0, i))
+    assert list(replay.user_experiences) == ["u7", "u8", "u9"]
+
+    before = replay.buffer.priority(9)
+    latest = replay.record_feedback("u9", 1.0)
+    assert latest is not None and latest.user_feedback == 1.0
+    assert replay.buffer.priority(9) > before
+    assert replay.record_feedback("nobody", 1.0) is None
+
+
+def test_negative_feedback_keeps_priority_real_and_positive():
+    replay = ExperienceReplaySystem(capacity=10)
+    replay.store_experience(_experience("u", -1.0))
+    assert replay.record_feedback("u", -2.0) is not None
+    priority = replay.buffer.priority(0)
+    assert isinstance(priority, float) and priority > 0.0
+    assert replay.sample_experiences(2, user_id="u")[0].user_feedback == -2.0
+
+
+def test_profile_cache_spills_and_reloads(tmp_path):
+    cache = UserProfileCache(max_profiles=8, db_path=str(tmp_path / "profiles.db"))
+    for i in range(20):
+        cache[f"u{i}"] = UserProfile(user_id=f"u{i}", interaction_patterns={"n": i},
+                                     preference_weights={"accuracy": 1.0})
+    assert len(cache) <= 8 and cache.spilled >= 12
+    profile = cache["u0"]
+    assert profile.interaction_patterns == {"n": 0} and profile.preference_weights == {"accuracy": 1.0}
+    assert "u3" in cache and "missing" not in cache
+    assert len(cache) <= 8
@@ -0,0 +1,102 @@
+import importlib.util
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from utils.analytics_service import _coalesce_events
+
+MIGRATION = Path(__file__).resolve().parent.parent / "migrations" / "versions" / "003_activity_rollups.py"
+
+ACTIVITIES = [
+    (1, "chat", "social", {"value": 4}, 30, datetime(2026, 1, 1, 9)),
+    (1, "chat", "social", {"rating": 2.5}, 10, datetime(2026, 1, 1, 22)),
+    (1, "chat", None, None, 0, datetime(2026, 1, 2, 8)),
+    (2, "mood", "health", {"mood": 7, "value": True}, 0, datetime(2026, 1, 1, 12)),
+    (2, "mood", "health", {}, 5, None),
+]
+
+
+def _migration():
+    spec = importlib.util.spec_from_file_location("migration_003", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _upgrade(engine):
+    with engine.begin() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            _migration().upgrade()
+
+
+def _legacy_db(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+        conn.exec_driver_sql(
+            "CREATE TABLE user_activities (id INTEGER PRIMARY KEY, user_id INTEGER, activity_type TEXT, "
+            "activity_category TEXT, activity_data JSON, duration_seconds INTEGER, timestamp DATETIME, "
+            "session_id TEXT)")
+        conn.exec_driver_sql(
+            "CREATE TABLE user_metrics (id INTEGER PRIMARY KEY, user_id INTEGER, metric_type TEXT, "
+            "metric_date DATE, tasks_completed INTEGER, tasks_created INTEGER, chat_sessions INTEGER, "
+            "total_chat_time INTEGER, mood_entries INTEGER, mood_average FLOAT, workout_sessions INTEGER, "
+            "app_sessions INTEGER, total_app_time INTEGER, features_used JSON, custom_metrics JSON)")
+        conn.execute(sa.text(
+            "INSERT INTO user_activities(user_id, activity_type, activity_category, activity_data, "
+            "duration_seconds, timestamp) VALUES (:u, :t, :c, :d, :s, :ts)"),
+            [{"u": u, "t": t, "c": c, "d": json.dumps(d) if d is not None else None, "s": s,
+              "ts": ts.isoformat(sep=" ") if ts else None} for u, t, c, d, s, ts in ACTIVITIES])
+    return engine
+
+
+def test_upgrade_backfills_rollups_like_the_service(tmp_path):
+    engine = _legacy_db(tmp_path)
+    _upgrade(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text(
+            "SELECT user_id, day, activity_type, activity_category, count, duration_seconds, value_sum, "
+            "value_count FROM user_activity_rollups ORDER BY user_id, day, activity_category")).all()
+    expected, _ = _coalesce_events([
+        {"user_id": u, "activity_type": t, "activity_category": c, "activity_data": d,
+         "duration_seconds": s, "timestamp": ts}
+        for u, t, c, d, s, ts in ACTIVITIES if ts is not None
+    ])
+    expected = sorted((r["user_id"], r["day"].isoformat(), r["activity_type"], r["activity_category"],
+                       r["count"], r["duration_seconds"], r["value_sum"], r["value_count"]) for r in expected)
+    assert [tuple(row) for row in rows] == expected
+
+
+def test_upgrade_merges_duplicate_daily_metrics(tmp_path):
+    engine = _legacy_db(tmp_path)
+    insert = sa.text(
+        "INSERT INTO user_metrics(id, user_id, metric_type, metric_date, tasks_completed, chat_sessions, "
+        "mood_entries, mood_average, features_used, custom_metrics) "
+        "VALUES (:id, :u, 'daily', :d, :tasks, :chats, :moods, :avg, :features, :custom)")
+    with engine.begin() as conn:
+        conn.execute(insert, [
+            {"id": 1, "u": 1, "d": "2026-01-01", "tasks": 2, "chats": None, "moods": 1, "avg": 4.0,
+             "features": json.dumps(["chat"]), "custom": json.dumps({"streak": 3, "theme": "dark"})},
+            {"id": 2, "u": 1, "d": "2026-01-01", "tasks": 3, "chats": 1, "moods": 3, "avg": 8.0,
+             "features": json.dumps(["chat", "tasks"]), "custom": json.dumps({"streak": 1, "theme": "light"})},
+            {"id": 3, "u": 1, "d": "2026-01-02", "tasks": 5, "chats": 0, "moods": 0, "avg": None,
+             "features": None, "custom": None},
+        ])
+    _upgrade(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text(
+            "SELECT id, tasks_completed, chat_sessions, mood_entries, mood_average, features_used, "
+            "custom_metrics FROM user_metrics ORDER BY id")).all()
+        with pytest.raises(sa.exc.IntegrityError):
+            conn.execute(insert, {"id": 4, "u": 1, "d": "2026-01-02", "tasks": 1, "chats": 0, "moods": 0,
+                                  "avg": None, "features": None, "custom": None})
+    assert [row[:5] for row in rows] == [(1, 5, 1, 4, 7.0), (3, 5, 0, 0, None)]
+    assert json.loads(rows[0][5]) == ["chat", "tasks"]
+    assert json.loads(rows[0][6]) == {"streak": 4, "theme": "dark"}
@@ -0,0 +1,213 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from models.database import db
+from utils.analytics_service import ActivityBuffer, AnalyticsService
+
+
+@pytest.fixture
+def app(tmp_path):
+    from models import analytics_models as am
+    from models.user import User
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'analytics.db'}"
+    db.init_app(app)
+    with app.app_context():
+        tables = [User.__table__] + [model.__table__ for model in (
+            am.UserActivity, am.UserActivityRollup, am.UserMetrics, am.UserInsight, am.UserGoals)]
+        db.metadata.create_all(db.engine, tables=tables)
+        db.session.add(User(id=1, username="u", email="u@example.com"))
+        db.session.commit()
+        AnalyticsService._invalidate_dashboard()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def service(app):
+    return AnalyticsService(db, write_behind=False)
+
+
+@pytest.fixture
+def buffered(app):
+    buffer = ActivityBuffer(max_events=1000, flush_interval=60)
+    yield AnalyticsService(db, write_behind=True, buffer=buffer)
+    buffer.flush()
+
+
+def test_track_activity_maintains_rollups(service):
+    from models.analytics_models import UserActivityRollup
+
+    for _ in range(3):
+        service.track_activity(1, "chat", "social", duration_seconds=60)
+    service.track_activity(1, "mood", "health", {"rating": 6})
+    service.track_activity(1, "mood", "health", {"rating": 8})
+    service.track_activity(1, "login")
+
+    rows = {(r.activity_type, r.activity_category): r for r in UserActivityRollup.query.all()}
+    assert rows[("chat", "social")].count == 3
+    assert rows[("chat", "social")].duration_seconds == 180
+    assert rows[("mood", "health")].value_sum == 14 and rows[("mood", "health")].value_count == 2
+    assert rows[("login", "")].count == 1
+
+
+def test_dashboard_from_rollups_matches_raw_rebuild(service):
+    service.track_activity(1, "task_completed", "productivity", duration_seconds=600)
+    service.track_activity(1, "workout", "health")
+    service.track_activity(1, "mood", "health", {"mood": 7})
+    service.track_activity(1, "login")
+
+    dashboard = service.get_user_analytics_dashboard(1, days=7)
+    assert dashboard["activity_summary"]["total_activities"] == 4
+    assert dashboard["activity_summary"]["by_category"] == {"productivity": 1, "health": 2}
+    assert dashboard["productivity_metrics"]["tasks_completed"] == 1
+    assert dashboard["health_metrics"]["workouts_logged"] == 1
+    assert dashboard["health_metrics"]["avg_mood"] == 7
+    assert dashboard["engagement_metrics"]["current_streak"] == 1
+    assert dashboard["trends"]["productivity"] == [{"date": date.today().isoformat(), "tasks": 1, "active_time": 10}]
+
+    # A rebuild from the raw table produces the same rollups, and so the same dashboard
+    assert service.rebuild_rollups(date.today() - timedelta(days=7), date.today(), user_id=1) == 4
+    rebuilt = service.get_user_analytics_dashboard(1, days=7)
+    for key in ("activity_summary", "productivity_metrics", "health_metrics", "engagement_metrics", "trends"):
+        assert rebuilt[key] == dashboard[key]
+
+
+def test_dashboard_cache_is_invalidated_by_writes(service):
+    service.track_activity(1, "chat")
+    first = service.get_user_analytics_dashboard(1)
+    first["activity_summary"]["total_activities"] = 999  # callers get copies
+    assert service.get_user_analytics_dashboard(1)["activity_summary"]["total_activities"] == 1
+
+    service.track_activity(1, "chat")
+    assert service.get_user_analytics_dashboard(1)["activity_summary"]["total_activities"] == 2
+
+    insight = service.generate_ai_insight(1, "pattern", "Evenings", "Most chats happen after 9pm")
+    assert insight["content"] == "Most chats happen after 9pm"
+    assert [i["title"] for i in service.get_user_analytics_dashboard(1)["insights"]] == ["Evenings"]
+
+
+def test_goals_and_activity_range(service):
+    from models.analytics_models import UserActivity, UserGoals
+
+    db.session.add(UserGoals(user_id=1, goal_type="health", title="Walk", target_value=10, current_value=4))
+    db.session.add(UserGoals(user_id=1, goal_type="health", title="Old", status="completed"))
+    db.session.add(UserActivity(user_id=1, activity_type="chat", timestamp=datetime.utcnow() - timedelta(days=40)))
+    db.session.commit()
+    service.track_activity(1, "chat")
+
+    goals = service.get_user_analytics_dashboard(1)["goals_progress"]
+    assert [(g["title"], g["progress_percent"]) for g in goals] == [("Walk", 40.0)]
+    assert len(service.get_user_activities(1, days=30)) == 1
+    assert len(service.get_user_activities(1, days=60)) == 2
+
+
+def test_daily_metrics_are_upserted(service):
+    from models.analytics_models import UserMetrics
+
+    service.track_activity(1, "chat", "social", duration_seconds=30)
+    service.track_activity(1, "chat", "social", duration_seconds=30)
+    service.track_activity(1, "mood", "health", {"rating": 4})
+    service.track_activity(1, "mood", "health", {"rating": 5})
+
+    metric = UserMetrics.query.one()
+    assert (metric.chat_sessions, metric.total_chat_time, metric.mood_entries) == (2, 60, 2)
+    assert metric.features_used == ["health", "social"]
+    assert metric.mood_average == 4.5
+
+
+def test_buffered_events_are_coalesced_into_one_flush(buffered):
+    from models.analytics_models import UserActivity, UserActivityRollup, UserMetrics
+
+    results = [buffered.track_activity(1, "chat", "social", duration_seconds=5) for _ in range(50)]
+    results.append(buffered.track_activity(1, "task_completed", "productivity"))
+    assert results[0]["id"] is None
+    assert UserActivity.query.count() == 0
+    stats = buffered.buffer.stats()
+    assert stats["pending"] == 51 and stats["pending_age_ms"] >= 0
+
+    assert buffered.buffer.flush() == 51
+    assert UserActivity.query.count() == 51
+    assert {r.activity_type: r.count for r in UserActivityRollup.query.all()} == {"chat": 50, "task_completed": 1}
+    metric = UserMetrics.query.one()
+    assert (metric.chat_sessions, metric.total_chat_time, metric.tasks_completed) == (50, 250, 1)
+
+    stats = buffered.buffer.stats()
+    assert stats["pending"] == 0 and stats["flushes"] == 1
+    assert stats["last_batch_size"] == stats["avg_batch_size"] == 51
+    assert stats["last_flush_lag_ms"] > 0
+
+
+def test_buffer_flushes_on_size_in_background(app):
+    from models.analytics_models import UserActivity
+
+    buffer = ActivityBuffer(max_events=10, flush_interval=60)
+    service = AnalyticsService(db, write_behind=True, buffer=buffer)
+    for _ in range(25):
+        service.track_activity(1, "login")
+    deadline = time.monotonic() + 5
+    while buffer.stats()["events_flushed"] < 20 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert buffer.stats()["events_flushed"] >= 20
+    buffer.flush()
+    assert UserActivity.query.count() == 25
+
+
+def test_failed_flush_keeps_events_for_retry(buffered, monkeypatch):
+    import utils.analytics_service as analytics
+
+    buffered.track_activity(1, "chat")
+    monkeypatch.setattr(analytics, "_apply_events", lambda conn, events: 1 / 0)
+    assert buffered.buffer.flush() == 0
+    stats = buffered.buffer.stats()
+    assert stats["flush_errors"] == 1 and stats["pending"] == 1
+    monkeypatch.undo()
+    assert buffered.buffer.flush() == 1
+
+
+def test_bad_event_is_isolated_and_dead_lettered(buffered):
+    from models.analytics_models import UserActivity
+
+    buffered.track_activity(1, "chat", activity_data={"bad": object()})
+    for _ in range(5):
+        buffered.track_activity(1, "chat", activity_data={"ok": True})
+    buffer = buffered.buffer
+    assert buffer.flush() == 5
+    assert buffer.stats()["pending"] == 1
+    assert buffer.flush() == 0 and buffer.flush() == 0
+    stats = buffer.stats()
+    assert stats["pending"] == 0 and stats["events_dead_lettered"] == 1
+    assert UserActivity.query.count() == 5
+
+
+def test_only_lock_and_connection_errors_are_transient():
+    import sqlite3
+
+    from sqlalchemy.exc import OperationalError
+
+    from utils.analytics_service import _is_transient
+
+    def error(message):
+        return OperationalError("INSERT ...", {}, sqlite3.OperationalError(message))
+
+    assert _is_transient(error("database is locked"))
+    assert _is_transient(error("server closed the connection unexpectedly"))
+    assert not _is_transient(error("no such table: user_activity_rollups"))
+    assert not _is_transient(error("no such column: value_sum"))
+    assert not _is_transient(ValueError("bad event"))
+
+
+def test_schema_errors_are_dead_lettered_not_retried_forever(buffered):
+    buffered.track_activity(1, "chat")
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE user_activity_rollups")
+    buffer = buffered.buffer
+    for _ in range(buffer.max_attempts):
+        assert buffer.flush() == 0
+    stats = buffer.stats()
+    assert stats["pending"] == 0 and stats["events_dead_lettered"] == 1
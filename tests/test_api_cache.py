@@ -0,0 +1,76 @@
+import threading
+import time
+
+from flask import Flask, jsonify
+
+import utils.api_cache as api_cache
+from utils.api_cache import APICache, MemoryCache, cached
+
+
+def test_memory_cache_lru_and_size_bounds():
+    cache = MemoryCache(max_entries=3, max_bytes=0)
+    for k in "abc":
+        cache.set(k, k.upper())
+    assert cache.get("a") == "A"  # 'a' becomes most recently used
+    cache.set("d", "D")
+    assert cache.get("b") is None
+    assert {k: cache.get(k) for k in "acd"} == {"a": "A", "c": "C", "d": "D"}
+    assert cache.stats()["evictions"] == 1
+
+    small = MemoryCache(max_entries=0, max_bytes=2000)
+    for i in range(50):
+        small.set(f"k{i}", "x" * 200)
+    assert 0 < small.stats()["bytes"] <= 2000
+    assert small.get("k49") == "x" * 200 and small.get("k0") is None
+
+
+def test_memory_cache_expires_without_reads():
+    cache = MemoryCache()
+    for i in range(100):
+        cache.set(f"old{i}", i, ttl=0.01)
+    time.sleep(0.02)
+    cache.set("fresh", 1, ttl=60)
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["expirations"] == 100
+
+
+def test_memory_cache_concurrent_writes():
+    cache = MemoryCache(max_entries=500)
+
+    def worker(n):
+        for i in range(2000):
+            cache.set(f"{n}:{i % 700}", i)
+            cache.get(f"{n}:{(i * 7) % 700}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.stats()["entries"] == 500
+
+
+def test_cached_stale_while_revalidate(monkeypatch):
+    monkeypatch.setattr(api_cache, "_api_cache", APICache(MemoryCache()))
+    app = Flask(__name__)
+    calls = []
+
+    @app.route("/data")
+    @cached(ttl=0.05, key_prefix="swr", stale_ttl=60)
+    def data():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    client = app.test_client()
+    r = client.get("/data")
+    assert r.headers["X-Cache"] == "MISS" and r.get_json() == {"n": 1}
+    assert client.get("/data").headers["X-Cache"] == "HIT"
+    time.sleep(0.06)
+    r = client.get("/data")
+    assert r.headers["X-Cache"] == "STALE" and r.get_json() == {"n": 1}
+    for _ in range(100):
+        if len(calls) == 2 and not api_cache._refreshing:
+            break
+        time.sleep(0.01)
+    r = client.get("/data")
+    assert r.headers["X-Cache"] == "HIT" and r.get_json() == {"n": 2}
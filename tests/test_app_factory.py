@@ -53,3 +53,18 @@ def test_app_starts_without_errors():
         response = client.get('/api/health')
         # Should return 200 or at least not crash
         assert response.status_code in [200, 404], f"Health check failed with status {response.status_code}"
+
+
+def test_response_compression_is_installed():
+    """create_app wraps the WSGI app in the streaming compression middleware."""
+    app = create_app()
+    middleware = app.extensions["compression"]["middleware"]
+    assert app.wsgi_app is middleware
+
+
+def test_model_mappers_configure():
+    """Every model create_app imports maps cleanly; one broken relationship breaks all ORM queries."""
+    from sqlalchemy.orm import configure_mappers
+
+    create_app()
+    configure_mappers()
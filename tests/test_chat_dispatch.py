@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+
+from core.chat.dispatcher import ChatDispatcher
+from core.chat.handler_registry import HandlerRegistry
+from services.runtime_service import BackgroundLoop
+
+
+def _write_codegraph(path, names):
+    path.write_text(json.dumps({"chat_handlers": [{"function": n, "file": "x.py"} for n in names]}))
+
+
+def test_codegraph_reloads_only_when_changed(tmp_path):
+    cg = tmp_path / "codegraph.json"
+    _write_codegraph(cg, ["cmd_weather"])
+    reg = HandlerRegistry(codegraph_path=str(cg))
+
+    def manual(message, context):
+        return "manual"
+
+    reg.register_handler(["ping"], manual)
+    assert reg.reload_if_changed() is False
+
+    _write_codegraph(cg, ["cmd_spotify", "handle_mood"])
+    st = os.stat(cg)
+    os.utime(cg, (st.st_atime, st.st_mtime + 5))
+    assert reg.reload_if_changed() is True
+    assert set(reg.handlers) == {"cmd_spotify", "handle_mood", "manual"}
+
+
+def test_background_loop_is_reused_across_dispatches(tmp_path):
+    disp = ChatDispatcher()
+    disp.registry = HandlerRegistry(codegraph_path=str(tmp_path / "missing.json"))
+    threads = []
+
+    def ping(message, context):
+        threads.append(threading.current_thread().name)
+        return f"pong {context['n']}"
+
+    disp.registry.register_handler(["ping"], ping)
+    loop = BackgroundLoop()
+    results = [loop.run(disp.dispatch("ping", {"n": i}), timeout=5) for i in range(3)]
+    assert [r["response"] for r in results] == ["pong 0", "pong 1", "pong 2"]
+    assert "nous-runtime-loop" not in threads  # sync handlers leave the loop free
+    assert loop._ensure() is loop._ensure()
+    loop.stop()
+
+
+def _legacy_find(reg, message):
+    message_lower = message.lower().strip()
+    best, best_score = None, 0
+    for handler_info in reg.handlers.values():
+        score = reg._calculate_match_score(message_lower, handler_info['intent_patterns'])
+        if score > best_score:
+            best, best_score = handler_info, score
+    return best
+
+
+def test_indexed_matcher_matches_legacy_scoring(tmp_path):
+    import random
+
+    rng = random.Random(7)
+    words = ["play", "music", "mood", "log", "weather", "spotify", "journal", "help", "sleep", "dbt"]
+    reg = HandlerRegistry(codegraph_path=str(tmp_path / "missing.json"))
+    for i in range(300):
+        name = rng.choice(["cmd_", "handle_", "chat_"]) + "_".join(rng.sample(words, rng.randint(1, 2))) + f"_{i % 7}"
+        reg.register_handler_from_codegraph({"function": name, "type": "command"})
+    messages = [" ".join(rng.choice(words + [f"{w}_{n}" for w in words for n in range(7)])
+                         for _ in range(rng.randint(1, 5))) for _ in range(300)]
+    messages += ["/play_music_3", "PLAY MUSIC 3", "", "nothing relevant here"]
+    for message in messages:
+        assert reg.find_handler(message) is _legacy_find(reg, message), message
@@ -0,0 +1,223 @@
+import gzip
+import json
+import zlib
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from extensions.compression import (
+    CompressionMiddleware,
+    CompressorContexts,
+    get_compression_stats,
+    init_compression,
+    negotiate_encoding,
+)
+
+PAYLOAD = {"items": [{"id": i, "name": f"item-{i}", "tags": ["mood", "journal"]} for i in range(200)]}
+
+
+def _app():
+    app = Flask(__name__)
+
+    @app.route("/big")
+    def big():
+        return jsonify(PAYLOAD)
+
+    @app.route("/small")
+    def small():
+        return jsonify(ok=True)
+
+    @app.route("/png")
+    def png():
+        return Response(b"\x89PNG" + b"\0" * 4096, mimetype="image/png")
+
+    @app.route("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 4096), mimetype="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.route("/stream")
+    def stream():
+        def events():
+            for i in range(3):
+                app.config["yielded"] = i
+                yield f"data: {json.dumps({'n': i, 'pad': 'x' * 400})}\n\n"
+        return Response(events(), mimetype="text/event-stream")
+
+    init_compression(app)
+    return app
+
+
+def test_negotiation_honours_q_values_and_preference():
+    available = ["zstd", "br", "gzip"]
+    assert negotiate_encoding("gzip, deflate, br, zstd", available) == "zstd"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate_encoding("*;q=0.2, zstd;q=0", available) == "br"
+    assert negotiate_encoding("identity", available) is None
+    assert negotiate_encoding("br", ["gzip"]) is None
+    assert negotiate_encoding("", available) is None
+
+
+def test_large_json_is_gzipped():
+    client = _app().test_client()
+    r = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["Vary"]
+    assert json.loads(gzip.decompress(r.data)) == PAYLOAD
+
+    plain = client.get("/big")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_json() == PAYLOAD
+
+
+@pytest.mark.parametrize("path", ["/small", "/png", "/encoded"])
+def test_skips_small_binary_and_encoded_bodies(path):
+    client = _app().test_client()
+    r = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert r.headers.get("Content-Encoding") in (None, "gzip")
+    if path == "/encoded":
+        assert gzip.decompress(r.data) == b"x" * 4096
+    else:
+        assert "Content-Encoding" not in r.headers
+
+
+def test_streaming_response_stays_streaming():
+    app = _app()
+    r = app.test_client().get("/stream", headers={"Accept-Encoding": "gzip"}, buffered=False)
+    assert r.headers["Content-Encoding"] == "gzip"
+    body = r.response
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first = decoder.decompress(next(iter(body)))
+    # The first event is fully decodable before the generator produced the second
+    assert first.startswith(b"data: ") and first.endswith(b"\n\n")
+    assert app.config["yielded"] == 0
+    rest = b"".join(decoder.decompress(chunk) for chunk in body)
+    r.close()
+    assert (first + rest).count(b"data: ") == 3
+
+
+def test_stats_and_context_reuse():
+    app = _app()
+    client = app.test_client()
+    for _ in range(3):
+        client.get("/big", headers={"Accept-Encoding": "gzip"}).close()  # as a WSGI server does
+    with app.app_context():
+        stats = get_compression_stats()
+    assert stats["total_compressions"] == 3
+    assert stats["total_bytes_saved"] > 0
+    assert stats["compressions_by_encoding"]["gzip"] == 3
+
+
+def test_zstd_context_is_reused_per_thread():
+    zstd = pytest.importorskip("zstandard")
+    contexts = CompressorContexts()
+    first = contexts.stream("zstd")
+    data = first.compress(b"hello " * 100, flush=True) + first.finish()
+    first.release()
+    reused = contexts._local.zstd
+    second = contexts.stream("zstd")
+    concurrent = contexts.stream("zstd")  # second is still open on this thread
+    assert contexts._local.zstd is reused
+    assert concurrent.finish() and second.finish()
+    assert zstd.ZstdDecompressor().decompressobj().decompress(data) == b"hello " * 100
+
+
+def _wsgi(body_chunks, headers, lazy=False):
+    def app(environ, start_response):
+        def body():
+            if lazy:
+                start_response("200 OK", headers)
+            yield from body_chunks
+        if not lazy:
+            start_response("200 OK", headers)
+        return body()
+    return app
+
+
+def _call(middleware, accept="gzip"):
+    sent = {}
+
+    def start_response(status, headers, exc_info=None):
+        sent["headers"] = dict(headers)
+        return lambda data: None
+    result = middleware({"REQUEST_METHOD": "GET", "HTTP_ACCEPT_ENCODING": accept}, start_response)
+    return result, sent
+
+
+def test_lazy_start_response_is_compressed_on_first_chunk():
+    chunks = [b"x" * 800, b"y" * 800]
+    middleware = CompressionMiddleware(_wsgi(chunks, [("Content-Type", "text/plain")], lazy=True))
+    result, sent = _call(middleware)
+    body = b"".join(result)
+    result.close()
+    assert sent["headers"]["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == b"".join(chunks)
+    assert middleware.stats()["total_compressions"] == 1
+
+
+def test_small_body_without_length_passes_through():
+    middleware = CompressionMiddleware(_wsgi([b"tiny", b" body"], [("Content-Type", "text/plain")]))
+    result, sent = _call(middleware)
+    assert b"".join(result) == b"tiny body"
+    result.close()
+    assert "Content-Encoding" not in sent["headers"]
+    assert middleware.stats()["total_compressions"] == 0
+
+
+def test_sized_body_is_compressed_in_one_pass(monkeypatch):
+    flushes = []
+    contexts = CompressorContexts()
+    real_stream = contexts.stream
+    monkeypatch.setattr(contexts, "stream", lambda encoding: _Spy(real_stream(encoding), flushes))
+    chunks = [b"a" * 700, b"b" * 700]
+    headers = [("Content-Type", "text/plain"), ("Content-Length", "1400")]
+    result, sent = _call(CompressionMiddleware(_wsgi(chunks, headers), contexts=contexts))
+    assert gzip.decompress(b"".join(result)) == b"".join(chunks)
+    assert "Content-Length" not in sent["headers"] and flushes == [False, False]
+
+
+def test_close_before_iteration_closes_app_and_releases_compressor(monkeypatch):
+    closed, released = [], []
+
+    class Body:
+        def __iter__(self):
+            yield b"z" * 4096
+
+        def close(self):
+            closed.append(True)
+
+    def app(environ, start_response):
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return Body()
+
+    contexts = CompressorContexts()
+    real_stream = contexts.stream
+    monkeypatch.setattr(contexts, "stream", lambda encoding: _Spy(real_stream(encoding), [], released))
+    middleware = CompressionMiddleware(app, contexts=contexts)
+    result, sent = _call(middleware)
+    assert "headers" not in sent  # nothing is decided before the first chunk
+    result.close()
+    result.close()
+    assert closed == [True] and released == []
+
+    result, sent = _call(middleware)
+    next(iter(result))
+    result.close()
+    assert sent["headers"]["Content-Encoding"] == "gzip"
+    assert closed == [True, True] and released == [True]
+
+
+class _Spy:
+    def __init__(self, stream, flushes, released=None):
+        self._stream, self._flushes, self._released = stream, flushes, released
+
+    def compress(self, data, flush):
+        self._flushes.append(flush)
+        return self._stream.compress(data, flush)
+
+    def finish(self):
+        return self._stream.finish()
+
+    def release(self):
+        if self._released is not None:
+            self._released.append(True)
+        self._stream.release()
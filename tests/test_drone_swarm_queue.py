@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.seed_drone_swarm import BaseDrone, DroneResult, DroneType, SeedDroneSwarm
+
+
+class _EchoDrone(BaseDrone):
+    def __init__(self, drone_id):
+        super().__init__(drone_id, DroneType.TASK_DRONE)
+
+    async def execute_task(self, task):
+        self.tasks_completed += 1
+        return DroneResult(task_id=task.task_id, drone_id=self.drone_id, success=True,
+                           result_data={"echo": task.payload}, execution_time=0.01,
+                           completed_at=datetime.now())
+
+
+@pytest.fixture
+def swarms(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    made = []
+    for _ in range(2):  # two gunicorn workers sharing instance/seed_drone_swarm.db
+        swarm = SeedDroneSwarm()
+        swarm.drone_configs = {DroneType.TASK_DRONE: {"class": _EchoDrone, "max_instances": 1,
+                                                      "spawn_interval": 0}}
+        made.append(swarm)
+    yield made
+    for swarm in made:
+        swarm.executor.shutdown(wait=True)
+
+
+def test_task_added_in_another_worker_runs_in_the_leader(swarms):
+    leader, worker = swarms
+    task_id = worker.add_task(DroneType.TASK_DRONE, priority=5, payload={"n": 1})
+    assert worker.get_swarm_status()["pending_tasks"] == 1
+
+    leader.run_tick()
+    leader.executor.shutdown(wait=True)
+    leader.run_tick()  # no pending work left; the registry is refreshed
+
+    status = worker.get_swarm_status()
+    assert status["pending_tasks"] == 0 and status["completed_tasks"] == 1
+    assert status["total_active_drones"] == 1
+    assert status["drone_performance"][0]["tasks_completed"] == 1
+    results = worker.get_recent_results()
+    assert [r["task_id"] for r in results] == [task_id]
+    assert results[0]["result_data"] == {"echo": {"n": 1}}
+
+
+def test_task_is_claimed_once(swarms):
+    first, second = swarms
+    first.add_task(DroneType.TASK_DRONE, priority=1, payload={})
+    first.task_queue = first._load_pending_tasks()
+    second.task_queue = second._load_pending_tasks()
+    assert first._claim_task(first.task_queue[0], _EchoDrone("a"))
+    assert not second._claim_task(second.task_queue[0], _EchoDrone("b"))
+
+
+def test_tasks_stranded_by_a_lost_leader_are_requeued(swarms):
+    old_leader, new_leader = swarms
+    old_leader.add_task(DroneType.TASK_DRONE, priority=1, payload={})
+    old_leader.task_queue = old_leader._load_pending_tasks()
+    drone = _EchoDrone("a")
+    old_leader.active_drones[drone.drone_id] = drone
+    assert old_leader._claim_task(old_leader.task_queue[0], drone)
+
+    assert old_leader._requeue_stale_tasks() == 0  # its drone is still alive
+    assert new_leader._requeue_stale_tasks() == 1
+    assert len(new_leader._load_pending_tasks()) == 1
+
+    assert new_leader._claim_task(new_leader._load_pending_tasks()[0], drone)
+    new_leader.active_drones[drone.drone_id] = drone
+    new_leader.task_lease = timedelta(0)
+    assert new_leader._requeue_stale_tasks() == 1  # lease expired
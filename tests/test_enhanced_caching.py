@@ -0,0 +1,188 @@
+import threading
+import time
+
+import numpy as np
+
+from utils.enhanced_caching_system import EnhancedCachingSystem
+
+
+def _system(tmp_path, **kwargs):
+    return EnhancedCachingSystem(cache_dir=str(tmp_path / "cache"), **kwargs)
+
+
+def test_exact_and_memory_hits(tmp_path):
+    cache = _system(tmp_path)
+    assert cache.cache_ai_response("how do I log my mood", "Open the mood tab", "openai")
+
+    hit = cache.get_cached_ai_response("how do I log my mood")
+    assert hit["response"] == "Open the mood tab"
+
+    fresh = _system(tmp_path)  # new process: memory tier empty, SQLite has the row
+    hit = fresh.get_cached_ai_response("how do I log my mood")
+    assert hit["match_type"] == "exact"
+
+
+def test_semantic_match_searches_all_live_entries(tmp_path):
+    cache = _system(tmp_path)
+    # Far more high-quality entries than the legacy top-20 scan would ever look at
+    for i in range(200):
+        cache.cache_ai_response(f"filler prompt number {i} about topic {i}", f"r{i}", "openai", quality_score=0.9)
+    target = "please remind me to water the garden plants every morning"
+    cache.cache_ai_response(target, "Reminder set", "openai", quality_score=0.75)
+    assert cache.sync_prompt_index(wait=True, timeout=30)
+    assert len(cache._prompt_index) == 201
+
+    hit = cache.get_cached_ai_response("please remind me to water the garden plants every morning today")
+    assert hit is not None and hit["match_type"] == "semantic"
+    assert hit["response"] == "Reminder set"
+    assert hit["similarity_score"] > 0.8
+
+    assert cache.get_cached_ai_response("completely unrelated question about jazz") is None
+
+
+def test_index_picks_up_rows_from_other_writers(tmp_path):
+    reader = _system(tmp_path)
+    assert reader.get_cached_ai_response("warm the index up first") is None
+    writer = _system(tmp_path)
+    writer.cache_ai_response("what is a good breathing exercise for anxiety", "Box breathing", "openai")
+    writer.cache_ai_response("how do I export my journal", "Settings > Export", "openai")
+    assert reader.sync_prompt_index(wait=True, timeout=30)
+    assert len(reader._prompt_index) == 2
+
+    hit = reader.get_cached_ai_response("what is a good breathing exercise for my anxiety")
+    assert hit["response"] == "Box breathing"
+
+
+def test_memory_tier_is_bounded(tmp_path):
+    cache = _system(tmp_path, memory_max_entries=32, memory_shards=4)
+    for i in range(500):
+        cache.cache_ai_response(f"prompt {i}", f"r{i}", "openai")
+    assert len(cache.memory_cache) <= 32
+    assert cache.get_cache_statistics()["memory_tier"]["evictions"] > 0
+
+
+def test_statistics_report_hit_rate_and_latency(tmp_path):
+    cache = _system(tmp_path)
+    cache.cache_ai_response("tell me about dbt skills", "DBT has four modules", "openai")
+
+    def lookups():
+        for _ in range(10):
+            cache.get_cached_ai_response("tell me about dbt skills")
+            cache.get_cached_ai_response("something never cached")
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ai = cache.get_cache_statistics()["performance"]["ai_lookups"]
+    assert ai["lookups"] == 80
+    assert ai["misses"] == 40
+    assert ai["hit_rate_percentage"] == 50
+    assert ai["latency_ms"]["p95"] >= ai["latency_ms"]["p50"] > 0
+
+
+class _TopicModel:
+    """Stand-in sentence encoder: prompts about the same topic embed together"""
+
+    TOPICS = ({"sleep", "insomnia", "rest", "tired"}, {"budget", "money", "spending", "savings"})
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, batch_size=None, normalize_embeddings=True):
+        self.calls += 1
+        out = np.zeros((len(texts), len(self.TOPICS) + 1), dtype="float32")
+        for row, text in enumerate(texts):
+            words = set(text.lower().split())
+            for col, topic in enumerate(self.TOPICS):
+                out[row, col] = len(words & topic)
+            out[row, -1] = 0.1
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+def test_semantic_match_uses_embeddings_when_available(tmp_path):
+    model = _TopicModel()
+    cache = _system(tmp_path, embedding_model=model)
+    cache.cache_ai_response("tips for insomnia", "Keep a regular bedtime", "openai")
+    cache.cache_ai_response("how to track spending", "Use the budget tab", "openai")
+    assert cache.sync_prompt_index(wait=True, timeout=30)
+
+    # No words in common with the cached prompt; word overlap would miss it
+    hit = cache.get_cached_ai_response("always tired cannot rest")
+    assert hit is not None and hit["match_type"] == "semantic"
+    assert hit["response"] == "Keep a regular bedtime"
+    assert hit["similarity_score"] > 0.8 and model.calls >= 2
+
+
+
+def test_embedding_model_loads_once_and_retries_after_failure(tmp_path, monkeypatch):
+    import utils.enhanced_caching_system as ecs
+
+    attempts = []
+
+    def load(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise OSError("model download failed")
+        time.sleep(0.05)  # other threads arrive while this load is in flight
+        return _TopicModel()
+
+    monkeypatch.setattr(ecs, "SentenceTransformer", load)
+    cache = _system(tmp_path)
+    assert cache.embedding_model is None
+
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(cache.embedding_model)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(attempts) == 2
+    assert len(models) == 4 and all(m is models[0] for m in models) and models[0] is not None
+
+def test_cleanup_in_another_process_rebuilds_the_index(tmp_path):
+    reader = _system(tmp_path)
+    reader.cache_ai_response("what helps with a racing mind at night", "Try a body scan", "openai", ttl_hours=-1)
+    reader.cache_ai_response("how should I plan my weekly meals", "Batch cook on Sundays", "openai")
+    assert reader.sync_prompt_index(wait=True, timeout=30)
+    assert reader.get_cached_ai_response("how should I plan my weekly meals today")["response"] == "Batch cook on Sundays"
+    assert len(reader._prompt_index) == 1  # the expired row is never indexed
+
+    reader.cache_ai_response("what helps with a racing mind at bedtime", "Try breathing", "openai")
+    assert reader.sync_prompt_index(wait=True, timeout=30)
+    generation = reader._index_generation
+    _system(tmp_path).cleanup_expired_cache()  # deletes the expired row from another "worker"
+    assert reader.sync_prompt_index(wait=True, timeout=30)
+    assert reader._index_generation == generation + 1
+    assert len(reader._prompt_index) == 2
+
+
+class _SlowModel(_TopicModel):
+    """Encoder that blocks until released, like a cold SentenceTransformer load"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def encode(self, texts, **kwargs):
+        self.release.wait(30)
+        return super().encode(texts, **kwargs)
+
+
+def test_lookups_never_wait_for_the_index_build(tmp_path):
+    model = _SlowModel()
+    cache = _system(tmp_path, embedding_model=model)
+    cache.cache_ai_response("tips for insomnia and poor rest", "Keep a regular bedtime", "openai")
+
+    # The index build is stuck embedding; lookups answer from SQLite meanwhile
+    started = time.perf_counter()
+    assert cache.get_cached_ai_response("tips for insomnia and poor rest")["response"] == "Keep a regular bedtime"
+    hit = cache.get_cached_ai_response("tips for insomnia and poor rest tonight")
+    assert hit is not None and hit["match_type"] == "semantic"  # word-overlap scan fallback
+    assert time.perf_counter() - started < 5 and cache._prompt_index is None
+
+    model.release.set()
+    assert cache.sync_prompt_index(wait=True, timeout=30)
+    assert len(cache._prompt_index) == 1
@@ -0,0 +1,107 @@
+import threading
+import time
+
+from nous_core.eventing import EventBus, EventStore
+
+
+def test_append_many_and_recent_prefix(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    first = store.append("mood.logged", {"mood": 3})
+    ids = store.append_many([
+        ("spotify.track.played", {"n": 1}),
+        ("spotify.track.played", {"n": 2}),
+        ("spotify_track", {"n": 3}),
+    ])
+    assert ids == [first + 1, first + 2, first + 3]
+
+    played = store.recent(limit=10, topic_prefix="spotify.track")
+    assert [e["payload"]["n"] for e in played] == [2, 1]
+    assert [e["id"] for e in store.recent(limit=2)] == [ids[2], ids[1]]
+
+
+def test_group_commit_under_concurrency(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"), group_commit=True)
+    results, errors = [], []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                results.append(store.append("load.test", {"worker": n, "i": i}))
+        except Exception as e:  # pragma: no cover - surfaced by the assert below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert len(set(results)) == 400
+    assert len(store.recent(limit=1000, topic_prefix="load.")) == 400
+
+
+
+def test_group_commit_leader_writes_only_its_own_batch(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"), group_commit=True)
+    insert_rows, writers = store._insert_rows, []
+    follower = threading.Thread(target=store.append, args=("load.test", {"n": 2}))
+
+    def insert(rows):
+        writers.append(threading.current_thread())
+        if len(writers) == 1:  # a second append queues while the first commit is in flight
+            follower.start()
+            while not store._pending:
+                time.sleep(0.001)
+        return insert_rows(rows)
+
+    store._insert_rows = insert
+    store.append("load.test", {"n": 1})
+    follower.join(2.0)
+    assert writers == [threading.main_thread(), follower]
+    assert len(store.recent(limit=10, topic_prefix="load.")) == 2
+
+def test_bus_publish_returns_event_id(tmp_path):
+    bus = EventBus(store=EventStore(str(tmp_path / "events.db")))
+    seen = []
+    bus.subscribe("habit.*", lambda topic, payload: seen.append(topic))
+    res = bus.publish("habit.checkin", {"habit": "walk"})
+    assert res["event_id"] == 1 and res["delivered"] == 1
+    assert seen == ["habit.checkin"]
+
+
+def test_topic_trie_matches_like_match():
+    from nous_core.eventing.bus import _match, _Subscription, _TopicTrie
+
+    patterns = ["*", "", "mood.*", "mood.logged", "spotify.track.*", "spotify.track.played", "spotify", "a.b.c"]
+    topics = ["mood", "mood.logged", "moods.logged", "spotify.track", "spotify.track.played.x",
+              "spotify", "spotify.playlist", "a.b.c", "a.b", ""]
+    subs = [_Subscription(p, lambda t, p: None, 1) for p in patterns]
+    trie = _TopicTrie.build(subs)
+    for topic in topics:
+        assert sorted(s.pattern for s in trie.match(topic)) == sorted(p for p in patterns if _match(p, topic))
+
+
+def test_async_dispatch_does_not_block_publisher():
+    bus = EventBus(async_dispatch=True, workers=2, queue_size=5)
+    release = threading.Event()
+    fast_seen = []
+
+    def slow(topic, payload):
+        release.wait(5)
+
+    bus.subscribe("sync.*", slow)
+    bus.subscribe("sync.track", lambda topic, payload: fast_seen.append(payload["i"]))
+
+    t0 = time.monotonic()
+    results = [bus.publish("sync.track", {"i": i}) for i in range(20)]
+    assert time.monotonic() - t0 < 1.0
+    assert sum(r["dropped"] for r in results) > 0
+
+    release.set()
+    assert bus.flush(timeout=5)
+    assert fast_seen == list(range(len(fast_seen)))
+    stats = {m["subscriber"]: m for m in bus.metrics()}
+    assert stats["slow"]["dropped"] > 0 and stats["slow"]["queued"] == 0
+    assert stats["slow"]["lag_ms_max"] > 0
+    bus.shutdown()
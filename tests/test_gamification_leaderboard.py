@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+import services.gamification_service as gs
+from models.database import db
+
+
+@pytest.fixture
+def service(tmp_path):
+    from models.gamification_models import Leaderboard, PointTransaction
+    from models.user import User
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'gamification.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[User.__table__, PointTransaction.__table__, Leaderboard.__table__])
+        db.session.add_all([User(id=i, username=f"user{i}", email=f"u{i}@example.com") for i in range(1, 6)])
+        db.session.commit()
+        gs._leaderboard_cache.clear()
+        yield gs.GamificationService()
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _earn(user_id, points, days_ago=0):
+    from models.gamification_models import PointTransaction
+
+    db.session.add(PointTransaction(user_id=user_id, points=points, transaction_type="earned",
+                                    created_at=datetime.utcnow() - timedelta(days=days_ago)))
+    db.session.commit()
+
+
+def test_full_rebuild_ranks_in_sql(service):
+    _earn(1, 10)
+    _earn(2, 30)
+    _earn(3, 20)
+    _earn(3, 15, days_ago=2)
+    _earn(4, 500, days_ago=40)  # outside both periods
+
+    service.update_leaderboards(incremental=False)
+    board = service.get_leaderboard("weekly", limit=10)
+    assert [(e["rank"], e["username"], e["score"]) for e in board] == [
+        (1, "user3", 35), (2, "user2", 30), (3, "user1", 10)]
+    assert service.get_user_rank(1) == {"rank": 3, "score": 10, "period": board[0]["period"]}
+    assert service.get_user_rank(4) is None
+
+
+def test_incremental_update_rescores_changed_users_only(service, monkeypatch):
+    from models.gamification_models import Leaderboard
+
+    monkeypatch.setattr(gs, "LEADERBOARD_WATERMARK_SLACK", timedelta(0))
+
+    for user_id, points in [(1, 10), (2, 20), (3, 30), (4, 40)]:
+        _earn(user_id, points)
+    service.update_leaderboards(incremental=False)
+    untouched = {e.user_id: e.id for e in Leaderboard.query.filter_by(leaderboard_type="weekly")}
+
+    _earn(1, 100)
+    _earn(5, 25)
+    service.update_leaderboards()
+
+    board = service.get_leaderboard("weekly", limit=10)
+    assert [(e["user_id"], e["rank"]) for e in board] == [(1, 1), (4, 2), (3, 3), (5, 4), (2, 5)]
+    rows = {e.user_id: e.id for e in Leaderboard.query.filter_by(leaderboard_type="weekly")}
+    # Users without new points keep their rows; only their ranks were rewritten
+    assert all(rows[u] == untouched[u] for u in (2, 3, 4))
+    assert rows[1] != untouched[1]
+
+    service.update_leaderboards(incremental=False)
+    assert service.get_leaderboard("weekly", limit=10) == board
+
+
+def test_leaderboard_reads_are_cached_until_rebuild(service):
+    _earn(1, 10)
+    service.update_leaderboards()
+    assert len(service.get_leaderboard("weekly")) == 1
+
+    _earn(2, 20)
+    assert len(service.get_leaderboard("weekly")) == 1  # cached
+    service.update_leaderboards()
+    assert [e["user_id"] for e in service.get_leaderboard("weekly")] == [2, 1]
+
+
+def test_incremental_ranks_match_full_rebuild(service, monkeypatch):
+    import random
+
+    from models.gamification_models import Leaderboard
+    from models.user import User
+
+    monkeypatch.setattr(gs, "LEADERBOARD_WATERMARK_SLACK", timedelta(0))
+    db.session.add_all([User(id=i, username=f"user{i}", email=f"u{i}@example.com") for i in range(6, 61)])
+    db.session.commit()
+    rng = random.Random(5)
+    for user_id in range(1, 41):
+        _earn(user_id, rng.randint(1, 30))
+    service.update_leaderboards(incremental=False)
+
+    def ranks():
+        return sorted((e.user_id, e.rank, e.score) for e in Leaderboard.query.filter_by(leaderboard_type="monthly"))
+
+    for _ in range(5):
+        for user_id in rng.sample(range(1, 61), 8):  # existing and new users
+            _earn(user_id, rng.randint(1, 15))
+        service.update_leaderboards()
+        incremental = ranks()
+        service.update_leaderboards(incremental=False)
+        assert incremental == ranks()
@@ -0,0 +1,103 @@
+import random
+import sqlite3
+
+import numpy as np
+
+from services.nexus.memory_graph import Edge, MemoryGraph
+
+
+def test_edges_accumulate_weight(tmp_path):
+    g = MemoryGraph(str(tmp_path / "graph.db"))
+    g.ingest_text("doc1", "Alice met Bob in Paris")
+    g.ingest_text("doc2", "Alice wrote to Bob")
+    first = g.add_edge("doc1", "Alice", rel="mentions", weight=2.0)
+    assert g.add_edge("doc1", "Alice", rel="mentions") == first
+    assert g.add_edges([Edge("Alice", "Bob", "knows"), Edge("Alice", "Bob", "knows", 0.5)]) == 1
+
+    rows = g.read("SELECT src, dst, rel, weight FROM edges ORDER BY id")
+    assert ("doc1", "Alice", "mentions", 4.0) in rows
+    assert ("Alice", "Bob", "knows", 1.5) in rows
+    assert len(rows) == 6
+
+
+def test_legacy_duplicate_edges_are_collapsed(tmp_path):
+    path = str(tmp_path / "graph.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE nodes (id TEXT PRIMARY KEY, kind TEXT NOT NULL, meta TEXT NOT NULL, created_ts REAL NOT NULL)")
+        conn.execute("CREATE TABLE edges (id INTEGER PRIMARY KEY AUTOINCREMENT, src TEXT NOT NULL, dst TEXT NOT NULL, "
+                     "rel TEXT NOT NULL, weight REAL NOT NULL, created_ts REAL NOT NULL)")
+        conn.executemany("INSERT INTO edges(src,dst,rel,weight,created_ts) VALUES(?,?,?,?,0)",
+                         [("a", "b", "r", 1.0), ("a", "b", "r", 2.0), ("a", "c", "r", 1.0)])
+    g = MemoryGraph(path)
+    assert g.read("SELECT id, src, dst, weight FROM edges ORDER BY id") == [(1, "a", "b", 3.0), (3, "a", "c", 1.0)]
+    g.add_edge("a", "b", rel="r")
+    assert g.read_one("SELECT weight FROM edges WHERE id = 1") == (4.0,)
+
+
+def _random_graph(g, n_nodes=60, n_edges=300, seed=3):
+    rng = random.Random(seed)
+    edges = [Edge(f"n{rng.randrange(n_nodes)}", f"n{rng.randrange(n_nodes)}", rng.choice("xy"), rng.random() + 0.1)
+             for _ in range(n_edges)]
+    g.add_edges(edges)
+    return rng
+
+
+def _bfs(g, start, k):
+    rows = g.read("SELECT src, dst FROM edges")
+    hops, frontier = {start: 0}, [start]
+    for depth in range(1, k + 1):
+        nxt = []
+        for u in frontier:
+            for s, d in rows:
+                for a, b in ((s, d), (d, s)):
+                    if a == u and b not in hops:
+                        hops[b] = depth
+                        nxt.append(b)
+        frontier = nxt
+    return hops
+
+
+def test_k_hop_matches_bfs_and_refreshes_incrementally(tmp_path):
+    path = str(tmp_path / "graph.db")
+    g = MemoryGraph(path, min_compact=8, compact_ratio=0.05)
+    rng = _random_graph(g, n_edges=80)
+    res = g.k_hop("n0", k=2, limit=1000)
+    assert {n["id"]: n["hops"] for n in res["nodes"]} == _bfs(g, "n0", 2)
+    assert all(e["src"] in {n["id"] for n in res["nodes"]} for e in res["edges"])
+
+    # Writes from another process-level instance, small (delta) and large (compaction)
+    other = MemoryGraph(path)
+    for batch in (3, 50):
+        other.add_edges([Edge(f"n{rng.randrange(80)}", f"n{rng.randrange(80)}", "z") for _ in range(batch)])
+        res = g.k_hop("n0", k=3, limit=1000)
+        assert {n["id"]: n["hops"] for n in res["nodes"]} == _bfs(g, "n0", 3)
+    assert g.neighborhood("n0", hops=2)["nodes"]
+
+
+def _dense_ppr(g, seed, alpha):
+    rows = g.read("SELECT src, dst, weight FROM edges")
+    ids = sorted({s for s, _, _ in rows} | {d for _, d, _ in rows})
+    ix = {n: i for i, n in enumerate(ids)}
+    w = np.zeros((len(ids), len(ids)))
+    for s, d, wt in rows:
+        w[ix[s], ix[d]] += wt
+        w[ix[d], ix[s]] += wt
+    p = np.zeros(len(ids))
+    p[ix[seed]] = 1.0
+    trans = w / w.sum(axis=1, keepdims=True)
+    r = p.copy()
+    for _ in range(200):
+        r = alpha * p + (1 - alpha) * trans.T @ r
+    return {n: r[ix[n]] for n in ids}
+
+
+def test_personalized_pagerank_matches_power_iteration(tmp_path):
+    g = MemoryGraph(str(tmp_path / "graph.db"))
+    _random_graph(g)
+    exact = _dense_ppr(g, "n1", alpha=0.15)
+    got = {r["id"]: r["score"] for r in g.related(["n1"], top_k=100, eps=1e-7, include_seeds=True)}
+    assert max(abs(exact[n] - got.get(n, 0.0)) for n in exact) < 1e-3
+    top = [r["id"] for r in g.related(["n1"], top_k=5)]
+    assert "n1" not in top
+    assert top[:3] == [n for n, _ in sorted(exact.items(), key=lambda kv: -kv[1]) if n != "n1"][:3]
+    assert g.related(["unknown"]) == []
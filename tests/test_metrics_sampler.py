@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nous_core.monitoring import MetricsSampler, snapshot
+from utils.adaptive_ai_system import ResizableExecutor
+
+
+def test_snapshot_reads_background_sample_without_blocking():
+    snapshot()
+    start = time.perf_counter()
+    snap = snapshot()
+    assert time.perf_counter() - start < 0.01
+    assert {"ts", "cpu_percent", "mem_percent", "disk_percent", "load_avg", "cpu_percent_ema"} <= set(snap)
+
+
+def test_sampler_smooths_and_bounds_history(monkeypatch):
+    sampler = MetricsSampler(interval=60, alpha=0.5, history=3)
+    readings = iter([10.0, 30.0, 50.0, 70.0])
+    monkeypatch.setattr(sampler, "_read", lambda cpu=True: {"cpu_percent": next(readings), "mem_percent": 40.0,
+                                                    "disk_percent": 1.0, "available_memory": 0, "load_avg": 0.0})
+    snaps = [sampler.sample_once() for _ in range(4)]
+    assert [s["cpu_percent_ema"] for s in snaps] == [10.0, 20.0, 35.0, 52.5]
+    assert [s["cpu_percent"] for s in sampler.history()] == [30.0, 50.0, 70.0]
+    assert sampler.history(limit=1) == [snaps[-1]]
+    assert snaps[-1]["samples"] == 4
+
+
+
+def test_sampler_withholds_cpu_until_a_full_interval(monkeypatch):
+    sampler = MetricsSampler(interval=60, alpha=0.5)
+    readings = iter([10.0, 30.0])
+    monkeypatch.setattr(sampler, "_read", lambda cpu=True: {
+        "cpu_percent": next(readings) if cpu else None, "mem_percent": 40.0,
+        "disk_percent": 1.0, "available_memory": 0, "load_avg": 0.0})
+    warm = sampler.sample_once(cpu=False)
+    assert warm["cpu_percent"] is None and warm["cpu_percent_ema"] is None
+    assert warm["mem_percent_ema"] == 40.0
+    assert [sampler.sample_once()["cpu_percent_ema"] for _ in range(2)] == [10.0, 20.0]
+
+
+def test_sampler_thread_publishes_new_readings():
+    sampler = MetricsSampler(interval=0.05).start()
+    first = sampler.latest()
+    deadline = time.time() + 2.0
+    while sampler.latest() is first and time.time() < deadline:
+        time.sleep(0.01)
+    assert sampler.latest()["samples"] > first["samples"]
+    assert first["cpu_percent"] is None and sampler.latest()["cpu_percent"] is not None
+    sampler.stop()
+
+
+def test_resizable_executor_limits_concurrency_in_place():
+    executor = ResizableExecutor(ThreadPoolExecutor, max_workers=4, limit=1)
+    gate, running, peak = threading.Event(), [0], [0]
+    lock = threading.Lock()
+
+    def work(i):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        gate.wait(2.0)
+        with lock:
+            running[0] -= 1
+        return i
+
+    futures = [executor.submit(work, i) for i in range(6)]
+    time.sleep(0.05)
+    assert executor.stats()["active"] == 1 and executor.stats()["queued"] == 5
+    executor.resize(3)
+    time.sleep(0.05)
+    assert executor.stats()["active"] == 3
+    gate.set()
+    assert [f.result(timeout=2) for f in futures] == list(range(6))
+    assert peak[0] == 3
+
+    with pytest.raises(ZeroDivisionError):
+        executor.submit(lambda: 1 / 0).result(timeout=2)
+    executor.shutdown()
+    with pytest.raises(RuntimeError):
+        executor.submit(work, 0)
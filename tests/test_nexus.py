@@ -19,3 +19,18 @@ def test_openlibrary_search(client):
     if r.status_code == 200:
       j = r.get_json()
       assert j["ok"] is True
+
+def test_graph_limits_are_validated_and_clamped(client, monkeypatch):
+    from services.nexus.memory_graph import MemoryGraph
+    seen = {}
+    monkeypatch.setattr(MemoryGraph, "neighborhood",
+                        lambda self, node, limit=50, hops=1: seen.update(limit=limit, hops=hops) or {})
+    for query in ("limit=abc", "hops=1.5", "limit="):
+      r = client.get(f"/api/v2/nexus/graph?node=x&{query}&demo=1")
+      assert r.status_code in (400, 401), query
+    assert client.get("/api/v2/nexus/graph/related?node=x&k=ten&demo=1").status_code in (400, 401)
+
+    r = client.get("/api/v2/nexus/graph?node=x&limit=1000000000&hops=99&demo=1")
+    assert r.status_code in (200, 401)
+    if r.status_code == 200:
+      assert seen == {"limit": 500, "hops": 4}
@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+
+import pytest
+from flask import Flask, jsonify
+
+import utils.rate_limiter as rl
+from utils.rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    return RateLimiter(path=str(tmp_path / "rl.tbl"), capacity=1024)
+
+
+def test_gcra_allows_burst_then_blocks(limiter):
+    results = [limiter.check("1.2.3.4", 5, 60) for _ in range(6)]
+    assert [r["allowed"] for r in results] == [True] * 5 + [False]
+    assert results[0]["remaining"] == 4
+    assert results[4]["remaining"] == 0
+    assert 0 < results[5]["retry_after"] <= 12
+
+    status = limiter.check("1.2.3.4", 5, 60, consume=False)
+    assert status["current_requests"] == 5 and status["remaining"] == 0
+    # Limits are per (key, limit, window): other keys and limits are untouched
+    assert limiter.is_allowed("5.6.7.8", 5, 60)
+    assert limiter.is_allowed("1.2.3.4", 10, 60)
+
+
+def test_tokens_refill_over_time(limiter, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rl.time, "time", lambda: now[0])
+    for _ in range(3):
+        assert limiter.is_allowed("k", 3, 30)
+    assert not limiter.is_allowed("k", 3, 30)
+    now[0] += 10  # one emission interval
+    assert limiter.is_allowed("k", 3, 30)
+    assert not limiter.is_allowed("k", 3, 30)
+
+
+def test_table_is_fixed_size_and_caps_keys(tmp_path):
+    limiter = RateLimiter(path=str(tmp_path / "rl.tbl"), capacity=64)
+    size = os.path.getsize(limiter.path)
+    for i in range(5000):
+        limiter.is_allowed(f"key-{i}", 10, 60)
+    assert os.path.getsize(limiter.path) == size
+    stats = limiter.stats()
+    assert stats["used_slots"] <= stats["capacity"] == 64
+    assert stats["evictions"] > 0 and stats["shared"]
+
+
+def test_incompatible_table_falls_back_to_local(tmp_path):
+    path = str(tmp_path / "rl.tbl")
+    RateLimiter(path=path, capacity=64)
+    other = RateLimiter(path=path, capacity=128)
+    assert not other.stats()["shared"]
+    assert other.is_allowed("k", 1, 60) and not other.is_allowed("k", 1, 60)
+
+
+def _worker(path, attempts, out):
+    limiter = RateLimiter(path=path, capacity=1024)
+    out.put(sum(limiter.is_allowed("shared-ip", 20, 60) for _ in range(attempts)))
+
+
+@pytest.mark.skipif(rl.fcntl is None, reason="shared table needs fcntl")
+def test_limit_is_shared_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(str(tmp_path / "rl.tbl"), 50, out)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    allowed = sum(out.get(timeout=30) for _ in procs)
+    for p in procs:
+        p.join()
+    assert allowed == 20
+
+
+def test_decorator_and_status(tmp_path, monkeypatch):
+    monkeypatch.setattr(rl, "rate_limiter", RateLimiter(path=str(tmp_path / "rl.tbl"), capacity=1024))
+    app = Flask(__name__)
+
+    @app.route("/api/ping")
+    @rl.rate_limit(limit=2, window=60)
+    def ping():
+        return jsonify(ok=True)
+
+    @app.route("/api/status")
+    def status():
+        return jsonify(rl.get_rate_limit_status(limit=2, window=60))
+
+    client = app.test_client()
+    assert [client.get("/api/ping").status_code for _ in range(3)] == [200, 200, 429]
+    assert client.get("/api/ping").get_json()["retry_after"] > 0
+    body = client.get("/api/status").get_json()
+    assert body.pop("reset_time") in (59, 60)
+    assert body == {"limit": 2, "remaining": 0, "current_requests": 2}
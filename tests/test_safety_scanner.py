@@ -0,0 +1,165 @@
+import random
+
+import pytest
+from flask import Flask, g
+
+from nous_core.patterns.lexicon import LexiconScanner
+from services.nlu_service import NLUService
+from utils.emotion_detection import EmotionDetector
+from utils.safety_scanner import (
+    CRISIS_KEYWORDS,
+    EMOTION_KEYWORDS,
+    FALLBACK_EMOTION_KEYWORDS,
+    INTENSITY_MODIFIERS,
+    INTENT_KEYWORDS,
+    REQUEST_CRISIS_KEYWORDS,
+    safety_scanner,
+    scan_message,
+)
+
+# The per-lexicon substring loops the scanner replaced, kept as the reference.
+
+
+def legacy_intents(lowered):
+    return [intent for intent, keywords in INTENT_KEYWORDS.items() if any(k in lowered for k in keywords)]
+
+
+def legacy_crisis(lowered):
+    return any(k in lowered for k in CRISIS_KEYWORDS)
+
+
+def legacy_fallback_emotion(lowered):
+    for emotion, keywords in FALLBACK_EMOTION_KEYWORDS.items():
+        if any(k in lowered for k in keywords):
+            return emotion
+    return None
+
+
+def legacy_emotion(text):
+    if not text:
+        return {'emotion': 'neutral', 'confidence': 0.0}
+    text_lower = text.lower()
+    scores = {}
+    for emotion, keywords in EMOTION_KEYWORDS.items():
+        score = 0
+        for keyword in keywords:
+            if keyword in text_lower:
+                base = 1.0
+                for modifier, multiplier in INTENSITY_MODIFIERS.items():
+                    if modifier in text_lower and text_lower.find(modifier) < text_lower.find(keyword):
+                        base *= multiplier
+                        break
+                score += base
+        scores[emotion] = score
+    if max(scores.values()) == 0:
+        return {'emotion': 'neutral', 'confidence': 0.5}
+    emotion, raw = max(scores.items(), key=lambda x: x[1])
+    return {'emotion': emotion, 'confidence': min(1.0, raw / 3.0), 'all_scores': scores}
+
+
+def legacy_request_crisis(payload):
+    return any(k in str(payload).lower() for k in REQUEST_CRISIS_KEYWORDS)
+
+
+CORPUS = [
+    "",
+    "   ",
+    "I want to kill myself",
+    "I am thinking about suicide",
+    "Schedule a reminder to walk",
+    "Me siento muy mal, necesito ayuda urgente",
+    "tengo mucha ansiedad y panico, gracias",
+    "I feel very sad but also really happy, a bit anxious",
+    "Extremely worried; slightly calm. Somewhat lost and unsure",
+    "background download made me mad",          # substring hits the old loops also counted
+    "I was born in 1988 and call 911 rarely",
+    "I CANT GO ON anymore, it's hopeless",
+    "SELF HARM thoughts, challenge them with a reframe",
+    "panico panic panicked",
+    "Wise Mind and opposite action; the STOP skill; TIPP",
+    "I can't go on, no point, want to die",
+    "wow, astonished and amazed — surprised!",
+    "tranquil serene content peaceful relaxed",
+]
+
+
+def _fuzz_corpus(n=300, seed=3):
+    rng = random.Random(seed)
+    vocab = sorted({k for kws in INTENT_KEYWORDS.values() for k in kws} | set(CRISIS_KEYWORDS)
+                   | {k for kws in EMOTION_KEYWORDS.values() for k in kws} | set(INTENSITY_MODIFIERS)
+                   | {k for kws in FALLBACK_EMOTION_KEYWORDS.values() for k in kws}
+                   | {"the", "and", "i", "feel", "not", "un", "s", "ing", "", " "})
+    out = []
+    for _ in range(n):
+        words = [rng.choice(vocab) for _ in range(rng.randint(0, 12))]
+        seps = [rng.choice([" ", "", ", ", ".", "\n"]) for _ in words]
+        text = "".join(w + s for w, s in zip(words, seps))
+        out.append(text.upper() if rng.random() < 0.2 else text)
+    return out
+
+
+@pytest.mark.parametrize("text", CORPUS + _fuzz_corpus())
+def test_parity_with_legacy_detectors(text):
+    lowered = text.lower().strip()
+    scan = scan_message(lowered)
+    nlu = NLUService()
+    assert nlu._detect_intents(lowered) == legacy_intents(lowered)
+    assert (nlu._detect_crisis(lowered) is not None) == legacy_crisis(lowered)
+    assert (scan.labels("emotion_fallback") or [None])[0] == legacy_fallback_emotion(lowered)
+    assert EmotionDetector().analyze_text_emotion(text) == legacy_emotion(text)
+
+
+def test_one_scan_per_message_is_shared():
+    safety_scanner.clear_cache()
+    NLUService().analyze("I feel really anxious and want to schedule a walk")
+    info = safety_scanner.cache_info()
+    assert info.misses == 1 and info.hits == 2  # crisis and emotion reuse the intent scan
+
+
+def test_cache_is_keyed_by_digest_and_skips_long_messages():
+    scanner = LexiconScanner({"crisis": {"crisis": ["suicide"]}}, cache_size=2, max_cached_chars=50)
+    scanner.scan("thinking about suicide")
+    assert scanner.scan("  Thinking about SUICIDE ").any("crisis")
+    assert scanner.cache_info() == (1, 1, 2, 1)
+    assert all(isinstance(key, bytes) and len(key) == 16 for key in scanner._cache)
+    assert scanner.scan("x" * 60 + " suicide").any("crisis")
+    assert scanner.cache_info().currsize == 1
+    scanner.scan("a")
+    scanner.scan("b")
+    assert scanner.cache_info().currsize == 2
+
+
+def test_word_boundary_information():
+    scanner = LexiconScanner({"crisis": {"hotline": ["988"]}, "emotion": {"sad": ["down"]}})
+    scan = scanner.scan("Born in 1988, I download everything")
+    assert scan.any("crisis") and not scan.any("crisis", whole_words=True)
+    assert scan.labels("emotion") == ["sad"] and scan.labels("emotion", whole_words=True) == []
+    scan = scanner.scan("Call 988. Feeling down-ish, downloads later")
+    assert scan.labels("emotion", whole_words=True) == ["sad"]
+    assert scan.first("emotion", "down") == "call 988. feeling down-ish".index("down")
+    assert scan.first("crisis", "911") == -1
+
+
+@pytest.mark.parametrize("payload", [
+    {"message": "I can't go on"},
+    {"message": "hello", "meta": {"notes": ["want to die"]}},
+    {"message": "Just checking in about my pills schedule"},
+    {"message": "all good here", "mood": 7},
+])
+def test_crisis_check_matches_request_values(payload, monkeypatch):
+    from utils.user_decorators import UserAuthDecorators
+
+    monkeypatch.setattr(UserAuthDecorators, "_log_crisis_trigger", staticmethod(lambda: None))
+    app = Flask("crisis_check_test")
+    handler = UserAuthDecorators.crisis_check(lambda: g.get("crisis_detected", False))
+    with app.test_request_context(json=payload):
+        assert handler() == legacy_request_crisis(payload)
+
+
+def test_crisis_check_ignores_keys():
+    from utils.user_decorators import UserAuthDecorators
+
+    app = Flask("crisis_check_test")
+    handler = UserAuthDecorators.crisis_check(lambda: g.get("crisis_detected", False))
+    with app.test_request_context(json={"pills": "vitamin reminder"}):
+        assert handler() is False
@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from services.scheduler_service import JobScheduler
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "scheduler.db")
+
+
+def _scheduler(state_path, **kwargs):
+    kwargs.setdefault("max_workers", 0)
+    return JobScheduler(state_path=state_path, lease_seconds=30, **kwargs)
+
+
+def test_only_the_lease_holder_runs_leader_jobs(state_path):
+    runs = []
+    first, second = _scheduler(state_path), _scheduler(state_path)
+    for sched in (first, second):
+        sched.add_job("job", lambda s=sched: runs.append(s.owner), interval=10)
+
+    now = time.time() + 11
+    first.run_pending(now)
+    second.run_pending(now)
+    assert first.is_leader and not second.is_leader
+    assert runs == [first.owner]
+
+    # The lease expires when its holder stops renewing it
+    second._lease_checked = 0
+    second.run_pending(now + 60)
+    assert second.is_leader
+    assert runs == [first.owner, second.owner]
+
+
+def test_next_run_and_metrics_are_persisted(state_path):
+    first = _scheduler(state_path)
+    first.add_job("job", lambda: time.sleep(0.01), interval=10)
+    now = time.time() + 11
+    first.run_pending(now)
+    first.stop()
+
+    second = _scheduler(state_path)
+    calls = []
+    second.add_job("job", lambda: calls.append(1), interval=10)
+    second.run_pending(now + 1)
+    assert calls == []  # the persisted slot is still in the future
+    stats = second.stats()["jobs"]["job"]
+    assert stats["runs"] == 1 and stats["last_duration_ms"] >= 10
+    second.run_pending(now + 10)
+    assert calls == [1]
+
+
+def test_missed_runs_are_coalesced_or_skipped(state_path):
+    calls = []
+    sched = _scheduler(state_path)
+    sched.add_job("catch_up", lambda: calls.append("catch_up"), interval=10)
+    sched.add_job("skip", lambda: calls.append("skip"), interval=10, catch_up=False)
+    start = sched._jobs["catch_up"].scheduled_at
+    sched._jobs["skip"].scheduled_at = sched._jobs["skip"].next_run = start
+
+    sched.run_pending(start + 55)  # five slots late
+    assert calls == ["catch_up"]
+    jobs = sched.stats()["jobs"]
+    assert jobs["catch_up"]["missed"] == 5 and jobs["skip"]["missed"] == 6
+    # Both keep their phase
+    assert sched._jobs["catch_up"].scheduled_at == start + 60
+
+
+def test_jitter_overrun_and_overlap(state_path):
+    sched = _scheduler(state_path, max_workers=1)
+    sched.add_job("slow", lambda: time.sleep(0.3), interval=0.1, jitter=0.05, leader_only=False)
+    job = sched._jobs["slow"]
+    assert job.scheduled_at <= job.next_run <= job.scheduled_at + 0.05
+
+    sched.run_pending(job.next_run)
+    sched.run_pending(job.next_run)  # still running: skipped, not stacked
+    deadline = time.time() + 5
+    while job.running and time.time() < deadline:
+        time.sleep(0.01)
+    stats = sched.stats()["jobs"]["slow"]
+    assert stats["runs"] == 1 and stats["skipped"] == 1 and stats["overruns"] == 1
+    assert not sched.stats()["leader"]  # per-process jobs never take the lease
+
+
+def test_enabled_flag_is_shared(state_path):
+    calls = []
+    first, second = _scheduler(state_path), _scheduler(state_path)
+    first.add_job("job", lambda: calls.append(1), interval=10, enabled=False)
+    second.add_job("job", lambda: None, interval=10, enabled=False)
+    second.set_enabled("job", True)
+    assert first.is_enabled("job")
+    first.run_pending(time.time() + 11)
+    assert calls == [1]
+
+
+def _worker(state_path, out_path, seconds):
+    sched = JobScheduler(state_path=state_path, lease_seconds=2, max_workers=0)
+
+    def job():
+        with open(out_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+
+    sched.add_job("tick", job, interval=0.2)
+    sched._jobs["tick"].scheduled_at = sched._jobs["tick"].next_run = time.time()
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        time.sleep(min(sched.run_pending(), 0.05))
+
+
+def test_one_process_runs_the_job_across_workers(tmp_path, state_path):
+    out_path = str(tmp_path / "runs.txt")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_worker, args=(state_path, out_path, 1.5)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    pids = open(out_path).read().split()
+    assert len(set(pids)) == 1
+    assert 5 <= len(pids) <= 9
+
+
+def _forked_worker(sched, out_path, seconds):
+    sched.ensure_running()
+    time.sleep(seconds)
+    stats = sched.stats()
+    with open(out_path, "a") as f:
+        f.write(f"leader {os.getpid()} {stats['leader']} {stats['running']}\n")
+    sched.stop()
+
+
+def test_lazy_start_runs_in_forked_workers_not_the_parent(tmp_path, state_path):
+    runs_path, out_path = str(tmp_path / "runs.txt"), str(tmp_path / "workers.txt")
+    sched = JobScheduler(state_path=state_path, lease_seconds=2, max_workers=0)
+
+    def job():
+        with open(runs_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+
+    sched.add_job("tick", job, interval=0.2)
+    sched.start(lazy=True)  # what create_app does in a preloading gunicorn master
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_forked_worker, args=(sched, out_path, 1.5)) for _ in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+
+    assert not sched.stats()["running"] and not sched.is_leader
+    workers = [line.split() for line in open(out_path)]
+    assert len(workers) == 2 and all(running == "True" for *_, running in workers)
+    leaders = [pid for _, pid, leader, _ in workers if leader == "True"]
+    assert len(leaders) == 1
+    assert set(open(runs_path).read().split()) == set(leaders)
+    sched.stop()
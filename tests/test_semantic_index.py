@@ -0,0 +1,179 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from nous_core.semantic import SemanticIndex
+from nous_core.semantic.vector_index import DenseVectorIndex, IVFVectorIndex
+
+
+class HashEncoder:
+    """Deterministic bag-of-words encoder standing in for sentence-transformers."""
+    dim = 64
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        self.calls.append(len(texts))
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                h = int(hashlib.md5(word.encode()).hexdigest(), 16)
+                out[i, h % self.dim] += 1.0
+            norm = np.linalg.norm(out[i])
+            if norm:
+                out[i] /= norm
+        return out
+
+
+def _unit(rng, n, dim):
+    v = rng.standard_normal((n, dim)).astype("float32")
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("mode", ["matrix", "scan"])
+def test_semantic_search_modes_agree(tmp_path, mode):
+    idx = SemanticIndex(str(tmp_path / "sem.db"), index_mode=mode, model=HashEncoder())
+    idx.bulk_upsert([
+        ("a", "calm breathing exercise", {"k": 1}),
+        ("b", "spotify playlist for running", {"k": 2}),
+    ])
+    idx.upsert("c", "breathing and grounding for anxiety", {"k": 3})
+    res = idx.search("breathing exercise", top_k=2)
+    assert [r["doc_id"] for r in res] == ["a", "c"]
+    assert res[0]["meta"] == {"k": 1}
+
+
+def test_matrix_index_tracks_upserts_and_other_writers(tmp_path):
+    db = str(tmp_path / "sem.db")
+    idx = SemanticIndex(db, model=HashEncoder())
+    idx.upsert("a", "morning journal", {})
+    assert idx.search("journal", top_k=1)[0]["doc_id"] == "a"
+
+    # A second process writing to the same db is picked up by rowid catch-up.
+    other = SemanticIndex(db, model=HashEncoder())
+    other.upsert("b", "evening gratitude journal", {})
+    other.upsert("a", "spotify sync", {})
+    assert [r["doc_id"] for r in idx.search("gratitude journal", top_k=1)] == ["b"]
+    assert idx.search("spotify sync", top_k=1)[0]["doc_id"] == "a"
+    assert len(idx._vectors) == 2
+
+
+def test_vector_sidecar_roundtrip(tmp_path):
+    db = str(tmp_path / "sem.db")
+    idx = SemanticIndex(db, model=HashEncoder(), vector_sidecar=True)
+    idx.bulk_upsert([(f"d{i}", f"note number {i}", {}) for i in range(20)])
+    idx.search("note", top_k=1)
+
+    reopened = SemanticIndex(db, model=HashEncoder(), vector_sidecar=True)
+    reopened.upsert("new", "fresh entry", {})
+    assert reopened.search("fresh entry", top_k=1)[0]["doc_id"] == "new"
+    assert len(reopened._vectors) == 21
+
+
+def test_dense_index_matches_bruteforce():
+    rng = np.random.default_rng(1)
+    vecs = _unit(rng, 500, 32)
+    idx = DenseVectorIndex(32, capacity=4)
+    idx.upsert_many([str(i) for i in range(500)], vecs)
+    q = vecs[7]
+    expected = [str(i) for i in np.argsort(-(vecs @ q))[:5]]
+    assert [doc_id for _s, doc_id in idx.search(q, 5)] == expected
+
+
+def test_ivf_index_recall():
+    rng = np.random.default_rng(2)
+    vecs = _unit(rng, 4000, 32)
+    idx = IVFVectorIndex(32, nlist=32, nprobe=8, min_train=1000)
+    idx.upsert_many([str(i) for i in range(4000)], vecs)
+    assert idx._centroids is not None
+    hits = sum(idx.search(vecs[i], 1)[0][1] == str(i) for i in range(0, 4000, 40))
+    assert hits == 100
+
+
+def test_keyword_search_uses_fts_and_tracks_replace(tmp_path):
+    idx = SemanticIndex(str(tmp_path / "sem.db"))
+    assert idx.model is None and idx.has_fts
+    idx.bulk_upsert([
+        ("a", "Running playlist for the morning run", {}),
+        ("b", "Evening wind-down playlist", {}),
+        ("c", "Journal about running", {}),
+    ])
+    res = idx.search("running playlist", top_k=3)
+    assert res[0]["doc_id"] == "a"
+    assert {r["doc_id"] for r in res} == {"a", "b", "c"}
+
+    idx.upsert("a", "Breathing exercise", {})
+    assert "a" not in {r["doc_id"] for r in idx.search("playlist", top_k=10)}
+    assert idx.search("breath", top_k=1)[0]["doc_id"] == "a"
+
+
+def test_keyword_index_migrates_legacy_db(tmp_path):
+    import sqlite3
+
+    db = str(tmp_path / "legacy.db")
+    with sqlite3.connect(db) as conn:
+        conn.execute("CREATE TABLE docs (doc_id TEXT PRIMARY KEY, text TEXT NOT NULL, meta TEXT NOT NULL, emb BLOB)")
+        conn.execute("INSERT INTO docs VALUES ('old', 'gratitude journal entry', '{}', NULL)")
+        conn.commit()
+
+    idx = SemanticIndex(db)
+    assert idx.search("gratitude", top_k=1)[0]["doc_id"] == "old"
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 1
+
+
+def test_bulk_upsert_embeds_in_batches(tmp_path):
+    enc = HashEncoder()
+    idx = SemanticIndex(str(tmp_path / "sem.db"), model=enc, embed_batch_size=8)
+    idx.bulk_upsert([(f"d{i}", f"entry {i}", {}) for i in range(20)])
+    assert enc.calls == [8, 8, 4]
+
+
+def test_async_embedding_backfills_in_background(tmp_path):
+    db = str(tmp_path / "sem.db")
+    enc = HashEncoder()
+    idx = SemanticIndex(db, model=enc, async_embed=True, embed_batch_size=16)
+    reader = SemanticIndex(db, model=HashEncoder())
+    reader.search("warmup", top_k=1)
+
+    for i in range(10):
+        idx.upsert(f"d{i}", f"note {i} about sleep" if i == 3 else f"note {i}", {})
+    assert idx.flush_embeddings(timeout=5)
+    assert idx.pending_embeddings() == 0
+    assert sum(enc.calls) == 10 and len(enc.calls) < 10
+
+    import sqlite3
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM docs WHERE emb IS NULL").fetchone()[0] == 0
+    assert idx.search("sleep", top_k=1)[0]["doc_id"] == "d3"
+    # Back-filled rows get a fresh rowid, so other workers pick them up too.
+    assert reader.search("sleep", top_k=1)[0]["doc_id"] == "d3"
+
+
+class FlakyEncoder(HashEncoder):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def encode(self, texts, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model unavailable")
+        return super().encode(texts, **kwargs)
+
+
+def test_failed_backfill_is_retried_then_dropped(tmp_path, caplog):
+    db = str(tmp_path / "sem.db")
+    idx = SemanticIndex(db, model=FlakyEncoder(failures=2), async_embed=True, embed_interval=0.001)
+    idx.upsert("d1", "note about sleep", {})
+    assert idx.flush_embeddings(timeout=5)
+    assert idx.embed_dropped == 0 and "attempt 2/3" in caplog.text
+    assert idx.search("sleep", top_k=1)[0]["doc_id"] == "d1"
+
+    idx = SemanticIndex(db, model=FlakyEncoder(failures=10), async_embed=True, embed_interval=0.001,
+                        embed_retries=1)
+    idx.upsert("d2", "note about food", {})
+    assert idx.flush_embeddings(timeout=5)
+    assert idx.embed_dropped == 1 and "dropping" in caplog.text
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import numpy as np
+
+from nous_core.eventing import EventBus, EventStore
+from nous_core.semantic import SemanticIndex
+from services.nexus.memory_graph import MemoryGraph
+from services.spotify import spotify_ingest
+from services.spotify.spotify_store import SpotifyStore
+
+
+class CountingEncoder:
+    dim = 8
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        self.calls.append(len(texts))
+        return np.ones((len(texts), self.dim), dtype="float32") / np.sqrt(self.dim)
+
+
+class FakeSpotify:
+    def __init__(self, items):
+        self.items = items
+        self.feature_calls = []
+
+    def recently_played(self, access_token, limit=50):
+        return self.items[:limit]
+
+    def audio_features(self, access_token, track_ids):
+        self.feature_calls.append(list(track_ids))
+        return [{"id": tid, "energy": 0.5} for tid in track_ids]
+
+
+class SlowProvider:
+    name = "stub"
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, *, artist, title):
+        with self.lock:
+            self.calls.append(title)
+        time.sleep(0.05)
+        if title.endswith("0"):
+            return None  # no lyrics anywhere
+        return {"provider": self.name, "lyrics": "love and hope heal tonight"}
+
+
+def _items(n, start=0):
+    return [{
+        "played_at": f"2026-10-16T10:{i:02d}:00.000Z",
+        "track": {"id": f"t{i}", "name": f"Song {i}", "artists": [{"name": f"Artist {i % 3}"}]},
+    } for i in reversed(range(start, start + n))]
+
+
+def test_sync_batches_and_skips_cached_tracks(tmp_path, monkeypatch):
+    provider = SlowProvider()
+    monkeypatch.setattr(spotify_ingest, "default_providers", lambda: [provider])
+    store = SpotifyStore(str(tmp_path / "spotify.db"))
+    encoder = CountingEncoder()
+    runtime = {
+        "bus": EventBus(store=EventStore(str(tmp_path / "events.db"))),
+        "semantic": SemanticIndex(str(tmp_path / "sem.db"), model=encoder),
+        "graph": MemoryGraph(str(tmp_path / "graph.db")),
+    }
+    spotify = FakeSpotify(_items(20))
+
+    t0 = time.perf_counter()
+    res = spotify_ingest.sync_recently_played(spotify=spotify, store=store, access_token="x", runtime=runtime)
+    assert time.perf_counter() - t0 < 0.6  # 20 x 50ms lookups ran concurrently
+    assert (res["tracks_cached"], res["lyrics_analyzed"], res["events_published"]) == (20, 18, 20)
+    assert res["semantic_upserts"] == 20 and res["graph_edges_added"] == 20
+    assert encoder.calls == [20]
+    assert len(spotify.feature_calls) == 1
+    assert store.get_lyrics_analysis("t1")["analysis"]["has_lyrics"]
+    assert store.get_enrichment("t5", "audio_features")["energy"] == 0.5
+
+    # Second sync: 5 new plays on top of the same 20 tracks
+    provider.calls.clear()
+    spotify.items = _items(5, start=20) + _items(20)
+    res = spotify_ingest.sync_recently_played(spotify=spotify, store=store, access_token="x", runtime=runtime)
+    assert (res["tracks_cached"], res["tracks_already_cached"], res["events_published"]) == (5, 20, 5)
+    assert spotify.feature_calls[-1] == [f"t{i}" for i in reversed(range(20, 25))]
+    assert sorted(provider.calls) == sorted(f"Song {i}" for i in range(20, 25))  # misses are negatively cached
+    assert encoder.calls == [20, 5]
+
+    played = runtime["bus"].store.recent(limit=100, topic_prefix="spotify.track.played")
+    assert len(played) == 25
+    assert played[0]["payload"]["played_at"] == "2026-10-16T10:24:00.000Z"
+
+
+class FailingIndex:
+    def bulk_upsert(self, docs):
+        raise RuntimeError("index down")
+
+
+def test_unindexed_tracks_are_retried_on_later_syncs(tmp_path, monkeypatch):
+    monkeypatch.setattr(spotify_ingest, "default_providers", lambda: [])
+    store = SpotifyStore(str(tmp_path / "spotify.db"))
+    spotify = FakeSpotify(_items(4))
+
+    # First sync without a runtime, second with a failing index: tracks are cached but never indexed
+    spotify_ingest.sync_recently_played(spotify=spotify, store=store, access_token="x", lyrics=False)
+    graph = MemoryGraph(str(tmp_path / "graph.db"))
+    res = spotify_ingest.sync_recently_played(spotify=spotify, store=store, access_token="x", lyrics=False,
+                                              runtime={"semantic": FailingIndex(), "graph": graph})
+    assert res["tracks_cached"] == 0 and res["semantic_upserts"] == 0 and res["graph_edges_added"] == 4
+
+    encoder = CountingEncoder()
+    runtime = {"semantic": SemanticIndex(str(tmp_path / "sem.db"), model=encoder), "graph": graph}
+    res = spotify_ingest.sync_recently_played(spotify=spotify, store=store, access_token="x", lyrics=False,
+                                              runtime=runtime)
+    assert res["semantic_upserts"] == 4 and res["graph_edges_added"] == 0
+    assert encoder.calls == [4]
+
+    res = spotify_ingest.sync_recently_played(spotify=spotify, store=store, access_token="x", lyrics=False,
+                                              runtime=runtime)
+    assert res["semantic_upserts"] == 0 and encoder.calls == [4]
+
+
+def test_lyrics_outages_are_not_negatively_cached(tmp_path, monkeypatch):
+    from services.spotify.lyrics import providers
+    from utils.http import HTTPError
+
+    def http_get_json(url, **kwargs):
+        if "Song 0" in url:
+            raise HTTPError("GET -> 404: No lyrics found", status_code=404)
+        if "Song 1" in url:
+            raise HTTPError("GET -> 503: unavailable", status_code=503)
+        if "Song 2" in url:
+            raise HTTPError("GET failed: read timeout")
+        return {"lyrics": "hope and light tomorrow"}
+
+    monkeypatch.setattr(providers, "http_get_json", http_get_json)
+    store = SpotifyStore(str(tmp_path / "spotify.db"))
+    candidates = [(f"t{i}", f"Artist {i}", f"Song {i}") for i in range(4)]
+
+    assert spotify_ingest._analyze_lyrics_batch(store, candidates, workers=4) == 1
+    # Only the 404 is a miss; the 503 and the timeout are looked up again next sync
+    assert store.lyrics_done_ids(["t0", "t1", "t2", "t3"]) == {"t0", "t3"}
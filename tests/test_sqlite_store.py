@@ -0,0 +1,63 @@
+import sqlite3
+import threading
+
+import pytest
+
+from nous_core.storage import SQLiteStore
+
+
+class KV(SQLiteStore):
+    def __init__(self, db_path, **opts):
+        super().__init__(db_path, **opts)
+        self.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v TEXT NOT NULL)")
+
+
+def test_connections_are_per_thread_and_tuned(tmp_path):
+    store = KV(str(tmp_path / "kv.db"))
+    conn = store._conn()
+    assert store._conn() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA mmap_size").fetchone()[0] == store.mmap_size
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(store._conn()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_get_many_and_put_many_chunk_large_batches(tmp_path):
+    store = KV(str(tmp_path / "kv.db"))
+    assert store.put_many("kv", ("k", "v"), [(f"k{i}", str(i)) for i in range(2500)]) == 2500
+    got = store.get_many("kv", "k", [f"k{i}" for i in range(0, 3000, 2)], ("v",))
+    assert len(got) == 1250 and got["k42"] == ("42",)
+    assert store.get_many("kv", "k", ["k1", "k2", "k3"], ("v",), "v != ?", ("2",)) == {"k1": ("1",), "k3": ("3",)}
+
+
+def test_write_retries_while_locked(tmp_path):
+    path = str(tmp_path / "kv.db")
+    store = KV(path, busy_timeout=0.05, retries=8, retry_backoff=0.02)
+    blocker = sqlite3.connect(path, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.2, blocker.rollback).start()
+    store.execute("INSERT INTO kv VALUES ('a', '1')")
+    assert store.read_one("SELECT v FROM kv WHERE k='a'") == ("1",)
+
+    impatient = KV(path, busy_timeout=0.01, retries=1, retry_backoff=0.01)
+    blocker.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError):
+        impatient.execute("INSERT INTO kv VALUES ('b', '2')")
+    blocker.rollback()
+
+
+def test_failed_write_rolls_back(tmp_path):
+    store = KV(str(tmp_path / "kv.db"))
+
+    def boom(conn):
+        conn.execute("INSERT INTO kv VALUES ('x', '1')")
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        store.write(boom)
+    assert store.read("SELECT * FROM kv") == []
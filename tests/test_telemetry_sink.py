@@ -0,0 +1,76 @@
+import threading
+
+from nous_core.eventing import EventBus, EventStore, TelemetrySink
+from nous_core.eventing.telemetry import flush_all
+
+
+def _sink(tmp_path, **opts):
+    store = EventStore(str(tmp_path / "events.db"))
+    bus = EventBus(store=store)
+    seen = []
+    bus.subscribe("http.*", lambda topic, payload: seen.append((topic, payload["id"])))
+    opts.setdefault("flush_interval", 60.0)
+    return TelemetrySink(bus, **opts), store, seen
+
+
+def test_record_is_batched_into_one_publish(tmp_path):
+    sink, store, seen = _sink(tmp_path)
+    for i in range(10):
+        assert sink.record("http.request", {"id": i})
+    assert store.recent() == []  # nothing written on the request path
+
+    assert sink.flush() == 10
+    assert [e["payload"]["id"] for e in reversed(store.recent())] == list(range(10))
+    assert seen == [("http.request", i) for i in range(10)]
+    stats = sink.stats()
+    assert stats["batches"] == 1 and stats["flushed"] == 10 and stats["queued"] == 0
+
+
+def test_sampling_and_path_exclusion(tmp_path):
+    sink, _, _ = _sink(tmp_path, exclude=("/static/", "/health"))
+    assert not sink.sample("/static/app.js")
+    assert not sink.sample("/health") and not sink.sample("/health/quick")
+    assert sink.sample("/healthz") and sink.sample("/healthcare") and sink.sample("/statistics")
+    assert sink.sample("/api/v2/chat")
+
+    sink.sample_rate = 0.0
+    assert not sink.sample("/api/v2/chat")
+    sink.sample_rate = 0.5
+    hits = sum(sink.sample("/x") for _ in range(4000))
+    assert 1600 < hits < 2400
+
+
+def test_default_exclusions_cover_the_api_health_probes(tmp_path):
+    sink, _, _ = _sink(tmp_path)
+    for probe in ("/health", "/healthz", "/api/health", "/api/healthz", "/api/v2/health", "/favicon.ico"):
+        assert not sink.sample(probe), probe
+    assert sink.sample("/api/healthcare/providers") and sink.sample("/api/v2/health-tips")
+
+
+def test_overflow_drops_and_counts(tmp_path, monkeypatch):
+    sink, store, _ = _sink(tmp_path, capacity=8)
+    monkeypatch.setattr(sink, "_start", lambda: None)  # no drainer racing the fill
+    results = [sink.record("http.request", {"id": i}) for i in range(12)]
+    assert results.count(False) == 4
+    assert sink.stats()["dropped"] == 4
+    assert sink.flush() == 8
+    assert len(store.recent()) == 8
+
+
+def test_concurrent_records_and_shutdown_flush(tmp_path):
+    sink, store, _ = _sink(tmp_path, capacity=64, flush_interval=0.05)
+    threads = [threading.Thread(target=lambda n=n: [sink.record("http.response", {"id": n * 100 + i})
+                                                    for i in range(10)]) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sink._thread.is_alive()  # the drainer runs until the process exits
+    sink.flush()  # whatever the drainer has not taken yet
+    stats = sink.stats()
+    assert stats["flushed"] == 40 and stats["queued"] == 0 and stats["dropped"] == 0
+    assert len(store.recent(limit=100)) == 40
+
+    sink.record("http.response", {"id": -1})
+    flush_all()
+    assert store.recent(limit=1)[0]["payload"]["id"] == -1
@@ -16,7 +16,8 @@ from utils.therapeutic_code_framework import (
     stop_skill, with_therapy_session, cognitive_reframe,
     with_mindful_breathing, distress_tolerance, growth_mindset_loop,
     CompassionateException, TherapeuticContext, generate_affirmation,
-    wise_mind_decision, TherapeuticVariables, COMPASSION_PROMPTS
+    wise_mind_decision, TherapeuticVariables, COMPASSION_PROMPTS,
+    smart_goal, dear_man_communication, BackoffPolicy, decorator_profiler
 )
 
 # 💝 Test fixtures with compassion
@@ -61,7 +62,7 @@ class TestTherapeuticJourney:
         """Verify STOP skill adds mindfulness to operations"""
         momentsBefore = time.time()
         
-        @stop_skill("important processing")
+        @stop_skill("important processing", mode="mindful")
         def mindful_operation():
             return "completed with awareness"
         
@@ -278,6 +279,97 @@ class TestGentlePerformance:
         
         print(f"💫 Generated 100 affirmations in {duration:.3f}s with love")
 
+# ⚡ Production mode - support without making anyone wait
+class TestProductionMode:
+    """Request-path decorators must add nanoseconds, never pauses"""
+
+    DECORATORS = [
+        stop_skill("serving"),
+        with_mindful_breathing(breath_count=3),
+        cognitive_reframe("slow", "fast"),
+        with_therapy_session("request"),
+        distress_tolerance("TIPP"),
+        smart_goal("s", "m", "a", "r", "t"),
+        dear_man_communication("respond"),
+        growth_mindset_loop(max_attempts=3),
+    ]
+
+    @pytest.fixture
+    def no_sleeping(self, monkeypatch):
+        def blocked(seconds):
+            raise AssertionError(f"request-path decorator blocked for {seconds}s")
+        monkeypatch.setattr(time, "sleep", blocked)
+
+    def test_no_decorator_blocks(self, no_sleeping):
+        for decorate in self.DECORATORS:
+            handler = decorate(lambda: "ok")
+            assert handler._therapeutic_mode == "production"
+            assert handler() == "ok"
+
+    def test_request_path_handlers_do_not_block(self, no_sleeping):
+        import os
+        from flask import Flask
+        from routes.chat_routes import chat_bp
+
+        app = Flask("therapeutic_test", root_path=os.path.dirname(os.path.dirname(__file__)))
+        app.secret_key = "test"
+        app.register_blueprint(chat_bp)
+        for endpoint, view in app.view_functions.items():
+            assert getattr(view, "_therapeutic_mode", "production") == "production", endpoint
+
+        client = app.test_client()
+        start = time.perf_counter()
+        assert client.post("/chat/check-in", json={"feeling": "calm"}).status_code == 200
+        assert client.get("/chat/demo").status_code == 200
+        assert time.perf_counter() - start < 0.5
+
+    def test_errors_still_reach_the_log(self, caplog):
+        @stop_skill("failing gently")
+        def fails():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            fails()
+        assert "boom" in caplog.text
+
+    def test_retry_uses_jittered_backoff(self, monkeypatch):
+        waits = []
+        monkeypatch.setattr(time, "sleep", waits.append)
+        attempts = []
+
+        @growth_mindset_loop(max_attempts=4, backoff=BackoffPolicy(base=0.01, factor=2.0, max_delay=0.03))
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 4:
+                raise ValueError("not yet")
+            return "done"
+
+        assert flaky() == "done"
+        assert len(waits) == 3
+        assert all(0 <= w <= c for w, c in zip(waits, (0.01, 0.02, 0.03)))
+
+    def test_profiler_reports_added_latency(self):
+        decorator_profiler.enable()
+        try:
+            @stop_skill("profiled")
+            def fast():
+                return 1
+
+            @stop_skill("profiled", mode="mindful")
+            def slow():
+                return 1
+        finally:
+            decorator_profiler.disable()
+
+        for _ in range(100):
+            fast()
+        slow()
+        rows = {row["function"].rsplit(".", 1)[-1]: row for row in decorator_profiler.report()}
+        assert rows["fast"]["calls"] == 100 and rows["fast"]["mode"] == "production"
+        assert rows["fast"]["avg_overhead_us"] < 1000
+        assert rows["slow"]["avg_overhead_us"] >= 100000  # the mindful 0.1s pause
+
+
 # 🌺 Helper functions for therapeutic testing
 def assert_with_compassion(condition, message):
     """Assert with a gentle message"""
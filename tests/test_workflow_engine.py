@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+from flask import Flask
+
+from nous_core.eventing import EventBus, EventStore
+from services.workflows import Step, WorkflowError, run_workflow
+
+
+@pytest.fixture
+def bus(tmp_path):
+    return EventBus(store=EventStore(str(tmp_path / "events.db")))
+
+
+def test_bare_callables_run_in_sequence(bus):
+    state = run_workflow("seq", [lambda s: {"a": 1}, lambda s: {"b": s["a"] + 1}, lambda s: 7],
+                         payload={"x": 0}, bus=bus)
+    assert (state["x"], state["a"], state["b"], state["result"]) == (0, 1, 2, 7)
+    assert len(state["_workflow"]["step_ms"]) == 3
+
+
+def test_independent_steps_run_concurrently(bus):
+    def slow(key):
+        def fn(state):
+            time.sleep(0.3)
+            return {key: True}
+        return fn
+
+    seen = {}
+
+    def join(state):
+        seen.update(state)
+        return {"joined": True}
+
+    t0 = time.perf_counter()
+    state = run_workflow("dag", [
+        Step("a", slow("a")), Step("b", slow("b")), Step("c", slow("c")),
+        Step("join", join, deps=("a", "b")),
+    ], bus=bus)
+    assert time.perf_counter() - t0 < 0.8
+    assert seen["a"] and seen["b"] and "c" not in seen  # only ancestors are visible
+    assert state["joined"] and state["c"]
+    assert all(ms >= 300 for name, ms in state["_workflow"]["step_ms"].items() if name != "join")
+
+
+def test_retries_and_timeouts(bus):
+    calls = []
+
+    def flaky(state):
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("boom")
+        return {"ok": True}
+
+    async def hang(state):
+        await asyncio.sleep(5)
+
+    assert run_workflow("retry", [Step("flaky", flaky, retries=2)], bus=bus)["ok"]
+    with pytest.raises(WorkflowError) as err:
+        run_workflow("timeout", [Step("hang", hang, timeout=0.1, retries=1)], bus=bus)
+    assert err.value.step == "hang" and isinstance(err.value.error, TimeoutError)
+    with pytest.raises(ValueError):
+        run_workflow("cycle", [Step("a", flaky, deps=("b",)), Step("b", flaky, deps=("a",))], bus=bus)
+
+
+
+def test_failed_run_waits_without_spinning_on_queued_retries(bus):
+    def boom(state):
+        raise RuntimeError("boom")
+
+    def slow(state):
+        time.sleep(0.5)
+        return {"slow": True}
+
+    cpu = time.process_time()
+    with pytest.raises(WorkflowError):
+        run_workflow("spin", [
+            Step("a", boom, retries=3, retry_delay=0.02), Step("b", boom), Step("c", slow),
+        ], bus=bus)
+    assert time.process_time() - cpu < 0.25
+
+def test_interrupted_run_resumes_from_checkpoint(bus):
+    calls = []
+    fail = [True]
+
+    def first(state):
+        calls.append("first")
+        return {"first": state["n"] * 2}
+
+    def second(state):
+        calls.append("second")
+        if fail[0]:
+            raise RuntimeError("interrupted")
+        return {"second": state["first"] + 1}
+
+    steps = [Step("first", first), Step("second", second, deps=("first",))]
+    with pytest.raises(WorkflowError) as err:
+        run_workflow("resumable", steps, payload={"n": 5}, bus=bus)
+
+    fail[0] = False
+    state = run_workflow("resumable", steps, payload={"n": 99}, resume=True, bus=bus)
+    assert state["_workflow"]["run_id"] == err.value.run_id
+    assert state["_workflow"]["restored"] == ["first"]
+    assert (state["n"], state["second"]) == (5, 11)
+    assert calls == ["first", "second", "second"]
+
+    # Checkpoints are per-step deltas, not state copies
+    steps_logged = bus.store.recent(limit=10, topic_prefix=f"workflow.resumable.{err.value.run_id}.step")
+    assert [e["payload"]["delta"] for e in steps_logged] == [{"second": 11}, {"first": 10}]
+    # A finished run is not resumed
+    assert run_workflow("resumable", steps, payload={"n": 1}, resume=True, bus=bus)["second"] == 3
+
+
+def test_daily_workflow(tmp_path):
+    from services.runtime_service import init_runtime
+    from services.workflows.daily import run_daily_workflow
+
+    app = Flask(__name__, instance_path=str(tmp_path))
+    with app.app_context():
+        state = run_daily_workflow()
+        rt = init_runtime(app)
+        assert rt["store"].recent(limit=1, topic_prefix="system.snapshot")[0]["id"] == state["snapshot_event_id"]
+        assert set(state["_workflow"]["step_ms"]) == {"snapshot", "rollup", "record"}
+        rt["bus"].flush(5)
@@ -12,13 +12,19 @@ import numpy as np
 import asyncio
 import random
 import logging
-from collections import deque, defaultdict
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from collections import OrderedDict, deque, defaultdict
+from itertools import islice
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+import threading
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from nous_core.monitoring import get_sampler
+from nous_core.replay import PrioritizedReplay
+from nous_core.storage import SQLiteStore
+
 logger = logging.getLogger(__name__)
 
 class ActionType(Enum):
@@ -37,7 +43,7 @@ class RewardType(Enum):
     RESOURCE_EFFICIENCY = "resource_efficiency"
     ACCURACY = "accuracy"
 
-@dataclass
+@dataclass(slots=True)
 class Experience:
     """Represents a learning experience"""
     timestamp: float
@@ -58,6 +64,107 @@ class UserProfile:
     learning_rate: float = 0.1
     last_updated: Optional[datetime] = None
 
+    def to_json(self) -> str:
+        data = asdict(self)
+        data['last_updated'] = self.last_updated.isoformat() if self.last_updated else None
+        return json.dumps(data, default=str)
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'UserProfile':
+        data = json.loads(payload)
+        if data.get('last_updated'):
+            data['last_updated'] = datetime.fromisoformat(data['last_updated'])
+        return cls(**data)
+
+class UserProfileStore(SQLiteStore):
+    """On-disk spill area for user profiles evicted from the in-memory LRU"""
+    
+    def __init__(self, db_path: str, **store_opts: Any):
+        super().__init__(db_path, **store_opts)
+        self.write(lambda conn: conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_profiles ("
+            "user_id TEXT PRIMARY KEY, payload TEXT NOT NULL, updated_ts REAL NOT NULL)"
+        ))
+    
+    def save_many(self, profiles: List[UserProfile]) -> int:
+        now = time.time()
+        return self.put_many('user_profiles', ('user_id', 'payload', 'updated_ts'),
+                             [(p.user_id, p.to_json(), now) for p in profiles])
+    
+    def load(self, user_id: str) -> Optional[UserProfile]:
+        row = self.read_one("SELECT payload FROM user_profiles WHERE user_id = ?", (user_id,))
+        return UserProfile.from_json(row[0]) if row else None
+
+class UserProfileCache:
+    """
+    LRU of live user profiles capped at `max_profiles`. Evicted profiles are
+    written to a UserProfileStore (opened on first eviction) and reloaded
+    transparently on the next lookup, so memory stays bounded however many
+    users the process sees.
+    """
+    
+    def __init__(self, max_profiles: int = 1024, db_path: Optional[str] = None):
+        self.max_profiles = max(1, int(max_profiles))
+        self.db_path = db_path
+        self._profiles: 'OrderedDict[str, UserProfile]' = OrderedDict()
+        self._store: Optional[UserProfileStore] = None
+        self.spilled = 0
+    
+    def _spill_store(self, create: bool = True) -> Optional[UserProfileStore]:
+        if self._store is None and self.db_path and (create or os.path.exists(self.db_path)):
+            self._store = UserProfileStore(self.db_path)
+        return self._store
+    
+    def get(self, user_id: str) -> Optional[UserProfile]:
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            self._profiles.move_to_end(user_id)
+            return profile
+        store = self._spill_store(create=False)
+        profile = store.load(user_id) if store else None
+        if profile is not None:
+            self[user_id] = profile
+        return profile
+    
+    def __getitem__(self, user_id: str) -> UserProfile:
+        profile = self.get(user_id)
+        if profile is None:
+            raise KeyError(user_id)
+        return profile
+    
+    def __setitem__(self, user_id: str, profile: UserProfile):
+        self._profiles[user_id] = profile
+        self._profiles.move_to_end(user_id)
+        if len(self._profiles) > self.max_profiles:
+            self._evict()
+    
+    def __contains__(self, user_id: str) -> bool:
+        return self.get(user_id) is not None
+    
+    def __len__(self) -> int:
+        return len(self._profiles)
+    
+    def _evict(self):
+        # Spill the oldest eighth in one transaction rather than one row per request
+        count = max(1, len(self._profiles) - self.max_profiles + self.max_profiles // 8)
+        evicted = [self._profiles.popitem(last=False)[1] for _ in range(min(count, len(self._profiles) - 1))]
+        store = self._spill_store()
+        if store and evicted:
+            try:
+                store.save_many(evicted)
+                self.spilled += len(evicted)
+            except Exception as e:
+                logger.warning(f"Could not spill {len(evicted)} user profiles: {e}")
+    
+    def flush(self):
+        """Write every live profile to the spill store"""
+        store = self._spill_store()
+        if store and self._profiles:
+            store.save_many(list(self._profiles.values()))
+
+MAX_THREADS = 16
+MAX_PROCESSES = 4
+
 class DynamicResourceManager:
     """Intelligent resource allocation based on system state and user needs"""
     
@@ -68,29 +175,35 @@ class DynamicResourceManager:
         self.optimization_factor = 0.85  # Conservative by default
     
     def get_system_metrics(self) -> Dict[str, float]:
-        """Get current system performance metrics"""
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        """Get current system performance metrics (latest background sample, never blocks)"""
+        snap = get_sampler().latest()
         
         metrics = {
-            'cpu_usage': cpu_percent,
-            'memory_usage': memory.percent,
-            'available_memory': memory.available,
-            'disk_usage': disk.percent,
-            'load_avg': os.getloadavg()[0] if hasattr(os, 'getloadavg') else 0.0
+            'cpu_usage': snap['cpu_percent'],
+            'memory_usage': snap['mem_percent'],
+            'available_memory': snap['available_memory'],
+            'disk_usage': snap['disk_percent'],
+            'load_avg': snap['load_avg'],
+            'cpu_usage_smoothed': snap['cpu_percent_ema'],
+            'memory_usage_smoothed': snap['mem_percent_ema'],
+            'sampled_at': snap['ts']
         }
         
-        self.load_history.append(metrics)
+        if not self.load_history or self.load_history[-1]['sampled_at'] != snap['ts']:
+            self.load_history.append(metrics)
         return metrics
     
     def calculate_optimal_resources(self, task_complexity: int = 1) -> Tuple[int, int]:
         """Calculate optimal thread and process counts based on current load"""
         metrics = self.get_system_metrics()
         
-        # Adjust based on current system load
-        cpu_factor = max(0.3, 1.0 - (metrics['cpu_usage'] / 100.0))
-        memory_factor = max(0.3, 1.0 - (metrics['memory_usage'] / 100.0))
+        # Adjust based on smoothed system load so a single spike does not resize the pools;
+        # until the sampler has a CPU reading, estimate CPU use from the load average
+        cpu_usage = metrics['cpu_usage_smoothed']
+        if cpu_usage is None:
+            cpu_usage = min(100.0, 100.0 * metrics['load_avg'] / (self.cpu_count or 1))
+        cpu_factor = max(0.3, 1.0 - (cpu_usage / 100.0))
+        memory_factor = max(0.3, 1.0 - (metrics['memory_usage_smoothed'] / 100.0))
         
         # Calculate optimal thread count
         base_threads = max(2, int(self.cpu_count * self.optimization_factor))
@@ -101,15 +214,105 @@ class DynamicResourceManager:
         max_processes_by_memory = max(1, int(metrics['available_memory'] / process_memory_limit))
         optimal_processes = min(max_processes_by_memory, max(1, int(self.cpu_count * memory_factor)))
         
-        return min(optimal_threads, 16), min(optimal_processes, 4)  # Cap at reasonable limits
+        return min(optimal_threads, MAX_THREADS), min(optimal_processes, MAX_PROCESSES)  # Cap at reasonable limits
+
+class ResizableExecutor(Executor):
+    """
+    Executor whose concurrency limit can change in place.
+    The underlying pool is created once (lazily, on first submit) at the hard
+    cap `max_workers`; resize() only moves the limit on how many submitted
+    calls run at once, and calls beyond it wait in a FIFO queue. Shrinking
+    lets running calls finish; growing dispatches queued calls immediately.
+    """
+    
+    def __init__(self, pool_factory, max_workers: int, limit: int):
+        self._pool_factory = pool_factory
+        self.max_workers = max(1, int(max_workers))
+        self.limit = min(self.max_workers, max(1, int(limit)))
+        self._pool: Optional[Executor] = None
+        self._pending: deque = deque()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._shutdown = False
+    
+    def resize(self, limit: int):
+        with self._lock:
+            self.limit = min(self.max_workers, max(1, int(limit)))
+        self._dispatch()
+    
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('cannot schedule new futures after shutdown')
+            if self._pool is None:
+                self._pool = self._pool_factory(max_workers=self.max_workers)
+            self._pending.append((future, fn, args, kwargs))
+        self._dispatch()
+        return future
+    
+    def _dispatch(self):
+        while True:
+            with self._lock:
+                if self._active >= self.limit or not self._pending:
+                    return
+                future, fn, args, kwargs = self._pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self._active += 1
+                pool = self._pool
+            try:
+                inner = pool.submit(fn, *args, **kwargs)
+            except Exception as e:
+                self._done(future, None, e)
+                continue
+            inner.add_done_callback(lambda f, outer=future: self._done(outer, f))
+    
+    def _done(self, outer: Future, inner: Optional[Future], error: Optional[BaseException] = None):
+        with self._lock:
+            self._active -= 1
+        if inner is not None:
+            error = inner.exception()
+        if error is not None:
+            outer.set_exception(error)
+        else:
+            outer.set_result(inner.result())
+        self._dispatch()
+    
+    def stats(self) -> Dict[str, int]:
+        return {'limit': self.limit, 'max_workers': self.max_workers,
+                'active': self._active, 'queued': len(self._pending)}
+    
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self._lock:
+            self._shutdown = True
+            pending = list(self._pending) if cancel_futures else []
+            if cancel_futures:
+                self._pending.clear()
+            pool = self._pool
+        for future, *_ in pending:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=wait)
 
 class ExperienceReplaySystem:
-    """Advanced experience replay with prioritization and user-specific learning"""
+    """
+    Advanced experience replay with prioritization and user-specific learning.
+    Experiences sit in bounded ring buffers backed by sum trees (one global,
+    one per recently active user, LRU-capped at `max_users`), so storing and
+    sampling are O(log n) instead of sorting the whole buffer per sample.
+    Priority grows with reward and with explicit user feedback.
+    """
     
-    def __init__(self, capacity: int = 10000):
+    def __init__(self, capacity: int = 10000, user_capacity: int = 1000, max_users: int = 1024,
+                 alpha: float = 0.6, epsilon: float = 0.01):
         self.capacity = capacity
-        self.experiences = deque(maxlen=capacity)
-        self.user_experiences = defaultdict(lambda: deque(maxlen=1000))
+        self.user_capacity = user_capacity
+        self.max_users = max(1, int(max_users))
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.buffer = PrioritizedReplay(capacity)
+        self.user_experiences: 'OrderedDict[str, PrioritizedReplay]' = OrderedDict()
         self.priority_weights = {
             RewardType.USER_SATISFACTION: 2.0,
             RewardType.TASK_COMPLETION: 1.5,
@@ -118,55 +321,75 @@ class ExperienceReplaySystem:
             RewardType.ACCURACY: 1.8
         }
     
+    def __len__(self) -> int:
+        return len(self.buffer)
+    
+    @property
+    def experiences(self) -> List[Experience]:
+        """Stored experiences, oldest first"""
+        return self.buffer.items()
+    
+    def priority(self, experience: Experience) -> float:
+        """Sampling priority: shifted reward (rewards are clamped to [-1, 2]) plus feedback"""
+        base = experience.reward + 1.0
+        if experience.user_feedback is not None:
+            base += self.priority_weights[RewardType.USER_SATISFACTION] * experience.user_feedback
+        # Clamp after feedback: negative feedback must not push the base below zero
+        return (max(base, 0.0) + self.epsilon) ** self.alpha
+    
+    def _user_buffer(self, user_id: str, create: bool = False) -> Optional[PrioritizedReplay]:
+        buffer = self.user_experiences.get(user_id)
+        if buffer is not None:
+            self.user_experiences.move_to_end(user_id)
+        elif create:
+            buffer = self.user_experiences[user_id] = PrioritizedReplay(self.user_capacity)
+            if len(self.user_experiences) > self.max_users:
+                self.user_experiences.popitem(last=False)
+        return buffer
+    
     def store_experience(self, experience: Experience):
         """Store a new learning experience"""
-        self.experiences.append(experience)
-        if experience.user_context.get('user_id'):
-            user_id = experience.user_context['user_id']
-            self.user_experiences[user_id].append(experience)
+        priority = self.priority(experience)
+        user_id = experience.user_context.get('user_id')
+        if user_id:
+            self.buffer.add(experience, priority, tag=hash(user_id))
+            self._user_buffer(user_id, create=True).add(experience, priority)
+        else:
+            self.buffer.add(experience, priority)
         
         logger.debug(f"Stored experience: action={experience.action_taken}, reward={experience.reward}")
     
     def sample_experiences(self, batch_size: int = 32, user_id: Optional[str] = None) -> List[Experience]:
         """Sample experiences with prioritization"""
-        if user_id and user_id in self.user_experiences:
+        user_buffer = self._user_buffer(user_id) if user_id else None
+        if user_buffer is not None:
             # Prioritize user-specific experiences (70%) + global experiences (30%)
             user_sample_size = int(batch_size * 0.7)
             global_sample_size = batch_size - user_sample_size
             
-            user_experiences = list(self.user_experiences[user_id])
-            global_experiences = [exp for exp in self.experiences if exp.user_context.get('user_id') != user_id]
-            
-            # Sample from user experiences with reward-based prioritization
-            user_sample = self._prioritized_sample(user_experiences, user_sample_size)
-            global_sample = self._prioritized_sample(global_experiences, global_sample_size)
+            # Global sample skips this user's own experiences
+            user_sample = user_buffer.sample(user_sample_size)
+            global_sample = self.buffer.sample(global_sample_size, exclude_tag=hash(user_id))
             
             return user_sample + global_sample
         else:
             # Sample globally with prioritization
-            return self._prioritized_sample(list(self.experiences), batch_size)
+            return self.buffer.sample(batch_size)
     
-    def _prioritized_sample(self, experiences: List[Experience], sample_size: int) -> List[Experience]:
-        """Sample experiences based on reward priority"""
-        if not experiences or sample_size <= 0:
-            return []
-        
-        sample_size = min(sample_size, len(experiences))
-        
-        # Sort by reward (prioritize high-reward experiences)
-        sorted_experiences = sorted(experiences, key=lambda x: x.reward, reverse=True)
-        
-        # Take top 50% deterministically, sample remaining 50% randomly
-        top_count = max(1, sample_size // 2)
-        random_count = sample_size - top_count
-        
-        result = sorted_experiences[:top_count]
-        
-        if random_count > 0 and len(sorted_experiences) > top_count:
-            remaining = sorted_experiences[top_count:]
-            result.extend(random.sample(remaining, min(random_count, len(remaining))))
-        
-        return result
+    def record_feedback(self, user_id: str, feedback_score: float, window: int = 20) -> Optional[Experience]:
+        """Attach feedback to the user's latest experience among the last `window` stored, re-prioritizing it"""
+        for slot, experience in reversed(self.buffer.recent(window)):
+            if experience.user_context.get('user_id') == user_id:
+                experience.user_feedback = feedback_score
+                priority = self.priority(experience)
+                self.buffer.update(slot, priority)
+                user_buffer = self._user_buffer(user_id)
+                if user_buffer is not None:
+                    for user_slot, own in user_buffer.recent(1):
+                        if own is experience:
+                            user_buffer.update(user_slot, priority)
+                return experience
+        return None
 
 class MultiAgentCoordinator:
     """Coordinates multiple AI agents for different aspects of personal assistance"""
@@ -216,7 +439,10 @@ class AdaptiveAISystem:
         self.resource_manager = DynamicResourceManager()
         self.experience_replay = ExperienceReplaySystem()
         self.multi_agent = MultiAgentCoordinator()
-        self.user_profiles = {}
+        self.user_profiles = UserProfileCache(
+            max_profiles=int(os.environ.get('ADAPTIVE_AI_MAX_PROFILES', 1024)),
+            db_path=os.environ.get('ADAPTIVE_AI_PROFILE_DB', os.path.join('instance', 'adaptive_ai_profiles.db'))
+        )
         
         # Learning parameters
         self.learning_rate = 0.01
@@ -224,38 +450,33 @@ class AdaptiveAISystem:
         self.exploration_decay = 0.995
         self.min_exploration = 0.05
         
-        # Performance tracking
-        self.performance_metrics = defaultdict(list)
+        # Performance tracking (bounded windows)
+        self.performance_metrics = defaultdict(lambda: deque(maxlen=1000))
         self.last_optimization = time.time()
         self.optimization_interval = 300  # 5 minutes
         
-        # Task execution
-        self.thread_executor = None
-        self.process_executor = None
-        self._initialize_executors()
+        # Task execution (created once, resized in place by _optimize_system)
+        max_threads, max_processes = self.resource_manager.calculate_optimal_resources()
+        self.thread_executor = ResizableExecutor(ThreadPoolExecutor, MAX_THREADS, max_threads)
+        self.process_executor = ResizableExecutor(ProcessPoolExecutor, MAX_PROCESSES, max_processes)
     
-    def _initialize_executors(self):
-        """Initialize thread and process executors with optimal configuration"""
+    def _resize_executors(self):
+        """Apply the current optimal thread and process counts to the executors"""
         max_threads, max_processes = self.resource_manager.calculate_optimal_resources()
-        
-        if self.thread_executor:
-            self.thread_executor.shutdown(wait=False)
-        if self.process_executor:
-            self.process_executor.shutdown(wait=False)
-        
-        self.thread_executor = ThreadPoolExecutor(max_workers=max_threads)
-        self.process_executor = ProcessPoolExecutor(max_workers=max_processes)
+        self.thread_executor.resize(max_threads)
+        self.process_executor.resize(max_processes)
     
     def get_user_profile(self, user_id: str) -> UserProfile:
         """Get or create user profile"""
-        if user_id not in self.user_profiles:
-            self.user_profiles[user_id] = UserProfile(
+        profile = self.user_profiles.get(user_id)
+        if profile is None:
+            profile = self.user_profiles[user_id] = UserProfile(
                 user_id=user_id,
                 interaction_patterns={},
                 preference_weights={reward_type.value: 1.0 for reward_type in RewardType},
                 last_updated=datetime.now()
             )
-        return self.user_profiles[user_id]
+        return profile
     
     def process_user_request(self, user_id: str, request: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process a user request using adaptive AI approach"""
@@ -428,29 +649,33 @@ class AdaptiveAISystem:
         """Periodic system optimization"""
         self.last_optimization = time.time()
         
-        # Re-initialize executors with current optimal configuration
-        self._initialize_executors()
+        # Resize executors to the current optimal configuration
+        self._resize_executors()
         
         # Update multi-agent performance
         if self.performance_metrics['reward']:
-            recent_performance = float(np.mean(self.performance_metrics['reward'][-50:]))
+            recent_performance = float(np.mean(self._recent_metric('reward', 50)))
             for agent_id in self.multi_agent.agents.keys():
                 self.multi_agent.update_agent_performance(agent_id, recent_performance)
         
         logger.info("System optimization completed")
     
+    def _recent_metric(self, name: str, n: int) -> List[float]:
+        values = self.performance_metrics[name]
+        return list(islice(values, max(0, len(values) - n), None))
+    
     def get_learning_insights(self, user_id: Optional[str] = None) -> Dict[str, Any]:
         """Get insights about the learning system"""
         insights = {
-            'total_experiences': len(self.experience_replay.experiences),
+            'total_experiences': len(self.experience_replay),
             'exploration_rate': self.exploration_rate,
-            'avg_response_time': np.mean(self.performance_metrics['response_time'][-100:]) if self.performance_metrics['response_time'] else 0,
-            'avg_reward': np.mean(self.performance_metrics['reward'][-100:]) if self.performance_metrics['reward'] else 0,
+            'avg_response_time': np.mean(self._recent_metric('response_time', 100)) if self.performance_metrics['response_time'] else 0,
+            'avg_reward': np.mean(self._recent_metric('reward', 100)) if self.performance_metrics['reward'] else 0,
             'system_metrics': self.resource_manager.get_system_metrics()
         }
         
-        if user_id and user_id in self.user_profiles:
-            profile = self.user_profiles[user_id]
+        profile = self.user_profiles.get(user_id) if user_id else None
+        if profile is not None:
             insights['user_profile'] = {
                 'learning_rate': profile.learning_rate,
                 'last_updated': profile.last_updated.isoformat() if profile.last_updated else None,
@@ -461,17 +686,10 @@ class AdaptiveAISystem:
     
     def update_from_user_feedback(self, user_id: str, feedback_score: float, session_context: Dict[str, Any]):
         """Update learning based on explicit user feedback"""
-        # Find recent experiences for this user
-        recent_experiences = [
-            exp for exp in list(self.experience_replay.experiences)[-20:]
-            if exp.user_context.get('user_id') == user_id
-        ]
+        # Update the user's most recent experience with the feedback (and its replay priority)
+        latest_experience = self.experience_replay.record_feedback(user_id, feedback_score)
         
-        if recent_experiences:
-            # Update the most recent experience with user feedback
-            latest_experience = recent_experiences[-1]
-            latest_experience.user_feedback = feedback_score
-            
+        if latest_experience is not None:
             # Adjust user profile based on feedback
             user_profile = self.get_user_profile(user_id)
             if feedback_score > 0.7:  # Positive feedback
@@ -5,42 +5,241 @@ This module provides analytics and insights functionality for the NOUS applicati
 supporting user activity tracking, metrics generation, and AI-powered insights.
 """
 
+import atexit
+import copy
 import json
 import logging
-from datetime import datetime, timedelta, date
-from sqlalchemy import func, and_, or_
-from typing import Dict, List, Optional, Any
-from collections import defaultdict
+import os
+import threading
+import time as _time
+from datetime import datetime, timedelta, date, time
+from flask import current_app, has_app_context
+from sqlalchemy import func, and_, or_, select, insert, bindparam
+from sqlalchemy.exc import DBAPIError, DisconnectionError, OperationalError
+from typing import Dict, List, Optional, Any, Tuple
+from collections import defaultdict, OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Dashboards are cached per user for this many seconds; any write for the user drops them
+DASHBOARD_CACHE_TTL = 60
+DASHBOARD_CACHE_MAX_USERS = 1024
+
+# activity_data keys whose numeric value is summed into the rollup (mood ratings etc.)
+VALUE_KEYS = ('value', 'rating', 'mood', 'score')
+
+
+def _day_bounds(start_date: date, end_date: date) -> Tuple[datetime, datetime]:
+    """Half-open [start, end + 1 day) datetime range, so timestamp indexes apply"""
+    return datetime.combine(start_date, time.min), datetime.combine(end_date + timedelta(days=1), time.min)
+
+
+def _activity_value(activity_data: Optional[Dict]) -> Optional[float]:
+    for key in VALUE_KEYS:
+        value = (activity_data or {}).get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return None
+
+
+# Daily UserMetrics counter bumped by each activity type
+METRIC_COUNTERS = {
+    'chat': 'chat_sessions',
+    'task_completed': 'tasks_completed',
+    'task_created': 'tasks_created',
+    'mood': 'mood_entries',
+    'workout': 'workout_sessions',
+    'login': 'app_sessions'
+}
+METRIC_COLUMNS = tuple(sorted(set(METRIC_COUNTERS.values()))) + ('total_chat_time', 'total_app_time')
+ROLLUP_KEYS = ('user_id', 'day', 'activity_type', 'activity_category')
+ROLLUP_COUNTERS = ('count', 'duration_seconds', 'value_sum', 'value_count')
+METRIC_KEYS = ('user_id', 'metric_type', 'metric_date')
+
+
+def _dialect_insert(executor):
+    """insert() with on_conflict_do_update for the executor's dialect, if it has one"""
+    bind = executor.get_bind() if hasattr(executor, 'get_bind') else executor
+    if bind.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if bind.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def _upsert_increment(executor, table, keys: Tuple[str, ...], counters: Tuple[str, ...], rows: List[Dict[str, Any]]):
+    """Insert rows, adding their counters onto any existing row with the same keys"""
+    if not rows:
+        return
+    insert = _dialect_insert(executor)
+    if insert is not None:
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: func.coalesce(table.c[name], 0) + stmt.excluded[name] for name in counters}
+        )
+        executor.execute(stmt, rows)
+        return
+    
+    # Other databases: increment in place, insert when nothing matched
+    for row in rows:
+        result = executor.execute(
+            table.update()
+            .where(and_(*(table.c[key] == row[key] for key in keys)))
+            .values({name: func.coalesce(table.c[name], 0) + row[name] for name in counters})
+        )
+        if result.rowcount == 0:
+            executor.execute(table.insert().values(row))
+
+
+def _coalesce_events(events: List[Dict[str, Any]]) -> Tuple[List[Dict], List[Dict]]:
+    """Fold activity events into rollup rows per (user, day, type, category) and metric rows per (user, day)"""
+    rollups: Dict[Tuple, Dict[str, Any]] = {}
+    metrics: Dict[Tuple, Dict[str, Any]] = {}
+    for event in events:
+        day = event['timestamp'].date()
+        duration = event.get('duration_seconds') or 0
+        value = _activity_value(event.get('activity_data'))
+        
+        key = (event['user_id'], day, event['activity_type'], event.get('activity_category') or '')
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollup = rollups[key] = dict(zip(ROLLUP_KEYS, key), count=0, duration_seconds=0,
+                                         value_sum=0.0, value_count=0)
+        rollup['count'] += 1
+        rollup['duration_seconds'] += duration
+        if value is not None:
+            rollup['value_sum'] += value
+            rollup['value_count'] += 1
+        
+        metric = metrics.get(key[:2])
+        if metric is None:
+            metric = metrics[key[:2]] = dict(user_id=key[0], metric_type='daily', metric_date=day,
+                                              **{name: 0 for name in METRIC_COLUMNS})
+        counter = METRIC_COUNTERS.get(event['activity_type'])
+        if counter:
+            metric[counter] += 1
+        metric['total_app_time'] += duration
+        if event['activity_type'] == 'chat':
+            metric['total_chat_time'] += duration
+    return list(rollups.values()), list(metrics.values())
+
+
+def _refresh_metric_summaries(executor, metric_rows: List[Dict[str, Any]]):
+    """Recompute features_used and mood_average of the touched daily metrics from the rollups"""
+    from models.analytics_models import UserActivityRollup, UserMetrics
+    
+    if not metric_rows:
+        return
+    rollups = UserActivityRollup.__table__
+    metrics = UserMetrics.__table__
+    summaries = {(str(row['user_id']), row['metric_date']): (set(), [0.0, 0]) for row in metric_rows}
+    result = executor.execute(
+        select(rollups.c.user_id, rollups.c.day, rollups.c.activity_type, rollups.c.activity_category,
+               rollups.c.value_sum, rollups.c.value_count)
+        .where(rollups.c.user_id.in_({row['user_id'] for row in metric_rows}),
+               rollups.c.day.in_({row['metric_date'] for row in metric_rows}))
+    )
+    for user_id, day, activity_type, category, value_sum, value_count in result:
+        summary = summaries.get((str(user_id), day))
+        if summary is None:
+            continue
+        if category:
+            summary[0].add(category)
+        if activity_type == 'mood' and value_count:
+            summary[1][0] += value_sum
+            summary[1][1] += value_count
+    
+    executor.execute(
+        metrics.update()
+        .where(metrics.c.user_id == bindparam('b_user_id'),
+               metrics.c.metric_type == 'daily',
+               metrics.c.metric_date == bindparam('b_metric_date'))
+        .values(features_used=bindparam('b_features_used'), mood_average=bindparam('b_mood_average')),
+        [{
+            'b_user_id': row['user_id'],
+            'b_metric_date': row['metric_date'],
+            'b_features_used': sorted(summaries[(str(row['user_id']), row['metric_date'])][0]),
+            'b_mood_average': _mood_average(summaries[(str(row['user_id']), row['metric_date'])][1])
+        } for row in metric_rows]
+    )
+
+
+def _mood_average(totals: List) -> Optional[float]:
+    return round(totals[0] / totals[1], 2) if totals[1] else None
+
+
+def _apply_events(executor, events: List[Dict[str, Any]], insert_activities: bool = True):
+    """Write a batch of activity events and their counter increments with one statement per table"""
+    from models.analytics_models import UserActivity, UserActivityRollup, UserMetrics
+    
+    if insert_activities:
+        executor.execute(insert(UserActivity.__table__), events)
+    rollup_rows, metric_rows = _coalesce_events(events)
+    _upsert_increment(executor, UserActivityRollup.__table__, ROLLUP_KEYS, ROLLUP_COUNTERS, rollup_rows)
+    _upsert_increment(executor, UserMetrics.__table__, METRIC_KEYS, METRIC_COLUMNS, metric_rows)
+    _refresh_metric_summaries(executor, metric_rows)
+
+
+def _insight_to_dict(insight) -> Dict[str, Any]:
+    return {
+        'id': insight.id,
+        'insight_type': insight.insight_type,
+        'insight_category': insight.insight_category,
+        'title': insight.title,
+        'content': insight.description,
+        'confidence_score': insight.confidence_score,
+        'priority': (insight.insight_data or {}).get('priority', 'medium'),
+        'generated_at': insight.generated_at.isoformat() if insight.generated_at else None
+    }
+
+
 class AnalyticsService:
     """Service for user analytics and insights"""
     
-    def __init__(self, db):
+    # Shared by every instance in the process (services create one per use)
+    _dashboard_cache: "OrderedDict[Any, Dict[Tuple[int, date], Tuple[float, Dict]]]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    
+    def __init__(self, db, write_behind: bool = None, buffer: "ActivityBuffer" = None):
         self.db = db
+        if write_behind is None:
+            write_behind = os.environ.get('ANALYTICS_WRITE_BEHIND', 'true').lower() in ('1', 'true', 'yes')
+        self.write_behind = write_behind
+        self.buffer = buffer or activity_buffer
     
     def track_activity(self, user_id: str, activity_type: str, activity_category: str = None, 
                       activity_data: Dict = None, duration_seconds: int = 0, session_id: str = None):
-        """Track a user activity"""
+        """Track a user activity
+        
+        With write-behind enabled (the default) the event is queued on the
+        activity buffer and written with its batch; the returned dict then
+        has no id yet.
+        """
+        event = {
+            'user_id': user_id,
+            'activity_type': activity_type,
+            'activity_category': activity_category,
+            'activity_data': activity_data or {},
+            'duration_seconds': duration_seconds,
+            'session_id': session_id,
+            'timestamp': datetime.utcnow()
+        }
+        if self.write_behind and has_app_context():
+            self.buffer.add(self.db, current_app._get_current_object(), event)
+            return dict(event, id=None, timestamp=event['timestamp'].isoformat())
+        
         try:
             from models.analytics_models import UserActivity
             
-            activity = UserActivity(
-                user_id=user_id,
-                activity_type=activity_type,
-                activity_category=activity_category,
-                activity_data=activity_data or {},
-                duration_seconds=duration_seconds,
-                session_id=session_id,
-                timestamp=datetime.utcnow()
-            )
-            
+            activity = UserActivity(**event)
             self.db.session.add(activity)
+            # Rollups and daily metrics go in the same transaction as the raw row
+            _apply_events(self.db.session, [event], insert_activities=False)
             self.db.session.commit()
-            
-            # Update daily metrics
-            self._update_daily_metrics(user_id, activity_type, activity_category)
+            self._invalidate_dashboard(user_id)
             
             return activity.to_dict()
             
@@ -49,173 +248,230 @@ class AnalyticsService:
             self.db.session.rollback()
             return None
     
+    def rebuild_rollups(self, start_date: date, end_date: date, user_id: str = None) -> int:
+        """Recompute rollups for a date range from user_activities (backfill/repair)"""
+        from models.analytics_models import UserActivity, UserActivityRollup
+        
+        try:
+            range_start, range_end = _day_bounds(start_date, end_date)
+            raw = self.db.session.query(
+                UserActivity.user_id, UserActivity.timestamp, UserActivity.activity_type,
+                UserActivity.activity_category, UserActivity.duration_seconds, UserActivity.activity_data
+            ).filter(UserActivity.timestamp >= range_start, UserActivity.timestamp < range_end)
+            rollups = self.db.session.query(UserActivityRollup).filter(
+                UserActivityRollup.day >= start_date, UserActivityRollup.day <= end_date
+            )
+            if user_id is not None:
+                raw = raw.filter(UserActivity.user_id == user_id)
+                rollups = rollups.filter(UserActivityRollup.user_id == user_id)
+            
+            events = [{
+                'user_id': uid, 'timestamp': ts, 'activity_type': activity_type,
+                'activity_category': category, 'duration_seconds': duration, 'activity_data': data
+            } for uid, ts, activity_type, category, duration, data in raw.yield_per(1000)]
+            rows, _ = _coalesce_events(events)
+            
+            rollups.delete(synchronize_session=False)
+            for i in range(0, len(rows), 500):
+                _upsert_increment(self.db.session, UserActivityRollup.__table__, ROLLUP_KEYS,
+                                  ROLLUP_COUNTERS, rows[i:i + 500])
+            self.db.session.commit()
+            self._invalidate_dashboard(user_id)
+            return len(rows)
+            
+        except Exception as e:
+            logger.error(f"Error rebuilding activity rollups: {str(e)}")
+            self.db.session.rollback()
+            return 0
+    
+    def get_user_activities(self, user_id: str, days: int = 30, limit: int = 1000) -> List[Dict]:
+        """Raw activities for the last `days` days, newest first"""
+        from models.analytics_models import UserActivity
+        
+        try:
+            range_start, range_end = _day_bounds(date.today() - timedelta(days=days), date.today())
+            activities = self.db.session.query(UserActivity).filter(
+                UserActivity.user_id == user_id,
+                UserActivity.timestamp >= range_start,
+                UserActivity.timestamp < range_end
+            ).order_by(UserActivity.timestamp.desc()).limit(limit).all()
+            return [activity.to_dict() for activity in activities]
+        except Exception as e:
+            logger.error(f"Error loading user activities: {str(e)}")
+            return []
+    
+    # === DASHBOARD ===
+    
+    @classmethod
+    def _invalidate_dashboard(cls, user_id: Any = None):
+        with cls._cache_lock:
+            if user_id is None:
+                cls._dashboard_cache.clear()
+            else:
+                cls._dashboard_cache.pop(str(user_id), None)
+    
+    @classmethod
+    def _cached_dashboard(cls, user_id: Any, key: Tuple[int, date]) -> Optional[Dict[str, Any]]:
+        with cls._cache_lock:
+            entry = cls._dashboard_cache.get(str(user_id), {}).get(key)
+            if entry is None or entry[0] < _time.monotonic():
+                return None
+            cls._dashboard_cache.move_to_end(str(user_id))
+            return copy.deepcopy(entry[1])
+    
+    @classmethod
+    def _store_dashboard(cls, user_id: Any, key: Tuple[int, date], dashboard: Dict[str, Any]):
+        with cls._cache_lock:
+            per_user = cls._dashboard_cache.setdefault(str(user_id), {})
+            per_user[key] = (_time.monotonic() + DASHBOARD_CACHE_TTL, copy.deepcopy(dashboard))
+            cls._dashboard_cache.move_to_end(str(user_id))
+            while len(cls._dashboard_cache) > DASHBOARD_CACHE_MAX_USERS:
+                cls._dashboard_cache.popitem(last=False)
+    
     def get_user_analytics_dashboard(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Get comprehensive analytics dashboard data"""
         try:
             end_date = date.today()
             start_date = end_date - timedelta(days=days)
             
-            # Get activity summary
-            activity_summary = self._get_activity_summary(user_id, start_date, end_date)
-            
-            # Get productivity metrics
-            productivity_metrics = self._get_productivity_metrics(user_id, start_date, end_date)
-            
-            # Get health metrics
-            health_metrics = self._get_health_metrics(user_id, start_date, end_date)
-            
-            # Get engagement metrics
-            engagement_metrics = self._get_engagement_metrics(user_id, start_date, end_date)
+            cached = self._cached_dashboard(user_id, (days, end_date))
+            if cached is not None:
+                return cached
             
-            # Get trends
-            trends = self._get_trends(user_id, start_date, end_date)
+            # One pass over the per-day rollups: O(days x activity types), not O(activities)
+            daily = self._load_daily_rollups(user_id, start_date, end_date)
             
-            # Get recent insights
-            insights = self._get_recent_insights(user_id, limit=5)
-            
-            # Get goals progress
-            goals_progress = self._get_goals_progress(user_id)
-            
-            return {
+            dashboard = {
                 'period': {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()},
-                'activity_summary': activity_summary,
-                'productivity_metrics': productivity_metrics,
-                'health_metrics': health_metrics,
-                'engagement_metrics': engagement_metrics,
-                'trends': trends,
-                'insights': insights,
-                'goals_progress': goals_progress,
+                'activity_summary': self._get_activity_summary(daily, start_date, end_date),
+                'productivity_metrics': self._get_productivity_metrics(daily),
+                'health_metrics': self._get_health_metrics(daily),
+                'engagement_metrics': self._get_engagement_metrics(daily, start_date, end_date),
+                'trends': self._get_trends(daily),
+                'insights': self._get_recent_insights(user_id, limit=5),
+                'goals_progress': self._get_goals_progress(user_id),
                 'generated_at': datetime.utcnow().isoformat()
             }
+            self._store_dashboard(user_id, (days, end_date), dashboard)
+            return dashboard
             
         except Exception as e:
             logger.error(f"Error generating analytics dashboard: {str(e)}")
             return {}
     
-    def _get_activity_summary(self, user_id: str, start_date: date, end_date: date) -> Dict[str, Any]:
-        """Get activity summary for the period"""
-        from models.analytics_models import UserActivity
+    def _load_daily_rollups(self, user_id: str, start_date: date, end_date: date) -> Dict[date, Dict[str, Any]]:
+        """Rollup rows for the period grouped by day: {day: {'types', 'categories', 'duration', 'mood'}}"""
+        from models.analytics_models import UserActivityRollup
         
-        activities = self.db.session.query(UserActivity).filter(
-            and_(
-                UserActivity.user_id == user_id,
-                func.date(UserActivity.timestamp) >= start_date,
-                func.date(UserActivity.timestamp) <= end_date
-            )
-        ).all()
+        rows = self.db.session.query(
+            UserActivityRollup.day,
+            UserActivityRollup.activity_type,
+            UserActivityRollup.activity_category,
+            UserActivityRollup.count,
+            UserActivityRollup.duration_seconds,
+            UserActivityRollup.value_sum,
+            UserActivityRollup.value_count
+        ).filter(
+            UserActivityRollup.user_id == user_id,
+            UserActivityRollup.day >= start_date,
+            UserActivityRollup.day <= end_date
+        ).order_by(UserActivityRollup.day).all()
         
-        # Group by activity type
+        daily: Dict[date, Dict[str, Any]] = OrderedDict()
+        for day, activity_type, category, count, duration, value_sum, value_count in rows:
+            bucket = daily.setdefault(day, {
+                'types': defaultdict(int), 'categories': defaultdict(int),
+                'duration': 0, 'mood_sum': 0.0, 'mood_count': 0
+            })
+            bucket['types'][activity_type] += count
+            if category:
+                bucket['categories'][category] += count
+            bucket['duration'] += duration or 0
+            if activity_type == 'mood' and value_count:
+                bucket['mood_sum'] += value_sum
+                bucket['mood_count'] += value_count
+        return daily
+    
+    def _get_activity_summary(self, daily: Dict[date, Dict[str, Any]], start_date: date, end_date: date) -> Dict[str, Any]:
+        """Get activity summary for the period"""
         by_type = defaultdict(int)
         by_category = defaultdict(int)
         total_duration = 0
         
-        for activity in activities:
-            by_type[activity.activity_type] += 1
-            if activity.activity_category:
-                by_category[activity.activity_category] += 1
-            total_duration += activity.duration_seconds or 0
+        for bucket in daily.values():
+            for activity_type, count in bucket['types'].items():
+                by_type[activity_type] += count
+            for category, count in bucket['categories'].items():
+                by_category[category] += count
+            total_duration += bucket['duration']
         
+        total_activities = sum(by_type.values())
         return {
-            'total_activities': len(activities),
+            'total_activities': total_activities,
             'total_duration_hours': round(total_duration / 3600, 2),
             'by_type': dict(by_type),
             'by_category': dict(by_category),
-            'daily_average': round(len(activities) / max(1, (end_date - start_date).days), 2)
+            'daily_average': round(total_activities / max(1, (end_date - start_date).days), 2)
         }
     
-    def _get_productivity_metrics(self, user_id: str, start_date: date, end_date: date) -> Dict[str, Any]:
+    def _get_productivity_metrics(self, daily: Dict[date, Dict[str, Any]]) -> Dict[str, Any]:
         """Get productivity metrics"""
-        from models.analytics_models import UserMetrics
-        
-        metrics = self.db.session.query(UserMetrics).filter(
-            and_(
-                UserMetrics.user_id == user_id,
-                UserMetrics.metric_date >= start_date,
-                UserMetrics.metric_date <= end_date
-            )
-        ).all()
-        
-        total_tasks = sum(m.tasks_completed or 0 for m in metrics)
-        total_messages = sum(m.chat_messages_sent or 0 for m in metrics)
-        total_active_time = sum(m.active_time_minutes or 0 for m in metrics)
+        total_tasks = sum(b['types'].get('task_completed', 0) for b in daily.values())
+        total_messages = sum(b['types'].get('chat', 0) for b in daily.values())
+        total_active_time = sum(b['duration'] for b in daily.values()) / 60
         
         # Get unique features used
         all_features = set()
-        for m in metrics:
-            if m.features_used:
-                all_features.update(m.features_used)
+        for bucket in daily.values():
+            all_features.update(bucket['categories'])
         
         return {
             'tasks_completed': total_tasks,
             'chat_messages_sent': total_messages,
             'active_time_hours': round(total_active_time / 60, 2),
             'features_used_count': len(all_features),
-            'features_used': list(all_features),
-            'avg_daily_tasks': round(total_tasks / max(1, len(metrics)), 2),
-            'avg_daily_active_time': round((total_active_time / max(1, len(metrics))) / 60, 2)
+            'features_used': sorted(all_features),
+            'avg_daily_tasks': round(total_tasks / max(1, len(daily)), 2),
+            'avg_daily_active_time': round((total_active_time / max(1, len(daily))) / 60, 2)
         }
     
-    def _get_health_metrics(self, user_id: str, start_date: date, end_date: date) -> Dict[str, Any]:
+    def _get_health_metrics(self, daily: Dict[date, Dict[str, Any]]) -> Dict[str, Any]:
         """Get health and wellness metrics"""
-        from models.analytics_models import UserMetrics
-        
-        metrics = self.db.session.query(UserMetrics).filter(
-            and_(
-                UserMetrics.user_id == user_id,
-                UserMetrics.metric_date >= start_date,
-                UserMetrics.metric_date <= end_date
-            )
-        ).all()
-        
-        mood_ratings = [m.mood_average for m in metrics if m.mood_average is not None]
-        total_workouts = sum(m.workouts_logged or 0 for m in metrics)
-        total_dbt_skills = sum(m.dbt_skills_used or 0 for m in metrics)
+        mood_ratings = [b['mood_sum'] / b['mood_count'] for b in daily.values() if b['mood_count']]
+        total_workouts = sum(b['types'].get('workout', 0) for b in daily.values())
+        total_dbt_skills = sum(b['types'].get('dbt_skill', 0) for b in daily.values())
         
         return {
             'workouts_logged': total_workouts,
             'dbt_skills_used': total_dbt_skills,
             'avg_mood': round(sum(mood_ratings) / max(1, len(mood_ratings)), 2) if mood_ratings else None,
             'mood_trend': self._calculate_trend(mood_ratings),
-            'workout_frequency': round(total_workouts / max(1, len(metrics)), 2),
+            'workout_frequency': round(total_workouts / max(1, len(daily)), 2),
             'wellness_score': self._calculate_wellness_score(mood_ratings, total_workouts, total_dbt_skills)
         }
     
-    def _get_engagement_metrics(self, user_id: str, start_date: date, end_date: date) -> Dict[str, Any]:
+    def _get_engagement_metrics(self, daily: Dict[date, Dict[str, Any]], start_date: date, end_date: date) -> Dict[str, Any]:
         """Get user engagement metrics"""
-        from models.analytics_models import UserMetrics
-        
-        metrics = self.db.session.query(UserMetrics).filter(
-            and_(
-                UserMetrics.user_id == user_id,
-                UserMetrics.metric_date >= start_date,
-                UserMetrics.metric_date <= end_date
-            )
-        ).all()
+        total_logins = sum(b['types'].get('login', 0) for b in daily.values())
+        active_days = len(daily)
         
-        total_logins = sum(m.login_count or 0 for m in metrics)
-        streak_days = max((m.streak_days or 0 for m in metrics), default=0)
-        active_days = len([m for m in metrics if (m.login_count or 0) > 0])
+        # Consecutive active days ending today (or yesterday, if nothing yet today)
+        streak_days = 0
+        day = end_date if end_date in daily else end_date - timedelta(days=1)
+        while day in daily and day >= start_date:
+            streak_days += 1
+            day -= timedelta(days=1)
         
         return {
             'total_logins': total_logins,
             'current_streak': streak_days,
             'active_days': active_days,
-            'engagement_rate': round(active_days / max(1, len(metrics)) * 100, 2),
-            'avg_daily_logins': round(total_logins / max(1, len(metrics)), 2)
+            'engagement_rate': round(active_days / max(1, (end_date - start_date).days + 1) * 100, 2),
+            'avg_daily_logins': round(total_logins / max(1, active_days), 2)
         }
     
-    def _get_trends(self, user_id: str, start_date: date, end_date: date) -> Dict[str, List]:
+    def _get_trends(self, daily: Dict[date, Dict[str, Any]]) -> Dict[str, List]:
         """Get trending data over time"""
-        from models.analytics_models import UserMetrics
-        
-        metrics = self.db.session.query(UserMetrics).filter(
-            and_(
-                UserMetrics.user_id == user_id,
-                UserMetrics.metric_date >= start_date,
-                UserMetrics.metric_date <= end_date
-            )
-        ).order_by(UserMetrics.metric_date).all()
-        
         trends = {
             'productivity': [],
             'mood': [],
@@ -223,30 +479,31 @@ class AnalyticsService:
             'engagement': []
         }
         
-        for metric in metrics:
-            date_str = metric.metric_date.isoformat()
+        for day, bucket in daily.items():
+            date_str = day.isoformat()
+            types = bucket['types']
             
             trends['productivity'].append({
                 'date': date_str,
-                'tasks': metric.tasks_completed or 0,
-                'active_time': metric.active_time_minutes or 0
+                'tasks': types.get('task_completed', 0),
+                'active_time': round(bucket['duration'] / 60)
             })
             
             trends['mood'].append({
                 'date': date_str,
-                'mood': metric.mood_average
+                'mood': round(bucket['mood_sum'] / bucket['mood_count'], 2) if bucket['mood_count'] else None
             })
             
             trends['activity'].append({
                 'date': date_str,
-                'workouts': metric.workouts_logged or 0,
-                'dbt_skills': metric.dbt_skills_used or 0
+                'workouts': types.get('workout', 0),
+                'dbt_skills': types.get('dbt_skill', 0)
             })
             
             trends['engagement'].append({
                 'date': date_str,
-                'logins': metric.login_count or 0,
-                'messages': metric.chat_messages_sent or 0
+                'logins': types.get('login', 0),
+                'messages': types.get('chat', 0)
             })
         
         return trends
@@ -255,27 +512,40 @@ class AnalyticsService:
         """Get recent AI insights"""
         from models.analytics_models import UserInsight
         
-        insights = self.db.session.query(UserInsight).filter(
-            and_(
+        try:
+            insights = self.db.session.query(UserInsight).filter(
                 UserInsight.user_id == user_id,
-                UserInsight.is_dismissed == False
-            )
-        ).order_by(UserInsight.generated_at.desc()).limit(limit).all()
-        
-        return [insight.to_dict() for insight in insights]
+                or_(UserInsight.expires_at.is_(None), UserInsight.expires_at > datetime.utcnow())
+            ).order_by(UserInsight.generated_at.desc()).limit(limit).all()
+            return [_insight_to_dict(insight) for insight in insights]
+        except Exception as e:
+            logger.error(f"Error loading insights: {str(e)}")
+            return []
     
     def _get_goals_progress(self, user_id: str) -> List[Dict]:
         """Get current goals progress"""
-        from models.analytics_models import UserGoal
+        from models.analytics_models import UserGoals
         
-        goals = self.db.session.query(UserGoal).filter(
-            and_(
-                UserGoal.user_id == user_id,
-                UserGoal.is_active == True
-            )
-        ).all()
+        try:
+            goals = self.db.session.query(UserGoals).filter(
+                UserGoals.user_id == user_id,
+                UserGoals.status == 'active'
+            ).all()
+        except Exception as e:
+            logger.error(f"Error loading goals: {str(e)}")
+            return []
         
-        return [goal.to_dict() for goal in goals]
+        return [{
+            'id': goal.id,
+            'goal_type': goal.goal_type,
+            'title': goal.title,
+            'target_value': goal.target_value,
+            'current_value': goal.current_value,
+            'unit': goal.unit,
+            'target_date': goal.target_date.isoformat() if goal.target_date else None,
+            'progress_percent': round(min(100.0, (goal.current_value or 0) / goal.target_value * 100), 1)
+                                if goal.target_value else None
+        } for goal in goals]
     
     def _calculate_trend(self, values: List[float]) -> str:
         """Calculate trend direction"""
@@ -313,53 +583,6 @@ class AnalyticsService:
         
         return round(score, 1)
     
-    def _update_daily_metrics(self, user_id: str, activity_type: str, activity_category: str):
-        """Update daily metrics for user"""
-        try:
-            from models.analytics_models import UserMetrics
-            
-            today = date.today()
-            
-            # Get or create daily metric
-            metric = self.db.session.query(UserMetrics).filter(
-                and_(
-                    UserMetrics.user_id == user_id,
-                    UserMetrics.metric_date == today,
-                    UserMetrics.metric_type == 'daily'
-                )
-            ).first()
-            
-            if not metric:
-                metric = UserMetrics(
-                    user_id=user_id,
-                    metric_type='daily',
-                    metric_date=today,
-                    features_used=[]
-                )
-                self.db.session.add(metric)
-            
-            # Update based on activity type
-            if activity_type == 'chat':
-                metric.chat_messages_sent = (metric.chat_messages_sent or 0) + 1
-            elif activity_type == 'task_completed':
-                metric.tasks_completed = (metric.tasks_completed or 0) + 1
-            elif activity_type == 'workout':
-                metric.workouts_logged = (metric.workouts_logged or 0) + 1
-            elif activity_type == 'dbt_skill':
-                metric.dbt_skills_used = (metric.dbt_skills_used or 0) + 1
-            
-            # Add feature to used features
-            if activity_category and activity_category not in (metric.features_used or []):
-                features = metric.features_used or []
-                features.append(activity_category)
-                metric.features_used = features
-            
-            self.db.session.commit()
-            
-        except Exception as e:
-            logger.error(f"Error updating daily metrics: {str(e)}")
-            self.db.session.rollback()
-    
     def generate_ai_insight(self, user_id: str, insight_type: str, title: str, content: str, 
                            confidence_score: float = 0.8, priority: str = 'medium'):
         """Generate an AI insight for the user"""
@@ -370,18 +593,242 @@ class AnalyticsService:
                 user_id=user_id,
                 insight_type=insight_type,
                 title=title,
-                content=content,
+                description=content,
                 confidence_score=confidence_score,
-                priority=priority,
+                insight_data={'priority': priority},
                 generated_at=datetime.utcnow()
             )
             
             self.db.session.add(insight)
             self.db.session.commit()
+            self._invalidate_dashboard(user_id)
             
-            return insight.to_dict()
+            return _insight_to_dict(insight)
             
         except Exception as e:
             logger.error(f"Error generating AI insight: {str(e)}")
             self.db.session.rollback()
-            return None 
\ No newline at end of file
+            return None
+
+
+class ActivityBuffer:
+    """Write-behind queue for AnalyticsService.track_activity
+    
+    Queued events are written one transaction per batch: a bulk INSERT into
+    user_activities plus UPSERT-increments of the per-day rollups and daily
+    UserMetrics, coalesced per (user, day). A batch is flushed by a
+    background thread once it holds max_events or its oldest event is
+    flush_interval seconds old, and at app-context teardown / process exit.
+    
+    If a batch fails because the database is unreachable it is retried as a
+    whole. Any other failure splits it into one transaction per event, so a
+    bad event cannot block the rest; an event that keeps failing is dropped
+    (logged as dead-lettered) after max_attempts flushes.
+    """
+    
+    def __init__(self, max_events: int = None, flush_interval: float = None, max_pending: int = None,
+                 max_attempts: int = 3):
+        self.max_events = max_events or int(os.environ.get('ANALYTICS_BATCH_SIZE', 500))
+        if flush_interval is None:
+            flush_interval = float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', 1.0))
+        self.flush_interval = flush_interval
+        # Beyond this many unflushed events (database down) new events are dropped
+        self.max_pending = max_pending or self.max_events * 20
+        self.max_attempts = max(1, max_attempts)
+        self._attempts: Dict[int, int] = {}  # id(event) -> failed flushes, for requeued events
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._events: List[Dict[str, Any]] = []
+        self._oldest: Optional[float] = None
+        self._db = None
+        self._app = None
+        self._worker: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._stats = {
+            'events_buffered': 0,
+            'events_flushed': 0,
+            'events_dropped': 0,
+            'flushes': 0,
+            'flush_errors': 0,
+            'events_dead_lettered': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'last_flush_lag_ms': 0.0,
+            'max_flush_lag_ms': 0.0,
+            'last_flush_ms': 0.0
+        }
+    
+    def add(self, db, app, event: Dict[str, Any]):
+        """Queue one activity event"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent flushes its own events, and its thread did not survive
+                self._events, self._oldest, self._worker, self._pid = [], None, None, os.getpid()
+                self._attempts = {}
+            self._db, self._app = db, app
+            if len(self._events) >= self.max_pending:
+                self._stats['events_dropped'] += 1
+                return
+            if not self._events:
+                self._oldest = _time.monotonic()
+            self._events.append(event)
+            self._stats['events_buffered'] += 1
+            full = len(self._events) >= self.max_events
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='activity-buffer', daemon=True)
+                self._worker.start()
+        if full:
+            self._wake.set()
+    
+    def _due(self) -> bool:
+        return bool(self._events) and (len(self._events) >= self.max_events or
+                                       _time.monotonic() - self._oldest >= self.flush_interval)
+    
+    def due(self) -> bool:
+        with self._lock:
+            return self._due()
+    
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            with self._lock:
+                timeout = self.flush_interval
+                if self._oldest is not None:
+                    timeout = max(0.01, self._oldest + self.flush_interval - _time.monotonic())
+            self._wake.wait(timeout)
+            self._wake.clear()
+            self.flush(only_due=True)
+    
+    def flush(self, only_due: bool = False) -> int:
+        """Write the queued events; returns how many were written"""
+        # Opportunistic flushes (worker, teardown) never wait behind one already running;
+        # this also covers the teardown of the app context a flush itself pushes
+        if not self._flush_lock.acquire(blocking=not only_due):
+            return 0
+        try:
+            return self._flush(only_due)
+        finally:
+            self._flush_lock.release()
+    
+    def _flush(self, only_due: bool) -> int:
+        with self._lock:
+            if self._pid != os.getpid() or not self._events or (only_due and not self._due()):
+                return 0
+            batch, oldest = self._events, self._oldest
+            self._events, self._oldest = [], None
+            db, app = self._db, self._app
+        
+        started = _time.monotonic()
+        try:
+            with app.app_context():
+                with db.engine.begin() as conn:
+                    _apply_events(conn, batch)
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} buffered activities: {str(e)}")
+            with self._lock:
+                self._stats['flush_errors'] += 1
+            if _is_transient(e):
+                self._requeue(batch, oldest)
+                return 0
+            batch = self._flush_one_by_one(db, app, batch, oldest)
+            if not batch:
+                return 0
+        
+        for event in batch:
+            self._attempts.pop(id(event), None)
+        finished = _time.monotonic()
+        lag_ms = (finished - oldest) * 1000
+        with self._lock:
+            stats = self._stats
+            stats['flushes'] += 1
+            stats['events_flushed'] += len(batch)
+            stats['last_batch_size'] = len(batch)
+            stats['max_batch_size'] = max(stats['max_batch_size'], len(batch))
+            stats['last_flush_lag_ms'] = round(lag_ms, 2)
+            stats['max_flush_lag_ms'] = round(max(stats['max_flush_lag_ms'], lag_ms), 2)
+            stats['last_flush_ms'] = round((finished - started) * 1000, 2)
+        for user_id in {event['user_id'] for event in batch}:
+            AnalyticsService._invalidate_dashboard(user_id)
+        return len(batch)
+    
+    def _requeue(self, events: List[Dict[str, Any]], oldest: float):
+        with self._lock:
+            # Put the events back in front; the next flush retries them
+            keep = events[:max(0, self.max_pending - len(self._events))]
+            for event in events[len(keep):]:
+                self._attempts.pop(id(event), None)
+            self._stats['events_dropped'] += len(events) - len(keep)
+            self._events = keep + self._events
+            self._oldest = oldest if self._events else None
+    
+    def _flush_one_by_one(self, db, app, batch: List[Dict[str, Any]], oldest: float) -> List[Dict[str, Any]]:
+        """Write each event in its own transaction; returns the written ones"""
+        written, retry = [], []
+        with app.app_context():
+            for event in batch:
+                try:
+                    with db.engine.begin() as conn:
+                        _apply_events(conn, [event])
+                    written.append(event)
+                except Exception as e:
+                    if _is_transient(e):
+                        retry.append(event)
+                        continue
+                    attempts = self._attempts.get(id(event), 0) + 1
+                    if attempts >= self.max_attempts:
+                        self._attempts.pop(id(event), None)
+                        with self._lock:
+                            self._stats['events_dead_lettered'] += 1
+                        logger.error(f"Dropping activity event after {attempts} failed flushes "
+                                     f"(user={event.get('user_id')}, type={event.get('activity_type')}): {str(e)}")
+                    else:
+                        self._attempts[id(event)] = attempts
+                        retry.append(event)
+        if retry:
+            self._requeue(retry, oldest)
+        return written
+    
+    def stats(self) -> Dict[str, Any]:
+        """Buffer depth, batch sizes and flush lag (oldest event to commit)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._events)
+            stats['pending_age_ms'] = round((_time.monotonic() - self._oldest) * 1000, 2) if self._oldest else 0.0
+        stats['avg_batch_size'] = round(stats['events_flushed'] / stats['flushes'], 2) if stats['flushes'] else 0.0
+        return stats
+
+
+# OperationalError also covers schema problems ("no such table/column"),
+# which retrying cannot fix; only these messages mean "try again later"
+_TRANSIENT_MARKERS = (
+    'database is locked', 'database table is locked', 'database is busy', 'lock timeout',
+    'deadlock detected', 'could not obtain lock', 'could not connect', 'connection refused',
+    'server closed the connection', 'terminating connection', 'connection reset',
+    'connection timed out', 'ssl connection has been closed', 'too many connections',
+)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Database unreachable/locked rather than a problem with the events themselves"""
+    if isinstance(error, DisconnectionError):
+        return True
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    if isinstance(error, OperationalError):
+        message = str(error.orig if error.orig is not None else error).lower()
+        return any(marker in message for marker in _TRANSIENT_MARKERS)
+    return False
+
+
+# Shared by all AnalyticsService instances in the process
+activity_buffer = ActivityBuffer()
+atexit.register(activity_buffer.flush)
+
+
+def init_activity_buffer(app):
+    """Flush due activity batches when an app context tears down"""
+    @app.teardown_appcontext
+    def _flush_activity_buffer(exc):
+        if activity_buffer.due():
+            activity_buffer.flush(only_due=True)
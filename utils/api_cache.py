@@ -4,12 +4,16 @@ Implements caching for API responses to improve performance and reduce load
 """
 
 import os
+import sys
 import json
+import time
+import heapq
 import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from functools import wraps
-from datetime import datetime, timedelta
-from flask import request, jsonify
+from flask import request, jsonify, copy_current_request_context
 
 logger = logging.getLogger(__name__)
 
@@ -34,44 +38,146 @@ class CacheBackend:
         raise NotImplementedError
 
 
+class _MemoryEntry:
+    """Cached value with its absolute expiry (monotonic clock) and size."""
+
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value, expires_at, size):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+def _approx_size(value, _depth=0):
+    """Cheap recursive size estimate for JSON-like values, in bytes."""
+    size = sys.getsizeof(value)
+    if _depth > 8:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _approx_size(k, _depth + 1) + _approx_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += _approx_size(v, _depth + 1)
+    return size
+
+
 class MemoryCache(CacheBackend):
-    """In-memory cache backend (single instance only)."""
+    """
+    In-memory cache backend (single instance only).
+
+    Bounded by entry count and approximate byte size with O(1) LRU eviction.
+    Expired entries are reclaimed lazily from a min-heap of expiry times on
+    every write, so memory does not depend on keys ever being read again.
+    All operations are guarded by a lock (gunicorn threads share the instance).
+    """
 
-    def __init__(self):
-        self._cache = {}
-        self._expiry = {}
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._expiry_heap = []
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
     def get(self, key):
         """Get value from memory cache."""
-        # Check if expired
-        if key in self._expiry:
-            if datetime.utcnow() > self._expiry[key]:
-                self.delete(key)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
                 return None
-
-        return self._cache.get(key)
+            # Check if expired
+            if time.monotonic() > entry.expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry.value
 
     def set(self, key, value, ttl=300):
         """Set value in memory cache."""
-        self._cache[key] = value
-        self._expiry[key] = datetime.utcnow() + timedelta(seconds=ttl)
+        size = _approx_size(key) + _approx_size(value)
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._cache[key] = _MemoryEntry(value, expires_at, size)
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            self._purge_expired()
+            while self._cache and (
+                (self.max_entries and len(self._cache) > self.max_entries)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._cache))
+                self._remove(oldest)
+                self.evictions += 1
 
     def delete(self, key):
         """Delete value from memory cache."""
-        self._cache.pop(key, None)
-        self._expiry.pop(key, None)
+        with self._lock:
+            self._remove(key)
 
     def clear(self):
         """Clear memory cache."""
-        self._cache.clear()
-        self._expiry.clear()
+        with self._lock:
+            self._cache.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
 
     def cleanup_expired(self):
         """Remove expired entries from cache."""
-        now = datetime.utcnow()
-        expired_keys = [k for k, exp in self._expiry.items() if now > exp]
-        for key in expired_keys:
-            self.delete(key)
+        with self._lock:
+            return self._purge_expired()
+
+    def stats(self):
+        """Hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._cache),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    def _remove(self, key):
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _purge_expired(self):
+        # Heap items are lazily invalidated: a popped (expires_at, key) only
+        # removes the entry if it still carries that expiry.
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+                removed += 1
+        if len(heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [(e.expires_at, k) for k, e in self._cache.items()]
+            heapq.heapify(self._expiry_heap)
+        return removed
 
 
 class RedisCache(CacheBackend):
@@ -119,6 +225,14 @@ class RedisCache(CacheBackend):
             logger.error(f"Redis clear error: {e}")
 
 
+def _default_memory_cache():
+    """MemoryCache sized from API_CACHE_MAX_ENTRIES / API_CACHE_MAX_BYTES."""
+    return MemoryCache(
+        max_entries=int(os.environ.get('API_CACHE_MAX_ENTRIES', 10000)),
+        max_bytes=int(os.environ.get('API_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    )
+
+
 class APICache:
     """
     API response caching manager.
@@ -142,10 +256,10 @@ class APICache:
                     backend = RedisCache(redis_url)
                     logger.info("API cache using Redis backend")
                 except Exception:
-                    backend = MemoryCache()
+                    backend = _default_memory_cache()
                     logger.info("API cache using memory backend (fallback)")
             else:
-                backend = MemoryCache()
+                backend = _default_memory_cache()
                 logger.info("API cache using memory backend")
 
         self.backend = backend
@@ -201,6 +315,11 @@ class APICache:
         """Clear all cached values."""
         self.backend.clear()
 
+    def stats(self):
+        """Backend counters (hits, misses, evictions...) when available."""
+        stats = getattr(self.backend, 'stats', None)
+        return stats() if callable(stats) else {}
+
 
 # Global cache instance
 _api_cache = None
@@ -235,13 +354,23 @@ def get_api_cache():
     return _api_cache
 
 
-def cached(ttl=300, key_prefix='api'):
+# Keys with a stale-while-revalidate refresh in flight (per process)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+_SWR_MARKER = '__swr__'
+
+
+def cached(ttl=300, key_prefix='api', stale_ttl=0):
     """
     Decorator to cache API endpoint responses.
 
     Args:
         ttl: Time to live in seconds (default: 5 minutes)
         key_prefix: Cache key prefix
+        stale_ttl: Stale-while-revalidate window in seconds. When > 0, a response
+            older than ttl (but younger than ttl + stale_ttl) is served
+            immediately and refreshed once in a background thread.
 
     Example:
         @app.route('/api/data')
@@ -250,6 +379,36 @@ def cached(ttl=300, key_prefix='api'):
             return jsonify({'data': expensive_operation()})
     """
     def decorator(f):
+        def store(cache, cache_key, response):
+            # Cache the response if successful
+            if response.status_code == 200:
+                try:
+                    response_data = response.get_json()
+                    if stale_ttl > 0:
+                        response_data = {_SWR_MARKER: True, 'data': response_data,
+                                         'fresh_until': time.time() + ttl}
+                    cache.set(cache_key, response_data, ttl + stale_ttl)
+                except Exception as e:
+                    logger.warning(f"Failed to cache response: {e}")
+
+        def refresh_in_background(cache, cache_key, args, kwargs):
+            with _refreshing_lock:
+                if cache_key in _refreshing:
+                    return
+                _refreshing.add(cache_key)
+
+            @copy_current_request_context
+            def refresh():
+                try:
+                    store(cache, cache_key, f(*args, **kwargs))
+                except Exception as e:
+                    logger.warning(f"Background cache refresh failed for {cache_key}: {e}")
+                finally:
+                    with _refreshing_lock:
+                        _refreshing.discard(cache_key)
+
+            threading.Thread(target=refresh, name="api-cache-refresh", daemon=True).start()
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
             cache = get_api_cache()
@@ -275,22 +434,21 @@ def cached(ttl=300, key_prefix='api'):
             # Try to get from cache
             cached_response = cache.get(cache_key)
             if cached_response is not None:
-                logger.debug(f"Cache hit: {cache_key}")
+                state = 'HIT'
+                if isinstance(cached_response, dict) and cached_response.get(_SWR_MARKER):
+                    if time.time() > cached_response['fresh_until']:
+                        state = 'STALE'
+                        refresh_in_background(cache, cache_key, args, kwargs)
+                    cached_response = cached_response['data']
+                logger.debug(f"Cache {state.lower()}: {cache_key}")
                 response = jsonify(cached_response)
-                response.headers['X-Cache'] = 'HIT'
+                response.headers['X-Cache'] = state
                 return response
 
             # Call original function
             logger.debug(f"Cache miss: {cache_key}")
             response = f(*args, **kwargs)
-
-            # Cache the response if successful
-            if response.status_code == 200:
-                try:
-                    response_data = response.get_json()
-                    cache.set(cache_key, response_data, ttl)
-                except Exception as e:
-                    logger.warning(f"Failed to cache response: {e}")
+            store(cache, cache_key, response)
 
             response.headers['X-Cache'] = 'MISS'
             return response
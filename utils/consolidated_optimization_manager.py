@@ -441,9 +441,10 @@ class ConsolidatedOptimizationManager:
         """Get current system health metrics"""
         try:
             import psutil
+            from nous_core.monitoring import get_sampler
             
             return {
-                'cpu_percent': psutil.cpu_percent(interval=1),
+                'cpu_percent': get_sampler().latest()['cpu_percent'],
                 'memory_percent': psutil.virtual_memory().percent,
                 'disk_percent': psutil.disk_usage('/').percent if os.path.exists('/') else 0,
                 'uptime_seconds': time.time() - psutil.boot_time() if hasattr(psutil, 'boot_time') else 0
@@ -469,7 +470,7 @@ class ConsolidatedOptimizationManager:
             system_health = self._get_system_health()
             
             # CPU optimization recommendations
-            if system_health.get('cpu_percent', 0) > 80:
+            if (system_health.get('cpu_percent') or 0) > 80:
                 recommendations.append({
                     'type': 'performance',
                     'priority': 'high',
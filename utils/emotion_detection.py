@@ -7,6 +7,8 @@ import re
 import logging
 from typing import Dict, Any
 
+from utils.safety_scanner import EMOTION_KEYWORDS, INTENSITY_MODIFIERS, scan_message
+
 logger = logging.getLogger(__name__)
 
 class EmotionDetector:
@@ -14,49 +16,37 @@ class EmotionDetector:
     
     def __init__(self):
         """Initialize emotion detector with keyword patterns"""
-        self.emotion_keywords = {
-            'happy': ['happy', 'joy', 'excited', 'great', 'wonderful', 'amazing', 'fantastic', 'excellent', 'love', 'smile'],
-            'sad': ['sad', 'unhappy', 'depressed', 'down', 'blue', 'upset', 'disappointed', 'cry', 'tears'],
-            'angry': ['angry', 'mad', 'furious', 'rage', 'hate', 'annoyed', 'frustrated', 'irritated'],
-            'anxious': ['anxious', 'worried', 'nervous', 'stress', 'concern', 'afraid', 'fear', 'panic'],
-            'calm': ['calm', 'peaceful', 'relaxed', 'serene', 'tranquil', 'content'],
-            'surprised': ['surprised', 'shock', 'amazed', 'astonished', 'wow'],
-            'confused': ['confused', 'puzzled', 'uncertain', 'unclear', 'lost', 'unsure']
-        }
+        self.emotion_keywords = EMOTION_KEYWORDS
         
         # Intensity modifiers
-        self.intensity_modifiers = {
-            'very': 1.5,
-            'extremely': 2.0,
-            'really': 1.3,
-            'quite': 1.2,
-            'somewhat': 0.8,
-            'a bit': 0.7,
-            'slightly': 0.6
-        }
+        self.intensity_modifiers = INTENSITY_MODIFIERS
         
     def analyze_text_emotion(self, text: str) -> Dict[str, Any]:
         """Analyze emotion from text content"""
         if not text:
             return {'emotion': 'neutral', 'confidence': 0.0}
         
-        text_lower = text.lower()
+        # Keyword and modifier offsets come from the shared (cached) lexicon scan
+        scan = scan_message(text)
+        modifiers = [(scan.first('intensity', modifier), multiplier)
+                     for modifier, multiplier in self.intensity_modifiers.items()
+                     if scan.first('intensity', modifier) != -1]
         emotion_scores = {}
         
         # Calculate emotion scores based on keyword matches
-        for emotion, keywords in self.emotion_keywords.items():
+        for emotion in self.emotion_keywords:
             score = 0
-            for keyword in keywords:
-                if keyword in text_lower:
-                    base_score = 1.0
-                    
-                    # Check for intensity modifiers
-                    for modifier, multiplier in self.intensity_modifiers.items():
-                        if modifier in text_lower and text_lower.find(modifier) < text_lower.find(keyword):
-                            base_score *= multiplier
-                            break
-                    
-                    score += base_score
+            for keyword in scan.keywords('emotion', emotion):
+                base_score = 1.0
+                keyword_at = scan.first('emotion', keyword)
+                
+                # Check for intensity modifiers (the first listed one that precedes the keyword)
+                for modifier_at, multiplier in modifiers:
+                    if modifier_at < keyword_at:
+                        base_score *= multiplier
+                        break
+                
+                score += base_score
             
             emotion_scores[emotion] = score
         
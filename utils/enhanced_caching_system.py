@@ -10,6 +10,8 @@ import hashlib
 import logging
 import sqlite3
 import threading
+import zlib
+from collections import deque
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from functools import lru_cache
@@ -19,22 +21,126 @@ import gzip
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+    from nous_core.semantic.vector_index import IVFVectorIndex
+except ImportError:  # numpy is optional; fall back to the bounded SQL scan
+    np = None
+    IVFVectorIndex = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # embeddings are optional; prompts are then hashed
+    SentenceTransformer = None
+
+MEMORY_TTL_SECONDS = 3600
+SEMANTIC_MIN_QUALITY = 0.7
+PROMPT_VECTOR_DIM = 512
+SEMANTIC_CANDIDATES = 16
+# Below this many prompts one matrix-vector product over every row is
+# cheaper than probing IVF cells, so the index stays exact until then
+PROMPT_INDEX_MIN_TRAIN = 4096
+# Lookups ask for a catch-up sync (rows written by other processes) at most
+# this often; writes in this process request one immediately
+PROMPT_INDEX_SYNC_INTERVAL = 1.0
+EMBED_MODEL = os.environ.get('AI_CACHE_EMBED_MODEL', 'all-MiniLM-L6-v2')
+
+
+def _prompt_vector(text: str) -> "np.ndarray":
+    """Hashed bag-of-words vector; cosine over these tracks word-overlap similarity
+
+    Only used without sentence-transformers: lookups are then still
+    lexical, and candidates are reranked by word overlap.
+    """
+    vec = np.zeros(PROMPT_VECTOR_DIM, dtype="float32")
+    words = set(text.lower().split())
+    if not words:
+        return vec
+    vec[[zlib.crc32(w.encode()) % PROMPT_VECTOR_DIM for w in words]] = 1.0
+    return vec / np.linalg.norm(vec)
+
+
+class _ShardedMemoryTier:
+    """Memory cache split into LRU-bounded shards so lookups do not share one lock"""
+
+    def __init__(self, shards: int = 16, max_entries: int = 4096, max_bytes: int = 32 * 1024 * 1024):
+        from utils.api_cache import MemoryCache
+        self._shards = [
+            MemoryCache(max_entries=max(1, max_entries // shards), max_bytes=max(1, max_bytes // shards))
+            for _ in range(shards)
+        ]
+
+    def _shard(self, key: str):
+        return self._shards[int(key[:8], 16) % len(self._shards)]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._shard(key).get(key)
+
+    def set(self, key: str, value: Dict[str, Any], ttl: int = MEMORY_TTL_SECONDS) -> None:
+        self._shard(key).set(key, value, ttl)
+
+    def cleanup_expired(self) -> int:
+        return sum(shard.cleanup_expired() for shard in self._shards)
+
+    def __len__(self) -> int:
+        return sum(shard.stats()['entries'] for shard in self._shards)
+
+    def stats(self) -> Dict[str, Any]:
+        per_shard = [shard.stats() for shard in self._shards]
+        hits = sum(s['hits'] for s in per_shard)
+        lookups = hits + sum(s['misses'] for s in per_shard)
+        return {
+            'shards': len(per_shard),
+            'entries': sum(s['entries'] for s in per_shard),
+            'bytes': sum(s['bytes'] for s in per_shard),
+            'evictions': sum(s['evictions'] for s in per_shard),
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+
 class EnhancedCachingSystem:
     """Multi-layer caching system for maximum cost optimization"""
     
-    def __init__(self):
-        self.cache_dir = Path("cache")
+    def __init__(self, cache_dir: str = "cache", memory_max_entries: int = 4096, memory_shards: int = 16,
+                 embedding_model: Any = None):
+        self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.db_path = self.cache_dir / "enhanced_cache.db"
-        self.memory_cache = {}
+        self.memory_cache = _ShardedMemoryTier(shards=memory_shards, max_entries=memory_max_entries)
         self.cache_stats = {
             'hits': 0,
             'misses': 0,
             'saves': 0,
             'invalidations': 0
         }
+        self.ai_lookup_stats = {'memory': 0, 'exact': 0, 'semantic': 0, 'miss': 0}
+        self._lookup_latency_ms = deque(maxlen=2048)
+        self._stats_lock = threading.Lock()
+        # Prompt vector index over every cached prompt, synced from SQLite by
+        # rowid on a background thread (at most one at a time). _index_lock
+        # guards the index state and the sync thread handoff; lookups never
+        # wait for a sync.
+        self._embedding_model = embedding_model
+        self._embedding_loaded = embedding_model is not None
+        self._embedding_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._sync_thread = None
+        self._sync_pending = False
+        self._next_index_sync = 0.0
+        self._prompt_index = None
+        self._indexed_rowid = 0
+        self._index_generation = None
         self.init_database()
-        self._lock = threading.Lock()
+    
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.cache_stats[key] += n
+    
+    def _record_ai_lookup(self, match_type: str, started: float):
+        with self._stats_lock:
+            self.cache_stats['misses' if match_type == 'miss' else 'hits'] += 1
+            self.ai_lookup_stats[match_type] += 1
+            self._lookup_latency_ms.append((time.perf_counter() - started) * 1000.0)
     
     def init_database(self):
         """Initialize enhanced cache database"""
@@ -107,6 +213,16 @@ class EnhancedCachingSystem:
                 )
             ''')
             
+            # Bumped whenever AI rows are deleted, so every process rebuilds
+            # its prompt index instead of searching dead entries
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            conn.execute("INSERT OR IGNORE INTO cache_meta (key, value) VALUES ('ai_index_generation', 0)")
+            
             # Create indexes for performance
             conn.execute('CREATE INDEX IF NOT EXISTS idx_ai_prompt_hash ON ai_response_cache(prompt_hash)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_query_hash ON query_cache(query_hash)')
@@ -139,158 +255,282 @@ class EnhancedCachingSystem:
                          user_rating: float = None, ttl_hours: int = 168) -> bool:
         """Cache AI response with enhanced metadata"""
         try:
-            with self._lock:
-                prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
-                
-                # Extract semantic tags
-                semantic_tags = self._extract_semantic_tags(prompt)
-                
-                # Calculate expiration
-                expires_at = datetime.now() + timedelta(hours=ttl_hours)
-                
-                conn = sqlite3.connect(str(self.db_path))
-                conn.execute('''
-                    INSERT OR REPLACE INTO ai_response_cache 
-                    (prompt_hash, prompt_text, response_text, provider, model, tokens_used,
-                     quality_score, semantic_tags, created_at, last_accessed, user_rating, expires_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'), ?, ?)
-                ''', (prompt_hash, prompt, response, provider, model, tokens_used,
-                      quality_score, json.dumps(semantic_tags), user_rating, expires_at))
-                
-                conn.commit()
-                conn.close()
-                
-                # Also cache in memory for fastest access
-                self.memory_cache[prompt_hash] = {
-                    'response': response,
-                    'provider': provider,
-                    'quality_score': quality_score,
-                    'cached_at': time.time()
-                }
-                
-                self.cache_stats['saves'] += 1
-                return True
+            prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+            
+            # Extract semantic tags
+            semantic_tags = self._extract_semantic_tags(prompt)
+            
+            # Calculate expiration
+            expires_at = datetime.now() + timedelta(hours=ttl_hours)
+            
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute('''
+                INSERT OR REPLACE INTO ai_response_cache 
+                (prompt_hash, prompt_text, response_text, provider, model, tokens_used,
+                 quality_score, semantic_tags, created_at, last_accessed, user_rating, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'), ?, ?)
+            ''', (prompt_hash, prompt, response, provider, model, tokens_used,
+                  quality_score, json.dumps(semantic_tags), user_rating, expires_at))
+            
+            conn.commit()
+            conn.close()
+            
+            # Also cache in memory for fastest access
+            self.memory_cache.set(prompt_hash, {
+                'response': response,
+                'provider': provider,
+                'quality_score': quality_score,
+                'cached_at': time.time()
+            })
+            
+            self._count('saves')
+            self.sync_prompt_index()
+            return True
                 
         except Exception as e:
             logger.error(f"AI response caching error: {e}")
             return False
     
+    @property
+    def embedding_model(self):
+        """Sentence-transformers model for prompt vectors, loaded on first use (None without it)
+        
+        A failed load is retried on the next call; callers meanwhile use hashed vectors.
+        """
+        if not self._embedding_loaded:
+            with self._embedding_lock:
+                if not self._embedding_loaded:
+                    if SentenceTransformer is not None and EMBED_MODEL:
+                        try:
+                            self._embedding_model = SentenceTransformer(EMBED_MODEL)
+                        except Exception as e:
+                            logger.warning(f"Prompt embeddings unavailable, using hashed vectors: {e}")
+                            return None
+                    self._embedding_loaded = True
+        return self._embedding_model
+    
+    def _prompt_vectors(self, texts: List[str]) -> "np.ndarray":
+        model = self.embedding_model
+        if model is None:
+            return np.stack([_prompt_vector(text) for text in texts])
+        vecs = model.encode(texts, batch_size=min(len(texts), 64), normalize_embeddings=True)
+        return np.asarray(vecs, dtype="float32").reshape(len(texts), -1)
+    
+    def sync_prompt_index(self, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """Catch the prompt index up with SQLite on the background sync thread
+        
+        Starts the thread if none is running, otherwise asks the running one
+        for another pass. With wait=True, blocks until the index is current
+        and returns False if timeout ran out first.
+        """
+        if IVFVectorIndex is None:
+            return True
+        with self._index_lock:
+            self._sync_pending = True
+            thread = self._sync_thread
+            if thread is None:
+                thread = self._sync_thread = threading.Thread(
+                    target=self._index_sync_worker, name="prompt-index-sync", daemon=True)
+                thread.start()
+        if wait:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+    
+    def _index_sync_worker(self):
+        while True:
+            with self._index_lock:
+                if not self._sync_pending:
+                    self._sync_thread = None
+                    self._next_index_sync = time.monotonic() + PROMPT_INDEX_SYNC_INTERVAL
+                    return
+                self._sync_pending = False
+            try:
+                conn = sqlite3.connect(str(self.db_path), timeout=30)
+                try:
+                    self._sync_prompt_index(conn)
+                finally:
+                    conn.close()
+            except Exception as e:
+                logger.error(f"Prompt index sync error: {e}")
+    
+    def _sync_prompt_index(self, conn: sqlite3.Connection):
+        """Index prompts written since the last sync (by any process) into the vector index
+        
+        Runs on the sync thread only. A generation change (rows deleted by
+        cleanup_expired_cache in any process) rebuilds the index from the
+        live rows; lookups keep searching the previous index until the new
+        one is swapped in.
+        """
+        generation = conn.execute(
+            "SELECT value FROM cache_meta WHERE key = 'ai_index_generation'"
+        ).fetchone()
+        generation = generation[0] if generation else 0
+        rebuild = self._prompt_index is None or self._index_generation != generation
+        since = 0 if rebuild else self._indexed_rowid
+        
+        last = conn.execute('SELECT MAX(id) FROM ai_response_cache').fetchone()[0] or 0
+        rows = []
+        if last > since:
+            rows = conn.execute('''
+                SELECT prompt_hash, prompt_text FROM ai_response_cache
+                WHERE id > ? AND id <= ? AND quality_score > ?
+                  AND (expires_at IS NULL OR expires_at > datetime('now'))
+            ''', (since, last, SEMANTIC_MIN_QUALITY)).fetchall()
+        vecs = self._prompt_vectors([row[1] or "" for row in rows]) if rows else None
+        
+        index = None if rebuild else self._prompt_index
+        if vecs is not None:
+            if index is None:
+                index = IVFVectorIndex(vecs.shape[1], min_train=PROMPT_INDEX_MIN_TRAIN)
+            index.upsert_many([row[0] for row in rows], vecs)
+        with self._index_lock:
+            self._prompt_index = index
+            self._indexed_rowid = last
+            self._index_generation = generation
+        return index
+    
+    def _semantic_candidates(self, conn: sqlite3.Connection, prompt: str) -> List[Tuple]:
+        """Nearest cached prompts by vector search, or the legacy top-20 scan
+        
+        The scan is used without numpy and until the background sync has
+        built a first index. Rows are (prompt_text, response_text, provider,
+        model, quality_score, score); score is the embedding cosine when a
+        model is loaded and None otherwise, in which case the caller reranks
+        by word overlap.
+        """
+        live = "(expires_at IS NULL OR expires_at > datetime('now')) AND quality_score > ?"
+        index = None
+        if IVFVectorIndex is not None:
+            if time.monotonic() >= self._next_index_sync:
+                self.sync_prompt_index()
+            index = self._prompt_index
+        if index is None:
+            rows = conn.execute(f'''
+                SELECT prompt_text, response_text, provider, model, quality_score
+                FROM ai_response_cache WHERE {live}
+                ORDER BY quality_score DESC
+                LIMIT 20
+            ''', (SEMANTIC_MIN_QUALITY,)).fetchall()
+            return [(*row, None) for row in rows]
+        
+        hits = index.search(self._prompt_vectors([prompt])[0], top_k=SEMANTIC_CANDIDATES)
+        scores = {doc_id: score for score, doc_id in hits if score > 0}
+        if not scores:
+            return []
+        marks = ",".join("?" * len(scores))
+        rows = conn.execute(f'''
+            SELECT prompt_text, response_text, provider, model, quality_score, prompt_hash
+            FROM ai_response_cache WHERE prompt_hash IN ({marks}) AND {live}
+        ''', (*scores, SEMANTIC_MIN_QUALITY)).fetchall()
+        embedded = self.embedding_model is not None
+        return [(*row[:5], scores[row[5]] if embedded else None) for row in rows]
+    
     def get_cached_ai_response(self, prompt: str, similarity_threshold: float = 0.8) -> Optional[Dict[str, Any]]:
         """Get cached AI response with semantic similarity matching"""
+        started = time.perf_counter()
         try:
-            with self._lock:
-                prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
-                
-                # Check memory cache first
-                if prompt_hash in self.memory_cache:
-                    cached = self.memory_cache[prompt_hash]
-                    # Check if still fresh (1 hour in memory)
-                    if time.time() - cached['cached_at'] < 3600:
-                        self.cache_stats['hits'] += 1
-                        return cached
-                    else:
-                        del self.memory_cache[prompt_hash]
-                
-                conn = sqlite3.connect(str(self.db_path))
-                
-                # First try exact match
-                cursor = conn.execute('''
-                    SELECT response_text, provider, model, quality_score, access_count
-                    FROM ai_response_cache 
-                    WHERE prompt_hash = ? AND (expires_at IS NULL OR expires_at > datetime('now'))
-                    ORDER BY quality_score DESC, access_count DESC
-                    LIMIT 1
+            prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+            
+            # Check memory cache first (entries live 1 hour in memory)
+            cached = self.memory_cache.get(prompt_hash)
+            if cached is not None:
+                self._record_ai_lookup('memory', started)
+                return cached
+            
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            
+            # First try exact match
+            cursor = conn.execute('''
+                SELECT response_text, provider, model, quality_score, access_count
+                FROM ai_response_cache 
+                WHERE prompt_hash = ? AND (expires_at IS NULL OR expires_at > datetime('now'))
+                ORDER BY quality_score DESC, access_count DESC
+                LIMIT 1
+            ''', (prompt_hash,))
+            
+            result = cursor.fetchone()
+            if result:
+                # Update access statistics
+                conn.execute('''
+                    UPDATE ai_response_cache 
+                    SET last_accessed = datetime('now'), access_count = access_count + 1
+                    WHERE prompt_hash = ?
                 ''', (prompt_hash,))
-                
-                result = cursor.fetchone()
-                if result:
-                    # Update access statistics
-                    conn.execute('''
-                        UPDATE ai_response_cache 
-                        SET last_accessed = datetime('now'), access_count = access_count + 1
-                        WHERE prompt_hash = ?
-                    ''', (prompt_hash,))
-                    conn.commit()
-                    conn.close()
-                    
-                    self.cache_stats['hits'] += 1
-                    return {
-                        'response': result[0],
-                        'provider': result[1],
-                        'model': result[2],
-                        'quality_score': result[3],
-                        'cached': True,
-                        'match_type': 'exact'
-                    }
-                
-                # If no exact match, try semantic similarity
-                cursor = conn.execute('''
-                    SELECT prompt_text, response_text, provider, model, quality_score
-                    FROM ai_response_cache 
-                    WHERE (expires_at IS NULL OR expires_at > datetime('now'))
-                    AND quality_score > 0.7
-                    ORDER BY quality_score DESC
-                    LIMIT 20
-                ''')
-                
-                candidates = cursor.fetchall()
-                best_match = None
-                best_similarity = 0
-                
-                for candidate in candidates:
-                    similarity = self.get_semantic_similarity(prompt, candidate[0])
-                    if similarity > similarity_threshold and similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match = candidate
-                
+                conn.commit()
                 conn.close()
                 
-                if best_match:
-                    self.cache_stats['hits'] += 1
-                    return {
-                        'response': best_match[1],
-                        'provider': best_match[2],
-                        'model': best_match[3],
-                        'quality_score': best_match[4],
-                        'cached': True,
-                        'match_type': 'semantic',
-                        'similarity_score': best_similarity
-                    }
-                
-                self.cache_stats['misses'] += 1
-                return None
+                self._record_ai_lookup('exact', started)
+                return {
+                    'response': result[0],
+                    'provider': result[1],
+                    'model': result[2],
+                    'quality_score': result[3],
+                    'cached': True,
+                    'match_type': 'exact'
+                }
+            
+            # If no exact match, take the nearest indexed prompt by embedding
+            # cosine (with hashed vectors, rerank by word overlap instead)
+            candidates = self._semantic_candidates(conn, prompt)
+            best_match = None
+            best_similarity = 0
+            
+            for candidate in candidates:
+                similarity = candidate[5]
+                if similarity is None:
+                    similarity = self.get_semantic_similarity(prompt, candidate[0])
+                if similarity > similarity_threshold and similarity > best_similarity:
+                    best_similarity = similarity
+                    best_match = candidate
+            
+            conn.close()
+            
+            if best_match:
+                self._record_ai_lookup('semantic', started)
+                return {
+                    'response': best_match[1],
+                    'provider': best_match[2],
+                    'model': best_match[3],
+                    'quality_score': best_match[4],
+                    'cached': True,
+                    'match_type': 'semantic',
+                    'similarity_score': best_similarity
+                }
+            
+            self._record_ai_lookup('miss', started)
+            return None
                 
         except Exception as e:
             logger.error(f"AI response cache retrieval error: {e}")
-            self.cache_stats['misses'] += 1
+            self._record_ai_lookup('miss', started)
             return None
     
     def cache_database_query(self, query: str, result: Any, table_names: List[str] = None, 
                            ttl_hours: int = 24) -> bool:
         """Cache database query result"""
         try:
-            with self._lock:
-                query_hash = hashlib.sha256(query.encode()).hexdigest()
-                
-                # Serialize result
-                result_data = pickle.dumps(result)
-                compressed_data = gzip.compress(result_data)
-                
-                expires_at = datetime.now() + timedelta(hours=ttl_hours)
-                
-                conn = sqlite3.connect(str(self.db_path))
-                conn.execute('''
-                    INSERT OR REPLACE INTO query_cache 
-                    (query_hash, query_text, result_data, table_names, created_at, last_accessed, expires_at)
-                    VALUES (?, ?, ?, ?, datetime('now'), datetime('now'), ?)
-                ''', (query_hash, query, compressed_data, json.dumps(table_names or []), expires_at))
-                
-                conn.commit()
-                conn.close()
-                
-                self.cache_stats['saves'] += 1
-                return True
-                
+            query_hash = hashlib.sha256(query.encode()).hexdigest()
+            
+            # Serialize result
+            result_data = pickle.dumps(result)
+            compressed_data = gzip.compress(result_data)
+            
+            expires_at = datetime.now() + timedelta(hours=ttl_hours)
+            
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute('''
+                INSERT OR REPLACE INTO query_cache 
+                (query_hash, query_text, result_data, table_names, created_at, last_accessed, expires_at)
+                VALUES (?, ?, ?, ?, datetime('now'), datetime('now'), ?)
+            ''', (query_hash, query, compressed_data, json.dumps(table_names or []), expires_at))
+            
+            conn.commit()
+            conn.close()
+            
+            self._count('saves')
+            return True
+            
         except Exception as e:
             logger.error(f"Database query caching error: {e}")
             return False
@@ -298,62 +538,60 @@ class EnhancedCachingSystem:
     def get_cached_database_query(self, query: str) -> Optional[Any]:
         """Get cached database query result"""
         try:
-            with self._lock:
-                query_hash = hashlib.sha256(query.encode()).hexdigest()
-                
-                conn = sqlite3.connect(str(self.db_path))
-                cursor = conn.execute('''
-                    SELECT result_data FROM query_cache 
-                    WHERE query_hash = ? AND (expires_at IS NULL OR expires_at > datetime('now'))
-                    LIMIT 1
+            query_hash = hashlib.sha256(query.encode()).hexdigest()
+            
+            conn = sqlite3.connect(str(self.db_path))
+            cursor = conn.execute('''
+                SELECT result_data FROM query_cache 
+                WHERE query_hash = ? AND (expires_at IS NULL OR expires_at > datetime('now'))
+                LIMIT 1
+            ''', (query_hash,))
+            
+            result = cursor.fetchone()
+            if result:
+                # Update access statistics
+                conn.execute('''
+                    UPDATE query_cache 
+                    SET last_accessed = datetime('now'), access_count = access_count + 1
+                    WHERE query_hash = ?
                 ''', (query_hash,))
+                conn.commit()
                 
-                result = cursor.fetchone()
-                if result:
-                    # Update access statistics
-                    conn.execute('''
-                        UPDATE query_cache 
-                        SET last_accessed = datetime('now'), access_count = access_count + 1
-                        WHERE query_hash = ?
-                    ''', (query_hash,))
-                    conn.commit()
-                    
-                    # Deserialize result
-                    compressed_data = result[0]
-                    result_data = gzip.decompress(compressed_data)
-                    cached_result = pickle.loads(result_data)
-                    
-                    conn.close()
-                    self.cache_stats['hits'] += 1
-                    return cached_result
+                # Deserialize result
+                compressed_data = result[0]
+                result_data = gzip.decompress(compressed_data)
+                cached_result = pickle.loads(result_data)
                 
                 conn.close()
-                self.cache_stats['misses'] += 1
-                return None
-                
+                self._count('hits')
+                return cached_result
+            
+            conn.close()
+            self._count('misses')
+            return None
+            
         except Exception as e:
             logger.error(f"Database query cache retrieval error: {e}")
-            self.cache_stats['misses'] += 1
+            self._count('misses')
             return None
     
     def invalidate_cache_by_tables(self, table_names: List[str]):
         """Invalidate cached queries that depend on specific tables"""
         try:
-            with self._lock:
-                conn = sqlite3.connect(str(self.db_path))
-                
-                for table_name in table_names:
-                    conn.execute('''
-                        DELETE FROM query_cache 
-                        WHERE table_names LIKE ? OR table_names LIKE ? OR table_names LIKE ?
-                    ''', (f'%"{table_name}"%', f'%{table_name}%', f'%{table_name.lower()}%'))
-                
-                conn.commit()
-                conn.close()
-                
-                self.cache_stats['invalidations'] += len(table_names)
-                logger.info(f"Invalidated cache for tables: {table_names}")
-                
+            conn = sqlite3.connect(str(self.db_path))
+            
+            for table_name in table_names:
+                conn.execute('''
+                    DELETE FROM query_cache 
+                    WHERE table_names LIKE ? OR table_names LIKE ? OR table_names LIKE ?
+                ''', (f'%"{table_name}"%', f'%{table_name}%', f'%{table_name.lower()}%'))
+            
+            conn.commit()
+            conn.close()
+            
+            self._count('invalidations', len(table_names))
+            logger.info(f"Invalidated cache for tables: {table_names}")
+            
         except Exception as e:
             logger.error(f"Cache invalidation error: {e}")
     
@@ -362,23 +600,22 @@ class EnhancedCachingSystem:
                              quality_score: float = 0.8) -> bool:
         """Cache voice processing results"""
         try:
-            with self._lock:
-                audio_hash = hashlib.sha256(audio_data).hexdigest()
-                
-                conn = sqlite3.connect(str(self.db_path))
-                conn.execute('''
-                    INSERT OR REPLACE INTO voice_cache 
-                    (audio_hash, transcription, voice_synthesis, language, quality_score,
-                     created_at, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-                ''', (audio_hash, transcription, synthesis_data, language, quality_score))
-                
-                conn.commit()
-                conn.close()
-                
-                self.cache_stats['saves'] += 1
-                return True
-                
+            audio_hash = hashlib.sha256(audio_data).hexdigest()
+            
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute('''
+                INSERT OR REPLACE INTO voice_cache 
+                (audio_hash, transcription, voice_synthesis, language, quality_score,
+                 created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+            ''', (audio_hash, transcription, synthesis_data, language, quality_score))
+            
+            conn.commit()
+            conn.close()
+            
+            self._count('saves')
+            return True
+            
         except Exception as e:
             logger.error(f"Voice processing caching error: {e}")
             return False
@@ -386,44 +623,43 @@ class EnhancedCachingSystem:
     def get_cached_voice_processing(self, audio_data: bytes) -> Optional[Dict[str, Any]]:
         """Get cached voice processing result"""
         try:
-            with self._lock:
-                audio_hash = hashlib.sha256(audio_data).hexdigest()
-                
-                conn = sqlite3.connect(str(self.db_path))
-                cursor = conn.execute('''
-                    SELECT transcription, voice_synthesis, language, quality_score
-                    FROM voice_cache 
+            audio_hash = hashlib.sha256(audio_data).hexdigest()
+            
+            conn = sqlite3.connect(str(self.db_path))
+            cursor = conn.execute('''
+                SELECT transcription, voice_synthesis, language, quality_score
+                FROM voice_cache 
+                WHERE audio_hash = ?
+                LIMIT 1
+            ''', (audio_hash,))
+            
+            result = cursor.fetchone()
+            if result:
+                # Update access statistics
+                conn.execute('''
+                    UPDATE voice_cache 
+                    SET last_accessed = datetime('now'), access_count = access_count + 1
                     WHERE audio_hash = ?
-                    LIMIT 1
                 ''', (audio_hash,))
-                
-                result = cursor.fetchone()
-                if result:
-                    # Update access statistics
-                    conn.execute('''
-                        UPDATE voice_cache 
-                        SET last_accessed = datetime('now'), access_count = access_count + 1
-                        WHERE audio_hash = ?
-                    ''', (audio_hash,))
-                    conn.commit()
-                    conn.close()
-                    
-                    self.cache_stats['hits'] += 1
-                    return {
-                        'transcription': result[0],
-                        'synthesis_data': result[1],
-                        'language': result[2],
-                        'quality_score': result[3],
-                        'cached': True
-                    }
-                
+                conn.commit()
                 conn.close()
-                self.cache_stats['misses'] += 1
-                return None
                 
+                self._count('hits')
+                return {
+                    'transcription': result[0],
+                    'synthesis_data': result[1],
+                    'language': result[2],
+                    'quality_score': result[3],
+                    'cached': True
+                }
+            
+            conn.close()
+            self._count('misses')
+            return None
+            
         except Exception as e:
             logger.error(f"Voice cache retrieval error: {e}")
-            self.cache_stats['misses'] += 1
+            self._count('misses')
             return None
     
     def _extract_semantic_tags(self, text: str) -> List[str]:
@@ -456,86 +692,113 @@ class EnhancedCachingSystem:
     def cleanup_expired_cache(self):
         """Clean up expired cache entries"""
         try:
-            with self._lock:
-                conn = sqlite3.connect(str(self.db_path))
-                
-                # Clean expired AI responses
-                cursor = conn.execute('DELETE FROM ai_response_cache WHERE expires_at < datetime("now")')
-                ai_deleted = cursor.rowcount
-                
-                # Clean expired queries
-                cursor = conn.execute('DELETE FROM query_cache WHERE expires_at < datetime("now")')
-                query_deleted = cursor.rowcount
-                
-                # Clean expired API responses
-                cursor = conn.execute('DELETE FROM api_cache WHERE expires_at < datetime("now")')
-                api_deleted = cursor.rowcount
-                
-                # Clean old voice cache (keep for 7 days)
-                cursor = conn.execute('''
-                    DELETE FROM voice_cache 
-                    WHERE created_at < datetime('now', '-7 days')
-                ''')
-                voice_deleted = cursor.rowcount
-                
-                conn.commit()
-                conn.close()
-                
-                # Clean memory cache
-                current_time = time.time()
-                expired_keys = [
-                    key for key, value in self.memory_cache.items()
-                    if current_time - value['cached_at'] > 3600  # 1 hour
-                ]
-                for key in expired_keys:
-                    del self.memory_cache[key]
-                
-                logger.info(f"Cache cleanup: AI:{ai_deleted}, Query:{query_deleted}, API:{api_deleted}, Voice:{voice_deleted}, Memory:{len(expired_keys)}")
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            
+            # Clean expired AI responses
+            cursor = conn.execute('DELETE FROM ai_response_cache WHERE expires_at < datetime("now")')
+            ai_deleted = cursor.rowcount
+            
+            # Clean expired queries
+            cursor = conn.execute('DELETE FROM query_cache WHERE expires_at < datetime("now")')
+            query_deleted = cursor.rowcount
+            
+            # Clean expired API responses
+            cursor = conn.execute('DELETE FROM api_cache WHERE expires_at < datetime("now")')
+            api_deleted = cursor.rowcount
+            
+            # Clean old voice cache (keep for 7 days)
+            cursor = conn.execute('''
+                DELETE FROM voice_cache 
+                WHERE created_at < datetime('now', '-7 days')
+            ''')
+            voice_deleted = cursor.rowcount
+            
+            # The vector index has no deletes: bump the generation so every
+            # process rebuilds its index from the surviving rows
+            if ai_deleted:
+                conn.execute("UPDATE cache_meta SET value = value + 1 WHERE key = 'ai_index_generation'")
+            
+            conn.commit()
+            conn.close()
+            if ai_deleted:
+                self.sync_prompt_index()
+            
+            # Clean memory cache
+            memory_expired = self.memory_cache.cleanup_expired()
+            
+            logger.info(f"Cache cleanup: AI:{ai_deleted}, Query:{query_deleted}, API:{api_deleted}, Voice:{voice_deleted}, Memory:{memory_expired}")
                 
         except Exception as e:
             logger.error(f"Cache cleanup error: {e}")
     
+    def _ai_lookup_summary(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counts = dict(self.ai_lookup_stats)
+            latencies = sorted(self._lookup_latency_ms)
+        lookups = sum(counts.values())
+        hits = lookups - counts['miss']
+        
+        def pct(p: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else 0.0
+        
+        return {
+            'lookups': lookups,
+            'hit_rate_percentage': (hits / lookups * 100) if lookups else 0,
+            'hits_by_type': {k: v for k, v in counts.items() if k != 'miss'},
+            'misses': counts['miss'],
+            'latency_ms': {
+                'avg': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'p50': pct(0.50),
+                'p95': pct(0.95),
+                'max': round(latencies[-1], 3) if latencies else 0.0,
+            },
+            'indexed_prompts': len(self._prompt_index) if self._prompt_index is not None else 0,
+        }
+    
     def get_cache_statistics(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
         try:
-            with self._lock:
-                conn = sqlite3.connect(str(self.db_path))
-                
-                # Count cache entries
-                ai_count = conn.execute('SELECT COUNT(*) FROM ai_response_cache').fetchone()[0]
-                query_count = conn.execute('SELECT COUNT(*) FROM query_cache').fetchone()[0]
-                voice_count = conn.execute('SELECT COUNT(*) FROM voice_cache').fetchone()[0]
-                api_count = conn.execute('SELECT COUNT(*) FROM api_cache').fetchone()[0]
-                
-                # Calculate hit rates
-                total_requests = self.cache_stats['hits'] + self.cache_stats['misses']
-                hit_rate = (self.cache_stats['hits'] / total_requests * 100) if total_requests > 0 else 0
-                
-                # Database size
-                db_size = os.path.getsize(str(self.db_path)) if os.path.exists(str(self.db_path)) else 0
-                
-                conn.close()
-                
-                return {
-                    'cache_entries': {
-                        'ai_responses': ai_count,
-                        'database_queries': query_count,
-                        'voice_processing': voice_count,
-                        'api_responses': api_count,
-                        'memory_cache': len(self.memory_cache)
-                    },
-                    'performance': {
-                        'hit_rate_percentage': hit_rate,
-                        'total_hits': self.cache_stats['hits'],
-                        'total_misses': self.cache_stats['misses'],
-                        'total_saves': self.cache_stats['saves'],
-                        'total_invalidations': self.cache_stats['invalidations']
-                    },
-                    'storage': {
-                        'database_size_bytes': db_size,
-                        'database_size_mb': db_size / (1024 * 1024)
-                    }
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            
+            # Count cache entries
+            ai_count = conn.execute('SELECT COUNT(*) FROM ai_response_cache').fetchone()[0]
+            query_count = conn.execute('SELECT COUNT(*) FROM query_cache').fetchone()[0]
+            voice_count = conn.execute('SELECT COUNT(*) FROM voice_cache').fetchone()[0]
+            api_count = conn.execute('SELECT COUNT(*) FROM api_cache').fetchone()[0]
+            
+            conn.close()
+            
+            # Calculate hit rates
+            with self._stats_lock:
+                stats = dict(self.cache_stats)
+            total_requests = stats['hits'] + stats['misses']
+            hit_rate = (stats['hits'] / total_requests * 100) if total_requests > 0 else 0
+            
+            # Database size
+            db_size = os.path.getsize(str(self.db_path)) if os.path.exists(str(self.db_path)) else 0
+            
+            return {
+                'cache_entries': {
+                    'ai_responses': ai_count,
+                    'database_queries': query_count,
+                    'voice_processing': voice_count,
+                    'api_responses': api_count,
+                    'memory_cache': len(self.memory_cache)
+                },
+                'performance': {
+                    'hit_rate_percentage': hit_rate,
+                    'total_hits': stats['hits'],
+                    'total_misses': stats['misses'],
+                    'total_saves': stats['saves'],
+                    'total_invalidations': stats['invalidations'],
+                    'ai_lookups': self._ai_lookup_summary()
+                },
+                'memory_tier': self.memory_cache.stats(),
+                'storage': {
+                    'database_size_bytes': db_size,
+                    'database_size_mb': db_size / (1024 * 1024)
                 }
+            }
                 
         except Exception as e:
             logger.error(f"Cache statistics error: {e}")
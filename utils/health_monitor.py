@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, Any, List
 from flask import Flask
 
+from nous_core.monitoring import get_sampler
+
 logger = logging.getLogger(__name__)
 
 class HealthMonitor:
@@ -189,12 +191,12 @@ class HealthMonitor:
         """Check system resource usage"""
         try:
             # CPU and memory usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = get_sampler().latest()['cpu_percent']
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
             # Health thresholds
-            cpu_healthy = cpu_percent < 80
+            cpu_healthy = cpu_percent is None or cpu_percent < 80  # None until the first CPU reading
             memory_healthy = memory.percent < 85
             disk_healthy = disk.percent < 90
             
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from flask import jsonify
 import logging
 
+from nous_core.monitoring import get_sampler
+
 logger = logging.getLogger(__name__)
 
 
@@ -133,7 +135,7 @@ class HealthMonitor:
             dict: System metrics
         """
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            cpu_percent = get_sampler().latest()['cpu_percent']
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
 
@@ -141,7 +143,7 @@ class HealthMonitor:
                 'cpu': {
                     'percent': cpu_percent,
                     'count': psutil.cpu_count(),
-                    'status': 'healthy' if cpu_percent < 80 else 'high'
+                    'status': 'warming_up' if cpu_percent is None else 'healthy' if cpu_percent < 80 else 'high'
                 },
                 'memory': {
                     'total_mb': round(memory.total / 1024 / 1024, 2),
@@ -11,7 +11,11 @@ DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 20.0)
 
 
 class HTTPError(RuntimeError):
-    pass
+    """Request failed; status_code is set when the server answered (None for network errors)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
 
 
 def http_get_json(
@@ -28,7 +32,7 @@ def http_get_json(
 
     if r.status_code >= 400:
         body = (r.text or "").strip()
-        raise HTTPError(f"GET {r.url} -> {r.status_code}: {body[:500]}")
+        raise HTTPError(f"GET {r.url} -> {r.status_code}: {body[:500]}", status_code=r.status_code)
     try:
         return r.json()
     except Exception as e:
@@ -52,7 +56,7 @@ def http_post_form_json(
 
     if r.status_code >= 400:
         body = (r.text or "").strip()
-        raise HTTPError(f"POST {r.url} -> {r.status_code}: {body[:500]}")
+        raise HTTPError(f"POST {r.url} -> {r.status_code}: {body[:500]}", status_code=r.status_code)
     try:
         return r.json()
     except Exception as e:
@@ -83,8 +83,10 @@ def setup_performance_middleware(app: Flask) -> None:
         # Add processing time header
         response.headers['X-Processing-Time'] = f"{processing_time:.3f}s"
 
-        # Apply compression if appropriate
-        if should_compress(request, response):
+        # Apply compression if appropriate (CompressionMiddleware, when
+        # installed by extensions.compression.init_compression, streams it instead)
+        compression = app.extensions.get('compression') or {}
+        if not compression.get('middleware') and should_compress(request, response):
             response = compress_response(response)
 
         # Apply cache headers if not already set
@@ -1,68 +1,213 @@
 """
 Rate Limiting Utility
-Provides rate limiting functionality for Flask routes 
+Provides rate limiting functionality for Flask routes
 Rate Limiting Utilities - Enhanced for Production
-Implements token bucket algorithm with Redis backend
+Implements GCRA (a token bucket variant) over a shared-memory table, so
+every gunicorn worker on the host enforces the same limit
 """
 
+import os
+import math
+import mmap
 import time
+import struct
+import tempfile
+import threading
 from functools import wraps
-from collections import defaultdict, deque
 from flask import request, jsonify, current_app, abort
 from typing import Dict, Tuple, Optional, Callable
 import logging
 import hashlib
 
+try:
+    import fcntl
+except ImportError:  # Windows: the table stays process-local
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+# Table layout: header, then buckets of SLOTS_PER_BUCKET slots.
+# Each slot is (key hash, theoretical arrival time, last seen); hash 0 = empty.
+_MAGIC = b"NOUSRL01"
+_HEADER = struct.Struct("<8sQ")
+_SLOT = struct.Struct("<Qdd")
+SLOTS_PER_BUCKET = 8
+_BUCKET = struct.Struct("<" + "Qdd" * SLOTS_PER_BUCKET)
+_THREAD_STRIPES = 64
+
+
+def _default_table_path(capacity: int) -> str:
+    """Shared file for the limiter table; /dev/shm keeps it in RAM like worker_tmp_dir"""
+    configured = os.environ.get("RATE_LIMIT_SHM_PATH")
+    if configured:
+        return configured
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(base, f"nous_rate_limit_{uid}_{capacity}.tbl")
+
+
 class RateLimiter:
-    """Simple in-memory rate limiter"""
-    
-    def __init__(self):
-        self.requests = defaultdict(deque)
-    
+    """
+    GCRA rate limiter backed by a fixed-size shared-memory hash table
+
+    - O(1) state per key: one theoretical arrival time (TAT), 24 bytes per slot
+    - The table holds at most `capacity` keys; a full bucket reuses the slot
+      whose bucket has refilled the most, so memory never grows
+    - Updates are atomic across processes (fcntl byte-range lock on the
+      bucket) and threads (striped thread locks, since fcntl locks are
+      per process)
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 65536):
+        self.nbuckets = max(1, capacity // SLOTS_PER_BUCKET)
+        self.capacity = self.nbuckets * SLOTS_PER_BUCKET
+        self.size = _HEADER.size + self.nbuckets * _BUCKET.size
+        self.path = None
+        self._fd = None
+        self._thread_locks = [threading.Lock() for _ in range(_THREAD_STRIPES)]
+        self.evictions = 0
+        try:
+            self._map = self._open_shared(path or _default_table_path(self.capacity)) if fcntl else None
+        except OSError as e:
+            logger.warning(f"Shared rate limit table unavailable ({e}); limits are per process")
+            self._map = None
+        if self._map is None:
+            self._map = mmap.mmap(-1, self.size)
+            _HEADER.pack_into(self._map, 0, _MAGIC, self.capacity)
+
+    def _open_shared(self, path: str) -> mmap.mmap:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    os.ftruncate(fd, self.size)
+                    os.pwrite(fd, _HEADER.pack(_MAGIC, self.capacity), 0)
+                elif _HEADER.unpack(os.pread(fd, _HEADER.size, 0).ljust(_HEADER.size, b"\0")) != (_MAGIC, self.capacity):
+                    # Never resize a table other workers may have mapped
+                    raise OSError(f"{path} holds an incompatible rate limit table")
+            finally:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            table = mmap.mmap(fd, self.size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        except OSError:
+            os.close(fd)
+            raise
+        self._fd = fd
+        self.path = path
+        return table
+
+    @staticmethod
+    def _hash(key: str, limit: int, window: int) -> int:
+        digest = hashlib.blake2b(f"{key}|{limit}|{window}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _update(self, key: str, limit: int, window: int, consume: bool) -> Tuple[bool, float]:
+        """Run one GCRA step for key; returns (allowed, TAT after the step)"""
+        limit = max(1, int(limit))
+        interval = window / limit
+        key_hash = self._hash(key, limit, window)
+        bucket = key_hash % self.nbuckets
+        offset = _HEADER.size + bucket * _BUCKET.size
+
+        with self._thread_locks[bucket % _THREAD_STRIPES]:
+            if self._fd is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, _BUCKET.size, offset)
+            try:
+                now = time.time()
+                slots = list(_BUCKET.unpack_from(self._map, offset))
+                index = None
+                for i in range(0, len(slots), 3):
+                    if slots[i] == key_hash:
+                        index = i
+                        break
+                if index is None:
+                    # Empty or fully refilled slots carry no state; otherwise evict
+                    # the slot closest to refilled
+                    index = min(range(0, len(slots), 3), key=lambda i: slots[i + 1] if slots[i] else float("-inf"))
+                    evicting = bool(slots[index]) and slots[index + 1] > now
+                    tat = now
+                else:
+                    evicting = False
+                    tat = max(slots[index + 1], now)
+
+                new_tat = tat + interval
+                allowed = new_tat - now <= window
+                if not consume:
+                    return True, tat
+                if allowed:
+                    self.evictions += evicting
+                    _SLOT.pack_into(self._map, offset + (index // 3) * _SLOT.size, key_hash, new_tat, now)
+                    return True, new_tat
+                return False, tat
+            finally:
+                if self._fd is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, _BUCKET.size, offset)
+
+    def check(self, key: str, limit: int, window: int, consume: bool = True) -> Dict[str, int]:
+        """Apply (or with consume=False, just inspect) the limit for key"""
+        allowed, tat = self._update(key, limit, window, consume)
+        now = time.time()
+        interval = window / max(1, int(limit))
+        backlog = max(0.0, tat - now)
+        current = min(limit, math.ceil(backlog / interval - 1e-9))
+        retry_after = 0 if allowed else max(0, math.ceil(tat + interval - window - now))
+        return {
+            'allowed': allowed,
+            'limit': limit,
+            'remaining': max(0, limit - current),
+            'reset_time': max(0, int(backlog)) if allowed else retry_after,
+            'retry_after': retry_after,
+            'current_requests': current
+        }
+
     def is_allowed(self, key: str, limit: int, window: int) -> bool:
         """
         Check if request is allowed based on rate limit
-        
+
         Args:
             key: Unique identifier (usually IP address)
             limit: Maximum number of requests
             window: Time window in seconds
-            
+
         Returns:
             True if request is allowed, False otherwise
         """
-        now = time.time()
-        
-        # Clean old requests outside the window
-        while self.requests[key] and self.requests[key][0] <= now - window:
-            self.requests[key].popleft()
-        
-        # Check if limit exceeded
-        if len(self.requests[key]) >= limit:
-            return False
-        
-        # Add current request
-        self.requests[key].append(now)
-        return True
-    
-    def get_reset_time(self, key: str, window: int) -> int:
+        return self._update(key, limit, window, consume=True)[0]
+
+    def check_rate_limit(self, key: str, limit: int = 60, window: int = 60) -> Dict[str, int]:
+        """Consume one request for key and report the outcome"""
+        return self.check(key, limit, window)
+
+    def get_reset_time(self, key: str, window: int, limit: int = 60) -> int:
         """Get time until rate limit resets"""
-        if not self.requests[key]:
-            return 0
-        
-        oldest_request = self.requests[key][0]
-        reset_time = oldest_request + window - time.time()
-        return max(0, int(reset_time))
+        return self.check(key, limit, window, consume=False)['reset_time']
+
+    def stats(self) -> Dict[str, int]:
+        """Occupancy of the shared table (scans it; for admin/diagnostics)"""
+        now = time.time()
+        used = active = 0
+        for bucket in range(self.nbuckets):
+            slots = _BUCKET.unpack_from(self._map, _HEADER.size + bucket * _BUCKET.size)
+            for i in range(0, len(slots), 3):
+                if slots[i]:
+                    used += 1
+                    active += slots[i + 1] > now
+        return {
+            'capacity': self.capacity,
+            'used_slots': used,
+            'active_keys': active,
+            'evictions': self.evictions,
+            'table_bytes': self.size,
+            'shared': self._fd is not None
+        }
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = RateLimiter(capacity=int(os.environ.get("RATE_LIMIT_MAX_KEYS", "65536")))
 
 def rate_limit(limit: int = 60, window: int = 60, per: str = "ip"):
     """
     Rate limiting decorator for Flask routes
-    
+
     Args:
         limit: Number of requests allowed
         window: Time window in seconds
@@ -81,12 +226,13 @@ def rate_limit(limit: int = 60, window: int = 60, per: str = "ip"):
                 key = per()
             else:
                 key = str(per)
-            
+
             # Check rate limit
-            if not rate_limiter.is_allowed(key, limit, window):
-                reset_time = rate_limiter.get_reset_time(key, window)
+            result = rate_limiter.check(key, limit, window)
+            if not result['allowed']:
+                reset_time = result['retry_after']
                 logger.warning(f"Rate limit exceeded for {key}. Reset in {reset_time}s")
-                
+
                 if request.path.startswith('/api/'):
                     return jsonify({
                         'error': 'Rate limit exceeded',
@@ -96,7 +242,7 @@ def rate_limit(limit: int = 60, window: int = 60, per: str = "ip"):
                 else:
                     # For web routes, return a user-friendly error page
                     abort(429)
-            
+
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -105,24 +251,16 @@ def get_rate_limit_status(key: str = None, limit: int = 60, window: int = 60) ->
     """Get current rate limit status for a key"""
     if key is None:
         key = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-    
-    now = time.time()
-    
-    # Clean old requests
-    while rate_limiter.requests[key] and rate_limiter.requests[key][0] <= now - window:
-        rate_limiter.requests[key].popleft()
-    
-    current_requests = len(rate_limiter.requests[key])
-    remaining = max(0, limit - current_requests)
-    reset_time = rate_limiter.get_reset_time(key, window)
-    
+
+    status = rate_limiter.check(key, limit, window, consume=False)
+
     return {
         'limit': limit,
-        'remaining': remaining,
-        'reset_time': reset_time,
-        'current_requests': current_requests
+        'remaining': status['remaining'],
+        'reset_time': status['reset_time'],
+        'current_requests': status['current_requests']
     }
 
 # Preconfigured limits used by auth routes
 login_rate_limit = rate_limit(limit=5, window=60)   # 5/min
-oauth_rate_limit = rate_limit(limit=10, window=60)  # 10/min
\ No newline at end of file
+oauth_rate_limit = rate_limit(limit=10, window=60)  # 10/min
@@ -0,0 +1,95 @@
+"""
+Safety Scanner
+Every intent, crisis and emotion lexicon (EN/ES) compiled into one shared
+multi-pattern scanner. The NLU service, the crisis_check decorator and the
+emotion detector all read their hits from the same cached scan of a message.
+"""
+
+from typing import Any, Dict, List
+
+from nous_core.patterns.lexicon import LexiconScanner, ScanResult
+
+# NLUService intents
+INTENT_KEYWORDS: Dict[str, List[str]] = {
+    "crisis": ["suicide", "kill myself", "self harm", "overdose", "cant go on", "abuso", "violencia", "911", "988", "741741"],
+    "cbt": ["thought", "distortion", "cbt", "challenge", "reframe"],
+    "dbt": ["dbt", "tipp", "wise mind", "stop skill", "opposite action"],
+    "act": ["defusion", "values", "aceptacion", "aceptar", "mindfulness"],
+    "grounding": ["ground", "anclaje", "panic", "panico", "ansiedad", "anxiety", "present moment"],
+    "behavioral_activation": ["activate", "activation", "motivation", "tarea", "task", "walk", "exercise"],
+    "motivational_interviewing": ["motivation", "ambivalence", "confidence", "importancia", "confianza", "cambio"],
+    "productivity": ["calendar", "schedule", "reminder", "task", "organize", "agenda"],
+    "gratitude": ["gratitude", "gracias", "agradecido"],
+}
+
+# NLUService crisis detection
+CRISIS_KEYWORDS: List[str] = [
+    "suicide", "kill myself", "self harm", "harm myself", "end it", "cant go on", "overdose", "abuse",
+    "assault", "rape", "violence", "hurt myself", "last goodbye",
+]
+
+# UserAuthDecorators.crisis_check, run over request bodies
+REQUEST_CRISIS_KEYWORDS: List[str] = [
+    'suicide', 'kill myself', 'end my life', 'self harm', 'hurt myself',
+    'overdose', 'pills', 'can\'t go on', 'want to die', 'no point',
+]
+
+# EmotionDetector
+EMOTION_KEYWORDS: Dict[str, List[str]] = {
+    'happy': ['happy', 'joy', 'excited', 'great', 'wonderful', 'amazing', 'fantastic', 'excellent', 'love', 'smile'],
+    'sad': ['sad', 'unhappy', 'depressed', 'down', 'blue', 'upset', 'disappointed', 'cry', 'tears'],
+    'angry': ['angry', 'mad', 'furious', 'rage', 'hate', 'annoyed', 'frustrated', 'irritated'],
+    'anxious': ['anxious', 'worried', 'nervous', 'stress', 'concern', 'afraid', 'fear', 'panic'],
+    'calm': ['calm', 'peaceful', 'relaxed', 'serene', 'tranquil', 'content'],
+    'surprised': ['surprised', 'shock', 'amazed', 'astonished', 'wow'],
+    'confused': ['confused', 'puzzled', 'uncertain', 'unclear', 'lost', 'unsure'],
+}
+
+INTENSITY_MODIFIERS: Dict[str, float] = {
+    'very': 1.5,
+    'extremely': 2.0,
+    'really': 1.3,
+    'quite': 1.2,
+    'somewhat': 0.8,
+    'a bit': 0.7,
+    'slightly': 0.6,
+}
+
+# NLUService fallback when the emotion detector is unavailable
+FALLBACK_EMOTION_KEYWORDS: Dict[str, List[str]] = {
+    "anxious": ["anxious", "nervous", "worried", "panico", "ansioso"],
+    "sad": ["sad", "down", "depressed", "triste"],
+    "angry": ["angry", "furious", "mad", "enojo"],
+    "overwhelmed": ["overwhelmed", "too much", "agotado"],
+    "distressed": ["hopeless", "cant go on", "sufrir"],
+}
+
+safety_scanner = LexiconScanner({
+    "intent": INTENT_KEYWORDS,
+    "crisis": {"crisis": CRISIS_KEYWORDS},
+    "request_crisis": {"crisis": REQUEST_CRISIS_KEYWORDS},
+    "emotion": EMOTION_KEYWORDS,
+    "intensity": {modifier: [modifier] for modifier in INTENSITY_MODIFIERS},
+    "emotion_fallback": FALLBACK_EMOTION_KEYWORDS,
+})
+
+
+def scan_message(text: str) -> ScanResult:
+    """All lexicon hits for a message (cached per normalized message)"""
+    return safety_scanner.scan(text)
+
+
+def iter_strings(value: Any):
+    """String values inside a decoded JSON / form payload, keys excluded"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_strings(item)
+
+
+__all__ = ["safety_scanner", "scan_message", "iter_strings", "INTENT_KEYWORDS", "CRISIS_KEYWORDS",
+           "REQUEST_CRISIS_KEYWORDS", "EMOTION_KEYWORDS", "INTENSITY_MODIFIERS", "FALLBACK_EMOTION_KEYWORDS"]
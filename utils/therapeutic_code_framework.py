@@ -8,6 +8,8 @@ Every variable holds space for healing.
 """
 
 import functools
+import os
+import threading
 import time
 import logging
 import random
@@ -47,13 +49,187 @@ ERROR_REFRAMES = {
     'permission': "Boundaries are healthy. This space isn't available right now."
 }
 
+# ⚙️ Decorator Modes
+# The mode is fixed when a decorator is applied ("compile time"), so the
+# wrapper built for it carries no per-call mode checks:
+# - "production" (default): no pauses; per-call narration becomes one
+#   sampled, structured DEBUG record (lazy %-args, `extra={"therapeutic": ...}`);
+#   errors are always logged; retries back off exponentially with jitter.
+# - "mindful": the original narrated behaviour - INFO prose and real pauses.
+DECORATOR_MODES = ('production', 'mindful')
+DECORATOR_MODE = os.environ.get('THERAPEUTIC_DECORATOR_MODE', 'production')
+# Fraction of production calls that emit their DEBUG record
+LOG_SAMPLE_RATE = float(os.environ.get('THERAPEUTIC_LOG_SAMPLE_RATE', '0.01'))
+
+def _resolve_mode(mode: Optional[str]) -> str:
+    mode = mode or DECORATOR_MODE
+    if mode not in DECORATOR_MODES:
+        raise ValueError(f"decorator mode must be one of {DECORATOR_MODES}, got {mode!r}")
+    return mode
+
+def _sampled() -> bool:
+    return LOG_SAMPLE_RATE > 0 and logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_SAMPLE_RATE
+
+class BackoffPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits a random time in
+    [0, min(max_delay, base * factor ** n)].
+    """
+    def __init__(self, base: float = 0.05, factor: float = 2.0, max_delay: float = 2.0, jitter: bool = True):
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base * self.factor ** attempt)
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+# ⏱️ Decorator Overhead Profiler
+class _Probe:
+    """Latency one decorator adds around one function (wrapper time minus the function's own)"""
+    __slots__ = ('decorator', 'function', 'mode', 'calls', 'total', 'max', '_local')
+
+    def __init__(self, decorator: str, function: str, mode: str):
+        self.decorator = decorator
+        self.function = function
+        self.mode = mode
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._local = threading.local()
+
+    def shim(self, func: Callable) -> Callable:
+        """Stands in for the decorated function so its own time can be subtracted"""
+        local = self._local
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                local.inner = getattr(local, 'inner', 0.0) + time.perf_counter() - started
+        return inner
+
+    def outer(self, wrapper: Callable) -> Callable:
+        local = self._local
+
+        @functools.wraps(wrapper)
+        def timed(*args, **kwargs):
+            enclosing = getattr(local, 'inner', 0.0)
+            local.inner = 0.0
+            started = time.perf_counter()
+            try:
+                return wrapper(*args, **kwargs)
+            finally:
+                added = time.perf_counter() - started - local.inner
+                local.inner = enclosing
+                self.calls += 1
+                self.total += added
+                self.max = max(self.max, added)
+        return timed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'decorator': self.decorator,
+            'function': self.function,
+            'mode': self.mode,
+            'calls': self.calls,
+            'avg_overhead_us': round(self.total / self.calls * 1e6, 3) if self.calls else 0.0,
+            'max_overhead_us': round(self.max * 1e6, 3),
+            'total_overhead_ms': round(self.total * 1000, 3),
+        }
+
+class DecoratorProfiler:
+    """
+    Reports the latency each therapeutic decorator adds per decorated function.
+    Like the mode, profiling is decided when a decorator is applied: enable it
+    (or set THERAPEUTIC_PROFILE=1) before the decorated modules are imported.
+    """
+    def __init__(self):
+        self.enabled = os.environ.get('THERAPEUTIC_PROFILE', '').lower() in ('1', 'true', 'yes')
+        self._probes: List[_Probe] = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            for probe in self._probes:
+                probe.calls, probe.total, probe.max = 0, 0.0, 0.0
+
+    def probe(self, decorator: str, func: Callable, mode: str) -> _Probe:
+        probe = _Probe(decorator, f"{func.__module__}.{func.__qualname__}", mode)
+        with self._lock:
+            self._probes.append(probe)
+        return probe
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per (decorator, function) overhead, most expensive first"""
+        with self._lock:
+            rows = [probe.stats() for probe in self._probes]
+        return sorted(rows, key=lambda row: row['total_overhead_ms'], reverse=True)
+
+decorator_profiler = DecoratorProfiler()
+
+def _probe(decorator: str, func: Callable, mode: str):
+    """(probe, function to call) - a timing shim around func while profiling, else func itself"""
+    if not decorator_profiler.enabled:
+        return None, func
+    probe = decorator_profiler.probe(decorator, func, mode)
+    return probe, probe.shim(func)
+
+def _finish(probe: Optional["_Probe"], wrapper: Callable, mode: str) -> Callable:
+    """Seal a decorator's wrapper: add the profiling probe and mark the mode"""
+    if probe is not None:
+        wrapper = probe.outer(wrapper)
+    wrapper._therapeutic_mode = mode
+    return wrapper
+
+def _production(decorator: str, label: str, func: Callable, error_level: int = logging.ERROR,
+                pause: float = 0.0, before: Optional[Callable[[], None]] = None,
+                on_error: Optional[Callable[[Exception], None]] = None) -> Callable:
+    """The production-mode wrapper shared by the narrating decorators"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if before is not None:
+            before()
+        sampled = _sampled()
+        started = time.perf_counter() if sampled else 0.0
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            logger.log(error_level, "🌈 %s (%s) learning opportunity in %s: %s", decorator, label, name, e)
+            if on_error is not None:
+                on_error(e)
+            raise
+        if sampled:
+            logger.debug("%s %s: %s ok", decorator, label, name, extra={'therapeutic': {
+                'decorator': decorator, 'label': label, 'function': name,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+                'skipped_pause_s': pause}})
+        return result
+    return wrapper
+
 # 🎭 DBT STOP Skill Decorator
-def stop_skill(action_description: str = "processing"):
+def stop_skill(action_description: str = "processing", mode: Optional[str] = None):
     """
     Implements DBT STOP skill:
     Stop → Take a step back → Observe → Proceed mindfully
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('stop_skill', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production('stop_skill', action_description, func, pause=0.1), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             # Stop - Pause before action
@@ -82,15 +258,21 @@ def stop_skill(action_description: str = "processing"):
                 logger.error(f"🌈 Learning opportunity during {action_description}: {str(e)}")
                 raise
                 
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 🧘 Mindfulness Wrapper
-def with_mindful_breathing(breath_count: int = 3):
+def with_mindful_breathing(breath_count: int = 3, mode: Optional[str] = None):
     """
     Wraps function execution with mindful breathing prompts
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('with_mindful_breathing', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production('with_mindful_breathing', f"{breath_count} breaths", func,
+                                                  pause=0.5 * breath_count), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             # Pre-execution breathing
@@ -106,15 +288,21 @@ def with_mindful_breathing(breath_count: int = 3):
             logger.info("🙏 Thank you for being present with this task.")
             
             return result
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 💭 Cognitive Reframe Decorator
-def cognitive_reframe(negative_pattern: str, balanced_thought: str):
+def cognitive_reframe(negative_pattern: str, balanced_thought: str, mode: Optional[str] = None):
     """
     CBT cognitive restructuring pattern for functions
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('cognitive_reframe', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production('cognitive_reframe', balanced_thought, func,
+                                                  error_level=logging.INFO), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             # Log the reframe
@@ -130,37 +318,60 @@ def cognitive_reframe(negative_pattern: str, balanced_thought: str):
                 logger.info(f"   💡 Alternative perspective: {str(e)} is information, not failure")
                 raise
                 
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 🤗 Therapeutic Session Wrapper
-def with_therapy_session(session_type: str = "supportive"):
+def _open_therapy_session(session_type: str) -> str:
+    """Set g.therapy_session when there is an app context; returns the session id"""
+    now = datetime.now()
+    session_id = now.strftime("%Y%m%d_%H%M%S")
+    try:
+        from flask import has_app_context
+        if has_app_context():
+            g.therapy_session = {
+                'id': session_id,
+                'type': session_type,
+                'start_time': now,
+                'coping_tips': []
+            }
+    except:
+        pass  # Skip if no app context
+    return session_id
+
+def _offer_coping_tip() -> str:
+    """Pick a coping tip and note it on the current session"""
+    coping_tip = random.choice(COMPASSION_PROMPTS)
+    try:
+        from flask import has_app_context
+        if has_app_context():
+            g.therapy_session['coping_tips'].append(coping_tip)
+    except:
+        pass
+    return coping_tip
+
+def with_therapy_session(session_type: str = "supportive", mode: Optional[str] = None):
     """
     Wraps API calls in a therapeutic session context
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('with_therapy_session', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production(
+                'with_therapy_session', session_type, func,
+                before=lambda: _open_therapy_session(session_type),
+                on_error=lambda e: _offer_coping_tip()), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Begin session
-            session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Begin session and set therapeutic context
+            session_id = _open_therapy_session(session_type)
             logger.info(f"🏥 Beginning {session_type} session {session_id}")
             
             # Check in with user
             logger.info("📝 Session check-in: How are you feeling right now?")
             
-            # Set therapeutic context
-            try:
-                from flask import has_app_context
-                if has_app_context():
-                    g.therapy_session = {
-                        'id': session_id,
-                        'type': session_type,
-                        'start_time': datetime.now(),
-                        'coping_tips': []
-                    }
-            except:
-                pass  # Skip if no app context
-            
             try:
                 # Process with therapeutic awareness
                 result = func(*args, **kwargs)
@@ -179,25 +390,24 @@ def with_therapy_session(session_type: str = "supportive"):
                 logger.info("💝 Remember: Setbacks are part of the journey, not the destination.")
                 
                 # Add coping tip
-                coping_tip = random.choice(COMPASSION_PROMPTS)
-                try:
-                    if has_app_context():
-                        g.therapy_session['coping_tips'].append(coping_tip)
-                except:
-                    pass
-                logger.info(f"💭 Coping tip: {coping_tip}")
+                logger.info(f"💭 Coping tip: {_offer_coping_tip()}")
                 
                 raise
                 
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 🌊 Distress Tolerance Wrapper
-def distress_tolerance(technique: str = "TIPP"):
+def distress_tolerance(technique: str = "TIPP", mode: Optional[str] = None):
     """
     DBT Distress Tolerance wrapper for high-stress operations
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('distress_tolerance', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production('distress_tolerance', technique, func), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             logger.info(f"🆘 High-stress operation detected. Activating {technique}...")
@@ -217,7 +427,7 @@ def distress_tolerance(technique: str = "TIPP"):
                 logger.info("🏄 You're still afloat. This wave will pass.")
                 raise
                 
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 💖 Self-Compassion Error Handler
@@ -240,11 +450,17 @@ class CompassionateException(Exception):
 """
 
 # 🎯 SMART Goal Function Wrapper
-def smart_goal(specific: str, measurable: str, achievable: str, relevant: str, time_bound: str):
+def smart_goal(specific: str, measurable: str, achievable: str, relevant: str, time_bound: str,
+               mode: Optional[str] = None):
     """
     Ensures functions align with SMART goal principles
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('smart_goal', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production('smart_goal', specific, func), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             logger.info(f"🎯 SMART Goal Activation for {func.__name__}:")
@@ -261,7 +477,7 @@ def smart_goal(specific: str, measurable: str, achievable: str, relevant: str, t
             logger.info(f"✅ Goal achieved in {duration:.2f}s! Celebrate this win!")
             
             return result
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 🌈 Therapeutic Variable Names
@@ -323,11 +539,16 @@ def log_with_self_compassion(level: str, message: str, affirmation: bool = True)
     getattr(logger, level.lower())(full_message)
 
 # 🎭 Interpersonal Effectiveness Wrapper (DEAR MAN)
-def dear_man_communication(objective: str):
+def dear_man_communication(objective: str, mode: Optional[str] = None):
     """
     DBT DEAR MAN skill for effective communication
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('dear_man_communication', func, resolved)
+        if resolved == 'production':
+            return _finish(probe, _production('dear_man_communication', objective, func), resolved)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             logger.info(f"📣 DEAR MAN Communication for: {objective}")
@@ -345,34 +566,43 @@ def dear_man_communication(objective: str):
             logger.info(f"✅ Communication objective '{objective}' completed with grace!")
             
             return result
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 🌱 Growth Mindset Loop Handler
-def growth_mindset_loop(max_attempts: int = 3):
+def growth_mindset_loop(max_attempts: int = 3, mode: Optional[str] = None,
+                        backoff: Optional[BackoffPolicy] = None):
     """
-    Transforms traditional retry logic into growth opportunity
+    Transforms traditional retry logic into growth opportunity.
+    Attempts are spaced by `backoff`: jittered exponential backoff in
+    production mode, the original one-second mindful pause in mindful mode.
     """
     def decorator(func: Callable) -> Callable:
+        resolved = _resolve_mode(mode)
+        probe, func = _probe('growth_mindset_loop', func, resolved)
+        mindful = resolved == 'mindful'
+        policy = backoff or (BackoffPolicy(base=1.0, factor=1.0, jitter=False) if mindful else BackoffPolicy())
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             for attemptNumber in range(max_attempts):
                 try:
-                    if attemptNumber > 0:
+                    if attemptNumber > 0 and mindful:
                         logger.info(f"🌱 Growth attempt #{attemptNumber + 1} - You're learning!")
                         
                     result = func(*args, **kwargs)
                     
                     if attemptNumber > 0:
-                        logger.info(f"🎉 Persistence paid off! Succeeded on attempt {attemptNumber + 1}")
+                        logger.info("🎉 Persistence paid off! Succeeded on attempt %d", attemptNumber + 1)
                         
                     return result
                     
                 except Exception as e:
                     if attemptNumber < max_attempts - 1:
-                        logger.info(f"💭 Attempt {attemptNumber + 1} taught us: {str(e)}")
-                        logger.info("🔄 Let's apply what we learned and try again...")
-                        time.sleep(1)  # Mindful pause
+                        logger.info("💭 Attempt %d taught us: %s", attemptNumber + 1, e)
+                        if mindful:
+                            logger.info("🔄 Let's apply what we learned and try again...")
+                        time.sleep(policy.delay(attemptNumber))  # Mindful pause
                     else:
                         logger.info(f"📚 We've learned {max_attempts} valuable lessons today.")
                         logger.info("🤗 Sometimes the journey is more important than the destination.")
@@ -382,7 +612,7 @@ def growth_mindset_loop(max_attempts: int = 3):
                             "Take a break, then consider a fresh perspective."
                         )
                         
-        return wrapper
+        return _finish(probe, wrapper, resolved)
     return decorator
 
 # 🫂 Support Group Pattern
@@ -457,6 +687,10 @@ __all__ = [
     'log_with_self_compassion',
     'dear_man_communication',
     'growth_mindset_loop',
+    'BackoffPolicy',
+    'DecoratorProfiler',
+    'decorator_profiler',
+    'DECORATOR_MODES',
     'TherapeuticContext',
     'generate_affirmation',
     'COMPASSION_PROMPTS',
@@ -14,9 +14,13 @@ import time
 import requests
 import base64
 import io
-from typing import Dict, List, Any, Optional, Union, Tuple
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, TimeoutError as FuturesTimeout, wait
+from typing import Dict, Iterator, List, Any, Optional, Union, Tuple
 from enum import Enum
 from functools import lru_cache
+from requests.adapters import HTTPAdapter
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -39,6 +43,44 @@ except ImportError:
     PLUGIN_REGISTRY_AVAILABLE = False
     logger.warning("Plugin registry not available - running in static mode")
 
+# Providers reached over the OpenAI-compatible HTTP API (pooled sessions, SSE streaming)
+HTTP_PROVIDERS = ('openrouter', 'openai')
+# Providers that can answer chat_completion, in hedging preference order
+CHAT_PROVIDERS = ('openrouter', 'openai', 'gemini')
+DEFAULT_BASE_URLS = {
+    'openrouter': "https://openrouter.ai/api/v1",
+    'openai': "https://api.openai.com/v1",
+}
+HTTP_POOL_SIZE = int(os.environ.get("AI_HTTP_POOL_SIZE", "16"))
+# Latency samples needed before the hedge deadline follows the observed p95
+HEDGE_MIN_SAMPLES = 20
+
+def _response_text(response: Dict[str, Any]) -> str:
+    """Extract the assistant text from an OpenAI-style or fallback response"""
+    try:
+        return response['choices'][0]['message']['content'] or ''
+    except (KeyError, IndexError, TypeError):
+        return response.get('content', '') if isinstance(response, dict) else ''
+
+def _iter_sse_deltas(response: requests.Response) -> Iterator[str]:
+    """Yield content deltas from an OpenAI/OpenRouter `stream: true` response"""
+    for raw in response.iter_lines():
+        line = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+        # Blank lines separate events; ':' lines are keep-alive comments (OpenRouter)
+        if not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        for choice in chunk.get('choices') or []:
+            content = (choice.get('delta') or {}).get('content')
+            if content:
+                yield content
+
 class TaskComplexity(Enum):
     BASIC = 1    # Simple responses, classification
     STANDARD = 2 # Regular chat, summarization
@@ -80,6 +122,24 @@ class UnifiedAIService:
         # Conversation memory for backwards compatibility
         self.conversation_memory = {}
 
+        # Keep-alive HTTP sessions per provider (rebuilt after fork)
+        self.base_urls = {
+            'openrouter': os.environ.get("OPENROUTER_BASE_URL", DEFAULT_BASE_URLS['openrouter']).rstrip('/'),
+            'openai': os.environ.get("OPENAI_BASE_URL", DEFAULT_BASE_URLS['openai']).rstrip('/'),
+        }
+        self._sessions = {}
+        self._sessions_pid = 0
+        self._session_lock = threading.Lock()
+
+        # Hedged requests: fire a second provider when the first is slower than its p95
+        self.hedge_requests = os.environ.get("AI_HEDGE_REQUESTS", "false").lower() == "true"
+        self.hedge_default_delay = float(os.environ.get("AI_HEDGE_DEFAULT_DELAY", "2.0"))
+        self.hedge_min_delay = float(os.environ.get("AI_HEDGE_MIN_DELAY", "0.25"))
+        self.hedge_stats = {'hedged': 0, 'secondary_wins': 0}
+        self._latencies = {p: deque(maxlen=200) for p in CHAT_PROVIDERS}
+        self._first_token_latencies = {p: deque(maxlen=200) for p in HTTP_PROVIDERS}
+        self._stats_lock = threading.Lock()
+
         # Initialize available providers
         self.available_providers = []
         if self.openrouter_key:
@@ -102,14 +162,8 @@ class UnifiedAIService:
         """Enhanced chat completion with adaptive AI learning integration"""
         try:
             # Auto-detect research questions if complexity not explicitly set
-            if complexity == TaskComplexity.STANDARD and messages:
-                last_message = messages[-1]['content'].lower()
-                research_keywords = ['research', 'study', 'analyze', 'investigate', 'compare', 'evaluate', 
-                                   'what is', 'how does', 'why does', 'explain', 'definition', 'facts about',
-                                   'statistics', 'data on', 'studies show', 'evidence', 'scientific']
-                if any(keyword in last_message for keyword in research_keywords):
-                    complexity = TaskComplexity.RESEARCH
-                    logger.info("Auto-detected research question, upgrading to RESEARCH complexity")
+            if complexity == TaskComplexity.STANDARD:
+                complexity = self.detect_complexity(messages)
             
             # MTM-CE Enhancement: Integrate with adaptive AI system
             if ADAPTIVE_AI_AVAILABLE and user_id and context:
@@ -123,17 +177,8 @@ class UnifiedAIService:
             else:
                 optimal_provider = self._select_best_provider(complexity)
             
-            # Generate response with selected provider
-            if optimal_provider == 'openrouter' and 'openrouter' in self.available_providers:
-                response = self._openrouter_chat(messages, max_tokens, temperature, complexity)
-            elif optimal_provider == 'gemini' and 'gemini' in self.available_providers:
-                response = self._gemini_chat(messages, max_tokens, temperature)
-            elif optimal_provider == 'openai' and 'openai' in self.available_providers:
-                # Use configured models based on complexity
-                model = self.models['openai_research'] if complexity == TaskComplexity.RESEARCH else self.models['openai_standard']
-                response = self._openai_chat(messages, max_tokens, temperature, model)
-            else:
-                response = self._fallback_response(messages[-1]['content'] if messages else "Hello")
+            # Generate response with selected provider (hedged when enabled)
+            response = self._complete(optimal_provider, messages, max_tokens, temperature, complexity)
             
             # MTM-CE Enhancement: Provide feedback to adaptive AI system
             if ADAPTIVE_AI_AVAILABLE and user_id and context:
@@ -157,6 +202,79 @@ class UnifiedAIService:
             logger.error(f"Enhanced chat completion error: {e}")
             return self._fallback_response(messages[-1]['content'] if messages else "Hello")
 
+    @staticmethod
+    def detect_complexity(messages: List[Dict[str, str]]) -> TaskComplexity:
+        """RESEARCH when the last message reads like a research question, else STANDARD"""
+        if not messages:
+            return TaskComplexity.STANDARD
+        last_message = str(messages[-1].get('content') or '').lower()
+        research_keywords = ['research', 'study', 'analyze', 'investigate', 'compare', 'evaluate', 
+                           'what is', 'how does', 'why does', 'explain', 'definition', 'facts about',
+                           'statistics', 'data on', 'studies show', 'evidence', 'scientific']
+        if any(keyword in last_message for keyword in research_keywords):
+            logger.info("Auto-detected research question, upgrading to RESEARCH complexity")
+            return TaskComplexity.RESEARCH
+        return TaskComplexity.STANDARD
+
+    def stream_chat_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000,
+                               temperature: float = 0.7,
+                               complexity: TaskComplexity = TaskComplexity.STANDARD) -> Iterator[str]:
+        """Yield response text as the provider generates it (falls back to one chunk)"""
+        provider = self._select_best_provider(complexity)
+        if provider in HTTP_PROVIDERS and provider in self.available_providers:
+            payload = {
+                "model": self._chat_model(provider, complexity),
+                "messages": messages,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stream": True
+            }
+            started = time.perf_counter()
+            streamed = False
+            try:
+                with self._post_chat(provider, payload, stream=True) as response:
+                    if response.status_code == 200:
+                        for delta in _iter_sse_deltas(response):
+                            if not streamed:
+                                streamed = True
+                                with self._stats_lock:
+                                    self._first_token_latencies[provider].append(time.perf_counter() - started)
+                            yield delta
+                        if streamed:
+                            self._record_latency(provider, time.perf_counter() - started)
+                            return
+                    else:
+                        logger.error(f"{provider} stream error: {response.status_code} - {response.text}")
+            except requests.RequestException as e:
+                logger.error(f"{provider} stream request error: {e}")
+            if streamed:
+                # Part of the answer is already on the wire; do not append a second one
+                return
+
+        # Non-streaming providers, or a stream that failed before its first token
+        text = _response_text(self._call_provider(provider, messages, max_tokens, temperature, complexity))
+        if text:
+            yield text
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Per-provider completion latency, time-to-first-token and hedging counters"""
+        def summary(samples):
+            ordered = sorted(samples)
+            if not ordered:
+                return {'count': 0}
+            return {
+                'count': len(ordered),
+                'p50_ms': round(ordered[int(0.50 * (len(ordered) - 1))] * 1000, 1),
+                'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1),
+            }
+
+        with self._stats_lock:
+            return {
+                'completion': {p: summary(v) for p, v in self._latencies.items()},
+                'first_token': {p: summary(v) for p, v in self._first_token_latencies.items()},
+                'hedging': {'enabled': self.hedge_requests, **self.hedge_stats},
+            }
+
     def text_to_speech(self, text: str, voice: str = "en-US-AriaRUS") -> bytes:
         """Text-to-speech using available providers"""
         try:
@@ -353,27 +471,145 @@ class UnifiedAIService:
         
         return status
 
-    # === PROVIDER IMPLEMENTATIONS ===
-    
-    def _openrouter_chat(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, complexity: TaskComplexity = TaskComplexity.STANDARD) -> Dict[str, Any]:
-        """OpenRouter chat implementation with dynamic model selection based on complexity"""
-        try:
-            # Select model based on complexity for optimal cost/quality balance
-            if complexity == TaskComplexity.RESEARCH:
-                model = self.models['openrouter_research']  # claude-sonnet-4.5 - Best reasoning
-            elif complexity == TaskComplexity.COMPLEX:
-                model = self.models['openrouter_complex']  # gemini-2.5-flash - Balanced
-            elif complexity == TaskComplexity.BASIC:
-                model = self.models['openrouter_basic']  # gemini-2.0-flash-exp:free - Free
-            else:  # STANDARD
-                model = self.models['openrouter_standard']  # deepseek-v3.2 - Cost-effective
-
-            headers = {
+    # === PROVIDER PLUMBING ===
+
+    def _provider_headers(self, provider: str) -> Dict[str, str]:
+        if provider == 'openrouter':
+            return {
                 "Authorization": f"Bearer {self.openrouter_key}",
                 "Content-Type": "application/json",
                 "HTTP-Referer": os.environ.get("APP_URL", "https://nous.app"),
                 "X-Title": "NOUS AI Platform"
             }
+        return {
+            "Authorization": f"Bearer {self.openai_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _session(self, provider: str) -> requests.Session:
+        """Shared keep-alive session for a provider, so calls reuse TLS connections"""
+        with self._session_lock:
+            if self._sessions_pid != os.getpid():
+                # Pooled sockets must not be shared across a fork
+                self._sessions = {}
+                self._sessions_pid = os.getpid()
+            session = self._sessions.get(provider)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(self._provider_headers(provider))
+                self._sessions[provider] = session
+            return session
+
+    def _post_chat(self, provider: str, payload: Dict[str, Any], stream: bool = False) -> requests.Response:
+        return self._session(provider).post(
+            f"{self.base_urls[provider]}/chat/completions",
+            json=payload,
+            timeout=30,
+            stream=stream
+        )
+
+    def _chat_model(self, provider: str, complexity: TaskComplexity) -> str:
+        if provider == 'openai':
+            # Use configured models based on complexity
+            return self.models['openai_research'] if complexity == TaskComplexity.RESEARCH else self.models['openai_standard']
+        # Select model based on complexity for optimal cost/quality balance
+        if complexity == TaskComplexity.RESEARCH:
+            return self.models['openrouter_research']  # claude-sonnet-4.5 - Best reasoning
+        elif complexity == TaskComplexity.COMPLEX:
+            return self.models['openrouter_complex']  # gemini-2.5-flash - Balanced
+        elif complexity == TaskComplexity.BASIC:
+            return self.models['openrouter_basic']  # gemini-2.0-flash-exp:free - Free
+        return self.models['openrouter_standard']  # deepseek-v3.2 - Cost-effective
+
+    def _record_latency(self, provider: str, seconds: float):
+        with self._stats_lock:
+            self._latencies[provider].append(seconds)
+
+    def _call_provider(self, provider: str, messages: List[Dict[str, str]], max_tokens: int,
+                       temperature: float, complexity: TaskComplexity) -> Dict[str, Any]:
+        if provider == 'openrouter' and 'openrouter' in self.available_providers:
+            return self._openrouter_chat(messages, max_tokens, temperature, complexity)
+        elif provider == 'gemini' and 'gemini' in self.available_providers:
+            return self._gemini_chat(messages, max_tokens, temperature)
+        elif provider == 'openai' and 'openai' in self.available_providers:
+            return self._openai_chat(messages, max_tokens, temperature, self._chat_model('openai', complexity))
+        return self._fallback_response(messages[-1]['content'] if messages else "Hello")
+
+    def _hedge_delay(self, provider: str) -> float:
+        """Seconds to wait for a provider before hedging: its observed p95 latency"""
+        with self._stats_lock:
+            samples = sorted(self._latencies[provider])
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, samples[int(0.95 * (len(samples) - 1))])
+
+    def _start_call(self, provider: str, args: tuple) -> Tuple[Future, threading.Event]:
+        """Run one provider call on its own thread; the event fires once the call has begun.
+
+        A dedicated thread per call keeps hedged calls from queueing behind each other,
+        so neither a busy process nor pool saturation can trip the hedge deadline.
+        """
+        future: Future = Future()
+        started = threading.Event()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            started.set()
+            try:
+                future.set_result(self._call_provider(provider, *args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=run, name=f"ai-hedge-{provider}", daemon=True).start()
+        return future, started
+
+    def _complete(self, provider: str, messages: List[Dict[str, str]], max_tokens: int,
+                  temperature: float, complexity: TaskComplexity) -> Dict[str, Any]:
+        """Call `provider`; with hedging on, race a backup provider once it runs past p95"""
+        backup = next((p for p in CHAT_PROVIDERS if p != provider and p in self.available_providers), None)
+        if not self.hedge_requests or backup is None or provider not in self.available_providers:
+            return self._call_provider(provider, messages, max_tokens, temperature, complexity)
+
+        args = (messages, max_tokens, temperature, complexity)
+        primary, started = self._start_call(provider, args)
+        started.wait()
+        # The deadline counts from when the primary call actually began
+        deadline = time.monotonic() + self._hedge_delay(provider)
+        try:
+            result = primary.result(timeout=max(0.0, deadline - time.monotonic()))
+            if not result.get('fallback'):
+                return result
+        except FuturesTimeout:
+            pass
+
+        with self._stats_lock:
+            self.hedge_stats['hedged'] += 1
+        secondary, _ = self._start_call(backup, args)
+        pending = {primary, secondary}
+        result = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if not result.get('fallback'):
+                    # The slower call finishes in the background and is discarded
+                    if future is secondary:
+                        with self._stats_lock:
+                            self.hedge_stats['secondary_wins'] += 1
+                        result['hedged_provider'] = backup
+                    return result
+        return result
+
+    # === PROVIDER IMPLEMENTATIONS ===
+    
+    def _openrouter_chat(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, complexity: TaskComplexity = TaskComplexity.STANDARD) -> Dict[str, Any]:
+        """OpenRouter chat implementation with dynamic model selection based on complexity"""
+        try:
+            model = self._chat_model('openrouter', complexity)
 
             payload = {
                 "model": model,
@@ -384,14 +620,11 @@ class UnifiedAIService:
 
             logger.info(f"OpenRouter request with model: {model} (complexity: {complexity.name})")
 
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            started = time.perf_counter()
+            response = self._post_chat('openrouter', payload)
 
             if response.status_code == 200:
+                self._record_latency('openrouter', time.perf_counter() - started)
                 result = response.json()
                 result['model_used'] = model
                 result['complexity'] = complexity.name
@@ -420,7 +653,9 @@ class UnifiedAIService:
 
             # Convert messages to Gemini format
             prompt = messages[-1]['content']
+            started = time.perf_counter()
             response = model.generate_content(prompt)
+            self._record_latency('gemini', time.perf_counter() - started)
 
             return {
                 "choices": [{
@@ -437,11 +672,6 @@ class UnifiedAIService:
     def _openai_chat(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, model: str = "gpt-4o-mini") -> Dict[str, Any]:
         """OpenAI chat implementation with dynamic model selection"""
         try:
-            headers = {
-                "Authorization": f"Bearer {self.openai_key}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "model": model,
                 "messages": messages,
@@ -449,14 +679,11 @@ class UnifiedAIService:
                 "temperature": temperature
             }
             
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
+            started = time.perf_counter()
+            response = self._post_chat('openai', payload)
             
             if response.status_code == 200:
+                self._record_latency('openai', time.perf_counter() - started)
                 return response.json()
             else:
                 return self._fallback_response(messages[-1]['content'])
@@ -523,7 +750,8 @@ class UnifiedAIService:
                     "content": response
                 }
             }],
-            "content": response
+            "content": response,
+            "fallback": True
         }
 
 # Create singleton instance
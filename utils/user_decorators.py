@@ -11,6 +11,7 @@ from flask import session, request, jsonify, redirect, url_for, current_app, g
 from models.user import User
 from models.setup_models import UserPreferences
 from models.database import db
+from utils.safety_scanner import iter_strings, scan_message
 
 logger = logging.getLogger(__name__)
 
@@ -169,19 +170,16 @@ class UserAuthDecorators:
         """Check for crisis keywords and provide resources"""
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Check request data for crisis keywords
-            crisis_keywords = [
-                'suicide', 'kill myself', 'end my life', 'self harm', 'hurt myself',
-                'overdose', 'pills', 'can\'t go on', 'want to die', 'no point'
-            ]
-            
-            request_text = ""
+            # Check the request's string values (not its keys or repr) for crisis
+            # keywords; scans are cached, so NLU reuses them for the same message
+            payload = None
             if request.is_json and request.json:
-                request_text = str(request.json).lower()
+                payload = request.json
             elif request.form:
-                request_text = str(dict(request.form)).lower()
+                payload = dict(request.form)
             
-            if any(keyword in request_text for keyword in crisis_keywords):
+            if payload is not None and any(scan_message(value).any('request_crisis')
+                                           for value in iter_strings(payload)):
                 UserAuthDecorators._log_crisis_trigger()
                 # Add crisis resources to response context
                 g.crisis_detected = True